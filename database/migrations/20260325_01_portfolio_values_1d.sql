@@ -0,0 +1,30 @@
+-- Materialized daily portfolio valuation (asset value, cash, net external flow).
+-- Rows are invalidated from the earliest affected date on transaction,
+-- price bar and FX writes, and recomputed lazily by the analytics reads.
+CREATE TABLE IF NOT EXISTS portfolio_values_1d (
+  portfolio_id bigint NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+  value_date date NOT NULL,
+  asset_value numeric(28,10) NOT NULL,
+  cash_value numeric(28,10) NOT NULL,
+  net_external_flow numeric(28,10) NOT NULL DEFAULT 0,
+  computed_at timestamptz NOT NULL DEFAULT now(),
+  PRIMARY KEY (portfolio_id, value_date)
+);
+
+ALTER TABLE portfolio_values_1d ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_policies WHERE tablename = 'portfolio_values_1d' AND policyname = 'portfolio_values_1d_owner'
+  ) THEN
+    CREATE POLICY portfolio_values_1d_owner ON portfolio_values_1d
+      USING (
+        EXISTS (
+          SELECT 1 FROM portfolios
+          WHERE portfolios.id = portfolio_values_1d.portfolio_id
+            AND portfolios.owner_user_id = public.clerk_user_id()
+        )
+      );
+  END IF;
+END $$;
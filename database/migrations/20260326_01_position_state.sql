@@ -0,0 +1,54 @@
+-- Incremental average-cost position ledger per (portfolio, asset).
+-- Appended trades are folded in by the transaction writes; back-dated,
+-- edited or deleted trades replay the affected asset. A portfolio's rows are
+-- authoritative only while its row in position_state_portfolios exists:
+-- FX writes that can change the cost basis of past trades drop it and the
+-- next positions read rebuilds the ledger.
+CREATE TABLE IF NOT EXISTS position_state (
+  portfolio_id bigint NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+  asset_id bigint NOT NULL REFERENCES assets(id) ON DELETE CASCADE,
+  quantity double precision NOT NULL DEFAULT 0,
+  cost_basis double precision NOT NULL DEFAULT 0,
+  running_quantity double precision NOT NULL DEFAULT 0,
+  first_trade_at timestamptz,
+  last_trade_at timestamptz,
+  last_transaction_id bigint,
+  updated_at timestamptz NOT NULL DEFAULT now(),
+  PRIMARY KEY (portfolio_id, asset_id)
+);
+
+CREATE TABLE IF NOT EXISTS position_state_portfolios (
+  portfolio_id bigint PRIMARY KEY REFERENCES portfolios(id) ON DELETE CASCADE,
+  rebuilt_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE position_state ENABLE ROW LEVEL SECURITY;
+ALTER TABLE position_state_portfolios ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_policies WHERE tablename = 'position_state' AND policyname = 'position_state_owner'
+  ) THEN
+    CREATE POLICY position_state_owner ON position_state
+      USING (
+        EXISTS (
+          SELECT 1 FROM portfolios
+          WHERE portfolios.id = position_state.portfolio_id
+            AND portfolios.owner_user_id = public.clerk_user_id()
+        )
+      );
+  END IF;
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_policies WHERE tablename = 'position_state_portfolios' AND policyname = 'position_state_portfolios_owner'
+  ) THEN
+    CREATE POLICY position_state_portfolios_owner ON position_state_portfolios
+      USING (
+        EXISTS (
+          SELECT 1 FROM portfolios
+          WHERE portfolios.id = position_state_portfolios.portfolio_id
+            AND portfolios.owner_user_id = public.clerk_user_id()
+        )
+      );
+  END IF;
+END $$;
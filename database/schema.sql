@@ -164,6 +164,34 @@ create table fx_rates_1d (
 );
 create index idx_fx_rates_1d_pair_date_desc on fx_rates_1d(from_ccy, to_ccy, price_date desc);
 
+create table portfolio_values_1d (
+  portfolio_id bigint not null references portfolios(id) on delete cascade,
+  value_date date not null,
+  asset_value numeric(28,10) not null,
+  cash_value numeric(28,10) not null,
+  net_external_flow numeric(28,10) not null default 0,
+  computed_at timestamptz not null default now(),
+  primary key (portfolio_id, value_date)
+);
+
+create table position_state (
+  portfolio_id bigint not null references portfolios(id) on delete cascade,
+  asset_id bigint not null references assets(id) on delete cascade,
+  quantity double precision not null default 0,
+  cost_basis double precision not null default 0,
+  running_quantity double precision not null default 0,
+  first_trade_at timestamptz,
+  last_trade_at timestamptz,
+  last_transaction_id bigint,
+  updated_at timestamptz not null default now(),
+  primary key (portfolio_id, asset_id)
+);
+
+create table position_state_portfolios (
+  portfolio_id bigint primary key references portfolios(id) on delete cascade,
+  rebuilt_at timestamptz not null default now()
+);
+
 create table api_idempotency_keys (
   idempotency_key varchar(128) not null,
   endpoint text not null,
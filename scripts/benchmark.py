@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark the repository and analytics hot paths on a synthetic dataset.
+
+Point DATABASE_URL to a dedicated database: the first run creates the schema
+if the database is empty, then loads N portfolios, M assets, years of daily
+bars and FX rates and the PAC transactions through the repository. Later runs
+reuse the data (--rebuild reloads it).
+
+Timings are compared with src/backend/benchmarks/baseline.json when it was
+recorded for the same dataset and cache mode; the exit code is 1 if a case
+got slower than its threshold. --update-baseline rewrites it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_SRC = ROOT / "src" / "backend"
+if str(BACKEND_SRC) not in sys.path:
+    sys.path.insert(0, str(BACKEND_SRC))
+
+from app.config import get_settings  # noqa: E402
+from app.db import engine  # noqa: E402
+from app.repository import PortfolioRepository, PortfolioSnapshotCache, PriceSeriesCache  # noqa: E402
+from benchmarks.cases import CASES, BenchContext  # noqa: E402
+from benchmarks.dataset import DatasetSpec, load  # noqa: E402
+from benchmarks.runner import (  # noqa: E402
+    BASELINE_PATH,
+    build_baseline,
+    compare,
+    format_report,
+    load_baseline,
+    run_case,
+    save_baseline,
+)
+
+
+def main() -> int:
+    defaults = DatasetSpec()
+    parser = argparse.ArgumentParser(description="Benchmark repository and analytics hot paths")
+    parser.add_argument("--portfolios", type=int, default=defaults.portfolios)
+    parser.add_argument("--assets", type=int, default=defaults.assets)
+    parser.add_argument("--years", type=int, default=defaults.years)
+    parser.add_argument("--assets-per-portfolio", type=int, default=defaults.assets_per_portfolio)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--rebuild", action="store_true", help="Reload the dataset even if already present")
+    parser.add_argument("--only", action="append", default=None, help="Run only this case (repeatable)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per case (default: 1)")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per case (default: 7)")
+    parser.add_argument("--warm", action="store_true", help="Keep the repository caches between runs")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Record these timings as the baseline")
+    parser.add_argument("--tolerance", type=float, default=None, help="Allowed slowdown, e.g. 0.5 (default: baseline's)")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the timings to this file")
+    args = parser.parse_args()
+
+    # Per-row INFO logs (CSV import) would be timed along with the work.
+    logging.getLogger().setLevel(logging.WARNING)
+    known = {case.name for case in CASES}
+    unknown = sorted(set(args.only or []) - known)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)} (available: {', '.join(sorted(known))})")
+    if args.repeat < 1:
+        parser.error("--repeat must be >= 1")
+
+    spec = DatasetSpec(
+        portfolios=args.portfolios,
+        assets=args.assets,
+        years=args.years,
+        assets_per_portfolio=args.assets_per_portfolio,
+        seed=args.seed,
+    )
+    settings = get_settings()
+    repo = PortfolioRepository(
+        engine,
+        snapshot_cache=PortfolioSnapshotCache(
+            ttl_seconds=settings.snapshot_cache_ttl_seconds,
+            max_entries=settings.snapshot_cache_max_entries,
+        ),
+        price_series_cache=PriceSeriesCache(max_bytes=int(settings.price_series_cache_max_mb * 1024 * 1024)),
+    )
+    data = load(repo, spec, rebuild=args.rebuild)
+    transactions = sum(len(ledger) for ledger in data.dataset.transactions)
+    print(
+        f"dataset {spec.key}: {spec.portfolios} portfolios, {spec.assets} assets, "
+        f"{len(data.dataset.days)} days, {transactions} transactions"
+    )
+
+    ctx = BenchContext(repo=repo, data=data)
+    mode = "warm" if args.warm else "cold"
+    results = {
+        case.name: run_case(ctx, case, warmup=args.warmup, repeat=args.repeat, cold=not args.warm)
+        for case in CASES
+        if args.only is None or case.name in args.only
+    }
+
+    baseline = load_baseline(args.baseline)
+    comparable = baseline is not None and baseline.get("spec") == spec.to_dict() and baseline.get("mode") == mode
+    print(format_report(results, baseline if comparable else None))
+    if args.json:
+        args.json.write_text(json.dumps({"spec": spec.to_dict(), "mode": mode, "cases": results}, indent=2) + "\n")
+
+    if args.update_baseline:
+        save_baseline(build_baseline(results, spec=spec.to_dict(), mode=mode, previous=baseline), args.baseline)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not comparable:
+        print("no baseline for this dataset and cache mode: nothing to compare")
+        return 0
+
+    regressions = compare(results, baseline, tolerance=args.tolerance)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.case}: fastest run {regression.current_ms:.2f} ms, "
+            f"baseline median {regression.baseline_ms:.2f} ms (x{regression.ratio:.2f}, tolerance {regression.tolerance:.0%})"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Bulk-load daily price bars and FX rates from CSV files.
+
+Meant for initial loads on new deployments and multi-year backfills: rows are
+streamed with COPY into a staging table and merged in one statement.
+
+Bars CSV columns:  asset_id or symbol, date, open, high, low, close[, volume]
+FX CSV columns:    from_ccy, to_ccy, date, rate
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from datetime import date
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_SRC = ROOT / "src" / "backend"
+if str(BACKEND_SRC) not in sys.path:
+    sys.path.insert(0, str(BACKEND_SRC))
+
+from app.config import get_settings  # noqa: E402
+from app.db import engine  # noqa: E402
+from app.repository import PortfolioRepository  # noqa: E402
+
+
+def _float_or_none(value: str | None) -> float | None:
+    value = (value or "").strip()
+    return float(value) if value else None
+
+
+def iter_bar_rows(path: Path, repo: PortfolioRepository):
+    asset_ids: dict[str, int | None] = {}
+    with path.open(newline="", encoding="utf-8") as handle:
+        for line_no, record in enumerate(csv.DictReader(handle), start=2):
+            asset_id = (record.get("asset_id") or "").strip()
+            if not asset_id:
+                symbol = (record.get("symbol") or "").strip().upper()
+                if symbol not in asset_ids:
+                    asset = repo.find_asset_by_symbol(symbol) if symbol else None
+                    asset_ids[symbol] = asset["id"] if asset else None
+                    if asset is None:
+                        print(f"{path.name}:{line_no}: asset '{symbol}' not found, rows skipped")
+                asset_id = asset_ids[symbol]
+                if asset_id is None:
+                    continue
+            yield {
+                "asset_id": int(asset_id),
+                "price_date": date.fromisoformat(record["date"].strip()),
+                "open": float(record["open"]),
+                "high": float(record["high"]),
+                "low": float(record["low"]),
+                "close": float(record["close"]),
+                "volume": _float_or_none(record.get("volume")),
+            }
+
+
+def iter_fx_rows(path: Path):
+    with path.open(newline="", encoding="utf-8") as handle:
+        for record in csv.DictReader(handle):
+            yield {
+                "from_ccy": record["from_ccy"],
+                "to_ccy": record["to_ccy"],
+                "price_date": date.fromisoformat(record["date"].strip()),
+                "rate": float(record["rate"]),
+            }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk-load daily price bars and FX rates from CSV")
+    parser.add_argument("--bars", type=Path, help="CSV file with daily bars")
+    parser.add_argument("--fx", type=Path, help="CSV file with daily FX rates")
+    parser.add_argument("--provider", default=None, help="Provider label (default: FINANCE_PROVIDER)")
+    args = parser.parse_args()
+
+    if not args.bars and not args.fx:
+        parser.error("at least one of --bars / --fx is required")
+
+    provider = (args.provider or get_settings().finance_provider).strip().lower()
+    repo = PortfolioRepository(engine)
+
+    if args.bars:
+        result = repo.bulk_load_price_bars_1d(provider=provider, rows=iter_bar_rows(args.bars, repo))
+        print(f"price_bars_1d: inserted={result.inserted} updated={result.updated} unchanged={result.unchanged}")
+    if args.fx:
+        result = repo.bulk_load_fx_rates_1d(provider=provider, rows=iter_fx_rows(args.fx))
+        print(f"fx_rates_1d: inserted={result.inserted} updated={result.updated} unchanged={result.unchanged}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Rebuild the incremental position ledger (position_state) from transactions.
+
+The ledger is kept up to date by the transaction writes and rebuilt lazily
+on read when missing; run this after editing transactions directly in the
+database or to warm it up after the migration.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_SRC = ROOT / "src" / "backend"
+if str(BACKEND_SRC) not in sys.path:
+    sys.path.insert(0, str(BACKEND_SRC))
+
+from app.db import engine  # noqa: E402
+from app.repository import PortfolioRepository  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild position_state from transactions")
+    parser.add_argument("--portfolio-id", type=int, default=None, help="Only this portfolio (default: all)")
+    args = parser.parse_args()
+
+    repo = PortfolioRepository(engine)
+    rebuilt = repo.rebuild_position_state(args.portfolio_id)
+    print(f"position_state: rebuilt {rebuilt} portfolio(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, Query
 
+from ..async_finance_client import AsyncFinanceClient, as_async_finance_client
 from ..auth import AuthContext
 from ..rate_limit import require_auth_rate_limited
 from ..config import get_settings
@@ -16,7 +17,7 @@ from ..schemas.portfolio_doctor import (
 )
 from ..services.portfolio_doctor import (
     analyze_portfolio_health,
-    compute_portfolio_xray,
+    compute_portfolio_xray_async,
     run_aggregate_decumulation_plan,
     run_decumulation_plan,
     run_monte_carlo_projection,
@@ -24,7 +25,13 @@ from ..services.portfolio_doctor import (
 )
 
 
-def register_portfolio_health_routes(router: APIRouter, repo: PortfolioRepository, finance_client: object = None, justetf_client: object = None) -> None:
+def register_portfolio_health_routes(
+    router: APIRouter,
+    repo: PortfolioRepository,
+    finance_client: object = None,
+    justetf_client: object = None,
+    async_finance_client: AsyncFinanceClient | None = None,
+) -> None:
     settings = get_settings()
 
     @router.get(
@@ -84,6 +91,7 @@ def register_portfolio_health_routes(router: APIRouter, repo: PortfolioRepositor
         other_income_annual: float = Query(default=0.0, ge=0),
         capital_gains_tax_rate_pct: float = Query(default=26.0, ge=0, le=100),
         current_age: int | None = Query(default=None, ge=18, le=100),
+        target_success_rate_pct: float = Query(default=90.0, ge=50, le=99),
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> AggregateDecumulationPlanResponse:
         try:
@@ -96,6 +104,7 @@ def register_portfolio_health_routes(router: APIRouter, repo: PortfolioRepositor
                 other_income_annual=other_income_annual,
                 capital_gains_tax_rate_pct=capital_gains_tax_rate_pct,
                 current_age=current_age,
+                target_success_rate_pct=target_success_rate_pct,
                 user_id=_auth.user_id,
             )
         except ValueError as exc:
@@ -116,6 +125,7 @@ def register_portfolio_health_routes(router: APIRouter, repo: PortfolioRepositor
         other_income_annual: float = Query(default=0.0, ge=0),
         capital_gains_tax_rate_pct: float = Query(default=26.0, ge=0, le=100),
         current_age: int | None = Query(default=None, ge=18, le=100),
+        target_success_rate_pct: float = Query(default=90.0, ge=50, le=99),
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> DecumulationPlanResponse:
         try:
@@ -128,6 +138,7 @@ def register_portfolio_health_routes(router: APIRouter, repo: PortfolioRepositor
                 other_income_annual=other_income_annual,
                 capital_gains_tax_rate_pct=capital_gains_tax_rate_pct,
                 current_age=current_age,
+                target_success_rate_pct=target_success_rate_pct,
                 user_id=_auth.user_id,
             )
         except ValueError as exc:
@@ -138,7 +149,7 @@ def register_portfolio_health_routes(router: APIRouter, repo: PortfolioRepositor
         response_model=XRayResponse,
         responses={404: {"model": ErrorResponse}},
     )
-    def get_portfolio_xray(
+    async def get_portfolio_xray(
         portfolio_id: int,
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> XRayResponse:
@@ -146,12 +157,13 @@ def register_portfolio_health_routes(router: APIRouter, repo: PortfolioRepositor
             raise AppError(code="not_configured", message="Finance client non disponibile", status_code=500)
         try:
             xray_justetf_client = justetf_client if settings.justetf_xray_auto_enrich_enabled_resolved else None
-            return compute_portfolio_xray(
+            return await compute_portfolio_xray_async(
                 repo,
                 portfolio_id,
                 _auth.user_id,
-                finance_client,
+                async_finance_client or as_async_finance_client(finance_client),
                 justetf_client=xray_justetf_client,
+                fanout_limit=settings.finance_fanout_limit,
             )
         except ValueError as exc:
             raise AppError(code="not_found", message=str(exc), status_code=404) from exc
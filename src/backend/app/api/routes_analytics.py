@@ -1,7 +1,15 @@
+import logging
 from datetime import date
 
 from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 
+from ..async_finance_client import (
+    DEFAULT_FANOUT_LIMIT,
+    AsyncFinanceClient,
+    as_async_finance_client,
+    gather_bounded,
+)
 from ..auth import AuthContext
 from ..rate_limit import require_auth_rate_limited
 from ..errors import AppError
@@ -24,6 +32,9 @@ from ..models import (
     TWRTimeseriesPoint,
 )
 from ..repository import PortfolioRepository
+from ..responses import NDJSONResponse, SafeJSONResponse, series_response_doc
+
+logger = logging.getLogger(__name__)
 
 
 def register_analytics_routes(
@@ -31,6 +42,8 @@ def register_analytics_routes(
     repo: PortfolioRepository,
     performance_service: object,
     finance_client: object,
+    async_finance_client: AsyncFinanceClient | None = None,
+    fanout_limit: int = DEFAULT_FANOUT_LIMIT,
 ) -> None:
 
     @router.get(
@@ -89,15 +102,24 @@ def register_analytics_routes(
     @router.get(
         "/portfolios/{portfolio_id}/performance/twr/timeseries",
         response_model=list[TWRTimeseriesPoint],
-        responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+        responses={200: series_response_doc("ndjson", "columnar"), 400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
     )
     def get_performance_twr_timeseries(
         portfolio_id: int,
         start_date: date | None = Query(default=None),
         end_date: date | None = Query(default=None),
+        format: str = Query(default="json", pattern="^(json|ndjson|columnar)$"),
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> list[TWRTimeseriesPoint]:
         try:
+            if format == "ndjson":
+                return NDJSONResponse(
+                    performance_service.iter_twr_timeseries(portfolio_id, _auth.user_id, start_date=start_date, end_date=end_date)
+                )
+            if format == "columnar":
+                return SafeJSONResponse(
+                    performance_service.get_twr_timeseries_columns(portfolio_id, _auth.user_id, start_date, end_date)
+                )
             return performance_service.get_twr_timeseries(portfolio_id, _auth.user_id, start_date=start_date, end_date=end_date)
         except ValueError as exc:
             message = str(exc)
@@ -108,15 +130,24 @@ def register_analytics_routes(
     @router.get(
         "/portfolios/{portfolio_id}/performance/gain/timeseries",
         response_model=list[GainTimeseriesPoint],
-        responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+        responses={200: series_response_doc("ndjson", "columnar"), 400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
     )
     def get_performance_gain_timeseries(
         portfolio_id: int,
         start_date: date | None = Query(default=None),
         end_date: date | None = Query(default=None),
+        format: str = Query(default="json", pattern="^(json|ndjson|columnar)$"),
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> list[GainTimeseriesPoint]:
         try:
+            if format == "ndjson":
+                return NDJSONResponse(
+                    performance_service.iter_gain_timeseries(portfolio_id, _auth.user_id, start_date=start_date, end_date=end_date)
+                )
+            if format == "columnar":
+                return SafeJSONResponse(
+                    performance_service.get_gain_timeseries_columns(portfolio_id, _auth.user_id, start_date, end_date)
+                )
             return performance_service.get_gain_timeseries(portfolio_id, _auth.user_id, start_date=start_date, end_date=end_date)
         except ValueError as exc:
             message = str(exc)
@@ -127,15 +158,24 @@ def register_analytics_routes(
     @router.get(
         "/portfolios/{portfolio_id}/performance/mwr/timeseries",
         response_model=list[MWRTimeseriesPoint],
-        responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+        responses={200: series_response_doc("ndjson", "columnar"), 400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
     )
     def get_performance_mwr_timeseries(
         portfolio_id: int,
         start_date: date | None = Query(default=None),
         end_date: date | None = Query(default=None),
+        format: str = Query(default="json", pattern="^(json|ndjson|columnar)$"),
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> list[MWRTimeseriesPoint]:
         try:
+            if format == "ndjson":
+                return NDJSONResponse(
+                    performance_service.iter_mwr_timeseries(portfolio_id, _auth.user_id, start_date=start_date, end_date=end_date)
+                )
+            if format == "columnar":
+                return SafeJSONResponse(
+                    performance_service.get_mwr_timeseries_columns(portfolio_id, _auth.user_id, start_date, end_date)
+                )
             return performance_service.get_mwr_timeseries(portfolio_id, _auth.user_id, start_date=start_date, end_date=end_date)
         except ValueError as exc:
             message = str(exc)
@@ -165,15 +205,20 @@ def register_analytics_routes(
     @router.get(
         "/portfolios/{portfolio_id}/timeseries",
         response_model=list[TimeSeriesPoint],
-        responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+        responses={200: series_response_doc("columnar"), 400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
     )
     def get_timeseries(
         portfolio_id: int,
-        range: str = Query(default="1y", pattern="^1y$"),
-        interval: str = Query(default="1d", pattern="^1d$"),
+        range: str = Query(default="1y", pattern="^(1m|3m|6m|ytd|1y|3y|5y|max)$"),
+        interval: str = Query(default="1d", pattern="^(1d|1w|1mo)$"),
+        format: str = Query(default="json", pattern="^(json|columnar)$"),
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> list[TimeSeriesPoint]:
         try:
+            if format == "columnar":
+                return SafeJSONResponse(
+                    repo.get_timeseries_columns(portfolio_id, range_value=range, interval=interval, user_id=_auth.user_id)
+                )
             return repo.get_timeseries(portfolio_id, range_value=range, interval=interval, user_id=_auth.user_id)
         except ValueError as exc:
             message = str(exc)
@@ -186,12 +231,28 @@ def register_analytics_routes(
         response_model=list[IntradayTimeseriesPoint],
         responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
     )
-    def get_intraday_timeseries(
+    async def get_intraday_timeseries(
         portfolio_id: int,
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> list[IntradayTimeseriesPoint]:
         try:
-            return repo.get_intraday_timeseries(portfolio_id, _auth.user_id, finance_client)
+            holdings = await run_in_threadpool(repo.get_intraday_holdings, portfolio_id, _auth.user_id)
+            if holdings is None:
+                return []
+
+            client = async_finance_client or as_async_finance_client(finance_client)
+
+            async def fetch_bars(asset_id: int) -> list:
+                symbol = holdings.provider_symbols[asset_id]
+                try:
+                    return await client.get_intraday_bars(symbol, period='1d', interval='1h')
+                except Exception as exc:
+                    logger.warning("intraday_timeseries: failed to fetch %s: %s", symbol, exc)
+                    return []
+
+            asset_ids = sorted(holdings.quantities)
+            bars = await gather_bounded(fetch_bars, asset_ids, limit=fanout_limit)
+            return repo.build_intraday_timeseries(holdings, dict(zip(asset_ids, bars)))
         except ValueError as exc:
             message = str(exc)
             status = 404 if "portfolio non trovato" in message.lower() else 400
@@ -233,15 +294,21 @@ def register_analytics_routes(
     @router.get(
         "/portfolios/{portfolio_id}/performance/drawdown",
         response_model=DrawdownResponse,
-        responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+        responses={200: series_response_doc("ndjson", "columnar"), 400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
     )
     def get_drawdown(
         portfolio_id: int,
         start_date: date | None = Query(default=None),
         end_date: date | None = Query(default=None),
+        format: str = Query(default="json", pattern="^(json|ndjson|columnar)$"),
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> DrawdownResponse:
         try:
+            if format == "ndjson":
+                header, points = performance_service.stream_drawdown(portfolio_id, _auth.user_id, start_date, end_date)
+                return NDJSONResponse(points, header=header)
+            if format == "columnar":
+                return SafeJSONResponse(performance_service.get_drawdown_columns(portfolio_id, _auth.user_id, start_date, end_date))
             return performance_service.get_drawdown(portfolio_id, _auth.user_id, start_date, end_date)
         except ValueError as exc:
             message = str(exc)
@@ -33,6 +33,7 @@ from ..models import (
     PortfolioTargetPerformanceResponse,
 )
 from ..repository import PortfolioRepository
+from ..responses import NDJSONResponse, SafeJSONResponse, series_response_doc
 
 
 def register_assets_routes(
@@ -138,13 +139,20 @@ def register_assets_routes(
     def search_assets(q: str = Query(min_length=1), _auth: AuthContext = Depends(require_auth_rate_limited)) -> dict[str, list[dict[str, str]]]:
         return {"assets": repo.search_assets(q)}
 
-    @router.get("/assets/{asset_id}/price-timeseries", response_model=list[AssetPricePoint])
+    @router.get(
+        "/assets/{asset_id}/price-timeseries",
+        response_model=list[AssetPricePoint],
+        responses={200: series_response_doc("columnar")},
+    )
     def get_asset_price_timeseries(
         asset_id: int,
         start_date: date | None = Query(default=None),
         end_date: date | None = Query(default=None),
+        format: str = Query(default="json", pattern="^(json|columnar)$"),
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> list[AssetPricePoint]:
+        if format == "columnar":
+            return SafeJSONResponse(repo.get_asset_price_timeseries_columns(asset_id, start_date, end_date))
         rows = repo.get_asset_price_timeseries(asset_id, start_date, end_date)
         return [AssetPricePoint(date=r["date"], close=r["close"]) for r in rows]
 
@@ -610,13 +618,18 @@ def register_assets_routes(
     @router.get(
         "/portfolios/{portfolio_id}/target-performance",
         response_model=PortfolioTargetPerformanceResponse,
-        responses={404: {"model": ErrorResponse}},
+        responses={200: series_response_doc("ndjson"), 404: {"model": ErrorResponse}},
     )
     def get_target_performance(
-        portfolio_id: int, _auth: AuthContext = Depends(require_auth_rate_limited)
+        portfolio_id: int,
+        format: str = Query(default="json", pattern="^(json|ndjson)$"),
+        _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> PortfolioTargetPerformanceResponse:
         ensure_target_allocation_enabled()
         try:
+            if format == "ndjson":
+                header, points = repo.stream_portfolio_target_performance(portfolio_id, _auth.user_id)
+                return NDJSONResponse(points, header=header)
             return repo.get_portfolio_target_performance(portfolio_id, _auth.user_id)
         except ValueError as exc:
             raise AppError(code="not_found", message=str(exc), status_code=404) from exc
@@ -6,6 +6,12 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, Query
 
+from ..async_finance_client import (
+    DEFAULT_FANOUT_LIMIT,
+    AsyncFinanceClient,
+    as_async_finance_client,
+    gather_bounded,
+)
 from ..auth import AuthContext
 from ..rate_limit import require_auth_rate_limited
 from ..errors import AppError
@@ -28,6 +34,8 @@ def register_markets_routes(
     router: APIRouter,
     repo: PortfolioRepository,
     finance_client: object,
+    async_finance_client: AsyncFinanceClient | None = None,
+    fanout_limit: int = DEFAULT_FANOUT_LIMIT,
 ) -> None:
     MARKET_QUOTES_CACHE_TTL_SECONDS = 60.0
     _market_quotes_cache: dict[str, Any] = {"payload": None, "expires_at": 0.0}
@@ -38,7 +46,7 @@ def register_markets_routes(
     _market_news_cache_lock = threading.Lock()
 
     @router.get("/markets/quotes", response_model=MarketQuotesResponse)
-    def get_market_quotes(_auth: AuthContext = Depends(require_auth_rate_limited)) -> MarketQuotesResponse:
+    async def get_market_quotes(_auth: AuthContext = Depends(require_auth_rate_limited)) -> MarketQuotesResponse:
         now = _time.monotonic()
         with _market_quotes_cache_lock:
             cached_payload = _market_quotes_cache.get("payload")
@@ -46,9 +54,23 @@ def register_markets_routes(
             if cached_payload is not None and cached_expires > now:
                 return cached_payload
 
-        def fetch_one(symbol: str, name: str) -> MarketQuoteItem:
+        client = async_finance_client or as_async_finance_client(finance_client)
+        symbol_items = [item for cat_info in MARKET_SYMBOLS.values() for item in cat_info["symbols"]]
+        symbols = [symbol for symbol, _ in symbol_items]
+
+        # Prices for every category come from one batched call; symbols it could
+        # not price use the single-symbol path.
+        try:
+            batch_quotes: dict[str, Any] = await client.get_quotes(symbols)
+        except Exception:
+            batch_quotes = {}
+
+        async def fetch_one(item: tuple[str, str]) -> MarketQuoteItem:
+            symbol, name = item
             try:
-                mq = finance_client.get_market_quote(symbol)
+                mq = batch_quotes.get(symbol)
+                if mq is None or isinstance(mq, Exception):
+                    mq = await client.get_market_quote(symbol)
                 change: float | None = None
                 change_pct: float | None = None
                 if mq.price is not None and mq.previous_close is not None and mq.previous_close != 0:
@@ -57,7 +79,7 @@ def register_markets_routes(
 
                 intraday: list[MarketIntradayPoint] = []
                 try:
-                    bars = finance_client.get_intraday_bars(symbol)
+                    bars = await client.get_intraday_bars(symbol)
                     intraday = [
                         MarketIntradayPoint(
                             time=b.ts.strftime('%d/%m %H:%M'),
@@ -95,12 +117,16 @@ def register_markets_routes(
                     warning="market quote fetch failed",
                 )
 
-        categories: list[MarketCategory] = []
-        for cat_key, cat_info in MARKET_SYMBOLS.items():
-            symbol_items = cat_info["symbols"]
-            with ThreadPoolExecutor(max_workers=min(4, len(symbol_items))) as executor:
-                items = list(executor.map(lambda item: fetch_one(item[0], item[1]), symbol_items))
-            categories.append(MarketCategory(category=cat_key, label=cat_info["label"], items=items))
+        items = await gather_bounded(fetch_one, symbol_items, limit=fanout_limit)
+        item_by_symbol = {item.symbol: item for item in items}
+        categories = [
+            MarketCategory(
+                category=cat_key,
+                label=cat_info["label"],
+                items=[item_by_symbol[symbol] for symbol, _ in cat_info["symbols"]],
+            )
+            for cat_key, cat_info in MARKET_SYMBOLS.items()
+        ]
 
         response = MarketQuotesResponse(categories=categories)
         with _market_quotes_cache_lock:
@@ -86,18 +86,25 @@ def register_pricing_routes(
         portfolio_id: int,
         days: int = Query(default=365, ge=30, le=2000),
         asset_scope: str = Query(default="target", pattern="^(target|transactions|all)$"),
+        full_refresh: bool = Query(default=False),
         idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
         _auth: AuthContext = Depends(require_auth_rate_limited),
     ) -> DailyBackfillResponse:
         if asset_scope == "target":
             ensure_target_allocation_enabled()
-        endpoint = f"prices_backfill_daily:{portfolio_id}:{days}:{asset_scope}"
+        endpoint = f"prices_backfill_daily:{portfolio_id}:{days}:{asset_scope}:{int(full_refresh)}"
         if idempotency_key:
             cached = repo.get_idempotency_response(idempotency_key=idempotency_key, endpoint=endpoint, user_id=_auth.user_id)
             if cached:
                 return DailyBackfillResponse.model_validate(cached)
         try:
-            response = historical_service.backfill_daily(portfolio_id=portfolio_id, days=days, asset_scope=asset_scope, user_id=_auth.user_id)
+            response = historical_service.backfill_daily(
+                portfolio_id=portfolio_id,
+                days=days,
+                asset_scope=asset_scope,
+                user_id=_auth.user_id,
+                incremental=not full_refresh,
+            )
             if idempotency_key:
                 repo.save_idempotency_response(
                     idempotency_key=idempotency_key, endpoint=endpoint, response_payload=response.model_dump(mode="json"), user_id=_auth.user_id
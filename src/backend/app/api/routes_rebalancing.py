@@ -40,10 +40,11 @@ def register_rebalancing_routes(
     ) -> RebalancePreviewResponse:
         ensure_target_allocation_enabled()
         try:
-            target_alloc = repo.list_portfolio_target_allocations(portfolio_id, _auth.user_id)
-            summary = repo.get_summary(portfolio_id, _auth.user_id)
-            allocation = repo.get_allocation(portfolio_id, _auth.user_id)
-            positions = repo.get_positions(portfolio_id, _auth.user_id)
+            with repo.unit_of_work():
+                target_alloc = repo.list_portfolio_target_allocations(portfolio_id, _auth.user_id)
+                summary = repo.get_summary(portfolio_id, _auth.user_id)
+                allocation = repo.get_allocation(portfolio_id, _auth.user_id)
+                positions = repo.get_positions(portfolio_id, _auth.user_id)
         except ValueError as exc:
             message = str(exc)
             status_code = 404 if "non trovato" in message.lower() else 400
@@ -79,17 +80,44 @@ def register_rebalancing_routes(
         skipped: list[str] = []
         warnings: list[str] = []
 
+        priced_targets = []
         for target in target_alloc:
-            aid = target.asset_id
-            quote_ccy = (quote_ccy_by_asset.get(aid) or summary.base_currency).upper()
+            quote_ccy = (quote_ccy_by_asset.get(target.asset_id) or summary.base_currency).upper()
             if quote_ccy != summary.base_currency.upper():
                 skipped.append(f"{target.symbol}: valuta {quote_ccy} diversa da {summary.base_currency} (preview MVP)")
                 continue
-
+            priced_targets.append(target)
+
+        # Latest prices for all targets in one batched provider call.
+        provider_symbol_by_asset: dict[int, str] = {}
+        pricing_errors: dict[int, Exception] = {}
+        latest_quotes: dict[str, object] = {}
+        if payload.use_latest_prices:
+            for target in priced_targets:
+                try:
+                    pricing_asset = repo.get_asset_pricing_symbol(target.asset_id, provider=settings.finance_provider)
+                    provider_symbol_by_asset[target.asset_id] = pricing_asset.provider_symbol
+                except Exception as exc:  # noqa: BLE001 - preview should degrade gracefully
+                    pricing_errors[target.asset_id] = exc
+            symbols = list(provider_symbol_by_asset.values())
+            if symbols and hasattr(finance_client, "get_quotes"):
+                try:
+                    latest_quotes.update(finance_client.get_quotes(symbols))
+                except Exception as exc:  # noqa: BLE001 - preview should degrade gracefully
+                    latest_quotes.update((symbol, exc) for symbol in symbols)
+
+        for target in priced_targets:
+            aid = target.asset_id
             try:
                 if payload.use_latest_prices:
-                    pricing_asset = repo.get_asset_pricing_symbol(aid, provider=settings.finance_provider)
-                    quote = finance_client.get_quote(pricing_asset.provider_symbol)
+                    if aid in pricing_errors:
+                        raise pricing_errors[aid]
+                    provider_symbol = provider_symbol_by_asset[aid]
+                    quote = latest_quotes.get(provider_symbol)
+                    if quote is None:
+                        quote = finance_client.get_quote(provider_symbol)
+                    if isinstance(quote, Exception):
+                        raise quote
                     quote_by_asset[aid] = float(quote.price)
                 else:
                     pos = position_by_asset.get(aid)
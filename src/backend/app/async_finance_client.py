@@ -0,0 +1,310 @@
+"""Async facade over the finance providers.
+
+TwelveData is called natively through a pooled ``httpx.AsyncClient``; yfinance
+has no async API, so its client runs on one bounded, process-wide executor
+instead of a thread pool per request. Fan-out over many symbols goes through
+``gather_bounded``.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Protocol, TypeVar
+
+import httpx
+
+from .errors import ProviderError
+from .finance_client import (
+    DEFAULT_ORDER,
+    DEFAULT_TIMEZONE,
+    ProviderDailyBar,
+    ProviderEtfHolding,
+    ProviderFxRate,
+    ProviderIntradayBar,
+    ProviderMarketQuote,
+    ProviderQuote,
+    TwelveDataClient,
+    _compute_retry_delay,
+    _log_retry,
+    _market_quote_from_quote,
+    _twelvedata_batch_quotes,
+    _twelvedata_daily_bars,
+    _twelvedata_fx_rates,
+    _twelvedata_intraday_bars,
+    _twelvedata_payload,
+    _twelvedata_quote,
+    _twelvedata_quote_chunks,
+    _twelvedata_request_failure,
+    _unavailable_market_quote,
+)
+from .http_pool import get_async_http_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_FINANCE_EXECUTOR_WORKERS = 8
+DEFAULT_FANOUT_LIMIT = 8
+
+# yfinance-style intraday intervals -> TwelveData intervals (minutes per bar).
+_TWELVEDATA_INTERVALS: dict[str, tuple[str, int]] = {
+    "1m": ("1min", 1),
+    "5m": ("5min", 5),
+    "15m": ("15min", 15),
+    "30m": ("30min", 30),
+    "60m": ("1h", 60),
+    "1h": ("1h", 60),
+}
+
+
+class AsyncFinanceClient(Protocol):
+    async def get_quote(self, symbol: str) -> ProviderQuote: ...
+
+    async def get_quotes(self, symbols: list[str]) -> dict[str, ProviderQuote | ProviderError]: ...
+
+    async def get_market_quote(self, symbol: str) -> ProviderMarketQuote: ...
+
+    async def get_daily_bars(self, symbol: str, outputsize: int = 365, **kwargs: Any) -> list[ProviderDailyBar]: ...
+
+    async def get_intraday_bars(self, symbol: str, period: str = "5d", interval: str = "1h") -> list[ProviderIntradayBar]: ...
+
+    async def get_daily_fx_rates(
+        self, from_currency: str, to_currency: str, outputsize: int = 365, **kwargs: Any
+    ) -> list[ProviderFxRate]: ...
+
+    async def get_etf_top_holdings(self, symbol: str) -> list[ProviderEtfHolding]: ...
+
+
+# ---------------------------------------------------------------------------
+# Shared executor for blocking provider calls
+# ---------------------------------------------------------------------------
+
+_executor: ThreadPoolExecutor | None = None
+_executor_workers = DEFAULT_FINANCE_EXECUTOR_WORKERS
+_executor_lock = threading.Lock()
+
+
+def configure_finance_executor(max_workers: int = DEFAULT_FINANCE_EXECUTOR_WORKERS) -> None:
+    """Set the executor size; takes effect the next time it is created."""
+    global _executor_workers
+    with _executor_lock:
+        _executor_workers = max(1, int(max_workers))
+
+
+def finance_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_executor_workers, thread_name_prefix="finance")
+        return _executor
+
+
+def shutdown_finance_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def map_in_finance_executor(func: Callable[[T], R], items: Iterable[T]) -> list[R | Exception]:
+    """Blocking fan-out for sync callers: results in input order, exceptions returned in place."""
+
+    def call(item: T) -> R | Exception:
+        try:
+            return func(item)
+        except Exception as exc:  # noqa: BLE001 - reported to the caller per item
+            return exc
+
+    return list(finance_executor().map(call, items))
+
+
+async def gather_bounded(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    *,
+    limit: int = DEFAULT_FANOUT_LIMIT,
+) -> list[R | BaseException]:
+    """``asyncio.gather`` with at most ``limit`` calls in flight; exceptions are returned in place."""
+    semaphore = asyncio.Semaphore(max(1, int(limit)))
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+
+
+# ---------------------------------------------------------------------------
+# Implementations
+# ---------------------------------------------------------------------------
+
+
+class ExecutorAsyncFinanceClient:
+    """Runs a synchronous finance client on the shared bounded executor."""
+
+    def __init__(self, client: object) -> None:
+        self._client = client
+
+    async def _run(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        func = functools.partial(getattr(self._client, method), *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(finance_executor(), func)
+
+    async def get_quote(self, symbol: str) -> ProviderQuote:
+        return await self._run("get_quote", symbol)
+
+    async def get_quotes(self, symbols: list[str]) -> dict[str, ProviderQuote | ProviderError]:
+        if hasattr(self._client, "get_quotes"):
+            return await self._run("get_quotes", symbols)
+        unique = list(dict.fromkeys(s for s in symbols if s))
+        quotes = await gather_bounded(self.get_quote, unique)
+        return dict(zip(unique, quotes))
+
+    async def get_market_quote(self, symbol: str) -> ProviderMarketQuote:
+        return await self._run("get_market_quote", symbol)
+
+    async def get_daily_bars(self, symbol: str, outputsize: int = 365, **kwargs: Any) -> list[ProviderDailyBar]:
+        return await self._run("get_daily_bars", symbol, outputsize, **kwargs)
+
+    async def get_intraday_bars(self, symbol: str, period: str = "5d", interval: str = "1h") -> list[ProviderIntradayBar]:
+        return await self._run("get_intraday_bars", symbol, period=period, interval=interval)
+
+    async def get_daily_fx_rates(
+        self, from_currency: str, to_currency: str, outputsize: int = 365, **kwargs: Any
+    ) -> list[ProviderFxRate]:
+        return await self._run("get_daily_fx_rates", from_currency, to_currency, outputsize, **kwargs)
+
+    async def get_etf_top_holdings(self, symbol: str) -> list[ProviderEtfHolding]:
+        return await self._run("get_etf_top_holdings", symbol)
+
+
+class AsyncTwelveDataClient:
+    """Native async TwelveData client sharing configuration and parsing with ``TwelveDataClient``."""
+
+    def __init__(self, client: TwelveDataClient) -> None:
+        self._client = client
+
+    async def get_quote(self, symbol: str) -> ProviderQuote:
+        payload = await self._request_json("/quote", {"symbol": symbol, "apikey": self._client.api_key}, symbol=symbol)
+        return _twelvedata_quote(symbol, payload)
+
+    async def get_quotes(self, symbols: list[str]) -> dict[str, ProviderQuote | ProviderError]:
+        async def fetch_chunk(chunk: list[str]) -> dict[str, ProviderQuote | ProviderError]:
+            if len(chunk) == 1:
+                try:
+                    return {chunk[0]: await self.get_quote(chunk[0])}
+                except ProviderError as exc:
+                    return {chunk[0]: exc}
+            joined = ",".join(chunk)
+            try:
+                payload = await self._request_json(
+                    "/quote", {"symbol": joined, "apikey": self._client.api_key}, symbol=joined
+                )
+            except ProviderError as exc:
+                return {symbol: exc for symbol in chunk}
+            return _twelvedata_batch_quotes(chunk, payload)
+
+        results: dict[str, ProviderQuote | ProviderError] = {}
+        for chunk_result in await asyncio.gather(*(fetch_chunk(chunk) for chunk in _twelvedata_quote_chunks(symbols))):
+            results.update(chunk_result)
+        return results
+
+    async def get_market_quote(self, symbol: str) -> ProviderMarketQuote:
+        try:
+            return _market_quote_from_quote(await self.get_quote(symbol))
+        except Exception:
+            return _unavailable_market_quote(symbol, source="quote")
+
+    async def get_daily_bars(
+        self,
+        symbol: str,
+        outputsize: int = 365,
+        *,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        timezone: str = DEFAULT_TIMEZONE,
+        order: str = DEFAULT_ORDER,
+    ) -> list[ProviderDailyBar]:
+        params = self._client._time_series_params(
+            symbol, outputsize, start_date=start_date, end_date=end_date, timezone=timezone, order=order
+        )
+        payload = await self._request_json("/time_series", params, symbol=symbol)
+        return _twelvedata_daily_bars(symbol, payload)
+
+    async def get_intraday_bars(self, symbol: str, period: str = "5d", interval: str = "1h") -> list[ProviderIntradayBar]:
+        """Bars of the last ``period`` trading sessions (``"1d"``, ``"5d"``...)."""
+        td_interval, minutes = _TWELVEDATA_INTERVALS.get(interval, ("1h", 60))
+        try:
+            sessions = max(1, int(period.rstrip("d")))
+        except ValueError:
+            sessions = 5
+        # Fetch enough bars to cover the sessions even around weekends, then trim.
+        outputsize = min(5000, (sessions + 3) * (24 * 60 // minutes))
+        params = self._client._time_series_params(symbol, outputsize, interval=td_interval)
+        payload = await self._request_json("/time_series", params, symbol=symbol)
+        bars = _twelvedata_intraday_bars(payload)
+        kept_days = sorted({bar.ts.date() for bar in bars})[-sessions:]
+        return [bar for bar in bars if bar.ts.date() in kept_days]
+
+    async def get_daily_fx_rates(
+        self,
+        from_currency: str,
+        to_currency: str,
+        outputsize: int = 365,
+        *,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        timezone: str = DEFAULT_TIMEZONE,
+        order: str = DEFAULT_ORDER,
+    ) -> list[ProviderFxRate]:
+        pair = f"{from_currency}/{to_currency}"
+        params = self._client._time_series_params(
+            pair, outputsize, start_date=start_date, end_date=end_date, timezone=timezone, order=order
+        )
+        payload = await self._request_json("/time_series", params, symbol=pair)
+        return _twelvedata_fx_rates(pair, payload)
+
+    async def get_etf_top_holdings(self, symbol: str) -> list[ProviderEtfHolding]:
+        raise ProviderError(
+            provider="twelvedata",
+            operation="etf_holdings",
+            symbol=symbol,
+            reason="unsupported",
+            message=f"Top holdings non disponibili per {symbol}",
+        )
+
+    async def _request_json(self, path: str, params: dict, *, symbol: str) -> dict:
+        client = self._client
+        client._check_configured(path, symbol)
+
+        url = f"{client.base_url}{path}"
+        attempt = 0
+        last_error: Exception | None = None
+
+        while attempt <= client.max_retries:
+            attempt += 1
+            try:
+                response = await get_async_http_client("twelvedata").get(url, params=params, timeout=client.timeout_seconds)
+                return _twelvedata_payload(response, path, symbol)
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.HTTPStatusError) as exc:
+                last_error = exc
+                if attempt > client.max_retries:
+                    break
+
+                delay = _compute_retry_delay(exc, attempt=attempt, backoff_seconds=client.retry_backoff_seconds)
+                _log_retry(symbol, attempt, client.max_retries, delay, exc)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+        raise _twelvedata_request_failure(path, symbol, last_error)
+
+
+def as_async_finance_client(client: object) -> AsyncFinanceClient:
+    """Async view of a sync finance client: native for TwelveData, executor-backed otherwise."""
+    if isinstance(client, TwelveDataClient):
+        return AsyncTwelveDataClient(client)
+    return ExecutorAsyncFinanceClient(client)
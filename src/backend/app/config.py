@@ -27,6 +27,31 @@ class Settings(BaseSettings):
     finance_max_retries: int = 3
     finance_retry_backoff_seconds: float = 0.5
     finance_symbol_request_delay_seconds: float = 0.0
+    # Parallel quote fetches per refresh cycle (1 = sequential).
+    price_refresh_max_workers: int = 1
+    # Parallel provider fetches (assets + FX pairs) per portfolio backfill.
+    backfill_max_workers: int = 4
+    # Symbols per batched quote request, for clients whose get_quotes sends one request per batch.
+    finance_quote_batch_size: int = 50
+    # Per-provider quote rate in symbols/second, e.g. "twelvedata=8,yfinance=20";
+    # a batched request takes one token per symbol.
+    # Providers without an entry fall back to 1 / FINANCE_SYMBOL_REQUEST_DELAY_SECONDS.
+    finance_provider_rate_limits: str = ""
+    finance_provider_rate_burst: int = 1
+    # Shared keep-alive pools for upstream HTTP providers (HTTP/2 needs the h2 package).
+    http_pool_max_connections: int = 20
+    http_pool_max_keepalive_connections: int = 10
+    http_pool_keepalive_expiry_seconds: float = 30.0
+    http2_enabled: bool = True
+    # Threads shared by blocking provider calls (yfinance) and max concurrent
+    # provider calls per request fan-out.
+    finance_executor_max_workers: int = 8
+    finance_fanout_limit: int = 8
+    # In-process cache of computed positions/summaries (0 entries disables it).
+    snapshot_cache_ttl_seconds: float = 60.0
+    snapshot_cache_max_entries: int = 512
+    # Memory budget of the in-process cache of daily close series (0 disables it).
+    price_series_cache_max_mb: float = 64.0
     justetf_enabled: bool = True
     justetf_blocked_cooldown_seconds: float = 900.0
     fmt_api_key: str = ""
@@ -99,6 +124,20 @@ class Settings(BaseSettings):
     def trusted_proxy_ips_list(self) -> list[str]:
         return [v.strip() for v in self.trusted_proxy_ips.split(",") if v.strip()]
 
+    @property
+    def finance_provider_rate_limits_map(self) -> dict[str, float]:
+        limits: dict[str, float] = {}
+        for entry in self.finance_provider_rate_limits.split(","):
+            provider, _, rate = entry.partition("=")
+            provider = provider.strip().lower()
+            if not provider or not rate.strip():
+                continue
+            try:
+                limits[provider] = float(rate)
+            except ValueError:
+                continue
+        return limits
+
     @property
     def admin_emails_list(self) -> list[str]:
         return [v.strip().lower() for v in self.admin_emails.split(",") if v.strip()]
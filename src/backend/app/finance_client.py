@@ -5,15 +5,19 @@ import time
 from dataclasses import dataclass, field
 from datetime import UTC, date, datetime
 from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 import httpx
 
 from .errors import ProviderError
+from .http_pool import get_http_client
 
 if TYPE_CHECKING:
     from .config import Settings
 
 RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Upper bound on symbols per TwelveData batch request.
+TWELVEDATA_QUOTE_BATCH_SIZE = 120
 
 logger = logging.getLogger(__name__)
 DEFAULT_TIMEZONE = "UTC"
@@ -156,6 +160,9 @@ class ProviderEtfHolding:
 
 
 class TwelveDataClient:
+    # get_quotes sends one /quote request for many symbols.
+    batched_quotes = True
+
     def __init__(
         self,
         base_url: str,
@@ -196,53 +203,38 @@ class TwelveDataClient:
 
     def get_quote(self, symbol: str) -> ProviderQuote:
         payload = self._request_json('/quote', {'symbol': symbol, 'apikey': self.api_key}, symbol=symbol)
-        price = _parse_float(payload, ['price', 'close', 'last'])
-        if price is None:
-            raise ProviderError(
-                provider='twelvedata',
-                operation='quote',
-                symbol=symbol,
-                reason='no_data',
-                message=f"Prezzo non disponibile per {symbol}",
-            )
+        return _twelvedata_quote(symbol, payload)
+
+    def get_quotes(self, symbols: list[str]) -> dict[str, ProviderQuote | ProviderError]:
+        """Quote many symbols through the comma-separated batch ``/quote`` endpoint.
+
+        Failures are reported per symbol: a failed chunk request assigns its
+        error to every symbol of the chunk.
+        """
+        results: dict[str, ProviderQuote | ProviderError] = {}
+        for chunk in _twelvedata_quote_chunks(symbols):
+            if len(chunk) == 1:
+                # A single-symbol batch is answered with an unkeyed payload.
+                try:
+                    results[chunk[0]] = self.get_quote(chunk[0])
+                except ProviderError as exc:
+                    results[chunk[0]] = exc
+                continue
 
-        ts = datetime.now(UTC)
-        return ProviderQuote(
-            symbol=symbol,
-            price=price,
-            bid=_parse_float(payload, ['bid']),
-            ask=_parse_float(payload, ['ask']),
-            volume=_parse_float(payload, ['volume']),
-            ts=ts,
-            source='quote',
-        )
+            joined = ','.join(chunk)
+            try:
+                payload = self._request_json('/quote', {'symbol': joined, 'apikey': self.api_key}, symbol=joined)
+            except ProviderError as exc:
+                results.update((symbol, exc) for symbol in chunk)
+                continue
+            results.update(_twelvedata_batch_quotes(chunk, payload))
+        return results
 
     def get_market_quote(self, symbol: str) -> ProviderMarketQuote:
         try:
-            quote = self.get_quote(symbol)
-            return ProviderMarketQuote(
-                symbol=symbol,
-                price=quote.price,
-                previous_close=None,
-                ts=quote.ts,
-                source=quote.source,
-                is_realtime=quote.is_realtime,
-                is_fallback=quote.is_fallback,
-                stale=quote.stale,
-                warning=quote.warning,
-            )
+            return _market_quote_from_quote(self.get_quote(symbol))
         except Exception:
-            return ProviderMarketQuote(
-                symbol=symbol,
-                price=None,
-                previous_close=None,
-                ts=datetime.now(UTC),
-                source='quote',
-                is_realtime=False,
-                is_fallback=True,
-                stale=True,
-                warning='market quote unavailable',
-            )
+            return _unavailable_market_quote(symbol, source='quote')
 
     def get_daily_bars(
         self,
@@ -254,59 +246,16 @@ class TwelveDataClient:
         timezone: str = DEFAULT_TIMEZONE,
         order: str = DEFAULT_ORDER,
     ) -> list[ProviderDailyBar]:
-        params: dict[str, object] = {
-            'symbol': symbol,
-            'interval': '1day',
-            'apikey': self.api_key,
-            'outputsize': max(1, min(outputsize, 5000)),
-            'timezone': timezone,
-            'order': order,
-        }
-        if start_date:
-            params['start_date'] = start_date
-        if end_date:
-            params['end_date'] = end_date
-        payload = self._request_json(
-            '/time_series',
-            params,
-            symbol=symbol,
+        params = self._time_series_params(
+            symbol,
+            outputsize,
+            start_date=start_date,
+            end_date=end_date,
+            timezone=timezone,
+            order=order,
         )
-        values = payload.get('values') if isinstance(payload, dict) else None
-        if not isinstance(values, list):
-            raise ProviderError(
-                provider='twelvedata',
-                operation='daily_bars',
-                symbol=symbol,
-                reason='no_data',
-                message=f"Serie storica non disponibile per {symbol}",
-            )
-
-        bars: list[ProviderDailyBar] = []
-        for row in values:
-            if not isinstance(row, dict):
-                continue
-            day = _parse_date(row.get('datetime'))
-            if day is None:
-                continue
-            o = _parse_float(row, ['open'])
-            h = _parse_float(row, ['high'])
-            l = _parse_float(row, ['low'])
-            c = _parse_float(row, ['close'])
-            if o is None or h is None or l is None or c is None:
-                continue
-            bars.append(
-                ProviderDailyBar(
-                    day=day,
-                    open=o,
-                    high=h,
-                    low=l,
-                    close=c,
-                    volume=_parse_float(row, ['volume']),
-                )
-            )
-
-        bars.sort(key=lambda x: x.day)
-        return bars
+        payload = self._request_json('/time_series', params, symbol=symbol)
+        return _twelvedata_daily_bars(symbol, payload)
 
     def get_daily_fx_rates(
         self,
@@ -320,9 +269,31 @@ class TwelveDataClient:
         order: str = DEFAULT_ORDER,
     ) -> list[ProviderFxRate]:
         pair = f"{from_currency}/{to_currency}"
+        params = self._time_series_params(
+            pair,
+            outputsize,
+            start_date=start_date,
+            end_date=end_date,
+            timezone=timezone,
+            order=order,
+        )
+        payload = self._request_json('/time_series', params, symbol=pair)
+        return _twelvedata_fx_rates(pair, payload)
+
+    def _time_series_params(
+        self,
+        symbol: str,
+        outputsize: int,
+        *,
+        interval: str = '1day',
+        start_date: str | None = None,
+        end_date: str | None = None,
+        timezone: str = DEFAULT_TIMEZONE,
+        order: str = DEFAULT_ORDER,
+    ) -> dict[str, object]:
         params: dict[str, object] = {
-            'symbol': pair,
-            'interval': '1day',
+            'symbol': symbol,
+            'interval': interval,
             'apikey': self.api_key,
             'outputsize': max(1, min(outputsize, 5000)),
             'timezone': timezone,
@@ -332,37 +303,9 @@ class TwelveDataClient:
             params['start_date'] = start_date
         if end_date:
             params['end_date'] = end_date
-        payload = self._request_json(
-            '/time_series',
-            params,
-            symbol=pair,
-        )
-        values = payload.get('values') if isinstance(payload, dict) else None
-        if not isinstance(values, list):
-            raise ProviderError(
-                provider='twelvedata',
-                operation='daily_fx_rates',
-                symbol=pair,
-                reason='no_data',
-                message=f"Serie FX non disponibile per {pair}",
-            )
-
-        rates: list[ProviderFxRate] = []
-        for row in values:
-            if not isinstance(row, dict):
-                continue
-            day = _parse_date(row.get('datetime'))
-            if day is None:
-                continue
-            close = _parse_float(row, ['close'])
-            if close is None:
-                continue
-            rates.append(ProviderFxRate(day=day, rate=close))
+        return params
 
-        rates.sort(key=lambda x: x.day)
-        return rates
-
-    def _request_json(self, path: str, params: dict, *, symbol: str) -> dict:
+    def _check_configured(self, path: str, symbol: str) -> None:
         if not self.api_key:
             raise ProviderError(
                 provider='twelvedata',
@@ -372,6 +315,9 @@ class TwelveDataClient:
                 message='FINANCE_API_KEY non configurata',
             )
 
+    def _request_json(self, path: str, params: dict, *, symbol: str) -> dict:
+        self._check_configured(path, symbol)
+
         url = f"{self.base_url}{path}"
         attempt = 0
         last_error: Exception | None = None
@@ -379,65 +325,244 @@ class TwelveDataClient:
         while attempt <= self.max_retries:
             attempt += 1
             try:
-                with httpx.Client(timeout=self.timeout_seconds) as client:
-                    response = client.get(url, params=params)
-
-                if response.status_code in RETRYABLE_STATUS_CODES:
-                    raise httpx.HTTPStatusError(
-                        f"Retryable status code {response.status_code}",
-                        request=response.request,
-                        response=response,
-                    )
-
-                response.raise_for_status()
-                payload = response.json()
-
-                if isinstance(payload, dict) and payload.get('code'):
-                    message = payload.get('message', 'Errore provider')
-                    raise ProviderError(
-                        provider='twelvedata',
-                        operation=path.strip('/'),
-                        symbol=symbol,
-                        reason='provider_error',
-                        message=f"Provider error per {symbol}: {message}",
-                    )
-
-                if not isinstance(payload, dict):
-                    raise ProviderError(
-                        provider='twelvedata',
-                        operation=path.strip('/'),
-                        symbol=symbol,
-                        reason='invalid_payload',
-                        message=f"Payload non valido per {symbol}",
-                    )
-                return payload
+                response = get_http_client('twelvedata').get(url, params=params, timeout=self.timeout_seconds)
+                return _twelvedata_payload(response, path, symbol)
             except (httpx.TimeoutException, httpx.NetworkError, httpx.HTTPStatusError) as exc:
                 last_error = exc
                 if attempt > self.max_retries:
                     break
 
                 delay = _compute_retry_delay(exc, attempt=attempt, backoff_seconds=self.retry_backoff_seconds)
-                logger.warning(
-                    'Retry provider request symbol=%s attempt=%s/%s delay=%.2fs reason=%s',
-                    symbol,
-                    attempt,
-                    self.max_retries + 1,
-                    delay,
-                    exc,
-                )
+                _log_retry(symbol, attempt, self.max_retries, delay, exc)
                 if delay > 0:
                     time.sleep(delay)
 
-        if last_error is not None:
-            raise _provider_error('twelvedata', path.strip('/'), symbol, last_error) from last_error
+        raise _twelvedata_request_failure(path, symbol, last_error)
+
+
+def _twelvedata_payload(response: httpx.Response, path: str, symbol: str) -> dict:
+    """Validate a TwelveData response; retryable HTTP statuses raise HTTPStatusError."""
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        raise httpx.HTTPStatusError(
+            f"Retryable status code {response.status_code}",
+            request=response.request,
+            response=response,
+        )
+
+    response.raise_for_status()
+    payload = response.json()
+
+    if isinstance(payload, dict) and payload.get('code'):
+        message = payload.get('message', 'Errore provider')
         raise ProviderError(
             provider='twelvedata',
             operation=path.strip('/'),
             symbol=symbol,
             reason='provider_error',
-            message=f"Errore provider per {symbol}",
+            message=f"Provider error per {symbol}: {message}",
+        )
+
+    if not isinstance(payload, dict):
+        raise ProviderError(
+            provider='twelvedata',
+            operation=path.strip('/'),
+            symbol=symbol,
+            reason='invalid_payload',
+            message=f"Payload non valido per {symbol}",
+        )
+    return payload
+
+
+def _log_retry(symbol: str, attempt: int, max_retries: int, delay: float, exc: Exception) -> None:
+    logger.warning(
+        'Retry provider request symbol=%s attempt=%s/%s delay=%.2fs reason=%s',
+        symbol,
+        attempt,
+        max_retries + 1,
+        delay,
+        exc,
+    )
+
+
+def _twelvedata_request_failure(path: str, symbol: str, last_error: Exception | None) -> ProviderError:
+    if last_error is not None:
+        error = _provider_error('twelvedata', path.strip('/'), symbol, last_error)
+        error.__cause__ = last_error
+        return error
+    return ProviderError(
+        provider='twelvedata',
+        operation=path.strip('/'),
+        symbol=symbol,
+        reason='provider_error',
+        message=f"Errore provider per {symbol}",
+    )
+
+
+def _twelvedata_quote_chunks(symbols: list[str]) -> list[list[str]]:
+    unique = list(dict.fromkeys(s for s in symbols if s))
+    return [unique[start:start + TWELVEDATA_QUOTE_BATCH_SIZE] for start in range(0, len(unique), TWELVEDATA_QUOTE_BATCH_SIZE)]
+
+
+def _twelvedata_quote(symbol: str, payload: dict) -> ProviderQuote:
+    price = _parse_float(payload, ['price', 'close', 'last'])
+    if price is None:
+        raise ProviderError(
+            provider='twelvedata',
+            operation='quote',
+            symbol=symbol,
+            reason='no_data',
+            message=f"Prezzo non disponibile per {symbol}",
+        )
+
+    ts = datetime.now(UTC)
+    return ProviderQuote(
+        symbol=symbol,
+        price=price,
+        bid=_parse_float(payload, ['bid']),
+        ask=_parse_float(payload, ['ask']),
+        volume=_parse_float(payload, ['volume']),
+        ts=ts,
+        source='quote',
+        previous_close=_parse_float(payload, ['previous_close']),
+    )
+
+
+def _twelvedata_batch_quotes(chunk: list[str], payload: dict) -> dict[str, ProviderQuote | ProviderError]:
+    results: dict[str, ProviderQuote | ProviderError] = {}
+    for symbol in chunk:
+        item = payload.get(symbol)
+        if not isinstance(item, dict) or item.get('code'):
+            message = item.get('message', 'Errore provider') if isinstance(item, dict) else 'simbolo assente'
+            results[symbol] = ProviderError(
+                provider='twelvedata',
+                operation='quote',
+                symbol=symbol,
+                reason='provider_error' if isinstance(item, dict) else 'no_data',
+                message=f"Provider error per {symbol}: {message}",
+            )
+            continue
+        try:
+            results[symbol] = _twelvedata_quote(symbol, item)
+        except ProviderError as exc:
+            results[symbol] = exc
+    return results
+
+
+def _market_quote_from_quote(quote: ProviderQuote) -> ProviderMarketQuote:
+    return ProviderMarketQuote(
+        symbol=quote.symbol,
+        price=quote.price,
+        previous_close=None,
+        ts=quote.ts,
+        source=quote.source,
+        is_realtime=quote.is_realtime,
+        is_fallback=quote.is_fallback,
+        stale=quote.stale,
+        warning=quote.warning,
+    )
+
+
+def _unavailable_market_quote(symbol: str, *, source: str) -> ProviderMarketQuote:
+    return ProviderMarketQuote(
+        symbol=symbol,
+        price=None,
+        previous_close=None,
+        ts=datetime.now(UTC),
+        source=source,
+        is_realtime=False,
+        is_fallback=True,
+        stale=True,
+        warning='market quote unavailable',
+    )
+
+
+def _twelvedata_daily_bars(symbol: str, payload: dict) -> list[ProviderDailyBar]:
+    values = payload.get('values') if isinstance(payload, dict) else None
+    if not isinstance(values, list):
+        raise ProviderError(
+            provider='twelvedata',
+            operation='daily_bars',
+            symbol=symbol,
+            reason='no_data',
+            message=f"Serie storica non disponibile per {symbol}",
+        )
+
+    bars: list[ProviderDailyBar] = []
+    for row in values:
+        if not isinstance(row, dict):
+            continue
+        day = _parse_date(row.get('datetime'))
+        if day is None:
+            continue
+        o = _parse_float(row, ['open'])
+        h = _parse_float(row, ['high'])
+        l = _parse_float(row, ['low'])
+        c = _parse_float(row, ['close'])
+        if o is None or h is None or l is None or c is None:
+            continue
+        bars.append(
+            ProviderDailyBar(
+                day=day,
+                open=o,
+                high=h,
+                low=l,
+                close=c,
+                volume=_parse_float(row, ['volume']),
+            )
         )
 
+    bars.sort(key=lambda x: x.day)
+    return bars
+
+
+def _twelvedata_fx_rates(pair: str, payload: dict) -> list[ProviderFxRate]:
+    values = payload.get('values') if isinstance(payload, dict) else None
+    if not isinstance(values, list):
+        raise ProviderError(
+            provider='twelvedata',
+            operation='daily_fx_rates',
+            symbol=pair,
+            reason='no_data',
+            message=f"Serie FX non disponibile per {pair}",
+        )
+
+    rates: list[ProviderFxRate] = []
+    for row in values:
+        if not isinstance(row, dict):
+            continue
+        day = _parse_date(row.get('datetime'))
+        if day is None:
+            continue
+        close = _parse_float(row, ['close'])
+        if close is None:
+            continue
+        rates.append(ProviderFxRate(day=day, rate=close))
+
+    rates.sort(key=lambda x: x.day)
+    return rates
+
+
+def _twelvedata_intraday_bars(payload: dict) -> list[ProviderIntradayBar]:
+    values = payload.get('values') if isinstance(payload, dict) else None
+    if not isinstance(values, list):
+        return []
+
+    bars: list[ProviderIntradayBar] = []
+    for row in values:
+        if not isinstance(row, dict) or not row.get('datetime'):
+            continue
+        close = _parse_float(row, ['close'])
+        if close is None or not math.isfinite(close):
+            continue
+        try:
+            ts = datetime.fromisoformat(str(row['datetime']))
+        except ValueError:
+            continue
+        bars.append(ProviderIntradayBar(ts=ts if ts.tzinfo else ts.replace(tzinfo=UTC), close=close))
+
+    bars.sort(key=lambda x: x.ts)
+    return bars
+
 
 def _parse_float(payload: dict, keys: list[str]) -> float | None:
     for key in keys:
@@ -524,12 +649,12 @@ _YAHOO_SUFFIX_PRIORITY: dict[str, int] = {
 def _resolve_isin(isin: str) -> list[ProviderSymbol]:
     """Chiama OpenFIGI per risolvere un codice ISIN in simboli Yahoo Finance."""
     try:
-        with httpx.Client(timeout=6) as client:
-            resp = client.post(
-                _OPENFIGI_URL,
-                json=[{'idType': 'ID_ISIN', 'idValue': isin}],
-                headers={'Content-Type': 'application/json'},
-            )
+        resp = get_http_client('openfigi').post(
+            _OPENFIGI_URL,
+            json=[{'idType': 'ID_ISIN', 'idValue': isin}],
+            headers={'Content-Type': 'application/json'},
+            timeout=6,
+        )
         if resp.status_code != 200:
             return []
         data = resp.json()
@@ -636,19 +761,8 @@ class YahooFinanceClient:
     def get_quote(self, symbol: str) -> ProviderQuote:
         import yfinance as yf
         ticker = yf.Ticker(symbol)
-        warning: str | None = None
-        previous_close: float | None = None
-        try:
-            price = ticker.fast_info.last_price
-            previous_close = ticker.fast_info.previous_close
-        except Exception as exc:
-            price = None
-            warning = f"fast_info unavailable: {exc.__class__.__name__}"
-
-        if previous_close is not None and not math.isfinite(float(previous_close)):
-            previous_close = None
-
-        if price is None or not math.isfinite(float(price)):
+        price, previous_close, warning = self._fast_info(ticker)
+        if price is None:
             hist = self._ticker_history(ticker, symbol, period='5d')
             if hist.empty:
                 raise ProviderError(
@@ -688,7 +802,28 @@ class YahooFinanceClient:
                 warning='realtime quote unavailable; using last close',
                 previous_close=previous_close,
             )
+        return self._fast_info_quote(symbol, price, previous_close, warning)
 
+    @staticmethod
+    def _fast_info(ticker) -> tuple[float | None, float | None, str | None]:
+        """``(last_price, previous_close, warning)`` from ``fast_info``; non-finite values are None."""
+        warning: str | None = None
+        price: float | None = None
+        previous_close: float | None = None
+        try:
+            price = ticker.fast_info.last_price
+            previous_close = ticker.fast_info.previous_close
+        except Exception as exc:
+            warning = f"fast_info unavailable: {exc.__class__.__name__}"
+
+        if previous_close is not None and not math.isfinite(float(previous_close)):
+            previous_close = None
+        if price is not None and not math.isfinite(float(price)):
+            price = None
+        return price, previous_close, warning
+
+    @staticmethod
+    def _fast_info_quote(symbol: str, price: float, previous_close: float | None, warning: str | None) -> ProviderQuote:
         return ProviderQuote(
             symbol=symbol,
             price=float(price),
@@ -704,6 +839,97 @@ class YahooFinanceClient:
             previous_close=previous_close,
         )
 
+    def get_quotes(self, symbols: list[str]) -> dict[str, ProviderQuote | ProviderError]:
+        """Quote many symbols: real-time ``fast_info`` first, one batched daily download for the rest.
+
+        As in ``get_quote``, ``fast_info`` is the source of truth. Symbols it
+        cannot price are fetched together with a single ``yf.download`` and
+        returned as fallback closes (``is_realtime=False``, ``is_fallback=True``),
+        stamped with their bar day and judged stale against today in the
+        exchange timezone. Errors are reported per symbol.
+        """
+        import yfinance as yf
+
+        unique = list(dict.fromkeys(s for s in symbols if s))
+        results: dict[str, ProviderQuote | ProviderError] = {}
+        # Symbols left for the download, with their exchange timezone when known.
+        missing: dict[str, str | None] = {}
+        for symbol in unique:
+            ticker = yf.Ticker(symbol)
+            price, previous_close, warning = self._fast_info(ticker)
+            if price is not None:
+                results[symbol] = self._fast_info_quote(symbol, price, previous_close, warning)
+            else:
+                missing[symbol] = _ticker_timezone(ticker)
+
+        if missing:
+            try:
+                df = yf.download(
+                    list(missing),
+                    period='5d',
+                    interval='1d',
+                    group_by='ticker',
+                    auto_adjust=False,
+                    ignore_tz=True,
+                    progress=False,
+                    threads=False,
+                    timeout=self.timeout_seconds,
+                )
+            except Exception as exc:
+                logger.warning('Batch quote download failed symbols=%s error=%s', len(missing), exc)
+                df = None
+            for symbol, tz_name in missing.items():
+                results[symbol] = self._quote_from_download(df, symbol, tz_name) or ProviderError(
+                    provider='yfinance',
+                    operation='quote',
+                    symbol=symbol,
+                    reason='no_data',
+                    message=f"Nessuna quotazione disponibile per {symbol}",
+                )
+        return {symbol: results[symbol] for symbol in unique}
+
+    @staticmethod
+    def _quote_from_download(df, symbol: str, tz_name: str | None) -> ProviderQuote | None:
+        if df is None or getattr(df, 'empty', True):
+            return None
+        try:
+            if getattr(df.columns, 'nlevels', 1) > 1:
+                if symbol not in df.columns.get_level_values(0):
+                    return None
+                close_col = df[symbol]['Close']
+            else:
+                close_col = df['Close']
+        except KeyError:
+            return None
+
+        close_col = close_col.dropna()
+        close_col = close_col[close_col.map(lambda v: math.isfinite(float(v)))]
+        if close_col.empty:
+            return None
+
+        price = float(close_col.iloc[-1])
+        previous_close = float(close_col.iloc[-2]) if len(close_col) >= 2 else None
+        # With ignore_tz the index holds exchange-local dates.
+        last_idx = close_col.index[-1]
+        bar_day = last_idx.date() if hasattr(last_idx, 'date') else _parse_date(str(last_idx))
+        if bar_day is None:
+            return None
+        exchange_tz = _zone(tz_name)
+        return ProviderQuote(
+            symbol=symbol,
+            price=price,
+            bid=None,
+            ask=None,
+            volume=None,
+            ts=datetime(bar_day.year, bar_day.month, bar_day.day, tzinfo=exchange_tz).astimezone(UTC),
+            source='download_close',
+            is_realtime=False,
+            is_fallback=True,
+            stale=bar_day < datetime.now(exchange_tz).date(),
+            warning='realtime quote unavailable; using last daily close',
+            previous_close=previous_close,
+        )
+
     def get_market_quote(self, symbol: str) -> ProviderMarketQuote:
         import yfinance as yf
         ticker = yf.Ticker(symbol)
@@ -1033,6 +1259,25 @@ def make_finance_client(settings: 'Settings') -> TwelveDataClient | YahooFinance
     )
 
 
+def _ticker_timezone(ticker) -> str | None:
+    """Exchange timezone of a yfinance ticker, None when Yahoo does not report it."""
+    try:
+        tz_name = ticker.fast_info.timezone
+    except Exception:
+        return None
+    return tz_name if isinstance(tz_name, str) and tz_name else None
+
+
+def _zone(tz_name: str | None):
+    """ZoneInfo for ``tz_name``; UTC when it is missing or unknown."""
+    if tz_name:
+        try:
+            return ZoneInfo(tz_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning('Unknown exchange timezone %s; using UTC', tz_name)
+    return UTC
+
+
 def _provider_error(provider: str, operation: str, symbol: str, exc: Exception) -> ProviderError:
     raw = str(exc).lower()
     reason = 'provider_error'
@@ -0,0 +1,112 @@
+"""Shared keep-alive HTTP clients, one per upstream provider.
+
+Provider clients are cheap objects built per job or per request; the
+connection pools live here so that TCP/TLS sessions survive across them.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+
+import httpx
+
+# HTTP/2 needs the h2 package (httpx[http2] in requirements.txt).
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+_clients: dict[str, httpx.Client] = {}
+# Async clients are bound to the event loop that created them, so they are
+# kept per loop: a client reused from another loop would hang or fail.
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]] = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+_config = {
+    "max_connections": DEFAULT_MAX_CONNECTIONS,
+    "max_keepalive_connections": DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    "keepalive_expiry": DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+    "http2": True,
+}
+
+
+def configure_http_pool(
+    *,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+    http2: bool = True,
+) -> None:
+    """Set the pool limits used by clients created from now on."""
+    if http2 and not _HTTP2_AVAILABLE:
+        logger.warning("HTTP/2 requested but the h2 package is not installed: provider clients use HTTP/1.1")
+    with _lock:
+        _config.update(
+            max_connections=max(1, int(max_connections)),
+            max_keepalive_connections=max(0, int(max_keepalive_connections)),
+            keepalive_expiry=max(0.0, float(keepalive_expiry)),
+            http2=bool(http2),
+        )
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_config["max_connections"],
+        max_keepalive_connections=_config["max_keepalive_connections"],
+        keepalive_expiry=_config["keepalive_expiry"],
+    )
+
+
+def get_http_client(provider: str) -> httpx.Client:
+    """Long-lived client for ``provider``; timeouts are passed per request."""
+    with _lock:
+        client = _clients.get(provider)
+        if client is None or client.is_closed:
+            http2 = bool(_config["http2"]) and _HTTP2_AVAILABLE
+            client = httpx.Client(http2=http2, limits=_limits())
+            _clients[provider] = client
+            logger.debug("Created pooled HTTP client provider=%s http2=%s", provider, http2)
+        return client
+
+
+def get_async_http_client(provider: str) -> httpx.AsyncClient:
+    """Async counterpart of ``get_http_client``, shared within the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(provider)
+        if client is None or client.is_closed:
+            http2 = bool(_config["http2"]) and _HTTP2_AVAILABLE
+            client = httpx.AsyncClient(http2=http2, limits=_limits())
+            clients[provider] = client
+            logger.debug("Created pooled async HTTP client provider=%s http2=%s", provider, http2)
+        return client
+
+
+def close_http_clients() -> None:
+    """Close every pooled client (called on application shutdown)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:  # noqa: BLE001 - best effort on shutdown
+            logger.warning("Failed to close pooled HTTP client", exc_info=True)
+
+
+async def aclose_async_http_clients() -> None:
+    """Close the pooled async clients of the running loop (called on application shutdown)."""
+    with _lock:
+        clients = list(_async_clients.pop(asyncio.get_running_loop(), {}).values())
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception:  # noqa: BLE001 - best effort on shutdown
+            logger.warning("Failed to close pooled async HTTP client", exc_info=True)
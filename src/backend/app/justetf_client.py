@@ -6,10 +6,9 @@ import threading
 import time
 from typing import Any
 
-import httpx
-
 from .config import Settings
 from .errors import ProviderError
+from .http_pool import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -116,7 +115,7 @@ class JustEtfClient:
             return None
 
     def _request_fmp_json(self, path: str, symbol: str) -> Any:
-        response = httpx.get(
+        response = get_http_client("fmp").get(
             f"{self._fmp_base_url}{path}",
             params={"symbol": symbol, "apikey": self._fmp_api_key},
             timeout=self._fmp_timeout_seconds,
@@ -1,7 +1,5 @@
 
-import json
 import logging
-import math
 from contextlib import asynccontextmanager
 from typing import Any
 
@@ -11,44 +9,17 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-
-class _SafeEncoder(json.JSONEncoder):
-    """JSON encoder that converts NaN/Inf to None instead of raising."""
-    def default(self, o: Any) -> Any:
-        return super().default(o)
-
-    def iterencode(self, o: Any, _one_shot: bool = False) -> Any:
-        return super().iterencode(self._sanitize(o), _one_shot=_one_shot)
-
-    @staticmethod
-    def _sanitize(obj: Any) -> Any:
-        if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
-            return None
-        if isinstance(obj, dict):
-            return {k: _SafeEncoder._sanitize(v) for k, v in obj.items()}
-        if isinstance(obj, (list, tuple)):
-            return [_SafeEncoder._sanitize(v) for v in obj]
-        return obj
-
-
-class SafeJSONResponse(JSONResponse):
-    def render(self, content: Any) -> bytes:
-        return json.dumps(
-            content,
-            ensure_ascii=False,
-            allow_nan=False,
-            cls=_SafeEncoder,
-        ).encode("utf-8")
-
-
 from .auth import AuthContext, require_admin
 from .middleware import RequestLoggingMiddleware
 from .config import get_settings
 from .db import engine
 from .errors import AppError
+from .async_finance_client import as_async_finance_client, configure_finance_executor, shutdown_finance_executor
 from .finance_client import make_finance_client
+from .http_pool import aclose_async_http_clients, close_http_clients, configure_http_pool
 from .models import AdminUsageSummary, ErrorResponse
-from .repository import PortfolioRepository
+from .responses import SafeJSONResponse
+from .repository import PortfolioRepository, PortfolioSnapshotCache, PriceSeriesCache
 from .scheduler import PriceRefreshScheduler
 from .services.csv_service import CsvImportService
 from .services.historical_service import HistoricalIngestionService
@@ -80,7 +51,22 @@ settings = get_settings()
 if not logging.getLogger().handlers:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
 
-repo = PortfolioRepository(engine)
+configure_http_pool(
+    max_connections=settings.http_pool_max_connections,
+    max_keepalive_connections=settings.http_pool_max_keepalive_connections,
+    keepalive_expiry=settings.http_pool_keepalive_expiry_seconds,
+    http2=settings.http2_enabled,
+)
+configure_finance_executor(settings.finance_executor_max_workers)
+
+repo = PortfolioRepository(
+    engine,
+    snapshot_cache=PortfolioSnapshotCache(
+        ttl_seconds=settings.snapshot_cache_ttl_seconds,
+        max_entries=settings.snapshot_cache_max_entries,
+    ),
+    price_series_cache=PriceSeriesCache(max_bytes=int(settings.price_series_cache_max_mb * 1024 * 1024)),
+)
 pricing_service = PriceIngestionService(settings, repo)
 historical_service = HistoricalIngestionService(settings, repo)
 csv_import_service = CsvImportService(repo)
@@ -88,6 +74,7 @@ pac_service = PacExecutionService(engine)
 performance_service = PerformanceService(repo)
 scheduler = PriceRefreshScheduler(settings, pricing_service, pac_service, historical_service, repo)
 finance_client = make_finance_client(settings)
+async_finance_client = as_async_finance_client(finance_client)
 justetf_client = JustEtfClient(settings=settings)
 
 
@@ -128,10 +115,13 @@ def _apply_pending_migrations():
             conn.execute(text(load_sql("migrations/create_asset_metadata")))
             conn.execute(text(load_sql("migrations/create_etf_enrichment")))
             conn.execute(text(load_sql("migrations/add_fire_expected_return_pct")))
+            conn.execute(text(load_sql("migrations/create_portfolio_values_1d")))
+            conn.execute(text(load_sql("migrations/create_position_state")))
+            conn.execute(text(load_sql("migrations/create_position_state_portfolios")))
             conn.execute(text("""
                 CREATE INDEX IF NOT EXISTS idx_etf_enrichment_isin ON etf_enrichment(isin)
             """))
-        logging.getLogger(__name__).info("asset_metadata, etf_enrichment and fire settings migrations ensured")
+        logging.getLogger(__name__).info("asset_metadata, etf_enrichment, fire settings, portfolio_values_1d and position_state migrations ensured")
     except Exception as exc:
         logging.getLogger(__name__).warning("Migration check failed: %s", exc)
 
@@ -150,6 +140,9 @@ async def lifespan(_: FastAPI):
         yield
     finally:
         scheduler.shutdown()
+        shutdown_finance_executor()
+        close_http_clients()
+        await aclose_async_http_clients()
 
 
 app = FastAPI(title="Valore365 API", version="0.6.0", lifespan=lifespan, default_response_class=SafeJSONResponse)
@@ -223,6 +216,16 @@ def get_admin_usage_summary(_auth: AuthContext = Depends(require_admin)) -> Admi
     return repo.get_admin_usage_summary()
 
 
+@router.get("/admin/cache-stats", responses={403: {"model": ErrorResponse}})
+def get_admin_cache_stats(_auth: AuthContext = Depends(require_admin)) -> dict[str, Any]:
+    """Counters of the in-process portfolio snapshot cache, FX index and price-series cache."""
+    return {
+        "portfolio_snapshots": repo.get_snapshot_cache_stats(),
+        "fx_rates": repo.get_fx_index_stats(),
+        "price_series": repo.get_price_series_cache_stats(),
+    }
+
+
 # Register all route modules
 register_instant_portfolio_analyzer_routes(router, repo, csv_import_service=csv_import_service)
 register_portfolio_health_routes(
@@ -230,6 +233,7 @@ register_portfolio_health_routes(
     RuntimeDependencyProxy(lambda: repo),
     RuntimeDependencyProxy(lambda: finance_client),
     justetf_client=RuntimeDependencyProxy(lambda: justetf_client),
+    async_finance_client=RuntimeDependencyProxy(lambda: async_finance_client),
 )
 register_portfolio_routes(router, RuntimeDependencyProxy(lambda: repo), settings=settings)
 register_assets_routes(
@@ -257,6 +261,8 @@ register_analytics_routes(
     router, RuntimeDependencyProxy(lambda: repo),
     performance_service=RuntimeDependencyProxy(lambda: performance_service),
     finance_client=RuntimeDependencyProxy(lambda: finance_client),
+    async_finance_client=RuntimeDependencyProxy(lambda: async_finance_client),
+    fanout_limit=settings.finance_fanout_limit,
 )
 register_rebalancing_routes(
     router, RuntimeDependencyProxy(lambda: repo),
@@ -265,7 +271,13 @@ register_rebalancing_routes(
     historical_service=RuntimeDependencyProxy(lambda: historical_service),
     ensure_target_allocation_enabled=ensure_target_allocation_enabled,
 )
-register_markets_routes(router, RuntimeDependencyProxy(lambda: repo), finance_client=RuntimeDependencyProxy(lambda: finance_client))
+register_markets_routes(
+    router,
+    RuntimeDependencyProxy(lambda: repo),
+    finance_client=RuntimeDependencyProxy(lambda: finance_client),
+    async_finance_client=RuntimeDependencyProxy(lambda: async_finance_client),
+    fanout_limit=settings.finance_fanout_limit,
+)
 register_cash_routes(router, RuntimeDependencyProxy(lambda: repo))
 register_csv_routes(
     router,
@@ -489,6 +489,7 @@ class DailyBackfillItem(BaseModel):
     bars_saved: int
     bars_requested: int = 0
     bars_rejected: int = 0
+    bars_unchanged: int = 0
 
 
 class FxBackfillItem(BaseModel):
@@ -497,6 +498,7 @@ class FxBackfillItem(BaseModel):
     rates_saved: int
     rates_requested: int = 0
     rates_rejected: int = 0
+    rates_unchanged: int = 0
 
 
 class DailyBackfillResponse(BaseModel):
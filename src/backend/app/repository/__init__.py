@@ -13,28 +13,62 @@ from ._target_alloc import TargetAllocationMixin
 from ._portfolio_crud import PortfolioCrudMixin
 from ._asset_crud import AssetCrudMixin
 from ._transactions import TransactionsMixin
+from ._valuation import DailyValuation, ValuationMixin
+from ._returns import AssetLogReturns, LogReturnsCache, ReturnsMixin
 from ._positions import PositionsMixin
-from ._summary import SummaryMixin
+from ._position_state import PositionState, PositionStateMixin
+from ._summary import IntradayHoldings, SummaryMixin
 from ._search_pricing import SearchPricingMixin
+from ._bulk_load import BulkLoadMixin, BulkLoadResult
+from ._fx_rates import FxRateIndex, FxRates, FxRatesMixin
+from ._price_series import PriceSeries, PriceSeriesCache, PriceSeriesMixin
 from ._utilities import UtilitiesMixin
 from ._pac import PacMixin
+from ._session import UnitOfWorkMixin
+from ._snapshot_cache import PortfolioSnapshotCache, SnapshotCacheMixin
 
 
 class PortfolioRepository(
+    SnapshotCacheMixin,
     AdminMixin,
     TargetAllocationMixin,
     PortfolioCrudMixin,
     AssetCrudMixin,
     TransactionsMixin,
+    ValuationMixin,
     PositionsMixin,
+    PositionStateMixin,
     SummaryMixin,
     SearchPricingMixin,
+    BulkLoadMixin,
+    FxRatesMixin,
+    PriceSeriesMixin,
+    ReturnsMixin,
     UtilitiesMixin,
     PacMixin,
+    UnitOfWorkMixin,
     BaseRepositoryMixin,
 ):
-    def __init__(self, engine: Engine) -> None:
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        snapshot_cache: PortfolioSnapshotCache | None = None,
+        fx_index: FxRateIndex | None = None,
+        price_series_cache: PriceSeriesCache | None = None,
+    ) -> None:
         self.engine = engine
+        self._log_returns_cache = LogReturnsCache()
+        self._snapshot_cache = snapshot_cache if snapshot_cache is not None else PortfolioSnapshotCache()
+        self._fx_index = fx_index if fx_index is not None else FxRateIndex()
+        self._price_series_cache = price_series_cache if price_series_cache is not None else PriceSeriesCache()
+
+    def clear_caches(self) -> None:
+        """Drop every process-local cache; the next reads go to the database."""
+        self._snapshot_cache.clear()
+        self._fx_index.clear()
+        self._price_series_cache.clear()
+        self._log_returns_cache.clear()
 
 
 __all__ = [
@@ -43,5 +77,15 @@ __all__ = [
     "PricingAsset",
     "AssetMeta",
     "PositionDelta",
+    "DailyValuation",
+    "AssetLogReturns",
+    "IntradayHoldings",
+    "PositionState",
+    "BulkLoadResult",
+    "FxRateIndex",
+    "FxRates",
+    "PriceSeries",
+    "PriceSeriesCache",
+    "PortfolioSnapshotCache",
     "_finite",
 ]
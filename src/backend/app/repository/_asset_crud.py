@@ -53,6 +53,8 @@ class AssetCrudMixin:
                 text("update assets set asset_type = :asset_type where id = :id"),
                 {"asset_type": asset_type, "id": asset_id},
             )
+        # Allocation breakdowns in cached summaries group by asset type.
+        self._bump_snapshot_assets([asset_id])
 
     def get_portfolio_asset_ids(self, portfolio_id: int, user_id: str) -> list[int]:
         with self.engine.begin() as conn:
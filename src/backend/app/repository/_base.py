@@ -17,6 +17,28 @@ def _finite(v: float, fallback: float = 0.0) -> float:
     return v if math.isfinite(v) else fallback
 
 
+def _lock_portfolios(conn, lock_ns: int, portfolio_ids_sql: str, params: dict) -> None:
+    """Take transaction-scoped advisory locks on the portfolios selected by ``portfolio_ids_sql``.
+
+    The single bigint key hashes the namespace with the full bigint id; a
+    collision only serializes two unrelated portfolios. Keys are locked in
+    order so concurrent writers cannot deadlock.
+    """
+    conn.execute(
+        text(
+            f"""
+            select pg_advisory_xact_lock(k.lock_key)
+            from (
+              select distinct hashtextextended(cast(:lock_ns as text) || ':' || cast(s.portfolio_id as text), 0) as lock_key
+              from ({portfolio_ids_sql}) as s(portfolio_id)
+              order by 1
+            ) as k
+            """
+        ),
+        {**params, "lock_ns": lock_ns},
+    ).fetchall()
+
+
 @dataclass
 class PortfolioData:
     id: int
@@ -46,17 +68,23 @@ class PositionDelta:
 
 class BaseRepositoryMixin:
     def _get_portfolio_for_user(self, conn, portfolio_id: int, user_id: str) -> PortfolioData | None:
+        uow = self._uow_for(conn)
+        if uow is not None and (portfolio_id, user_id) in uow.portfolios:
+            return uow.portfolios[(portfolio_id, user_id)]
         row = conn.execute(
             text("select id, base_currency, cash_balance from portfolios where id = :id and owner_user_id = :user_id"),
             {"id": portfolio_id, "user_id": user_id},
         ).mappings().fetchone()
-        if row is None:
-            return None
-        return PortfolioData(
-            id=int(row["id"]),
-            base_currency=str(row["base_currency"]),
-            cash_balance=float(row["cash_balance"]),
-        )
+        portfolio = None
+        if row is not None:
+            portfolio = PortfolioData(
+                id=int(row["id"]),
+                base_currency=str(row["base_currency"]),
+                cash_balance=float(row["cash_balance"]),
+            )
+        if uow is not None:
+            uow.portfolios[(portfolio_id, user_id)] = portfolio
+        return portfolio
 
     def _asset_exists(self, conn, asset_id: int) -> bool:
         row = conn.execute(text("select 1 from assets where id = :id"), {"id": asset_id}).fetchone()
@@ -185,20 +213,27 @@ class BaseRepositoryMixin:
         return {int(r["id"]): {"symbol": str(r["symbol"]), "name": str(r["name"]), "asset_type": str(r["asset_type"])} for r in rows}
 
     def _get_asset_meta(self, conn, asset_ids: list[int]) -> dict[int, AssetMeta]:
-        rows = conn.execute(
-            text(
-                """
-                select id, symbol, quote_currency
-                from assets
-                where id = any(:asset_ids)
-                """
-            ),
-            {"asset_ids": asset_ids},
-        ).mappings().all()
-        return {
+        uow = self._uow_for(conn)
+        cached = uow.asset_meta if uow is not None else {}
+        missing = [asset_id for asset_id in asset_ids if asset_id not in cached]
+        rows = []
+        if missing:
+            rows = conn.execute(
+                text(
+                    """
+                    select id, symbol, quote_currency
+                    from assets
+                    where id = any(:asset_ids)
+                    """
+                ),
+                {"asset_ids": missing},
+            ).mappings().all()
+        loaded = {
             int(r["id"]): AssetMeta(symbol=str(r["symbol"]), quote_currency=str(r["quote_currency"]))
             for r in rows
         }
+        cached.update(loaded)
+        return {asset_id: cached[asset_id] for asset_id in asset_ids if asset_id in cached}
 
     def _get_latest_prices(self, conn, asset_ids: list[int]) -> dict[int, float]:
         rows = conn.execute(
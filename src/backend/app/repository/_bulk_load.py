@@ -0,0 +1,204 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from ._fx_rates import FxRefresh
+from ._price_series import PriceSeriesRefresh
+
+
+@dataclass
+class BulkLoadResult:
+    """Outcome of a COPY-based merge; ``unchanged`` rows matched the stored values."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def staged(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+
+# Rows are streamed with COPY into a temp table, deduplicated (last row wins)
+# and merged in a single statement. Rows whose values are already stored are
+# left untouched, so they neither bump the tuple nor invalidate valuations.
+_MERGE_PRICE_BARS_SQL = """
+    with staged as (
+        select distinct on (asset_id, price_date)
+               asset_id, price_date, open, high, low, close, volume
+        from price_bars_1d_stage
+        order by asset_id, price_date, seq desc
+    ),
+    merged as (
+        insert into price_bars_1d as p (asset_id, provider, price_date, open, high, low, close, volume)
+        select asset_id, %(provider)s, price_date, open, high, low, close, volume
+        from staged
+        on conflict (asset_id, provider, price_date)
+        do update set
+          open = excluded.open,
+          high = excluded.high,
+          low = excluded.low,
+          close = excluded.close,
+          volume = excluded.volume
+        where (p.open, p.high, p.low, p.close, p.volume)
+              is distinct from (excluded.open, excluded.high, excluded.low, excluded.close, excluded.volume)
+        returning p.asset_id, p.price_date, (xmax = 0) as inserted
+    )
+    select asset_id,
+           min(price_date) as first_date,
+           count(*) filter (where inserted) as inserted,
+           count(*) filter (where not inserted) as updated
+    from merged
+    group by asset_id
+"""
+
+_MERGE_FX_RATES_SQL = """
+    with staged as (
+        select distinct on (from_ccy, to_ccy, price_date)
+               from_ccy, to_ccy, price_date, rate
+        from fx_rates_1d_stage
+        order by from_ccy, to_ccy, price_date, seq desc
+    ),
+    merged as (
+        insert into fx_rates_1d as f (from_ccy, to_ccy, provider, price_date, rate)
+        select from_ccy, to_ccy, %(provider)s, price_date, rate
+        from staged
+        on conflict (from_ccy, to_ccy, provider, price_date)
+        do update set rate = excluded.rate
+        where f.rate is distinct from excluded.rate
+        returning f.from_ccy, f.to_ccy, f.price_date, (xmax = 0) as inserted
+    )
+    select from_ccy, to_ccy,
+           min(price_date) as first_date,
+           count(*) filter (where inserted) as inserted,
+           count(*) filter (where not inserted) as updated
+    from merged
+    group by from_ccy, to_ccy
+"""
+
+
+class BulkLoadMixin:
+    def bulk_load_price_bars_1d(self, *, provider: str, rows: Iterable[dict]) -> BulkLoadResult:
+        """Stream daily bars of any number of assets into price_bars_1d.
+
+        Each row carries ``asset_id``, ``price_date``, ``open``, ``high``,
+        ``low``, ``close`` and ``volume``; ``rows`` may be a generator.
+        """
+        with self.engine.begin() as conn:
+            result, refresh = self._copy_price_bars_1d(conn, provider, rows)
+        self._after_price_bars_changed(refresh)
+        return result
+
+    def bulk_load_fx_rates_1d(self, *, provider: str, rows: Iterable[dict]) -> BulkLoadResult:
+        """Stream daily FX rates (``from_ccy``, ``to_ccy``, ``price_date``, ``rate``) into fx_rates_1d."""
+        with self.engine.begin() as conn:
+            result, refresh = self._copy_fx_rates_1d(conn, provider, rows)
+        self._after_fx_rates_changed(refresh)
+        return result
+
+    def _copy_price_bars_1d(
+        self, conn, provider: str, rows: Iterable[dict]
+    ) -> tuple[BulkLoadResult, PriceSeriesRefresh | None]:
+        """Stage and merge bars on ``conn``; returns the counts and the price-series refresh to apply after commit."""
+        cursor = conn.connection.driver_connection.cursor()
+        try:
+            cursor.execute(
+                """
+                create temp table if not exists price_bars_1d_stage (
+                  seq bigint generated always as identity,
+                  asset_id bigint not null,
+                  price_date date not null,
+                  open numeric(28,10) not null,
+                  high numeric(28,10) not null,
+                  low numeric(28,10) not null,
+                  close numeric(28,10) not null,
+                  volume numeric(28,10)
+                ) on commit drop
+                """
+            )
+            cursor.execute("truncate price_bars_1d_stage")
+            staged = 0
+            with cursor.copy(
+                "copy price_bars_1d_stage (asset_id, price_date, open, high, low, close, volume) from stdin"
+            ) as copy:
+                for row in rows:
+                    copy.write_row((
+                        int(row["asset_id"]),
+                        row["price_date"],
+                        row["open"],
+                        row["high"],
+                        row["low"],
+                        row["close"],
+                        row.get("volume"),
+                    ))
+                    staged += 1
+            if not staged:
+                return BulkLoadResult(), None
+
+            cursor.execute("select count(*) from (select distinct asset_id, price_date from price_bars_1d_stage) s")
+            distinct_rows = int(cursor.fetchone()[0])
+            cursor.execute(_MERGE_PRICE_BARS_SQL, {"provider": provider.strip().lower()})
+            changes = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        result = BulkLoadResult()
+        for asset_id, first_date, inserted, updated in changes:
+            result.inserted += int(inserted)
+            result.updated += int(updated)
+            self._invalidate_portfolio_values_for_asset(conn, int(asset_id), first_date)
+        result.unchanged = distinct_rows - result.inserted - result.updated
+        refresh = self._begin_price_series_refresh(
+            conn, {int(asset_id): first_date for asset_id, first_date, *_ in changes}
+        )
+        return result, refresh
+
+    def _copy_fx_rates_1d(self, conn, provider: str, rows: Iterable[dict]) -> tuple[BulkLoadResult, FxRefresh | None]:
+        """Stage and merge FX rates on ``conn``; returns the counts and the FX index refresh to apply after commit."""
+        cursor = conn.connection.driver_connection.cursor()
+        try:
+            cursor.execute(
+                """
+                create temp table if not exists fx_rates_1d_stage (
+                  seq bigint generated always as identity,
+                  from_ccy text not null,
+                  to_ccy text not null,
+                  price_date date not null,
+                  rate numeric(28,10) not null
+                ) on commit drop
+                """
+            )
+            cursor.execute("truncate fx_rates_1d_stage")
+            staged = 0
+            with cursor.copy("copy fx_rates_1d_stage (from_ccy, to_ccy, price_date, rate) from stdin") as copy:
+                for row in rows:
+                    copy.write_row((
+                        str(row["from_ccy"]).strip().upper(),
+                        str(row["to_ccy"]).strip().upper(),
+                        row["price_date"],
+                        row["rate"],
+                    ))
+                    staged += 1
+            if not staged:
+                return BulkLoadResult(), None
+
+            cursor.execute(
+                "select count(*) from (select distinct from_ccy, to_ccy, price_date from fx_rates_1d_stage) s"
+            )
+            distinct_rows = int(cursor.fetchone()[0])
+            cursor.execute(_MERGE_FX_RATES_SQL, {"provider": provider.strip().lower()})
+            changes = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        result = BulkLoadResult()
+        for from_ccy, to_ccy, first_date, inserted, updated in changes:
+            result.inserted += int(inserted)
+            result.updated += int(updated)
+            self._invalidate_portfolio_values_for_fx(conn, from_ccy, to_ccy, first_date)
+            self._invalidate_position_state_for_fx(conn, from_ccy, to_ccy, first_date)
+        result.unchanged = distinct_rows - result.inserted - result.updated
+        refresh = self._begin_fx_refresh(
+            conn, {(from_ccy, to_ccy): first_date for from_ccy, to_ccy, first_date, *_ in changes}
+        )
+        return result, refresh
+
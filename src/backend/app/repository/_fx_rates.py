@@ -0,0 +1,240 @@
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date
+
+import numpy as np
+from sqlalchemy import text
+
+_FX_INDEX_TTL_SECONDS = 900.0
+
+_Pair = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class FxSeries:
+    """Daily rates of one currency pair as sorted, de-duplicated arrays."""
+
+    dates: np.ndarray  # datetime64[D], strictly increasing
+    rates: np.ndarray  # float64
+
+    @classmethod
+    def from_points(cls, points: Iterable[tuple[date, float]]) -> "FxSeries":
+        # Later points win on duplicate dates, like bisecting a date-sorted list.
+        by_day = {day: float(rate) for day, rate in points}
+        days = sorted(by_day)
+        return cls(
+            dates=np.array(days, dtype="datetime64[D]"),
+            rates=np.array([by_day[day] for day in days], dtype=np.float64),
+        )
+
+    def merged(self, points: Iterable[tuple[date, float]]) -> "FxSeries":
+        existing = zip(self.dates.astype(object), self.rates.tolist())
+        return FxSeries.from_points([*existing, *points])
+
+    def rate_on_or_before(self, day: date) -> float | None:
+        idx = int(np.searchsorted(self.dates, np.datetime64(day, "D"), side="right")) - 1
+        return float(self.rates[idx]) if idx >= 0 else None
+
+    def rates_on_or_before(self, days: np.ndarray) -> np.ndarray:
+        """As-of rate for each of ``days`` (datetime64[D]); NaN before the first rate."""
+        idx = np.searchsorted(self.dates, days, side="right") - 1
+        out = np.full(len(days), np.nan)
+        found = idx >= 0
+        out[found] = self.rates[idx[found]]
+        return out
+
+    def latest(self) -> float | None:
+        return float(self.rates[-1]) if len(self.rates) else None
+
+
+class FxRates:
+    """As-of conversions of some currencies into ``base_currency``.
+
+    ``default`` is what callers get for a missing rate (no series, no rate on
+    or before the day, unknown day): ``None`` where they skip the amount,
+    ``1.0`` where they fall back to the unconverted value.
+    """
+
+    def __init__(self, base_currency: str, series: dict[str, FxSeries], default: float | None = None) -> None:
+        self.base_currency = base_currency
+        self.series = series
+        self.default = default
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], base_currency: str, default: float | None = None) -> "FxRates":
+        """Build from ``from_ccy``/``price_date``/``rate`` rows sorted by currency and date."""
+        points: dict[str, list[tuple[date, float]]] = {}
+        for row in rows:
+            points.setdefault(str(row["from_ccy"]), []).append((row["price_date"], float(row["rate"])))
+        return cls(base_currency, {ccy: FxSeries.from_points(p) for ccy, p in points.items()}, default)
+
+    def rate(self, currency: str, day: date | None) -> float | None:
+        if currency == self.base_currency:
+            return 1.0
+        series = self.series.get(currency)
+        if day is None or series is None:
+            return self.default
+        rate = series.rate_on_or_before(day)
+        return self.default if rate is None else rate
+
+    def rates(self, currency: str, days: np.ndarray) -> np.ndarray:
+        """Vectorized ``rate`` over ``days`` (datetime64[D]); NaN stands for a ``None`` default."""
+        if currency == self.base_currency:
+            return np.ones(len(days))
+        fill = np.nan if self.default is None else self.default
+        series = self.series.get(currency)
+        if series is None:
+            return np.full(len(days), fill)
+        out = series.rates_on_or_before(days)
+        if self.default is not None:
+            out[np.isnan(out)] = fill
+        return out
+
+    def latest(self, currency: str) -> float | None:
+        if currency == self.base_currency:
+            return 1.0
+        series = self.series.get(currency)
+        rate = series.latest() if series is not None else None
+        return self.default if rate is None else rate
+
+
+@dataclass
+class _CachedFxSeries:
+    loaded_at: float
+    series: FxSeries
+
+
+@dataclass
+class FxRefresh:
+    """Rates re-read by an FX writer, applied to the index once it committed."""
+
+    generation: int
+    pairs: list[_Pair]
+    tails: dict[_Pair, list[tuple[date, float]]] = field(default_factory=dict)
+
+
+class FxRateIndex:
+    """Process-wide as-of index over fx_rates_1d, one compact series per pair.
+
+    Pairs are loaded on first use. FX writers re-read the days they touched
+    and merge them in after committing; a pair written concurrently by
+    someone else is dropped and reloaded instead. Entries also expire after
+    a TTL so that rates written by another process are picked up eventually.
+    """
+
+    def __init__(self, ttl_seconds: float = _FX_INDEX_TTL_SECONDS) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[_Pair, _CachedFxSeries] = {}
+        self._versions: dict[_Pair, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, conn, currencies: Iterable[str], base_currency: str, *, default: float | None = None) -> FxRates:
+        wanted = sorted({ccy for ccy in currencies if ccy != base_currency})
+        series: dict[str, FxSeries] = {}
+        now = time.monotonic()
+        with self._lock:
+            for ccy in wanted:
+                entry = self._entries.get((ccy, base_currency))
+                if entry is not None and now - entry.loaded_at <= self.ttl_seconds:
+                    series[ccy] = entry.series
+            generation = self._generation
+        missing = [ccy for ccy in wanted if ccy not in series]
+        if missing:
+            loaded = self._load(conn, missing, base_currency)
+            with self._lock:
+                loaded_at = time.monotonic()
+                for ccy, item in loaded.items():
+                    pair = (ccy, base_currency)
+                    # A write landed while loading: use the rows, but do not keep them.
+                    if self._versions.get(pair, 0) <= generation:
+                        self._entries[pair] = _CachedFxSeries(loaded_at=loaded_at, series=item)
+            series.update(loaded)
+        return FxRates(base_currency, {ccy: item for ccy, item in series.items() if len(item.dates)}, default)
+
+    def begin_refresh(self, conn, first_dates: dict[_Pair, date]) -> FxRefresh:
+        """Re-read, on the writer's connection, the written days of the pairs held in memory."""
+        with self._lock:
+            generation = self._generation
+            cached = [pair for pair in first_dates if pair in self._entries]
+        refresh = FxRefresh(generation=generation, pairs=list(first_dates))
+        for from_ccy, to_ccy in cached:
+            rows = conn.execute(
+                text(
+                    """
+                    select price_date, rate::float8 as rate
+                    from fx_rates_1d
+                    where from_ccy = :from_ccy
+                      and to_ccy = :to_ccy
+                      and price_date >= :first_date
+                    order by price_date asc
+                    """
+                ),
+                {"from_ccy": from_ccy, "to_ccy": to_ccy, "first_date": first_dates[(from_ccy, to_ccy)]},
+            ).mappings().all()
+            refresh.tails[(from_ccy, to_ccy)] = [(row["price_date"], float(row["rate"])) for row in rows]
+        return refresh
+
+    def apply_refresh(self, refresh: FxRefresh) -> None:
+        """Merge a committed writer's rows; call after commit."""
+        with self._lock:
+            for pair in refresh.pairs:
+                entry = self._entries.get(pair)
+                if entry is None:
+                    continue
+                if pair not in refresh.tails or self._versions.get(pair, 0) > refresh.generation:
+                    del self._entries[pair]
+                else:
+                    entry.series = entry.series.merged(refresh.tails[pair])
+            self._generation += 1
+            for pair in refresh.pairs:
+                self._versions[pair] = self._generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            for pair in self._entries:
+                self._versions[pair] = self._generation
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"pairs": len(self._entries), "points": sum(len(e.series.dates) for e in self._entries.values())}
+
+    def _load(self, conn, currencies: list[str], base_currency: str) -> dict[str, FxSeries]:
+        rows = conn.execute(
+            text(
+                """
+                select from_ccy, price_date, rate::float8 as rate
+                from fx_rates_1d
+                where from_ccy = any(:from_ccy)
+                  and to_ccy = :to_ccy
+                order by from_ccy asc, price_date asc
+                """
+            ),
+            {"from_ccy": currencies, "to_ccy": base_currency},
+        ).mappings().all()
+        points: dict[str, list[tuple[date, float]]] = {ccy: [] for ccy in currencies}
+        for row in rows:
+            points[str(row["from_ccy"])].append((row["price_date"], float(row["rate"])))
+        return {ccy: FxSeries.from_points(p) for ccy, p in points.items()}
+
+
+class FxRatesMixin:
+    def get_fx_index_stats(self) -> dict[str, int]:
+        return self._fx_index.stats()
+
+    def _fx_rates(self, conn, currencies: Iterable[str], base_currency: str, *, default: float | None = None) -> FxRates:
+        """As-of FX lookups into ``base_currency`` served from the process-wide index."""
+        return self._fx_index.lookup(conn, currencies, base_currency, default=default)
+
+    def _begin_fx_refresh(self, conn, first_dates: dict[_Pair, date]) -> FxRefresh:
+        return self._fx_index.begin_refresh(conn, first_dates)
+
+    def _after_fx_rates_changed(self, refresh: FxRefresh | None) -> None:
+        """Refresh process-local FX state after a committed FX write."""
+        if refresh is not None and refresh.pairs:
+            self._fx_index.apply_refresh(refresh)
+            self._bump_snapshot_fx()
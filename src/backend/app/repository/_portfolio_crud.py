@@ -1,3 +1,5 @@
+from datetime import date
+
 from sqlalchemy import text
 
 from ..models import (
@@ -145,6 +147,11 @@ class PortfolioCrudMixin:
                 ,
                 params,
             ).mappings().fetchone()
+            if row is not None and "base_currency" in params:
+                self._invalidate_portfolio_values(conn, portfolio_id, date.min)
+                self._invalidate_position_state(conn, portfolio_id)
+        self._forget_portfolio(portfolio_id)
+        self._bump_snapshot_portfolios([portfolio_id])
 
         if row is None:
             raise ValueError("Portfolio non trovato")
@@ -241,6 +248,8 @@ class PortfolioCrudMixin:
                 text("delete from portfolios where id = :id and owner_user_id = :user_id returning id"),
                 {"id": portfolio_id, "user_id": user_id},
             ).fetchone()
+        self._forget_portfolio(portfolio_id)
+        self._bump_snapshot_portfolios([portfolio_id])
 
         if row is None:
             raise ValueError("Portfolio non trovato")
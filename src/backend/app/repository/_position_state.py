@@ -0,0 +1,329 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+from ._base import _lock_portfolios
+
+# Namespace for the transaction-scoped advisory locks that serialize
+# position_state rebuilds with the writes that fold trades into it.
+_POSITION_STATE_LOCK_NS = 3652
+
+# Same tolerance as _assert_non_negative_inventory_timeline.
+_QUANTITY_EPSILON = 1e-9
+
+
+@dataclass
+class PositionState:
+    """Average-cost ledger of one asset in a portfolio, in base currency.
+
+    ``quantity`` and ``cost_basis`` follow the average-cost replay (sells
+    beyond the held quantity are capped), ``running_quantity`` is the plain
+    buys-minus-sells checkpoint used to validate new sells.
+    """
+
+    asset_id: int
+    quantity: float = 0.0
+    cost_basis: float = 0.0
+    running_quantity: float = 0.0
+    first_trade_at: datetime | None = None
+    last_trade_at: datetime | None = None
+    last_transaction_id: int | None = None
+
+    def apply(self, transaction_id: int, trade_at: datetime, side: str, quantity: float, price: float, fees: float, taxes: float, fx: float) -> None:
+        gross_cost_base = quantity * price * fx
+        fees_taxes_base = (fees + taxes) * fx
+        if side == "buy":
+            self.quantity += quantity
+            self.cost_basis += gross_cost_base + fees_taxes_base
+            self.running_quantity += quantity
+        else:
+            if self.quantity > 0:
+                avg_cost = self.cost_basis / self.quantity
+                sold_qty = min(quantity, self.quantity)
+                self.quantity -= sold_qty
+                self.cost_basis -= avg_cost * sold_qty
+                self.cost_basis = max(self.cost_basis, 0.0)
+            self.running_quantity -= quantity
+        if self.first_trade_at is None or trade_at < self.first_trade_at:
+            self.first_trade_at = trade_at
+        self.last_trade_at = trade_at
+        self.last_transaction_id = transaction_id
+
+
+class PositionStateMixin:
+    """Persisted per-asset position ledger maintained on transaction writes.
+
+    A portfolio's rows are authoritative only while its marker row in
+    ``position_state_portfolios`` exists. Appended trades are folded in
+    incrementally; back-dated, edited or deleted trades replay the affected
+    asset. FX writes that can change the cost basis of existing trades drop
+    the marker, and the next read rebuilds the portfolio.
+    """
+
+    def rebuild_position_state(self, portfolio_id: int | None = None) -> int:
+        """Rebuild the ledger of one portfolio (or all); returns how many were rebuilt."""
+        with self.engine.begin() as conn:
+            if portfolio_id is not None:
+                portfolio_ids = [portfolio_id]
+            else:
+                portfolio_ids = [int(r[0]) for r in conn.execute(text("select id from portfolios order by id")).fetchall()]
+        rebuilt = 0
+        for pid in portfolio_ids:
+            with self.engine.begin() as conn:
+                self._lock_position_state(conn, "select cast(:portfolio_id as bigint)", {"portfolio_id": pid})
+                if self._rebuild_position_state(conn, pid):
+                    rebuilt += 1
+        return rebuilt
+
+    def _load_position_state(self, conn, portfolio_id: int) -> list[PositionState]:
+        """Open positions of ``portfolio_id``, rebuilding the ledger first if it is not current.
+
+        This is a write on the read path: a missing marker (FX correction,
+        first read after the migration) makes the caller's transaction
+        rebuild and persist the ledger, holding the portfolio's lock until it
+        commits. ``conn`` must therefore be a writable transaction; later
+        reads find the marker and only select. scripts/rebuild_position_state.py
+        rebuilds every ledger ahead of time.
+        """
+        if not self._position_state_is_current(conn, portfolio_id):
+            self._lock_position_state(conn, "select cast(:portfolio_id as bigint)", {"portfolio_id": portfolio_id})
+            if not self._position_state_is_current(conn, portfolio_id):
+                self._rebuild_position_state(conn, portfolio_id)
+        rows = conn.execute(
+            text(
+                """
+                select asset_id, quantity, cost_basis, running_quantity,
+                       first_trade_at, last_trade_at, last_transaction_id
+                from position_state
+                where portfolio_id = :portfolio_id
+                  and quantity > 0
+                order by first_trade_at asc, asset_id asc
+                """
+            ),
+            {"portfolio_id": portfolio_id},
+        ).mappings().all()
+        return [_state_from_row(row) for row in rows]
+
+    # ---- Write hooks (called inside the writer's transaction) ----
+
+    def _apply_trade_to_position_state(self, conn, portfolio_id: int, base_currency: str, trade: Mapping) -> None:
+        """Fold a just-inserted buy/sell into the ledger.
+
+        ``trade`` carries ``id``, ``asset_id``, ``side``, ``trade_at``,
+        ``trade_date`` (``trade_at::date`` as computed by the DB),
+        ``quantity``, ``price``, ``fees``, ``taxes`` and ``trade_currency``.
+        Raises ValueError when a sell exceeds the quantity held at its date.
+        """
+        asset_id = int(trade["asset_id"])
+        side = str(trade["side"])
+        self._lock_position_state(conn, "select cast(:portfolio_id as bigint)", {"portfolio_id": portfolio_id})
+        state = None
+        if self._position_state_is_current(conn, portfolio_id):
+            row = conn.execute(
+                text(
+                    """
+                    select asset_id, quantity, cost_basis, running_quantity,
+                           first_trade_at, last_trade_at, last_transaction_id
+                    from position_state
+                    where portfolio_id = :portfolio_id and asset_id = :asset_id
+                    """
+                ),
+                {"portfolio_id": portfolio_id, "asset_id": asset_id},
+            ).mappings().fetchone()
+            state = _state_from_row(row) if row is not None else PositionState(asset_id=asset_id)
+
+        if state is None or (state.last_trade_at is not None and trade["trade_at"] < state.last_trade_at):
+            # No usable checkpoint, or a back-dated trade: validate against the full timeline.
+            if side == "sell":
+                self._assert_non_negative_inventory_timeline(conn, portfolio_id, asset_id)
+            if state is not None:
+                self._rebuild_position_state(conn, portfolio_id, [asset_id])
+            return
+
+        trade_ccy = str(trade["trade_currency"])
+        fx = self._fx_rates(conn, [trade_ccy], base_currency, default=1.0).rate(trade_ccy, trade["trade_date"]) or 1.0
+        state.apply(
+            int(trade["id"]),
+            trade["trade_at"],
+            side,
+            float(trade["quantity"]),
+            float(trade["price"]),
+            float(trade["fees"]),
+            float(trade["taxes"]),
+            fx,
+        )
+        if side == "sell" and state.running_quantity < -_QUANTITY_EPSILON:
+            raise ValueError("Quantita insufficiente per sell alla data operazione")
+        self._save_position_state(conn, portfolio_id, [state])
+
+    def _refresh_position_state(self, conn, portfolio_id: int, asset_ids: list[int]) -> None:
+        """Replay ``asset_ids`` after an edit or delete of their trades."""
+        self._lock_position_state(conn, "select cast(:portfolio_id as bigint)", {"portfolio_id": portfolio_id})
+        if self._position_state_is_current(conn, portfolio_id):
+            self._rebuild_position_state(conn, portfolio_id, asset_ids)
+
+    def _invalidate_position_state(self, conn, portfolio_id: int) -> None:
+        self._drop_position_state_markers(conn, "select cast(:portfolio_id as bigint)", {"portfolio_id": portfolio_id})
+
+    def _invalidate_position_state_for_fx(self, conn, from_ccy: str, to_ccy: str, from_date: date) -> None:
+        # Only trades on or after the first changed day can pick up a different rate.
+        self._drop_position_state_markers(
+            conn,
+            """
+            select distinct t.portfolio_id
+            from transactions t
+            join portfolios p on p.id = t.portfolio_id
+            where p.base_currency = :to_ccy
+              and t.trade_currency = :from_ccy
+              and t.side in ('buy', 'sell')
+              and t.asset_id is not null
+              and t.trade_at::date >= :from_date
+            """,
+            {"from_ccy": from_ccy.upper(), "to_ccy": to_ccy.upper(), "from_date": from_date},
+        )
+
+    # ---- Ledger storage ----
+
+    def _rebuild_position_state(self, conn, portfolio_id: int, asset_ids: list[int] | None = None) -> bool:
+        """Replay the trades of ``portfolio_id`` (optionally only ``asset_ids``) into position_state."""
+        portfolio = conn.execute(
+            text("select base_currency from portfolios where id = :id"),
+            {"id": portfolio_id},
+        ).mappings().fetchone()
+        if portfolio is None:
+            return False
+        base_ccy = str(portfolio["base_currency"])
+
+        params: dict[str, object] = {"portfolio_id": portfolio_id}
+        asset_clause = ""
+        if asset_ids is not None:
+            asset_clause = "and asset_id = any(:asset_ids)"
+            params["asset_ids"] = asset_ids
+        tx_rows = conn.execute(
+            text(
+                f"""
+                select id,
+                       asset_id,
+                       side,
+                       trade_at,
+                       trade_at::date as trade_date,
+                       quantity::float8 as quantity,
+                       price::float8 as price,
+                       fees::float8 as fees,
+                       taxes::float8 as taxes,
+                       trade_currency
+                from transactions
+                where portfolio_id = :portfolio_id
+                  and side in ('buy', 'sell')
+                  and asset_id is not null
+                  {asset_clause}
+                order by trade_at asc, id asc
+                """
+            ),
+            params,
+        ).mappings().all()
+
+        fx = self._fx_rates(conn, {str(r["trade_currency"]) for r in tx_rows}, base_ccy, default=1.0)
+
+        states: dict[int, PositionState] = {}
+        for tx in tx_rows:
+            aid = int(tx["asset_id"])
+            state = states.setdefault(aid, PositionState(asset_id=aid))
+            state.apply(
+                int(tx["id"]),
+                tx["trade_at"],
+                str(tx["side"]),
+                float(tx["quantity"]),
+                float(tx["price"]),
+                float(tx["fees"]),
+                float(tx["taxes"]),
+                fx.rate(str(tx["trade_currency"]), tx["trade_date"]) or 1.0,
+            )
+
+        conn.execute(
+            text(f"delete from position_state where portfolio_id = :portfolio_id {asset_clause}"),
+            params,
+        )
+        self._save_position_state(conn, portfolio_id, list(states.values()))
+        if asset_ids is None:
+            conn.execute(
+                text(
+                    """
+                    insert into position_state_portfolios (portfolio_id, rebuilt_at)
+                    values (:portfolio_id, now())
+                    on conflict (portfolio_id) do update set rebuilt_at = excluded.rebuilt_at
+                    """
+                ),
+                {"portfolio_id": portfolio_id},
+            )
+        return True
+
+    def _save_position_state(self, conn, portfolio_id: int, states: list[PositionState]) -> None:
+        if not states:
+            return
+        conn.execute(
+            text(
+                """
+                insert into position_state (
+                    portfolio_id, asset_id, quantity, cost_basis, running_quantity,
+                    first_trade_at, last_trade_at, last_transaction_id, updated_at
+                ) values (
+                    :portfolio_id, :asset_id, :quantity, :cost_basis, :running_quantity,
+                    :first_trade_at, :last_trade_at, :last_transaction_id, now()
+                )
+                on conflict (portfolio_id, asset_id)
+                do update set
+                  quantity = excluded.quantity,
+                  cost_basis = excluded.cost_basis,
+                  running_quantity = excluded.running_quantity,
+                  first_trade_at = excluded.first_trade_at,
+                  last_trade_at = excluded.last_trade_at,
+                  last_transaction_id = excluded.last_transaction_id,
+                  updated_at = excluded.updated_at
+                """
+            ),
+            [
+                {
+                    "portfolio_id": portfolio_id,
+                    "asset_id": state.asset_id,
+                    "quantity": state.quantity,
+                    "cost_basis": state.cost_basis,
+                    "running_quantity": state.running_quantity,
+                    "first_trade_at": state.first_trade_at,
+                    "last_trade_at": state.last_trade_at,
+                    "last_transaction_id": state.last_transaction_id,
+                }
+                for state in states
+            ],
+        )
+
+    def _position_state_is_current(self, conn, portfolio_id: int) -> bool:
+        row = conn.execute(
+            text("select 1 from position_state_portfolios where portfolio_id = :portfolio_id"),
+            {"portfolio_id": portfolio_id},
+        ).fetchone()
+        return row is not None
+
+    def _drop_position_state_markers(self, conn, portfolio_ids_sql: str, params: dict) -> None:
+        self._lock_position_state(conn, portfolio_ids_sql, params)
+        conn.execute(
+            text(f"delete from position_state_portfolios where portfolio_id in ({portfolio_ids_sql})"),
+            params,
+        )
+
+    def _lock_position_state(self, conn, portfolio_ids_sql: str, params: dict) -> None:
+        _lock_portfolios(conn, _POSITION_STATE_LOCK_NS, portfolio_ids_sql, params)
+
+
+def _state_from_row(row: Mapping) -> PositionState:
+    return PositionState(
+        asset_id=int(row["asset_id"]),
+        quantity=float(row["quantity"]),
+        cost_basis=float(row["cost_basis"]),
+        running_quantity=float(row["running_quantity"]),
+        first_trade_at=row["first_trade_at"],
+        last_trade_at=row["last_trade_at"],
+        last_transaction_id=int(row["last_transaction_id"]) if row["last_transaction_id"] is not None else None,
+    )
@@ -1,7 +1,5 @@
 import math
-from bisect import bisect_right
-from collections import defaultdict
-from datetime import date, datetime
+from datetime import date
 
 from sqlalchemy import text
 
@@ -12,37 +10,21 @@ from ._base import _finite
 
 class PositionsMixin:
     def get_positions(self, portfolio_id: int, user_id: str, stale_days: int = 5) -> list[Position]:
-        with self.engine.begin() as conn:
+        """Open positions of the portfolio valued at the latest close.
+
+        Runs in a writable transaction: an outdated position ledger is
+        rebuilt and saved before it is read (see ``_load_position_state``).
+        """
+        with self._begin() as conn:
             portfolio = self._get_portfolio_for_user(conn, portfolio_id, user_id)
             if portfolio is None:
                 raise ValueError("Portfolio non trovato")
 
-            tx_rows = conn.execute(
-                text(
-                    """
-                    select asset_id,
-                           side,
-                           trade_at,
-                           trade_at::date as trade_date,
-                           quantity::float8 as quantity,
-                           price::float8 as price,
-                           fees::float8 as fees,
-                           taxes::float8 as taxes,
-                           trade_currency
-                    from transactions
-                    where portfolio_id = :portfolio_id
-                      and side in ('buy', 'sell')
-                      and asset_id is not null
-                    order by trade_at asc, id asc
-                    """
-                ),
-                {"portfolio_id": portfolio_id},
-            ).mappings().all()
-
-            if not tx_rows:
+            states = self._load_position_state(conn, portfolio_id)
+            if not states:
                 return []
 
-            asset_ids = sorted({int(r["asset_id"]) for r in tx_rows})
+            asset_ids = sorted(state.asset_id for state in states)
             assets = self._get_assets(conn, asset_ids)
             asset_meta = self._get_asset_meta(conn, asset_ids)
             daily_prices = self._get_latest_daily_prices(conn, asset_ids)
@@ -122,89 +104,18 @@ class PositionsMixin:
 
             fx_currencies = sorted(
                 {
-                    str(r["trade_currency"])
-                    for r in tx_rows
-                    if r.get("trade_currency") and str(r["trade_currency"]) != base_ccy
-                }
-                | {
                     meta.quote_currency
                     for meta in asset_meta.values()
                     if meta.quote_currency != base_ccy
                 }
             )
-            fx_rows = []
-            if fx_currencies:
-                fx_rows = conn.execute(
-                    text(
-                        """
-                        select from_ccy, price_date, rate::float8 as rate
-                        from fx_rates_1d
-                        where from_ccy = any(:from_ccy)
-                          and to_ccy = :to_ccy
-                        order by from_ccy asc, price_date asc
-                        """
-                    ),
-                    {"from_ccy": fx_currencies, "to_ccy": base_ccy},
-                ).mappings().all()
-
-            grouped: dict[int, dict[str, float]] = defaultdict(lambda: {"quantity": 0.0, "cost": 0.0})
-            first_trade_at_by_asset: dict[int, datetime] = {}
-            fx_series: dict[str, list[tuple[date, float]]] = defaultdict(list)
-            for row in fx_rows:
-                fx_series[str(row["from_ccy"])].append((row["price_date"], float(row["rate"])))
-
-            fx_dates = {ccy: [d for d, _ in series] for ccy, series in fx_series.items()}
-
-            def fx_rate_on_or_before(currency: str, day: date | None) -> float | None:
-                if currency == base_ccy:
-                    return 1.0
-                if day is None:
-                    return None
-                series = fx_series.get(currency)
-                dates = fx_dates.get(currency)
-                if not series or not dates:
-                    return None
-                idx = bisect_right(dates, day) - 1
-                if idx < 0:
-                    return None
-                return series[idx][1]
-
-            for tx in tx_rows:
-                aid = int(tx["asset_id"])
-                lot = grouped[aid]
-                trade_at_ts = tx.get("trade_at")
-                if isinstance(trade_at_ts, datetime):
-                    prev_first = first_trade_at_by_asset.get(aid)
-                    if prev_first is None or trade_at_ts < prev_first:
-                        first_trade_at_by_asset[aid] = trade_at_ts
-                qty = float(tx["quantity"])
-                price = float(tx["price"])
-                fees = float(tx["fees"])
-                taxes = float(tx["taxes"])
-                trade_day = tx["trade_date"]
-                trade_ccy = str(tx["trade_currency"])
-                tx_fx = fx_rate_on_or_before(trade_ccy, trade_day) or 1.0
-                gross_cost_base = qty * price * tx_fx
-                fees_taxes_base = (fees + taxes) * tx_fx
-
-                if tx["side"] == "buy":
-                    lot["quantity"] += qty
-                    lot["cost"] += gross_cost_base + fees_taxes_base
-                else:
-                    if lot["quantity"] <= 0:
-                        continue
-                    avg_cost = lot["cost"] / lot["quantity"]
-                    sold_qty = min(qty, lot["quantity"])
-                    lot["quantity"] -= sold_qty
-                    lot["cost"] -= avg_cost * sold_qty
-                    lot["cost"] = max(lot["cost"], 0.0)
+            fx = self._fx_rates(conn, fx_currencies, base_ccy)
 
             positions: list[Position] = []
-            for aid, lot in grouped.items():
-                qty = lot["quantity"]
-                if qty <= 0:
-                    continue
-                avg_cost = lot["cost"] / qty if qty else 0.0
+            for state in states:
+                aid = state.asset_id
+                qty = state.quantity
+                avg_cost = state.cost_basis / qty if qty else 0.0
                 price_info = daily_prices.get(aid)
                 meta = asset_meta.get(aid)
                 market_price = avg_cost
@@ -214,7 +125,7 @@ class PositionsMixin:
                     price_day, latest_close = price_info
                     raw_price = latest_close
                     price_day_val = price_day
-                    quote_fx = fx_rate_on_or_before(meta.quote_currency, price_day)
+                    quote_fx = fx.rate(meta.quote_currency, price_day)
                     if quote_fx is not None:
                         market_price = latest_close * quote_fx
                 market_value = qty * market_price
@@ -259,7 +170,7 @@ class PositionsMixin:
                         unrealized_pl_pct=round(_finite(pl_pct), 2),
                         day_change_pct=round(_finite(pos_day_change_pct), 2),
                         weight=0,  # Placeholder, will be calculated next
-                        first_trade_at=first_trade_at_by_asset.get(aid),
+                        first_trade_at=state.first_trade_at,
                         price_stale=stale,
                         price_date=price_day_val,
                     )
@@ -0,0 +1,284 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any
+
+import numpy as np
+from sqlalchemy import text
+
+_PRICE_SERIES_CACHE_TTL_SECONDS = 900.0
+_PRICE_SERIES_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# One close per asset and day: the first provider (alphabetically) with a
+# positive close, else the first provider.
+_PRICE_SERIES_SQL = """
+    select distinct on (b.asset_id, b.price_date)
+           b.asset_id, b.price_date, b.close::float8 as close
+    from price_bars_1d b
+    where b.asset_id = any(:asset_ids)
+    order by b.asset_id asc, b.price_date asc, (b.close > 0) desc, b.provider asc
+"""
+
+_PRICE_SERIES_TAIL_SQL = """
+    select distinct on (b.asset_id, b.price_date)
+           b.asset_id, b.price_date, b.close::float8 as close
+    from price_bars_1d b
+    join unnest(cast(:asset_ids as bigint[]), cast(:first_dates as date[])) as w(asset_id, first_date)
+      on b.asset_id = w.asset_id and b.price_date >= w.first_date
+    order by b.asset_id asc, b.price_date asc, (b.close > 0) desc, b.provider asc
+"""
+
+
+@dataclass(frozen=True)
+class PriceSeries:
+    """Daily closes of one asset as sorted, de-duplicated arrays."""
+
+    dates: np.ndarray  # datetime64[D], strictly increasing
+    closes: np.ndarray  # float64, may hold non-positive closes as stored
+
+    @classmethod
+    def from_points(cls, points: Iterable[tuple[date, float]]) -> "PriceSeries":
+        by_day = {day: float(close) for day, close in points}
+        days = sorted(by_day)
+        return cls(
+            dates=np.array(days, dtype="datetime64[D]"),
+            closes=np.array([by_day[day] for day in days], dtype=np.float64),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.dates.nbytes + self.closes.nbytes)
+
+    def window(self, start_date: date | None = None, end_date: date | None = None) -> "PriceSeries":
+        """Closes within [start_date, end_date]; an open bound is unbounded."""
+        lo = 0 if start_date is None else int(np.searchsorted(self.dates, np.datetime64(start_date, "D"), side="left"))
+        hi = len(self.dates) if end_date is None else int(
+            np.searchsorted(self.dates, np.datetime64(end_date, "D"), side="right")
+        )
+        if lo == 0 and hi == len(self.dates):
+            return self
+        return PriceSeries(dates=self.dates[lo:hi], closes=self.closes[lo:hi])
+
+    def valid(self) -> "PriceSeries":
+        """Only the positive, finite closes."""
+        keep = np.isfinite(self.closes) & (self.closes > 0)
+        if keep.all():
+            return self
+        return PriceSeries(dates=self.dates[keep], closes=self.closes[keep])
+
+    def with_tail(self, first_date: date, tail: "PriceSeries") -> "PriceSeries":
+        """Replace every close from ``first_date`` onwards with ``tail``."""
+        cut = int(np.searchsorted(self.dates, np.datetime64(first_date, "D"), side="left"))
+        return PriceSeries(
+            dates=np.concatenate([self.dates[:cut], tail.dates]),
+            closes=np.concatenate([self.closes[:cut], tail.closes]),
+        )
+
+    def points(self) -> list[tuple[date, float]]:
+        return list(zip(self.dates.astype(object).tolist(), self.closes.tolist()))
+
+
+_EMPTY_SERIES = PriceSeries(dates=np.empty(0, dtype="datetime64[D]"), closes=np.empty(0))
+
+
+@dataclass
+class _CachedPriceSeries:
+    loaded_at: float
+    series: PriceSeries
+
+
+@dataclass
+class PriceSeriesRefresh:
+    """Closes re-read by a bar writer, applied to the cache once it committed."""
+
+    generation: int
+    first_dates: dict[int, date]
+    tails: dict[int, PriceSeries] = field(default_factory=dict)
+
+    @property
+    def asset_ids(self) -> list[int]:
+        return list(self.first_dates)
+
+
+class PriceSeriesCache:
+    """Process-wide LRU of per-asset daily close series, bounded by memory.
+
+    Each asset's full history is loaded on first use and served to every
+    reader afterwards. Bar writers re-read the days they touched and splice
+    them in after committing; an asset written concurrently by someone else
+    is dropped and reloaded instead. Entries also expire after a TTL so that
+    bars written by another process are picked up eventually.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = _PRICE_SERIES_CACHE_MAX_BYTES,
+        ttl_seconds: float = _PRICE_SERIES_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[int, _CachedPriceSeries] = OrderedDict()
+        self._bytes = 0
+        self._versions: dict[int, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl_seconds > 0
+
+    def get_many(self, conn, asset_ids: Iterable[int]) -> dict[int, PriceSeries]:
+        wanted = list(dict.fromkeys(int(asset_id) for asset_id in asset_ids))
+        if not self.enabled:
+            return self._load(conn, wanted)
+        series: dict[int, PriceSeries] = {}
+        now = time.monotonic()
+        with self._lock:
+            for asset_id in wanted:
+                entry = self._entries.get(asset_id)
+                if entry is not None and now - entry.loaded_at <= self.ttl_seconds:
+                    self._entries.move_to_end(asset_id)
+                    series[asset_id] = entry.series
+                    self._hits += 1
+            self._misses += len(wanted) - len(series)
+            generation = self._generation
+        missing = [asset_id for asset_id in wanted if asset_id not in series]
+        if missing:
+            loaded = self._load(conn, missing)
+            with self._lock:
+                loaded_at = time.monotonic()
+                for asset_id, item in loaded.items():
+                    # A write landed while loading: use the rows, but do not keep them.
+                    if self._versions.get(asset_id, 0) <= generation:
+                        self._store(asset_id, _CachedPriceSeries(loaded_at=loaded_at, series=item))
+            series.update(loaded)
+        return {asset_id: series[asset_id] for asset_id in wanted}
+
+    def begin_refresh(self, conn, first_dates: dict[int, date]) -> PriceSeriesRefresh:
+        """Re-read, on the writer's connection, the written days of the assets held in memory."""
+        with self._lock:
+            generation = self._generation
+            cached = [asset_id for asset_id in first_dates if asset_id in self._entries]
+        refresh = PriceSeriesRefresh(generation=generation, first_dates=dict(first_dates))
+        if cached:
+            rows = conn.execute(
+                text(_PRICE_SERIES_TAIL_SQL),
+                {"asset_ids": cached, "first_dates": [first_dates[asset_id] for asset_id in cached]},
+            ).mappings().all()
+            points: dict[int, list[tuple[date, float]]] = {asset_id: [] for asset_id in cached}
+            for row in rows:
+                points[int(row["asset_id"])].append((row["price_date"], float(row["close"])))
+            refresh.tails = {asset_id: PriceSeries.from_points(p) for asset_id, p in points.items()}
+        return refresh
+
+    def apply_refresh(self, refresh: PriceSeriesRefresh) -> None:
+        """Splice a committed writer's closes in; call after commit."""
+        with self._lock:
+            for asset_id, first_date in refresh.first_dates.items():
+                entry = self._entries.pop(asset_id, None)
+                if entry is None:
+                    continue
+                self._bytes -= entry.series.nbytes
+                if asset_id in refresh.tails and self._versions.get(asset_id, 0) <= refresh.generation:
+                    entry.series = entry.series.with_tail(first_date, refresh.tails[asset_id])
+                    self._store(asset_id, entry)
+            self._generation += 1
+            for asset_id in refresh.first_dates:
+                self._versions[asset_id] = self._generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            for asset_id in self._entries:
+                self._versions[asset_id] = self._generation
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "assets": len(self._entries),
+                "points": sum(len(e.series.dates) for e in self._entries.values()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+    def _store(self, asset_id: int, entry: _CachedPriceSeries) -> None:
+        # Called with the lock held. A series larger than the whole budget is not kept.
+        size = entry.series.nbytes
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(asset_id, None)
+        if previous is not None:
+            self._bytes -= previous.series.nbytes
+        self._entries[asset_id] = entry
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.series.nbytes
+            self._evictions += 1
+
+    def _load(self, conn, asset_ids: list[int]) -> dict[int, PriceSeries]:
+        if not asset_ids:
+            return {}
+        rows = conn.execute(text(_PRICE_SERIES_SQL), {"asset_ids": asset_ids}).mappings().all()
+        dates: dict[int, list[date]] = {asset_id: [] for asset_id in asset_ids}
+        closes: dict[int, list[float]] = {asset_id: [] for asset_id in asset_ids}
+        for row in rows:
+            asset_id = int(row["asset_id"])
+            dates[asset_id].append(row["price_date"])
+            closes[asset_id].append(float(row["close"]))
+        return {
+            asset_id: PriceSeries(
+                dates=np.array(dates[asset_id], dtype="datetime64[D]"),
+                closes=np.array(closes[asset_id], dtype=np.float64),
+            )
+            if dates[asset_id]
+            else _EMPTY_SERIES
+            for asset_id in asset_ids
+        }
+
+
+class PriceSeriesMixin:
+    def get_price_series(
+        self, asset_ids: Iterable[int], start_date: date | None = None, end_date: date | None = None,
+    ) -> dict[int, PriceSeries]:
+        """Daily closes of ``asset_ids`` within [start_date, end_date], served from the process-wide cache."""
+        with self._begin() as conn:
+            series = self._price_series(conn, asset_ids)
+        return {asset_id: item.window(start_date, end_date) for asset_id, item in series.items()}
+
+    def get_price_series_cache_stats(self) -> dict[str, Any]:
+        return self._price_series_cache.stats()
+
+    def _price_series(self, conn, asset_ids: Iterable[int]) -> dict[int, PriceSeries]:
+        return self._price_series_cache.get_many(conn, asset_ids)
+
+    def _price_rows(self, conn, asset_ids: Iterable[int], end_date: date | None = None) -> list[dict]:
+        """``asset_id``/``price_date``/``close`` rows up to ``end_date``, by asset and date."""
+        return [
+            {"asset_id": asset_id, "price_date": day, "close": close}
+            for asset_id, item in sorted(self._price_series(conn, asset_ids).items())
+            for day, close in item.window(None, end_date).points()
+        ]
+
+    def _begin_price_series_refresh(self, conn, first_dates: dict[int, date]) -> PriceSeriesRefresh:
+        return self._price_series_cache.begin_refresh(conn, first_dates)
+
+    def _after_price_bars_changed(self, refresh: PriceSeriesRefresh | None) -> None:
+        """Refresh process-local state built on the written bars; call after commit."""
+        if refresh is not None and refresh.first_dates:
+            self._price_series_cache.apply_refresh(refresh)
+            self._invalidate_log_returns(refresh.asset_ids)
+            self._bump_snapshot_assets(refresh.asset_ids)
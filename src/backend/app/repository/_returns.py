@@ -0,0 +1,122 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+_LOG_RETURNS_CACHE_TTL_SECONDS = 900.0
+
+
+@dataclass
+class AssetLogReturns:
+    """Daily log returns of one asset; ``dates[i]`` is the close ending return i."""
+
+    asset_id: int
+    dates: list[date]
+    log_returns: np.ndarray
+
+    def since(self, start_date: date) -> "AssetLogReturns":
+        start_idx = next((idx for idx, day in enumerate(self.dates) if day >= start_date), len(self.dates))
+        if start_idx == 0:
+            return self
+        return AssetLogReturns(
+            asset_id=self.asset_id,
+            dates=self.dates[start_idx:],
+            log_returns=self.log_returns[start_idx:],
+        )
+
+
+@dataclass
+class _CachedLogReturns:
+    start_date: date
+    loaded_at: float
+    returns: AssetLogReturns
+
+
+class LogReturnsCache:
+    """Process-local per-asset log returns, dropped whenever bars are upserted.
+
+    Entries also expire after a TTL so that bars written by another process
+    are picked up eventually.
+    """
+
+    def __init__(self, ttl_seconds: float = _LOG_RETURNS_CACHE_TTL_SECONDS) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[int, _CachedLogReturns] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, asset_id: int, start_date: date) -> AssetLogReturns | None:
+        with self._lock:
+            entry = self._entries.get(asset_id)
+            if entry is None:
+                return None
+            if entry.start_date > start_date or time.monotonic() - entry.loaded_at > self.ttl_seconds:
+                del self._entries[asset_id]
+                return None
+            return entry.returns.since(start_date)
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def put(self, returns: list[AssetLogReturns], start_date: date, generation: int) -> None:
+        """Store freshly loaded returns unless an upsert happened meanwhile."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            loaded_at = time.monotonic()
+            for item in returns:
+                self._entries[item.asset_id] = _CachedLogReturns(start_date=start_date, loaded_at=loaded_at, returns=item)
+
+    def invalidate(self, asset_ids: list[int]) -> None:
+        with self._lock:
+            self._generation += 1
+            for asset_id in asset_ids:
+                self._entries.pop(asset_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+class ReturnsMixin:
+    def get_asset_log_returns(self, asset_ids: list[int], start_date: date) -> dict[int, AssetLogReturns]:
+        """Daily log returns from ``start_date`` onwards, served from the cache when possible."""
+        cache: LogReturnsCache = self._log_returns_cache
+        result: dict[int, AssetLogReturns] = {}
+        missing: list[int] = []
+        for asset_id in dict.fromkeys(asset_ids):
+            cached = cache.get(asset_id, start_date)
+            if cached is None:
+                missing.append(asset_id)
+            else:
+                result[asset_id] = cached
+
+        if missing:
+            generation = cache.generation()
+            loaded = self._load_asset_log_returns(missing, start_date)
+            cache.put(loaded, start_date, generation)
+            result.update((item.asset_id, item) for item in loaded)
+        return result
+
+    def _invalidate_log_returns(self, asset_ids: list[int]) -> None:
+        self._log_returns_cache.invalidate(asset_ids)
+
+    def _load_asset_log_returns(self, asset_ids: list[int], start_date: date) -> list[AssetLogReturns]:
+        with self._begin() as conn:
+            series = self._price_series(conn, asset_ids)
+
+        loaded: list[AssetLogReturns] = []
+        for asset_id, item in series.items():
+            closes = item.window(start_date).valid()
+            loaded.append(
+                AssetLogReturns(
+                    asset_id=asset_id,
+                    dates=closes.dates[1:].astype(object).tolist(),
+                    log_returns=np.log(closes.closes[1:] / closes.closes[:-1]) if len(closes.closes) > 1 else np.empty(0),
+                )
+            )
+        return loaded
@@ -1,29 +1,24 @@
 from datetime import date
 
 from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
 from ._base import PricingAsset
+from ._bulk_load import BulkLoadResult
 
 
 class SearchPricingMixin:
     def get_asset_price_timeseries(
         self, asset_id: int, start_date: date | None = None, end_date: date | None = None,
     ) -> list[dict]:
-        clauses = ["asset_id = :asset_id"]
-        params: dict = {"asset_id": asset_id}
-        if start_date:
-            clauses.append("price_date >= :start_date")
-            params["start_date"] = start_date
-        if end_date:
-            clauses.append("price_date <= :end_date")
-            params["end_date"] = end_date
-        where = " and ".join(clauses)
-        with self.engine.begin() as conn:
-            rows = conn.execute(
-                text(f"select price_date, close::float8 as close from price_bars_1d where {where} order by price_date asc"),
-                params,
-            ).mappings().all()
-        return [{"date": str(r["price_date"]), "close": r["close"]} for r in rows]
+        series = self.get_price_series([asset_id], start_date, end_date)[asset_id]
+        return [{"date": str(day), "close": close} for day, close in series.points()]
+
+    def get_asset_price_timeseries_columns(
+        self, asset_id: int, start_date: date | None = None, end_date: date | None = None,
+    ) -> dict[str, list]:
+        series = self.get_price_series([asset_id], start_date, end_date)[asset_id]
+        return {"dates": series.dates.astype(str).tolist(), "close": series.closes.tolist()}
 
     def get_asset_by_symbol(self, symbol: str) -> dict | None:
         base = symbol.split(".")[0].upper()
@@ -98,6 +93,103 @@ class SearchPricingMixin:
             return None
         return float(row["close"])
 
+    def get_latest_close_prices(self, asset_ids: list[int]) -> dict[int, float]:
+        """Most recent close per asset (any provider); assets without bars are omitted."""
+        if not asset_ids:
+            return {}
+        with self.engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    """
+                    select distinct on (asset_id) asset_id, close::float8 as close
+                    from price_bars_1d
+                    where asset_id = any(:asset_ids)
+                    order by asset_id asc, price_date desc
+                    """
+                ),
+                {"asset_ids": asset_ids},
+            ).mappings().all()
+        return {int(row["asset_id"]): float(row["close"]) for row in rows}
+
+    def get_price_bars_1d_by_date(
+        self,
+        asset_ids: list[int],
+        provider: str,
+        start_date: date,
+        end_date: date,
+    ) -> dict[int, dict[date, dict]]:
+        """Stored daily bars of ``provider`` per asset and date within [start_date, end_date]."""
+        result: dict[int, dict[date, dict]] = {asset_id: {} for asset_id in asset_ids}
+        if not asset_ids:
+            return result
+        with self.engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    """
+                    select asset_id, price_date,
+                           open::float8 as open, high::float8 as high, low::float8 as low,
+                           close::float8 as close, volume::float8 as volume
+                    from price_bars_1d
+                    where asset_id = any(:asset_ids)
+                      and provider = :provider
+                      and price_date between :start_date and :end_date
+                    order by asset_id asc, price_date asc
+                    """
+                ),
+                {
+                    "asset_ids": asset_ids,
+                    "provider": provider.strip().lower(),
+                    "start_date": start_date,
+                    "end_date": end_date,
+                },
+            ).mappings().all()
+        for row in rows:
+            result[int(row["asset_id"])][row["price_date"]] = {
+                "open": row["open"],
+                "high": row["high"],
+                "low": row["low"],
+                "close": row["close"],
+                "volume": row["volume"],
+            }
+        return result
+
+    def get_fx_rates_1d_by_date(
+        self,
+        from_ccys: list[str],
+        to_ccy: str,
+        provider: str,
+        start_date: date,
+        end_date: date,
+    ) -> dict[str, dict[date, float]]:
+        """Stored daily FX rates of ``provider`` per source currency and date."""
+        result: dict[str, dict[date, float]] = {ccy.upper(): {} for ccy in from_ccys}
+        if not from_ccys:
+            return result
+        with self.engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    """
+                    select from_ccy, price_date, rate::float8 as rate
+                    from fx_rates_1d
+                    where from_ccy = any(:from_ccys)
+                      and to_ccy = :to_ccy
+                      and provider = :provider
+                      and price_date between :start_date and :end_date
+                    order by from_ccy asc, price_date asc
+                    """
+                ),
+                {
+                    "from_ccys": [ccy.upper() for ccy in from_ccys],
+                    "to_ccy": to_ccy.upper(),
+                    "provider": provider.strip().lower(),
+                    "start_date": start_date,
+                    "end_date": end_date,
+                },
+            ).mappings().all()
+        for row in rows:
+            result[str(row["from_ccy"]).strip().upper()][row["price_date"]] = float(row["rate"])
+        return result
+
     def get_assets_for_price_refresh(
         self,
         provider: str,
@@ -226,6 +318,52 @@ class SearchPricingMixin:
                     "previous_close": previous_close,
                 },
             )
+        self._bump_snapshot_assets([asset_id])
+
+    def save_price_ticks(self, *, provider: str, ticks: list[dict]) -> dict[int, str]:
+        """Insert the ticks of a refresh cycle; returns the asset ids whose tick was not saved, with the error.
+
+        The batch goes in one statement. If it fails, the ticks are retried one
+        by one, each in its own savepoint, so one bad tick does not discard
+        the others. A tick already stored (same asset, provider and ts) is skipped.
+        """
+        if not ticks:
+            return {}
+        provider_value = provider.strip().lower()
+        payload = [
+            {
+                "asset_id": tick["asset_id"],
+                "provider": provider_value,
+                "ts": tick["ts"],
+                "last": tick["last"],
+                "bid": tick.get("bid"),
+                "ask": tick.get("ask"),
+                "volume": tick.get("volume"),
+                "previous_close": tick.get("previous_close"),
+            }
+            for tick in ticks
+        ]
+        statement = text(
+            """
+            insert into price_ticks (asset_id, provider, ts, last, bid, ask, volume, previous_close)
+            values (:asset_id, :provider, :ts, :last, :bid, :ask, :volume, :previous_close)
+            on conflict (asset_id, provider, ts) do nothing
+            """
+        )
+        failed: dict[int, str] = {}
+        with self.engine.begin() as conn:
+            try:
+                with conn.begin_nested():
+                    conn.execute(statement, payload)
+            except SQLAlchemyError:
+                for row in payload:
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(statement, row)
+                    except SQLAlchemyError as exc:
+                        failed[int(row["asset_id"])] = str(getattr(exc, "orig", None) or exc).splitlines()[0]
+        self._bump_snapshot_assets({int(tick["asset_id"]) for tick in ticks} - set(failed))
+        return failed
 
     def batch_upsert_price_bars_1d(
         self,
@@ -267,6 +405,28 @@ class SearchPricingMixin:
                 ),
                 payload,
             )
+            first_date = min(row["price_date"] for row in rows)
+            self._invalidate_portfolio_values_for_asset(conn, asset_id, first_date)
+            refresh = self._begin_price_series_refresh(conn, {asset_id: first_date})
+        self._after_price_bars_changed(refresh)
+
+    def save_daily_history(
+        self,
+        *,
+        provider: str,
+        bars: list[dict],
+        fx_rates: list[dict],
+    ) -> tuple[BulkLoadResult, BulkLoadResult]:
+        """Bulk-load daily bars of many assets and FX rates of many pairs in one transaction.
+
+        ``bars`` rows carry ``asset_id``; ``fx_rates`` rows carry ``from_ccy`` and ``to_ccy``.
+        """
+        with self.engine.begin() as conn:
+            bars_result, bars_refresh = self._copy_price_bars_1d(conn, provider, bars) if bars else (BulkLoadResult(), None)
+            fx_result, fx_refresh = self._copy_fx_rates_1d(conn, provider, fx_rates) if fx_rates else (BulkLoadResult(), None)
+        self._after_price_bars_changed(bars_refresh)
+        self._after_fx_rates_changed(fx_refresh)
+        return bars_result, fx_result
 
     def upsert_price_bar_1d(
         self,
@@ -306,6 +466,9 @@ class SearchPricingMixin:
                     "volume": volume,
                 },
             )
+            self._invalidate_portfolio_values_for_asset(conn, asset_id, price_date)
+            refresh = self._begin_price_series_refresh(conn, {asset_id: price_date})
+        self._after_price_bars_changed(refresh)
 
     def upsert_fx_rate_1d(
         self,
@@ -334,6 +497,10 @@ class SearchPricingMixin:
                     "rate": rate,
                 },
             )
+            self._invalidate_portfolio_values_for_fx(conn, from_ccy, to_ccy, price_date)
+            self._invalidate_position_state_for_fx(conn, from_ccy, to_ccy, price_date)
+            refresh = self._begin_fx_refresh(conn, {(from_ccy.upper(), to_ccy.upper()): price_date})
+        self._after_fx_rates_changed(refresh)
 
     def batch_upsert_fx_rates_1d(
         self,
@@ -368,3 +535,8 @@ class SearchPricingMixin:
                 ),
                 payload,
             )
+            first_date = min(row["price_date"] for row in rows)
+            self._invalidate_portfolio_values_for_fx(conn, from_ccy, to_ccy, first_date)
+            self._invalidate_position_state_for_fx(conn, from_ccy, to_ccy, first_date)
+            refresh = self._begin_fx_refresh(conn, {(from_ccy.upper(), to_ccy.upper()): first_date})
+        self._after_fx_rates_changed(refresh)
@@ -0,0 +1,80 @@
+import threading
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy.engine import Connection, Engine
+
+from ._base import AssetMeta, PortfolioData
+
+
+@dataclass
+class _UnitOfWork:
+    engine: Engine
+    thread_id: int
+    stack: ExitStack
+    conn: Connection | None = None
+    portfolios: dict[tuple[int, str], PortfolioData | None] = field(default_factory=dict)
+    asset_meta: dict[int, AssetMeta] = field(default_factory=dict)
+
+
+_current_uow: ContextVar[_UnitOfWork | None] = ContextVar("repository_unit_of_work", default=None)
+
+
+class UnitOfWorkMixin:
+    """One connection and transaction shared by composed repository calls.
+
+    Inside ``with repo.unit_of_work():`` every method that opens its
+    connection through ``_begin`` reuses the same one, and portfolio rows
+    and asset meta are loaded once. The connection is checked out by the
+    first such call and committed when the block exits. The scope is bound
+    to the calling thread: work handed to other threads opens its own
+    connections.
+
+    Writes that must commit on their own (target allocations, idempotency
+    keys, CSV batches, transactions) open ``engine.begin()`` directly and
+    never join. Derived state saved on the read path, such as the position
+    ledger rebuilt by ``get_positions``, does join and commits with the
+    unit of work.
+    """
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[None]:
+        if self._active_uow() is not None:
+            yield
+            return
+        with ExitStack() as stack:
+            token = _current_uow.set(_UnitOfWork(engine=self.engine, thread_id=threading.get_ident(), stack=stack))
+            try:
+                yield
+            finally:
+                _current_uow.reset(token)
+
+    @contextmanager
+    def _begin(self) -> Iterator[Connection]:
+        """``engine.begin()`` that joins the active unit of work, if any."""
+        uow = self._active_uow()
+        if uow is not None:
+            if uow.conn is None:
+                uow.conn = uow.stack.enter_context(self.engine.begin())
+            yield uow.conn
+            return
+        with self.engine.begin() as conn:
+            yield conn
+
+    def _active_uow(self) -> _UnitOfWork | None:
+        uow = _current_uow.get()
+        if uow is None or uow.engine is not self.engine or uow.thread_id != threading.get_ident():
+            return None
+        return uow
+
+    def _uow_for(self, conn) -> _UnitOfWork | None:
+        uow = self._active_uow()
+        return uow if uow is not None and uow.conn is conn else None
+
+    def _forget_portfolio(self, portfolio_id: int) -> None:
+        uow = self._active_uow()
+        if uow is not None:
+            for key in [key for key in uow.portfolios if key[0] == portfolio_id]:
+                del uow.portfolios[key]
@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from ..models import Position
+
+_SNAPSHOT_CACHE_TTL_SECONDS = 60.0
+_SNAPSHOT_CACHE_MAX_ENTRIES = 512
+
+# Any FX upsert invalidates every snapshot: rates are written rarely (daily
+# backfill) and positions do not record which currencies they went through.
+_FX_KEY = ("fx",)
+
+
+@dataclass
+class _CachedSnapshot:
+    generation: int
+    loaded_at: float
+    dependencies: tuple[Hashable, ...]
+    value: Any
+
+
+class PortfolioSnapshotCache:
+    """Process-local LRU of computed positions/summaries with version stamps.
+
+    Writers bump the version of what they touched (a portfolio, an asset,
+    FX rates) after committing. An entry is served only while none of its
+    dependencies was bumped after the generation at which it started
+    loading, and for at most ``ttl_seconds`` so that writes from other
+    processes are picked up eventually.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = _SNAPSHOT_CACHE_TTL_SECONDS,
+        max_entries: int = _SNAPSHOT_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(0, int(max_entries))
+        self._entries: OrderedDict[Hashable, _CachedSnapshot] = OrderedDict()
+        self._versions: dict[Hashable, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any], dependencies: Callable[[Any], Iterable[Hashable]]) -> Any:
+        """Cached value for ``key``; ``dependencies(value)`` lists the version keys it was built from."""
+        if not self.enabled:
+            return load()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry):
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.value
+            if entry is not None:
+                del self._entries[key]
+                self._invalidations += 1
+            self._misses += 1
+            generation = self._generation
+
+        value = load()
+        deps = tuple(dependencies(value))
+        with self._lock:
+            # A write landed while loading: the value may already be stale.
+            if any(self._versions.get(dep, 0) > generation for dep in deps):
+                return value
+            self._entries[key] = _CachedSnapshot(
+                generation=generation, loaded_at=time.monotonic(), dependencies=deps, value=value
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def bump_portfolios(self, portfolio_ids: Iterable[int]) -> None:
+        self._bump([("portfolio", int(portfolio_id)) for portfolio_id in portfolio_ids])
+
+    def bump_assets(self, asset_ids: Iterable[int]) -> None:
+        self._bump([("asset", int(asset_id)) for asset_id in asset_ids])
+
+    def bump_fx(self) -> None:
+        self._bump([_FX_KEY])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+    def _bump(self, keys: list[Hashable]) -> None:
+        if not keys:
+            return
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._versions[key] = self._generation
+
+    def _is_fresh(self, entry: _CachedSnapshot) -> bool:
+        if time.monotonic() - entry.loaded_at > self.ttl_seconds:
+            return False
+        return all(self._versions.get(dep, 0) <= entry.generation for dep in entry.dependencies)
+
+
+def _position_dependencies(portfolio_id: int, positions: list[Position]) -> list[Hashable]:
+    return [("portfolio", portfolio_id), _FX_KEY, *(("asset", p.asset_id) for p in positions)]
+
+
+class SnapshotCacheMixin:
+    def get_positions(self, portfolio_id: int, user_id: str, stale_days: int = 5) -> list[Position]:
+        positions = self._snapshot_cache.get_or_load(
+            ("positions", portfolio_id, user_id, stale_days),
+            lambda: super(SnapshotCacheMixin, self).get_positions(portfolio_id, user_id, stale_days),
+            lambda value: _position_dependencies(portfolio_id, value),
+        )
+        # Callers may adjust the models they get back (weights, rounding).
+        return [position.model_copy() for position in positions]
+
+    def get_summary(self, portfolio_id: int, user_id: str):
+        def load():
+            summary = super(SnapshotCacheMixin, self).get_summary(portfolio_id, user_id)
+            # The summary is built from the positions: remember which assets it used.
+            return summary, self.get_positions(portfolio_id, user_id)
+
+        summary, _ = self._snapshot_cache.get_or_load(
+            ("summary", portfolio_id, user_id),
+            load,
+            lambda value: _position_dependencies(portfolio_id, value[1]),
+        )
+        return summary.model_copy()
+
+    def get_snapshot_cache_stats(self) -> dict[str, Any]:
+        return self._snapshot_cache.stats()
+
+    def _bump_snapshot_portfolios(self, portfolio_ids: Iterable[int]) -> None:
+        self._snapshot_cache.bump_portfolios(portfolio_ids)
+
+    def _bump_snapshot_assets(self, asset_ids: Iterable[int]) -> None:
+        self._snapshot_cache.bump_assets(asset_ids)
+
+    def _bump_snapshot_fx(self) -> None:
+        self._snapshot_cache.bump_fx()
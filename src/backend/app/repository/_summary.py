@@ -1,9 +1,10 @@
 import logging
 import math
-from bisect import bisect_right
 from collections import defaultdict
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 
+import numpy as np
 from sqlalchemy import text
 
 from ..models import (
@@ -12,12 +13,66 @@ from ..models import (
     PortfolioSummary,
     TimeSeriesPoint,
 )
-from ._base import PositionDelta, _finite
+from ._base import AssetMeta, _finite
+
+
+@dataclass
+class IntradayHoldings:
+    """Open quantities of a portfolio with the data needed to value them intraday."""
+
+    base_currency: str
+    quantities: dict[int, float]
+    asset_meta: dict[int, AssetMeta]
+    provider_symbols: dict[int, str]
+    fx_rates: dict[str, float]
+    cash: float
+
+
+# Calendar days covered by the fixed timeseries ranges ("1y" is the last 365 days).
+_TIMESERIES_RANGE_DAYS: dict[str, int] = {
+    "1m": 30,
+    "3m": 90,
+    "6m": 180,
+    "1y": 365,
+    "3y": 1095,
+    "5y": 1825,
+}
+
+_TIMESERIES_INTERVALS = ("1d", "1w", "1mo")
+
+
+def _timeseries_start(range_value: str, end_date: date, first_trade: date | None) -> date:
+    if range_value == "ytd":
+        return date(end_date.year, 1, 1)
+    if range_value == "max":
+        return min(first_trade, end_date) if first_trade is not None else end_date
+    return end_date - timedelta(days=_TIMESERIES_RANGE_DAYS[range_value] - 1)
+
+
+def _sample_indices(days: np.ndarray, interval: str) -> np.ndarray:
+    """Positions in ``days`` (datetime64[D]) of the last day of every interval.
+
+    Weeks end on Sunday and months on their last day; the last bucket ends
+    on the last day of the grid even when the period is not over yet.
+    """
+    if interval == "1d" or len(days) == 0:
+        return np.arange(len(days))
+    if interval == "1w":
+        buckets = (days - np.datetime64("1969-12-29", "D")).astype(np.int64) // 7
+    else:
+        buckets = days.astype("datetime64[M]").astype(np.int64)
+    ends = np.flatnonzero(buckets[1:] != buckets[:-1])
+    return np.append(ends, len(days) - 1)
 
 
 class SummaryMixin:
     def get_summary(self, portfolio_id: int, user_id: str) -> PortfolioSummary:
-        with self.engine.begin() as conn:
+        # Cash balance and positions below share this connection and the loaded portfolio data.
+        with self.unit_of_work():
+            return self._get_summary(portfolio_id, user_id)
+
+    def _get_summary(self, portfolio_id: int, user_id: str) -> PortfolioSummary:
+        with self._begin() as conn:
             portfolio = self._get_portfolio_for_user(conn, portfolio_id, user_id)
             if portfolio is None:
                 raise ValueError("Portfolio non trovato")
@@ -35,7 +90,7 @@ class SummaryMixin:
             asset_ids = [p.asset_id for p in positions]
             qty_by_asset = {p.asset_id: p.quantity for p in positions}
 
-            with self.engine.begin() as conn:
+            with self._begin() as conn:
                 asset_meta = self._get_asset_meta(conn, asset_ids)
                 rows = conn.execute(
                     text(
@@ -69,39 +124,7 @@ class SummaryMixin:
                         if meta.quote_currency != portfolio.base_currency
                     }
                 )
-                fx_rows = []
-                if fx_currencies:
-                    fx_rows = conn.execute(
-                        text(
-                            """
-                            select from_ccy, price_date, rate::float8 as rate
-                            from fx_rates_1d
-                            where from_ccy = any(:from_ccy)
-                              and to_ccy = :to_ccy
-                            order by from_ccy asc, price_date asc
-                            """
-                        ),
-                        {"from_ccy": fx_currencies, "to_ccy": portfolio.base_currency},
-                    ).mappings().all()
-
-            fx_series: dict[str, list[tuple[date, float]]] = defaultdict(list)
-            for row in fx_rows:
-                fx_series[str(row["from_ccy"])].append((row["price_date"], float(row["rate"])))
-            fx_dates = {ccy: [d for d, _ in series] for ccy, series in fx_series.items()}
-
-            def fx_rate_on_or_before(currency: str, day: date | None) -> float | None:
-                if currency == portfolio.base_currency:
-                    return 1.0
-                if day is None:
-                    return None
-                series = fx_series.get(currency)
-                dates = fx_dates.get(currency)
-                if not series or not dates:
-                    return None
-                idx = bisect_right(dates, day) - 1
-                if idx < 0:
-                    return None
-                return series[idx][1]
+                fx = self._fx_rates(conn, fx_currencies, portfolio.base_currency)
 
             _log = logging.getLogger(__name__)
 
@@ -110,7 +133,7 @@ class SummaryMixin:
             tick_last: dict[int, float] = {}
             tick_prev_close: dict[int, float] = {}
             tick_day_by_asset: dict[int, date] = {}
-            with self.engine.begin() as conn2:
+            with self._begin() as conn2:
                 tick_rows = conn2.execute(
                     text(
                         """
@@ -180,8 +203,8 @@ class SummaryMixin:
                 if meta is None:
                     _log.warning("day_change: asset %s has no meta, skipping", asset_id)
                     continue
-                current_fx = fx_rate_on_or_before(meta.quote_currency, current_day)
-                prev_fx = fx_rate_on_or_before(meta.quote_currency, prev_day)
+                current_fx = fx.rate(meta.quote_currency, current_day)
+                prev_fx = fx.rate(meta.quote_currency, prev_day)
                 if current_quote is None or current_day is None or current_fx is None:
                     _log.warning("day_change: asset %s no current quote/fx for %s on %s, skipping", asset_id, meta.quote_currency, current_day)
                     continue
@@ -213,11 +236,12 @@ class SummaryMixin:
             cash_balance=current_cash_balance,
         )
 
-    def get_intraday_timeseries(self, portfolio_id: int, user_id: str, finance_client) -> list[IntradayTimeseriesPoint]:
-        """Compute portfolio market value at hourly intervals using yFinance intraday bars."""
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+    def get_intraday_holdings(self, portfolio_id: int, user_id: str) -> IntradayHoldings | None:
+        """Open positions plus what is needed to value them on intraday bars.
 
-        with self.engine.begin() as conn:
+        Returns None when the portfolio holds no assets.
+        """
+        with self._begin() as conn:
             portfolio = self._get_portfolio_for_user(conn, portfolio_id, user_id)
             if portfolio is None:
                 raise ValueError("Portfolio non trovato")
@@ -237,7 +261,7 @@ class SummaryMixin:
             ).mappings().all()
 
             if not tx_rows:
-                return []
+                return None
 
             holdings: dict[int, float] = defaultdict(float)
             for row in tx_rows:
@@ -251,7 +275,7 @@ class SummaryMixin:
             # Only keep assets with positive holdings
             holdings = {aid: qty for aid, qty in holdings.items() if qty > 1e-9}
             if not holdings:
-                return []
+                return None
 
             asset_ids = sorted(holdings.keys())
             asset_meta = self._get_asset_meta(conn, asset_ids)
@@ -277,41 +301,29 @@ class SummaryMixin:
             fx_currencies = sorted(
                 {meta.quote_currency for meta in asset_meta.values() if meta.quote_currency != base_ccy}
             )
-            fx_rate_map: dict[str, float] = {}
-            if fx_currencies:
-                fx_rows = conn.execute(
-                    text(
-                        """
-                        select distinct on (from_ccy) from_ccy, rate::float8 as rate
-                        from fx_rates_1d
-                        where from_ccy = any(:from_ccy) and to_ccy = :to_ccy
-                        order by from_ccy, price_date desc
-                        """
-                    ),
-                    {"from_ccy": fx_currencies, "to_ccy": base_ccy},
-                ).mappings().all()
-                for r in fx_rows:
-                    fx_rate_map[str(r["from_ccy"])] = float(r["rate"])
-
-        # Fetch intraday bars in parallel
-        _log = logging.getLogger(__name__)
-        bars_by_asset: dict[int, list] = {}
-
-        def fetch_bars(asset_id: int) -> tuple[int, list]:
-            symbol = provider_by_asset.get(asset_id, asset_meta[asset_id].symbol)
-            try:
-                return asset_id, finance_client.get_intraday_bars(symbol, period='1d', interval='1h')
-            except Exception as exc:
-                _log.warning("intraday_timeseries: failed to fetch %s: %s", symbol, exc)
-                return asset_id, []
-
-        with ThreadPoolExecutor(max_workers=min(len(asset_ids), 10)) as executor:
-            futures = [executor.submit(fetch_bars, aid) for aid in asset_ids]
-            for future in as_completed(futures):
-                aid, bars = future.result()
-                if bars:
-                    bars_by_asset[aid] = bars
+            fx = self._fx_rates(conn, fx_currencies, base_ccy)
+            fx_rate_map: dict[str, float] = {
+                ccy: rate for ccy in fx_currencies if (rate := fx.latest(ccy)) is not None
+            }
+
+        return IntradayHoldings(
+            base_currency=base_ccy,
+            quantities=holdings,
+            asset_meta=asset_meta,
+            provider_symbols={
+                aid: provider_by_asset.get(aid, asset_meta[aid].symbol) for aid in asset_ids
+            },
+            fx_rates=fx_rate_map,
+            cash=self.get_current_cash_balance_value(portfolio_id, user_id),
+        )
 
+    @staticmethod
+    def build_intraday_timeseries(
+        holdings: IntradayHoldings,
+        bars_by_asset: dict[int, list],
+    ) -> list[IntradayTimeseriesPoint]:
+        """Portfolio market value at every bar timestamp, carrying prices forward."""
+        bars_by_asset = {aid: bars for aid, bars in bars_by_asset.items() if bars}
         if not bars_by_asset:
             return []
 
@@ -329,12 +341,12 @@ class SummaryMixin:
             for bar in bars:
                 price_lookup[aid][bar.ts] = bar.close
 
-        cash = self.get_current_cash_balance_value(portfolio_id, user_id)
+        base_ccy = holdings.base_currency
         points: list[IntradayTimeseriesPoint] = []
 
         for ts in sorted_ts:
-            mv = cash
-            for aid, qty in holdings.items():
+            mv = holdings.cash
+            for aid, qty in holdings.quantities.items():
                 prices = price_lookup.get(aid)
                 if not prices:
                     continue
@@ -347,10 +359,10 @@ class SummaryMixin:
                         close = prices[earlier[-1]]
                     else:
                         continue
-                meta = asset_meta.get(aid)
+                meta = holdings.asset_meta.get(aid)
                 fx = 1.0
                 if meta and meta.quote_currency != base_ccy:
-                    fx = fx_rate_map.get(meta.quote_currency, 1.0)
+                    fx = holdings.fx_rates.get(meta.quote_currency, 1.0)
                 mv += qty * close * fx
 
             points.append(IntradayTimeseriesPoint(
@@ -361,13 +373,22 @@ class SummaryMixin:
         return points
 
     def get_timeseries(self, portfolio_id: int, range_value: str, interval: str, user_id: str) -> list[TimeSeriesPoint]:
-        if range_value != "1y" or interval != "1d":
-            raise ValueError("Solo range=1y e interval=1d supportati in V1")
+        columns = self.get_timeseries_columns(portfolio_id, range_value, interval, user_id)
+        return [
+            TimeSeriesPoint(date=day, market_value=value)
+            for day, value in zip(columns["dates"], columns["market_value"])
+        ]
+
+    def get_timeseries_columns(self, portfolio_id: int, range_value: str, interval: str, user_id: str) -> dict[str, list]:
+        """The series as ``dates`` and ``market_value`` lists, without building a model per point."""
+        if range_value not in _TIMESERIES_RANGE_DAYS and range_value not in ("ytd", "max"):
+            raise ValueError("range non valido")
+        if interval not in _TIMESERIES_INTERVALS:
+            raise ValueError("interval non valido")
 
         end_date = date.today()
-        start_date = end_date - timedelta(days=364)
 
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             portfolio = self._get_portfolio_for_user(conn, portfolio_id, user_id)
             if portfolio is None:
                 raise ValueError("Portfolio non trovato")
@@ -387,126 +408,52 @@ class SummaryMixin:
                 {"portfolio_id": portfolio_id, "end_date": end_date},
             ).mappings().all()
 
+            first_trade = min((r["trade_date"] for r in tx_rows if r["trade_date"] is not None), default=None)
+            start_date = _timeseries_start(range_value, end_date, first_trade)
+            days = np.arange(np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1)
+            sampled = _sample_indices(days, interval)
+
             if not tx_rows:
-                return [
-                    TimeSeriesPoint(date=(start_date + timedelta(days=offset)).isoformat(), market_value=0.0)
-                    for offset in range(365)
-                ]
+                return {"dates": days[sampled].astype(str).tolist(), "market_value": [0.0] * len(sampled)}
 
             asset_ids = sorted({int(r["asset_id"]) for r in tx_rows})
             assets = self._get_asset_meta(conn, asset_ids)
 
-            price_rows = conn.execute(
-                text(
-                    """
-                    select asset_id, price_date, close::float8 as close
-                    from price_bars_1d
-                    where asset_id = any(:asset_ids) and price_date <= :end_date
-                    order by asset_id asc, price_date asc
-                    """
-                ),
-                {"asset_ids": asset_ids, "end_date": end_date},
-            ).mappings().all()
+            closes = self._price_series(conn, asset_ids)
 
             fx_needed = sorted({meta.quote_currency for meta in assets.values() if meta.quote_currency != base_ccy})
-            fx_rows = []
-            if fx_needed:
-                fx_rows = conn.execute(
-                    text(
-                        """
-                        select from_ccy, price_date, rate::float8 as rate
-                        from fx_rates_1d
-                        where from_ccy = any(:from_ccy)
-                          and to_ccy = :to_ccy
-                          and price_date <= :end_date
-                        order by from_ccy asc, price_date asc
-                        """
-                    ),
-                    {"from_ccy": fx_needed, "to_ccy": base_ccy, "end_date": end_date},
-                ).mappings().all()
+            fx = self._fx_rates(conn, fx_needed, base_ccy)
+
+        # Assets without metadata cannot be valued and are left out of the grid.
+        valued = [asset_id for asset_id in asset_ids if asset_id in assets]
+        column = {asset_id: col for col, asset_id in enumerate(valued)}
 
-        deltas_by_day: dict[date, list[PositionDelta]] = defaultdict(list)
+        # Quantity held at the end of every day: opening holdings plus the
+        # cumulative sum of the trades booked inside the range.
+        deltas = np.zeros((len(days), len(valued)))
         for row in tx_rows:
-            trade_day = row["trade_date"]
-            if trade_day is None:
+            col = column.get(int(row["asset_id"]))
+            if col is None or row["trade_date"] is None:
                 continue
-            deltas_by_day[trade_day].append(
-                PositionDelta(asset_id=int(row["asset_id"]), side=str(row["side"]), quantity=float(row["quantity"]))
-            )
-
-        price_series: dict[int, list[tuple[date, float]]] = defaultdict(list)
-        for row in price_rows:
-            price_series[int(row["asset_id"])].append((row["price_date"], float(row["close"])))
-
-        fx_series: dict[str, list[tuple[date, float]]] = defaultdict(list)
-        for row in fx_rows:
-            fx_series[str(row["from_ccy"])].append((row["price_date"], float(row["rate"])))
-
-        holdings: dict[int, float] = defaultdict(float)
-
-        # Pre-compute holdings for transactions before start_date
-        for day in sorted(deltas_by_day.keys()):
-            if day >= start_date:
-                break
-            for delta in deltas_by_day[day]:
-                if delta.side == "buy":
-                    holdings[delta.asset_id] += delta.quantity
-                else:
-                    holdings[delta.asset_id] -= delta.quantity
-
-        price_index: dict[int, int] = {aid: -1 for aid in asset_ids}
-        current_price: dict[int, float | None] = {aid: None for aid in asset_ids}
-
-        fx_index: dict[str, int] = {ccy: -1 for ccy in fx_series.keys()}
-        current_fx: dict[str, float | None] = {ccy: None for ccy in fx_series.keys()}
-
-        points: list[TimeSeriesPoint] = []
-        cursor = start_date
-        while cursor <= end_date:
-            for delta in deltas_by_day.get(cursor, []):
-                if delta.side == "buy":
-                    holdings[delta.asset_id] += delta.quantity
-                else:
-                    holdings[delta.asset_id] -= delta.quantity
-
-            for asset_id, series in price_series.items():
-                idx = price_index[asset_id]
-                while idx + 1 < len(series) and series[idx + 1][0] <= cursor:
-                    idx += 1
-                price_index[asset_id] = idx
-                current_price[asset_id] = series[idx][1] if idx >= 0 else None
-
-            for from_ccy, series in fx_series.items():
-                idx = fx_index[from_ccy]
-                while idx + 1 < len(series) and series[idx + 1][0] <= cursor:
-                    idx += 1
-                fx_index[from_ccy] = idx
-                current_fx[from_ccy] = series[idx][1] if idx >= 0 else None
-
-            total_value = 0.0
-            for asset_id, qty in holdings.items():
-                if qty <= 0:
-                    continue
-                meta = assets.get(asset_id)
-                if meta is None:
-                    continue
-                px = current_price.get(asset_id)
-                if px is None:
-                    continue
-
-                if meta.quote_currency == base_ccy:
-                    fx_rate = 1.0
-                else:
-                    fx_rate = current_fx.get(meta.quote_currency)
-                    if fx_rate is None:
-                        continue
-
-                total_value += qty * px * fx_rate
-
-            points.append(TimeSeriesPoint(date=cursor.isoformat(), market_value=round(total_value, 2)))
-            cursor += timedelta(days=1)
-
-        return points
+            quantity = float(row["quantity"]) if row["side"] == "buy" else -float(row["quantity"])
+            deltas[max((row["trade_date"] - start_date).days, 0), col] += quantity
+        holdings = np.cumsum(deltas, axis=0)
+
+        # As-of close and FX rate of every asset on every day (NaN: none yet).
+        unit_values = np.empty((len(days), len(valued)))
+        for asset_id, col in column.items():
+            series = closes[asset_id]
+            idx = np.searchsorted(series.dates, days, side="right") - 1
+            prices = np.where(idx >= 0, series.closes[np.maximum(idx, 0)], np.nan)
+            unit_values[:, col] = prices * fx.rates(assets[asset_id].quote_currency, days)
+
+        held = (holdings > 0) & ~np.isnan(unit_values)
+        market_values = np.einsum("ij,ij->i", np.where(held, holdings, 0.0), np.where(held, unit_values, 0.0))
+
+        return {
+            "dates": days[sampled].astype(str).tolist(),
+            "market_value": [round(value, 2) for value in market_values[sampled].tolist()],
+        }
 
     def get_allocation(self, portfolio_id: int, user_id: str) -> list[AllocationItem]:
         positions = self.get_positions(portfolio_id, user_id)
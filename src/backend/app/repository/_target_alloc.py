@@ -1,4 +1,5 @@
 from collections import defaultdict
+from collections.abc import Iterator
 from datetime import date, datetime, time, timedelta
 
 from sqlalchemy import text
@@ -20,9 +21,44 @@ from ..models import (
 )
 
 
+def _target_performance_points(
+    start_date: date,
+    end_date: date,
+    baseline: dict[int, float],
+    price_series: dict[int, list[tuple[date, float]]],
+    alloc_meta: dict[int, dict],
+) -> Iterator[PortfolioTargetPerformancePoint]:
+    """Daily weighted index (base 100 at ``start_date``) of the target allocation."""
+    indices: dict[int, int] = {aid: -1 for aid in baseline.keys()}
+    current_px: dict[int, float | None] = {aid: None for aid in baseline.keys()}
+
+    cursor = start_date
+    while cursor <= end_date:
+        weighted_sum = 0.0
+        active_weight = 0.0
+        for aid in baseline.keys():
+            series = price_series.get(aid, [])
+            idx = indices[aid]
+            while idx + 1 < len(series) and series[idx + 1][0] <= cursor:
+                idx += 1
+            indices[aid] = idx
+            current_px[aid] = series[idx][1] if idx >= 0 else None
+
+            px = current_px[aid]
+            if px is None:
+                continue
+            weight = alloc_meta[aid]["weight_pct"]
+            weighted_sum += (px / baseline[aid]) * weight
+            active_weight += weight
+
+        value = (weighted_sum / active_weight * 100.0) if active_weight > 0 else 0.0
+        yield PortfolioTargetPerformancePoint(date=cursor.isoformat(), weighted_index=round(value, 4))
+        cursor += timedelta(days=1)
+
+
 class TargetAllocationMixin:
     def list_portfolio_target_allocations(self, portfolio_id: int, user_id: str) -> list[PortfolioTargetAllocationItem]:
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             if self._get_portfolio_for_user(conn, portfolio_id, user_id) is None:
                 raise ValueError("Portfolio non trovato")
 
@@ -101,10 +137,17 @@ class TargetAllocationMixin:
             )
 
     def get_portfolio_target_performance(self, portfolio_id: int, user_id: str) -> PortfolioTargetPerformanceResponse:
+        header, points = self.stream_portfolio_target_performance(portfolio_id, user_id)
+        return PortfolioTargetPerformanceResponse(points=list(points), **header)
+
+    def stream_portfolio_target_performance(
+        self, portfolio_id: int, user_id: str,
+    ) -> tuple[dict, Iterator[PortfolioTargetPerformancePoint]]:
+        """PortfolioTargetPerformanceResponse fields other than ``points``, and the points as a lazy iterator."""
         end_date = date.today()
         start_date = end_date - timedelta(days=364)
 
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             if self._get_portfolio_for_user(conn, portfolio_id, user_id) is None:
                 raise ValueError("Portfolio non trovato")
 
@@ -125,26 +168,10 @@ class TargetAllocationMixin:
             ).mappings().all()
 
             if not alloc_rows:
-                return PortfolioTargetPerformanceResponse(
-                    portfolio_id=portfolio_id,
-                    points=[],
-                    last_updated_at=None,
-                    best=None,
-                    worst=None,
-                )
+                return dict(portfolio_id=portfolio_id, last_updated_at=None, best=None, worst=None), iter(())
 
             asset_ids = [int(r["asset_id"]) for r in alloc_rows]
-            price_rows = conn.execute(
-                text(
-                    """
-                    select asset_id, price_date, close::float8 as close
-                    from price_bars_1d
-                    where asset_id = any(:asset_ids) and price_date <= :end_date
-                    order by asset_id asc, price_date asc
-                    """
-                ),
-                {"asset_ids": asset_ids, "end_date": end_date},
-            ).mappings().all()
+            price_rows = self._price_rows(conn, asset_ids, end_date)
 
             latest_tick_rows = conn.execute(
                 text(
@@ -194,40 +221,7 @@ class TargetAllocationMixin:
                 baseline[aid] = base_px
 
         if not baseline:
-            return PortfolioTargetPerformanceResponse(
-                portfolio_id=portfolio_id,
-                points=[],
-                last_updated_at=None,
-                best=None,
-                worst=None,
-            )
-
-        indices: dict[int, int] = {aid: -1 for aid in baseline.keys()}
-        current_px: dict[int, float | None] = {aid: None for aid in baseline.keys()}
-
-        points: list[PortfolioTargetPerformancePoint] = []
-        cursor = start_date
-        while cursor <= end_date:
-            weighted_sum = 0.0
-            active_weight = 0.0
-            for aid in baseline.keys():
-                series = price_series.get(aid, [])
-                idx = indices[aid]
-                while idx + 1 < len(series) and series[idx + 1][0] <= cursor:
-                    idx += 1
-                indices[aid] = idx
-                current_px[aid] = series[idx][1] if idx >= 0 else None
-
-                px = current_px[aid]
-                if px is None:
-                    continue
-                weight = alloc_meta[aid]["weight_pct"]
-                weighted_sum += (px / baseline[aid]) * weight
-                active_weight += weight
-
-            value = (weighted_sum / active_weight * 100.0) if active_weight > 0 else 0.0
-            points.append(PortfolioTargetPerformancePoint(date=cursor.isoformat(), weighted_index=round(value, 4)))
-            cursor += timedelta(days=1)
+            return dict(portfolio_id=portfolio_id, last_updated_at=None, best=None, worst=None), iter(())
 
         performers: list[PortfolioTargetPerformer] = []
         for aid, base_px in baseline.items():
@@ -251,19 +245,14 @@ class TargetAllocationMixin:
         worst = min(performers, key=lambda x: x.return_pct) if performers else None
         last_updated_at = max((ts for ts in latest_tick_ts.values() if isinstance(ts, datetime)), default=None)
 
-        return PortfolioTargetPerformanceResponse(
-            portfolio_id=portfolio_id,
-            points=points,
-            last_updated_at=last_updated_at,
-            best=best,
-            worst=worst,
-        )
+        header = dict(portfolio_id=portfolio_id, last_updated_at=last_updated_at, best=best, worst=worst)
+        return header, _target_performance_points(start_date, end_date, baseline, price_series, alloc_meta)
 
     def get_portfolio_target_intraday_performance(self, portfolio_id: int, day: date, user_id: str) -> PortfolioTargetIntradayResponse:
         day_start = datetime.combine(day, time.min)
         day_end = day_start + timedelta(days=1)
 
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             if self._get_portfolio_for_user(conn, portfolio_id, user_id) is None:
                 raise ValueError("Portfolio non trovato")
 
@@ -354,7 +343,7 @@ class TargetAllocationMixin:
         end_date = date.today()
         start_date = end_date - timedelta(days=364)
 
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             if self._get_portfolio_for_user(conn, portfolio_id, user_id) is None:
                 raise ValueError("Portfolio non trovato")
 
@@ -378,17 +367,7 @@ class TargetAllocationMixin:
                 return PortfolioTargetAssetPerformanceResponse(portfolio_id=portfolio_id, points_count=0, assets=[])
 
             asset_ids = [int(r["asset_id"]) for r in alloc_rows]
-            price_rows = conn.execute(
-                text(
-                    """
-                    select asset_id, price_date, close::float8 as close
-                    from price_bars_1d
-                    where asset_id = any(:asset_ids) and price_date <= :end_date
-                    order by asset_id asc, price_date asc
-                    """
-                ),
-                {"asset_ids": asset_ids, "end_date": end_date},
-            ).mappings().all()
+            price_rows = self._price_rows(conn, asset_ids, end_date)
             latest_tick_rows = conn.execute(
                 text(
                     """
@@ -491,7 +470,7 @@ class TargetAllocationMixin:
         day_start = datetime.combine(day, time.min)
         day_end = day_start + timedelta(days=1)
 
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             if self._get_portfolio_for_user(conn, portfolio_id, user_id) is None:
                 raise ValueError("Portfolio non trovato")
 
@@ -1,5 +1,3 @@
-from bisect import bisect_right
-from collections import defaultdict
 from datetime import date, datetime
 
 from sqlalchemy import Date, bindparam, text
@@ -11,6 +9,7 @@ from ..models import (
     TransactionRead,
     TransactionUpdate,
 )
+from ._valuation import _valuation_affected_from
 
 
 class TransactionsMixin:
@@ -43,19 +42,6 @@ class TransactionsMixin:
             elif not is_cash_movement:
                 raise ValueError("asset_id obbligatorio per transazioni buy/sell")
 
-            if side == "sell" and payload.asset_id is not None:
-                self._assert_non_negative_inventory_timeline(
-                    conn,
-                    payload.portfolio_id,
-                    payload.asset_id,
-                    candidate={
-                        "id": None,
-                        "trade_at": payload.trade_at,
-                        "side": side,
-                        "quantity": float(payload.quantity),
-                    },
-                )
-
             row = conn.execute(
                 text(
                     """
@@ -64,7 +50,16 @@ class TransactionsMixin:
                     ) values (
                         :portfolio_id, :asset_id, :side, :trade_at, :quantity, :price, :fees, :taxes, :trade_currency, :notes, :owner_user_id
                     )
-                    returning id
+                    returning id,
+                              asset_id,
+                              side,
+                              trade_at,
+                              trade_at::date as trade_date,
+                              quantity::float8 as quantity,
+                              price::float8 as price,
+                              fees::float8 as fees,
+                              taxes::float8 as taxes,
+                              trade_currency
                     """
                 ),
                 {
@@ -80,13 +75,19 @@ class TransactionsMixin:
                     "notes": payload.notes,
                     "owner_user_id": user_id,
                 },
-            ).fetchone()
+            ).mappings().fetchone()
+            self._invalidate_portfolio_values(conn, payload.portfolio_id, _valuation_affected_from(payload.trade_at))
+            if row is not None and side in {"buy", "sell"}:
+                # Validates sells against the running quantity checkpoint (or the full
+                # timeline for back-dated trades); raising here rolls the insert back.
+                self._apply_trade_to_position_state(conn, payload.portfolio_id, portfolio.base_currency, row)
+        self._bump_snapshot_portfolios([payload.portfolio_id])
 
         if row is None:
             raise ValueError("Impossibile creare la transazione")
 
         return TransactionRead(
-            id=int(row.id),
+            id=int(row["id"]),
             portfolio_id=payload.portfolio_id,
             asset_id=payload.asset_id,
             side=side,
@@ -240,46 +241,12 @@ class TransactionsMixin:
             if portfolio is None:
                 raise ValueError("Portfolio non trovato")
 
-            base_ccy = portfolio.base_currency
-            max_day = max(tx.trade_at.date() for tx in selected)
-            currencies = sorted({tx.trade_currency for tx in selected if tx.trade_currency != base_ccy})
-            fx_rows = []
-            if currencies:
-                fx_rows = conn.execute(
-                    text(
-                        """
-                        select from_ccy, price_date, rate::float8 as rate
-                        from fx_rates_1d
-                        where from_ccy = any(:from_ccy)
-                          and to_ccy = :to_ccy
-                          and price_date <= :max_day
-                        order by from_ccy asc, price_date asc
-                        """
-                    ),
-                    {"from_ccy": currencies, "to_ccy": base_ccy, "max_day": max_day},
-                ).mappings().all()
-
-        fx_series: dict[str, list[tuple[date, float]]] = defaultdict(list)
-        for row in fx_rows:
-            fx_series[str(row["from_ccy"])].append((row["price_date"], float(row["rate"])))
-        fx_dates = {ccy: [d for d, _ in points] for ccy, points in fx_series.items()}
-
-        def fx_rate_on_or_before(currency: str, day: date) -> float:
-            if currency == base_ccy:
-                return 1.0
-            series = fx_series.get(currency)
-            dates = fx_dates.get(currency)
-            if not series or not dates:
-                return 1.0
-            idx = bisect_right(dates, day) - 1
-            if idx < 0:
-                return 1.0
-            return series[idx][1]
+            fx_rates = self._fx_rates(conn, {tx.trade_currency for tx in selected}, portfolio.base_currency, default=1.0)
 
         out: list[CashFlowEntry] = []
         for tx in selected:
             amount = tx.quantity * tx.price
-            fx = fx_rate_on_or_before(tx.trade_currency, tx.trade_at.date())
+            fx = fx_rates.rate(tx.trade_currency, tx.trade_at.date())
             amount_base = amount * fx
             costs_base = (tx.fees + tx.taxes) * fx
 
@@ -303,160 +270,6 @@ class TransactionsMixin:
             )
         return out
 
-    def get_portfolio_value_at_date(self, portfolio_id: int, user_id: str, target_date: date) -> float:
-        with self.engine.begin() as conn:
-            portfolio = self._get_portfolio_for_user(conn, portfolio_id, user_id)
-            if portfolio is None:
-                raise ValueError("Portfolio non trovato")
-            base_ccy = portfolio.base_currency
-
-            tx_rows = conn.execute(
-                text(
-                    """
-                    select asset_id,
-                           side,
-                           trade_at::date as trade_date,
-                           quantity::float8 as quantity,
-                           price::float8 as price,
-                           fees::float8 as fees,
-                           taxes::float8 as taxes,
-                           trade_currency
-                    from transactions
-                    where portfolio_id = :portfolio_id
-                      and trade_at::date <= :target_date
-                    order by trade_at asc, id asc
-                    """
-                ),
-                {"portfolio_id": portfolio_id, "target_date": target_date},
-            ).mappings().all()
-
-            if not tx_rows:
-                if target_date >= date.today():
-                    return round(float(portfolio.cash_balance), 2)
-                return 0.0
-
-            asset_ids = sorted({int(r["asset_id"]) for r in tx_rows if r["asset_id"] is not None})
-            asset_meta = self._get_asset_meta(conn, asset_ids) if asset_ids else {}
-
-            price_rows = []
-            if asset_ids:
-                price_rows = conn.execute(
-                    text(
-                        """
-                        select asset_id, price_date, close::float8 as close
-                        from price_bars_1d
-                        where asset_id = any(:asset_ids)
-                          and price_date <= :target_date
-                        order by asset_id asc, price_date asc
-                        """
-                    ),
-                    {"asset_ids": asset_ids, "target_date": target_date},
-                ).mappings().all()
-
-            fx_needed = sorted(
-                {
-                    str(r["trade_currency"])
-                    for r in tx_rows
-                    if r["trade_currency"] is not None and str(r["trade_currency"]) != base_ccy
-                }
-                | {
-                    meta.quote_currency
-                    for meta in asset_meta.values()
-                    if meta.quote_currency != base_ccy
-                }
-            )
-            fx_rows = []
-            if fx_needed:
-                fx_rows = conn.execute(
-                    text(
-                        """
-                        select from_ccy, price_date, rate::float8 as rate
-                        from fx_rates_1d
-                        where from_ccy = any(:from_ccy)
-                          and to_ccy = :to_ccy
-                          and price_date <= :target_date
-                        order by from_ccy asc, price_date asc
-                        """
-                    ),
-                    {"from_ccy": fx_needed, "to_ccy": base_ccy, "target_date": target_date},
-                ).mappings().all()
-
-        fx_series: dict[str, list[tuple[date, float]]] = defaultdict(list)
-        for row in fx_rows:
-            fx_series[str(row["from_ccy"])].append((row["price_date"], float(row["rate"])))
-        fx_dates = {ccy: [d for d, _ in series] for ccy, series in fx_series.items()}
-
-        def fx_rate_on_or_before(currency: str, day: date | None) -> float:
-            if currency == base_ccy:
-                return 1.0
-            if day is None:
-                return 1.0
-            series = fx_series.get(currency)
-            dates = fx_dates.get(currency)
-            if not series or not dates:
-                return 1.0
-            idx = bisect_right(dates, day) - 1
-            if idx < 0:
-                return 1.0
-            return series[idx][1]
-
-        holdings: dict[int, float] = defaultdict(float)
-        cash_balance = 0.0
-
-        for row in tx_rows:
-            side = str(row["side"])
-            qty = float(row["quantity"])
-            price = float(row["price"])
-            fees = float(row["fees"])
-            taxes = float(row["taxes"])
-            trade_day = row["trade_date"]
-            trade_ccy = str(row["trade_currency"])
-            fx = fx_rate_on_or_before(trade_ccy, trade_day)
-            amount_base = qty * price * fx
-
-            if side == "buy":
-                aid = row["asset_id"]
-                if aid is None:
-                    continue
-                holdings[int(aid)] += qty
-            elif side == "sell":
-                aid = row["asset_id"]
-                if aid is None:
-                    continue
-                holdings[int(aid)] = max(0.0, holdings[int(aid)] - qty)
-            elif side in {"deposit", "dividend", "interest"}:
-                cash_balance += amount_base
-            elif side in {"withdrawal", "fee"}:
-                cash_balance -= amount_base
-
-        price_series: dict[int, list[tuple[date, float]]] = defaultdict(list)
-        for row in price_rows:
-            aid = int(row["asset_id"])
-            px = float(row["close"])
-            if px > 0:
-                price_series[aid].append((row["price_date"], px))
-        price_dates = {aid: [d for d, _ in series] for aid, series in price_series.items()}
-
-        total_assets_value = 0.0
-        for aid, qty in holdings.items():
-            if qty <= 0:
-                continue
-            series = price_series.get(aid)
-            dates = price_dates.get(aid)
-            if not series or not dates:
-                continue
-            idx = bisect_right(dates, target_date) - 1
-            if idx < 0:
-                continue
-            px_day, px = series[idx]
-            meta = asset_meta.get(aid)
-            if meta is None:
-                continue
-            fx = fx_rate_on_or_before(meta.quote_currency, px_day)
-            total_assets_value += qty * px * fx
-
-        return round(cash_balance + total_assets_value, 2)
-
     def update_transaction(self, transaction_id: int, payload: TransactionUpdate, user_id: str) -> TransactionRead:
         updates = payload.model_dump(exclude_unset=True)
         with self.engine.begin() as conn:
@@ -487,9 +300,19 @@ class TransactionsMixin:
                     text(f"update transactions set {assignments} where id = :transaction_id and owner_user_id = :user_id"),
                     {"transaction_id": transaction_id, "user_id": user_id, **updates},
                 )
+                previous_trade_at = existing["trade_at"]
                 existing = self._get_transaction_for_user(conn, transaction_id, user_id)
                 if existing is None:
                     raise ValueError("Transazione non trovata")
+                self._invalidate_portfolio_values(
+                    conn,
+                    int(existing["portfolio_id"]),
+                    _valuation_affected_from(previous_trade_at, existing["trade_at"]),
+                )
+                if existing["asset_id"] is not None and str(existing["side"]) in {"buy", "sell"}:
+                    self._refresh_position_state(conn, int(existing["portfolio_id"]), [int(existing["asset_id"])])
+        if updates:
+            self._bump_snapshot_portfolios([int(existing["portfolio_id"])])
 
         return TransactionRead(
             id=int(existing["id"]),
@@ -522,3 +345,11 @@ class TransactionsMixin:
             )
             if deleted.rowcount == 0:
                 raise ValueError("Transazione non trovata")
+            self._invalidate_portfolio_values(
+                conn,
+                int(existing["portfolio_id"]),
+                _valuation_affected_from(existing["trade_at"]),
+            )
+            if existing["asset_id"] is not None and str(existing["side"]) in {"buy", "sell"}:
+                self._refresh_position_state(conn, int(existing["portfolio_id"]), [int(existing["asset_id"])])
+        self._bump_snapshot_portfolios([int(existing["portfolio_id"])])
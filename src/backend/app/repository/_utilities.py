@@ -1,8 +1,4 @@
 import json
-from bisect import bisect_right
-from collections import defaultdict
-from datetime import date
-
 from sqlalchemy import text
 
 from ..models import (
@@ -16,6 +12,7 @@ from ..models import (
     TransactionRead,
 )
 from ._base import PortfolioData
+from ._fx_rates import FxRates
 
 
 def _build_cash_breakdown(
@@ -47,27 +44,9 @@ def _compute_cash_balance_base(
     base_currency: str,
     opening_cash_balance: float,
     rows: list[dict],
-    fx_rows: list[dict],
+    fx: FxRates,
 ) -> float:
-    fx_series: dict[str, list[tuple[date, float]]] = defaultdict(list)
-    for row in fx_rows:
-        fx_series[str(row["from_ccy"])].append((row["price_date"], float(row["rate"])))
-    fx_dates = {ccy: [d for d, _ in series] for ccy, series in fx_series.items()}
-
-    def fx_rate_on_or_before(currency: str, day: date | None) -> float:
-        if currency == base_currency:
-            return 1.0
-        if day is None:
-            return 1.0
-        series = fx_series.get(currency)
-        dates = fx_dates.get(currency)
-        if not series or not dates:
-            return 1.0
-        idx = bisect_right(dates, day) - 1
-        if idx < 0:
-            return 1.0
-        return series[idx][1]
-
+    """Opening cash plus explicit cash movements in base currency; ``fx`` falls back to 1.0."""
     cash_balance = float(opening_cash_balance)
     for row in rows:
         side = str(row["side"])
@@ -78,7 +57,7 @@ def _compute_cash_balance_base(
         trade_ccy = str(row["trade_currency"])
         quantity = float(row["quantity"])
         price = float(row["price"])
-        fx_rate = fx_rate_on_or_before(trade_ccy, trade_day)
+        fx_rate = fx.rate(trade_ccy, trade_day)
         amount_base = quantity * price * fx_rate
 
         if side in {"deposit", "interest", "dividend"}:
@@ -105,7 +84,7 @@ class UtilitiesMixin:
                 where idempotency_key = :idempotency_key and endpoint = :endpoint
             """
             params = {"idempotency_key": idempotency_key, "endpoint": endpoint}
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             row = conn.execute(text(query), params).mappings().fetchone()
         if row is None:
             return None
@@ -132,7 +111,7 @@ class UtilitiesMixin:
             )
 
     def get_portfolio_base_currency(self, portfolio_id: int, user_id: str | None = None) -> str:
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             if user_id:
                 portfolio = self._get_portfolio_for_user(conn, portfolio_id, user_id)
             else:
@@ -148,7 +127,7 @@ class UtilitiesMixin:
     def get_quote_currencies_for_assets(self, asset_ids: list[int]) -> dict[int, str]:
         if not asset_ids:
             return {}
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             rows = conn.execute(
                 text(
                     """
@@ -163,7 +142,7 @@ class UtilitiesMixin:
 
     def get_price_coverage(self, portfolio_id: int, days: int = 365, user_id: str | None = None) -> list[dict]:
         """Return price bar coverage stats for each asset in the portfolio target allocation."""
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             if user_id and self._get_portfolio_for_user(conn, portfolio_id, user_id) is None:
                 raise ValueError("Portfolio non trovato")
             rows = conn.execute(
@@ -228,7 +207,7 @@ class UtilitiesMixin:
         )
 
     def get_computed_cash_balance(self, portfolio_id: int, user_id: str) -> CashBalanceResponse:
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             portfolio = self._get_portfolio_for_user(conn, portfolio_id, user_id)
             if portfolio is None:
                 raise ValueError("Portfolio non trovato")
@@ -263,28 +242,14 @@ class UtilitiesMixin:
             non_base_currencies = sorted(
                 {b.currency for b in breakdown if b.currency != portfolio.base_currency}
             )
-            fx_latest: dict[str, float] = {}
-            if non_base_currencies:
-                fx_rows = conn.execute(
-                    text(
-                        """
-                        select distinct on (from_ccy) from_ccy, rate::float8 as rate
-                        from fx_rates_1d
-                        where from_ccy = any(:from_ccy) and to_ccy = :to_ccy
-                        order by from_ccy, price_date desc
-                        """
-                    ),
-                    {"from_ccy": non_base_currencies, "to_ccy": portfolio.base_currency},
-                ).mappings().all()
-                for r in fx_rows:
-                    fx_latest[str(r["from_ccy"])] = float(r["rate"])
+            fx = self._fx_rates(conn, non_base_currencies, portfolio.base_currency, default=1.0)
 
             total_cash = 0.0
             for b in breakdown:
                 if b.currency == portfolio.base_currency:
                     total_cash += b.balance
                 else:
-                    total_cash += b.balance * fx_latest.get(b.currency, 1.0)
+                    total_cash += b.balance * fx.latest(b.currency)
             total_cash = round(total_cash, 2)
 
             # Recent cash movements (last 20)
@@ -334,7 +299,7 @@ class UtilitiesMixin:
         )
 
     def get_current_cash_balance_value(self, portfolio_id: int, user_id: str) -> float:
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             portfolio = self._get_portfolio_for_user(conn, portfolio_id, user_id)
             if portfolio is None:
                 raise ValueError("Portfolio non trovato")
@@ -368,36 +333,17 @@ class UtilitiesMixin:
                     if row["trade_currency"] is not None and str(row["trade_currency"]) != portfolio.base_currency
                 }
             )
-            fx_rows = []
-            if fx_needed:
-                max_trade_day = max(row["trade_date"] for row in tx_rows if row["trade_date"] is not None)
-                fx_rows = conn.execute(
-                    text(
-                        """
-                        select from_ccy, price_date, rate::float8 as rate
-                        from fx_rates_1d
-                        where from_ccy = any(:from_ccy)
-                          and to_ccy = :to_ccy
-                          and price_date <= :max_trade_day
-                        order by from_ccy asc, price_date asc
-                        """
-                    ),
-                    {
-                        "from_ccy": fx_needed,
-                        "to_ccy": portfolio.base_currency,
-                        "max_trade_day": max_trade_day,
-                    },
-                ).mappings().all()
+            fx = self._fx_rates(conn, fx_needed, portfolio.base_currency, default=1.0)
 
         return _compute_cash_balance_base(
             base_currency=portfolio.base_currency,
             opening_cash_balance=portfolio.cash_balance,
             rows=[dict(row) for row in tx_rows],
-            fx_rows=[dict(row) for row in fx_rows],
+            fx=fx,
         )
 
     def get_cash_flow_timeline(self, portfolio_id: int, user_id: str) -> CashFlowTimelineResponse:
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             if self._get_portfolio_for_user(conn, portfolio_id, user_id) is None:
                 raise ValueError("Portfolio non trovato")
 
@@ -490,7 +436,7 @@ class UtilitiesMixin:
         return int(row.id)
 
     def get_csv_import_batch(self, batch_id: int, user_id: str) -> dict | None:
-        with self.engine.begin() as conn:
+        with self._begin() as conn:
             row = conn.execute(
                 text(
                     """
@@ -0,0 +1,379 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+
+from ._base import AssetMeta, _lock_portfolios
+from ._fx_rates import FxRates
+
+
+# Namespace for the transaction-scoped advisory locks that serialize
+# portfolio_values_1d refreshes with the writes that invalidate them.
+_PORTFOLIO_VALUES_LOCK_NS = 3651
+
+
+def _valuation_affected_from(*trade_ats: datetime) -> date:
+    """First stored day a write at ``trade_ats`` can change.
+
+    ``trade_at::date`` follows the DB session time zone, so step back one day
+    to stay on the safe side of the client-side conversion.
+    """
+    return min(ts.date() for ts in trade_ats) - timedelta(days=1)
+
+
+@dataclass
+class DailyValuation:
+    day: date
+    asset_value: float
+    cash_value: float
+    net_external_flow: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return round(self.cash_value + self.asset_value, 2)
+
+
+def _sweep_daily_valuations(
+    *,
+    opening_cash_balance: float,
+    start_date: date,
+    end_date: date,
+    today: date,
+    tx_rows: list[dict],
+    price_rows: list[dict],
+    fx: FxRates,
+    asset_meta: dict[int, AssetMeta],
+) -> list[DailyValuation]:
+    """Value the portfolio on every calendar day in [start_date, end_date] in one forward pass.
+
+    Rows must be sorted by date (transactions by trade_at/id, prices by asset/date);
+    ``fx`` converts into the base currency and falls back to 1.0. Each emitted day
+    matches what a point-in-time valuation restricted to rows on or before that
+    day would return.
+    """
+
+    price_series: dict[int, list[tuple[date, float]]] = defaultdict(list)
+    for row in price_rows:
+        px = float(row["close"])
+        if px > 0:
+            price_series[int(row["asset_id"])].append((row["price_date"], px))
+
+    # Per-asset forward pointer into its price series plus the (close, fx) pair
+    # it resolves to; pointers only move forward as the cursor advances.
+    price_index: dict[int, int] = {aid: -1 for aid in price_series}
+    price_base: dict[int, tuple[float, float] | None] = {aid: None for aid in price_series}
+
+    holdings: dict[int, float] = defaultdict(float)
+    cash_balance = 0.0
+    tx_pos = 0
+    tx_count = len(tx_rows)
+
+    out: list[DailyValuation] = []
+    cursor = start_date
+    while cursor <= end_date:
+        day_flow = 0.0
+        while tx_pos < tx_count and tx_rows[tx_pos]["trade_date"] <= cursor:
+            row = tx_rows[tx_pos]
+            tx_pos += 1
+            side = str(row["side"])
+            aid = row["asset_id"]
+            qty = float(row["quantity"])
+            if side == "buy":
+                if aid is None:
+                    continue
+                holdings[int(aid)] += qty
+            elif side == "sell":
+                if aid is None:
+                    continue
+                holdings[int(aid)] = max(0.0, holdings[int(aid)] - qty)
+            elif side in {"deposit", "dividend", "interest", "withdrawal", "fee"}:
+                fx_rate = fx.rate(str(row["trade_currency"]), row["trade_date"])
+                amount_base = qty * float(row["price"]) * fx_rate
+                signed = -amount_base if side in {"withdrawal", "fee"} else amount_base
+                cash_balance += signed
+                if row["trade_date"] == cursor:
+                    day_flow += signed
+
+        if tx_pos == 0:
+            cash_value = round(float(opening_cash_balance), 2) if cursor >= today else 0.0
+            out.append(DailyValuation(day=cursor, asset_value=0.0, cash_value=cash_value))
+            cursor += timedelta(days=1)
+            continue
+
+        for aid, series in price_series.items():
+            idx = price_index[aid]
+            moved = False
+            while idx + 1 < len(series) and series[idx + 1][0] <= cursor:
+                idx += 1
+                moved = True
+            if moved:
+                price_index[aid] = idx
+                meta = asset_meta.get(aid)
+                if meta is None:
+                    price_base[aid] = None
+                else:
+                    px_day, px = series[idx]
+                    price_base[aid] = (px, fx.rate(meta.quote_currency, px_day))
+
+        asset_value = 0.0
+        for aid, qty in holdings.items():
+            if qty <= 0:
+                continue
+            quote = price_base.get(aid)
+            if quote is None:
+                continue
+            px, px_fx = quote
+            asset_value += qty * px * px_fx
+
+        out.append(
+            DailyValuation(day=cursor, asset_value=asset_value, cash_value=cash_balance, net_external_flow=day_flow)
+        )
+        cursor += timedelta(days=1)
+
+    return out
+
+
+class ValuationMixin:
+    """Daily valuation engine backed by the ``portfolio_values_1d`` store.
+
+    Past days are served from the store; missing or invalidated days are
+    recomputed with a single forward sweep from the first gap and written back.
+    The current day is always computed live and never persisted.
+    """
+
+    def get_daily_valuations(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date,
+        end_date: date,
+    ) -> list[DailyValuation]:
+        if end_date < start_date:
+            raise ValueError("Intervallo date non valido")
+
+        today = date.today()
+        with self.engine.begin() as conn:
+            portfolio = self._get_portfolio_for_user(conn, portfolio_id, user_id)
+            if portfolio is None:
+                raise ValueError("Portfolio non trovato")
+
+            stored = self._load_stored_valuations(conn, portfolio_id, start_date, end_date, today)
+            first_missing = self._first_missing_day(stored, start_date, end_date)
+            if first_missing is None:
+                return [stored[day] for day in sorted(stored)]
+
+            if first_missing < today:
+                # Serialize with concurrent invalidations, then re-read: rows seen
+                # before taking the lock may have been deleted in the meantime.
+                self._lock_portfolio_values(conn, "select cast(:portfolio_id as bigint)", {"portfolio_id": portfolio_id})
+                stored = self._load_stored_valuations(conn, portfolio_id, start_date, end_date, today)
+                first_missing = self._first_missing_day(stored, start_date, end_date)
+                if first_missing is None:
+                    return [stored[day] for day in sorted(stored)]
+
+            computed = self._compute_daily_valuations(conn, portfolio, first_missing, end_date, today)
+            persist = [item for item in computed if item.day < today]
+            if persist:
+                conn.execute(
+                    text(
+                        """
+                        insert into portfolio_values_1d (portfolio_id, value_date, asset_value, cash_value, net_external_flow)
+                        values (:portfolio_id, :value_date, :asset_value, :cash_value, :net_external_flow)
+                        on conflict (portfolio_id, value_date)
+                        do update set
+                          asset_value = excluded.asset_value,
+                          cash_value = excluded.cash_value,
+                          net_external_flow = excluded.net_external_flow,
+                          computed_at = now()
+                        """
+                    ),
+                    [
+                        {
+                            "portfolio_id": portfolio_id,
+                            "value_date": item.day,
+                            "asset_value": item.asset_value,
+                            "cash_value": item.cash_value,
+                            "net_external_flow": item.net_external_flow,
+                        }
+                        for item in persist
+                    ],
+                )
+
+        head_rows = [stored[day] for day in sorted(stored) if day < first_missing]
+        return head_rows + computed
+
+    def get_portfolio_values_in_range(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date,
+        end_date: date,
+    ) -> dict[date, float]:
+        return {
+            item.day: item.total
+            for item in self.get_daily_valuations(portfolio_id, user_id, start_date, end_date)
+        }
+
+    def get_portfolio_value_at_date(self, portfolio_id: int, user_id: str, target_date: date) -> float:
+        values = self.get_portfolio_values_in_range(portfolio_id, user_id, target_date, target_date)
+        return values[target_date]
+
+    # ---- Invalidation hooks (called inside the writer's transaction) ----
+
+    def _invalidate_portfolio_values(self, conn, portfolio_id: int, from_date: date) -> None:
+        self._delete_portfolio_values(
+            conn,
+            "select cast(:portfolio_id as bigint)",
+            {"portfolio_id": portfolio_id},
+            from_date,
+        )
+
+    def _invalidate_portfolio_values_for_asset(self, conn, asset_id: int, from_date: date) -> None:
+        self._delete_portfolio_values(
+            conn,
+            "select distinct portfolio_id from transactions where asset_id = :asset_id",
+            {"asset_id": asset_id},
+            from_date,
+        )
+
+    def _invalidate_portfolio_values_for_fx(self, conn, from_ccy: str, to_ccy: str, from_date: date) -> None:
+        self._delete_portfolio_values(
+            conn,
+            """
+            select distinct t.portfolio_id
+            from transactions t
+            join portfolios p on p.id = t.portfolio_id
+            left join assets a on a.id = t.asset_id
+            where p.base_currency = :to_ccy
+              and (t.trade_currency = :from_ccy or a.quote_currency = :from_ccy)
+            """,
+            {"from_ccy": from_ccy.upper(), "to_ccy": to_ccy.upper()},
+            from_date,
+        )
+
+    def _delete_portfolio_values(self, conn, portfolio_ids_sql: str, params: dict, from_date: date) -> None:
+        self._lock_portfolio_values(conn, portfolio_ids_sql, params)
+        conn.execute(
+            text(
+                f"""
+                delete from portfolio_values_1d
+                where portfolio_id in ({portfolio_ids_sql})
+                  and value_date >= :from_date
+                """
+            ),
+            {**params, "from_date": from_date},
+        )
+
+    def _lock_portfolio_values(self, conn, portfolio_ids_sql: str, params: dict) -> None:
+        _lock_portfolios(conn, _PORTFOLIO_VALUES_LOCK_NS, portfolio_ids_sql, params)
+
+    # ---- Store access / live computation ----
+
+    def _load_stored_valuations(
+        self,
+        conn,
+        portfolio_id: int,
+        start_date: date,
+        end_date: date,
+        today: date,
+    ) -> dict[date, DailyValuation]:
+        last_stored_day = min(end_date, today - timedelta(days=1))
+        if last_stored_day < start_date:
+            return {}
+        rows = conn.execute(
+            text(
+                """
+                select value_date,
+                       asset_value::float8 as asset_value,
+                       cash_value::float8 as cash_value,
+                       net_external_flow::float8 as net_external_flow
+                from portfolio_values_1d
+                where portfolio_id = :portfolio_id
+                  and value_date between :start_date and :end_date
+                """
+            ),
+            {"portfolio_id": portfolio_id, "start_date": start_date, "end_date": last_stored_day},
+        ).mappings().all()
+        return {
+            row["value_date"]: DailyValuation(
+                day=row["value_date"],
+                asset_value=float(row["asset_value"]),
+                cash_value=float(row["cash_value"]),
+                net_external_flow=float(row["net_external_flow"]),
+            )
+            for row in rows
+        }
+
+    @staticmethod
+    def _first_missing_day(stored: dict[date, DailyValuation], start_date: date, end_date: date) -> date | None:
+        cursor = start_date
+        while cursor <= end_date:
+            if cursor not in stored:
+                return cursor
+            cursor += timedelta(days=1)
+        return None
+
+    def _compute_daily_valuations(
+        self,
+        conn,
+        portfolio,
+        start_date: date,
+        end_date: date,
+        today: date,
+    ) -> list[DailyValuation]:
+        base_ccy = portfolio.base_currency
+        tx_rows = conn.execute(
+            text(
+                """
+                select asset_id,
+                       side,
+                       trade_at::date as trade_date,
+                       quantity::float8 as quantity,
+                       price::float8 as price,
+                       trade_currency
+                from transactions
+                where portfolio_id = :portfolio_id
+                  and trade_at::date <= :end_date
+                order by trade_at asc, id asc
+                """
+            ),
+            {"portfolio_id": portfolio.id, "end_date": end_date},
+        ).mappings().all()
+
+        asset_ids = sorted({int(r["asset_id"]) for r in tx_rows if r["asset_id"] is not None})
+        asset_meta = self._get_asset_meta(conn, asset_ids) if asset_ids else {}
+
+        price_rows = []
+        if asset_ids:
+            # Bars inside the range plus the last usable bar before it, which is
+            # all the as-of lookups of the sweep can ever reach.
+            for asset_id, item in sorted(self._price_series(conn, asset_ids).items()):
+                prior = item.window(None, start_date - timedelta(days=1)).valid()
+                if len(prior.dates):
+                    price_rows.append(
+                        {"asset_id": asset_id, "price_date": prior.dates[-1].astype(object), "close": float(prior.closes[-1])}
+                    )
+                price_rows.extend(
+                    {"asset_id": asset_id, "price_date": day, "close": close}
+                    for day, close in item.window(start_date, end_date).points()
+                )
+
+        fx = self._fx_rates(
+            conn,
+            {str(r["trade_currency"]) for r in tx_rows if r["trade_currency"] is not None}
+            | {meta.quote_currency for meta in asset_meta.values()},
+            base_ccy,
+            default=1.0,
+        )
+
+        return _sweep_daily_valuations(
+            opening_cash_balance=portfolio.cash_balance,
+            start_date=start_date,
+            end_date=end_date,
+            today=today,
+            tx_rows=[dict(r) for r in tx_rows],
+            price_rows=price_rows,
+            fx=fx,
+            asset_meta=asset_meta,
+        )
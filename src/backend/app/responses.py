@@ -0,0 +1,128 @@
+"""Response classes shared by the app and the route modules."""
+
+import json
+import math
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# OpenAPI descriptions of the alternative ``format`` values of series routes.
+_SERIES_FORMAT_DOCS = {
+    "ndjson": "Con format=ndjson: un oggetto JSON per riga, un punto per riga dopo l'eventuale intestazione.",
+    "columnar": "Con format=columnar: un oggetto con la lista `dates` e una lista per ogni altro campo dei punti.",
+}
+# Non-str dict keys are stringified as the stdlib does (date keys too, which the
+# stdlib rejects). Date and dataclass values are handed to the default hook,
+# which rejects them as the stdlib encoder does.
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+# Lines buffered into one chunk: one write per point would flood the transport.
+_NDJSON_CHUNK_LINES = 256
+
+
+class _SafeEncoder(json.JSONEncoder):
+    """JSON encoder that converts NaN/Inf to None instead of raising."""
+    def default(self, o: Any) -> Any:
+        if isinstance(o, BaseModel):
+            return self._sanitize(o.model_dump(mode="json"))
+        return super().default(o)
+
+    def iterencode(self, o: Any, _one_shot: bool = False) -> Any:
+        return super().iterencode(self._sanitize(o), _one_shot=_one_shot)
+
+    @staticmethod
+    def _sanitize(obj: Any) -> Any:
+        if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
+            return None
+        if isinstance(obj, dict):
+            return {k: _SafeEncoder._sanitize(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [_SafeEncoder._sanitize(v) for v in obj]
+        return obj
+
+
+def series_response_doc(*formats: str) -> dict[str, Any]:
+    """OpenAPI 200 entry for a series route that also answers with these ``format`` values."""
+    doc: dict[str, Any] = {"description": " ".join(_SERIES_FORMAT_DOCS[fmt] for fmt in formats)}
+    if "ndjson" in formats:
+        doc["content"] = {NDJSON_MEDIA_TYPE: {}}
+    return doc
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), cls=_SafeEncoder,
+    ).encode("utf-8")
+
+
+def _orjson_default(o: Any) -> Any:
+    if isinstance(o, BaseModel):
+        return o.model_dump(mode="json")
+    if isinstance(o, float):
+        # Float subclasses, numpy.float64 included: the stdlib writes them as floats.
+        return float(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON with NaN/Inf as null.
+
+    orjson writes NaN/Inf as null natively, in a single pass. It accepts the
+    types the stdlib encoder accepts: dates, dataclasses, numpy integers and
+    arrays raise TypeError either way. Integers beyond 64 bits, which orjson
+    cannot write, go through the stdlib encoder.
+
+    The values are those of the stdlib encoder, the bytes are not quite:
+    separators are compact (no space after ',' and ':'), and floats the
+    stdlib prints in exponent notation lose the '+' and the zero padding of
+    the exponent, with 1e-05 written out in full (1e16, 1.5e-7 and 0.00001
+    instead of 1e+16, 1.5e-07 and 1e-05).
+    """
+    try:
+        return orjson.dumps(content, default=_orjson_default, option=_ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        return _stdlib_dumps(content)
+
+
+class SafeJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
+
+
+def _ndjson_chunks(items: Iterable[Any], header: Any | None) -> Iterator[bytes]:
+    if header is not None:
+        yield _dumps(_jsonable(header)) + b"\n"
+    lines: list[bytes] = []
+    for item in items:
+        lines.append(_dumps(_jsonable(item)))
+        if len(lines) >= _NDJSON_CHUNK_LINES:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def _jsonable(item: Any) -> Any:
+    if isinstance(item, BaseModel):
+        return item.model_dump(mode="json")
+    return jsonable_encoder(item)
+
+
+class NDJSONResponse(StreamingResponse):
+    """Newline-delimited JSON, encoded while ``items`` is consumed.
+
+    ``header``, when given, is the first line: the fields of an envelope
+    response other than its points. NaN/Inf become null, as in SafeJSONResponse.
+    """
+
+    def __init__(self, items: Iterable[Any], *, header: Any | None = None, status_code: int = 200) -> None:
+        super().__init__(
+            _ndjson_chunks(items, header),
+            status_code=status_code,
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
@@ -107,6 +107,8 @@ class DecumulationPlanResponse(BaseModel):
     annualized_mean_return_pct: float
     annualized_volatility_pct: float
     sustainable_withdrawal: float = Field(ge=0)
+    target_success_rate_pct: float = Field(default=90.0, ge=0, le=100)
+    target_success_withdrawal: float = Field(default=0.0, ge=0)
     success_rate_pct: float = Field(ge=0, le=100)
     depletion_probability_pct: float = Field(ge=0, le=100)
     p25_terminal_value: float = Field(ge=0)
@@ -130,6 +132,8 @@ class AggregateDecumulationPlanResponse(BaseModel):
     annualized_mean_return_pct: float
     annualized_volatility_pct: float
     sustainable_withdrawal: float = Field(ge=0)
+    target_success_rate_pct: float = Field(default=90.0, ge=0, le=100)
+    target_success_withdrawal: float = Field(default=0.0, ge=0)
     success_rate_pct: float = Field(ge=0, le=100)
     depletion_probability_pct: float = Field(ge=0, le=100)
     p25_terminal_value: float = Field(ge=0)
@@ -1,14 +1,24 @@
 import logging
+import math
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 
 from ..config import Settings
+from ..errors import ProviderError
 from ..finance_client import make_finance_client
 from ..models import DailyBackfillItem, DailyBackfillResponse, FxBackfillItem
 from ..price_validation import validate_fx_rate, validate_price_bar
 from ..repository import PortfolioRepository
+from .pricing_service import TokenBucket, _provider_rate, _provider_token_bucket
 
 logger = logging.getLogger(__name__)
 
+# Holes in stored history shorter than this many weekdays are market holidays.
+MIN_GAP_WEEKDAYS = 3
+# Missing ranges closer than this many days are fetched with one request.
+MERGE_GAP_DAYS = 30
+
 
 class HistoricalIngestionService:
     def __init__(self, settings: Settings, repository: PortfolioRepository) -> None:
@@ -73,75 +83,199 @@ class HistoricalIngestionService:
             rows.append({"price_date": fx.day, "rate": fx.rate})
         return rows
 
-    def backfill_single_asset(self, *, asset_id: int, portfolio_id: int, days: int = 365, user_id: str | None = None) -> None:
+    def _collect_asset(
+        self,
+        client,
+        *,
+        asset_id: int,
+        symbol: str,
+        provider_symbol: str,
+        start_date: date,
+        end_date: date,
+        stored: dict[date, dict],
+        latest_close: float | None,
+        bucket: TokenBucket | None = None,
+    ) -> tuple[DailyBackfillItem, list[dict]]:
+        """Fetch and validate the bars missing for one asset; returns the rows to store."""
+        ranges = _missing_ranges(stored, start_date, end_date) if stored else [(start_date, end_date)]
+        stored_dates = sorted(stored)
+
+        requested = 0
+        rows: list[dict] = []
+        for range_start, range_end in ranges:
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                bars = client.get_daily_bars(
+                    provider_symbol,
+                    outputsize=(range_end - range_start).days + 1,
+                    start_date=range_start.isoformat(),
+                    end_date=range_end.isoformat(),
+                )
+            except ProviderError as exc:
+                # Short gaps (holidays, days not traded yet) legitimately have no bars.
+                if stored and exc.reason == 'no_data':
+                    continue
+                raise
+            requested += len(bars)
+
+            reference_close = _close_before(stored, stored_dates, range_start)
+            rows.extend(
+                self._validate_bars(
+                    bars,
+                    asset_id,
+                    provider_symbol,
+                    range_start,
+                    range_end,
+                    reference_close=latest_close if reference_close is None else reference_close,
+                )
+            )
+
+        changed = [{**row, 'asset_id': asset_id} for row in _changed_bar_rows(rows, stored)]
+        item = DailyBackfillItem(
+            asset_id=asset_id,
+            symbol=symbol,
+            provider_symbol=provider_symbol,
+            bars_saved=len(changed),
+            bars_requested=requested,
+            bars_rejected=max(0, requested - len(rows)),
+            bars_unchanged=len(rows) - len(changed),
+        )
+        return item, changed
+
+    def _collect_fx_pair(
+        self,
+        client,
+        *,
+        from_ccy: str,
+        to_ccy: str,
+        start_date: date,
+        end_date: date,
+        stored: dict[date, float],
+        bucket: TokenBucket | None = None,
+    ) -> tuple[FxBackfillItem, list[dict]]:
+        """Fetch and validate the FX rates missing for one pair; returns the rows to store."""
+        ranges = _missing_ranges(stored, start_date, end_date) if stored else [(start_date, end_date)]
+
+        requested = 0
+        rows: list[dict] = []
+        for range_start, range_end in ranges:
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                rates = client.get_daily_fx_rates(
+                    from_ccy,
+                    to_ccy,
+                    outputsize=(range_end - range_start).days + 1,
+                    start_date=range_start.isoformat(),
+                    end_date=range_end.isoformat(),
+                )
+            except ProviderError as exc:
+                if stored and exc.reason == 'no_data':
+                    continue
+                raise
+            requested += len(rates)
+            rows.extend(self._validate_fx_rows(rates, from_ccy, to_ccy, range_start, range_end))
+
+        changed = [
+            {**row, 'from_ccy': from_ccy, 'to_ccy': to_ccy} for row in _changed_fx_rows(rows, stored)
+        ]
+        item = FxBackfillItem(
+            from_currency=from_ccy,
+            to_currency=to_ccy,
+            rates_saved=len(changed),
+            rates_requested=requested,
+            rates_rejected=max(0, requested - len(rows)),
+            rates_unchanged=len(rows) - len(changed),
+        )
+        return item, changed
+
+    def _backfill_window(self, days: int) -> tuple[date, date]:
+        outputsize = max(30, min(days, 2000))
+        end_date = date.today()
+        return end_date - timedelta(days=outputsize - 1), end_date
+
+    def backfill_single_asset(
+        self,
+        *,
+        asset_id: int,
+        portfolio_id: int,
+        days: int = 365,
+        user_id: str | None = None,
+        incremental: bool = True,
+    ) -> None:
         """Background backfill for a single asset (prices + FX). Never raises."""
         try:
             provider = self.settings.finance_provider.strip().lower()
-            outputsize = max(30, min(days, 2000))
-            end_date = date.today()
-            start_date = end_date - timedelta(days=outputsize - 1)
+            start_date, end_date = self._backfill_window(days)
 
             client = make_finance_client(self.settings)
             pricing_asset = self.repository.get_asset_pricing_symbol(asset_id, provider)
             base_currency = self.repository.get_portfolio_base_currency(portfolio_id, user_id=user_id)
-            reference_close = self.repository.get_latest_close_price(asset_id)
 
             # Price bars
-            bars = client.get_daily_bars(
-                pricing_asset.provider_symbol,
-                outputsize=outputsize,
-                start_date=start_date.isoformat(),
-                end_date=end_date.isoformat(),
+            stored = (
+                self.repository.get_price_bars_1d_by_date([asset_id], provider, start_date, end_date).get(asset_id, {})
+                if incremental
+                else {}
             )
-            rows = self._validate_bars(
-                bars,
-                asset_id,
-                pricing_asset.provider_symbol,
-                start_date,
-                end_date,
-                reference_close=reference_close,
-            )
-            self.repository.batch_upsert_price_bars_1d(
+            item, bar_rows = self._collect_asset(
+                client,
                 asset_id=asset_id,
-                provider=provider,
-                rows=rows,
-            )
-            logger.info(
-                'Single-asset backfill asset=%s bars=%s',
-                pricing_asset.provider_symbol,
-                len(rows),
+                symbol=pricing_asset.symbol,
+                provider_symbol=pricing_asset.provider_symbol,
+                start_date=start_date,
+                end_date=end_date,
+                stored=stored,
+                latest_close=self.repository.get_latest_close_prices([asset_id]).get(asset_id),
             )
 
             # FX rates if needed
+            fx_rows: list[dict] = []
             quote_ccys = self.repository.get_quote_currencies_for_assets([asset_id])
             quote_ccy = quote_ccys.get(asset_id, '')
             if quote_ccy and quote_ccy.upper() != base_currency.upper():
-                rates = client.get_daily_fx_rates(
-                    quote_ccy,
-                    base_currency,
-                    outputsize=outputsize,
-                    start_date=start_date.isoformat(),
-                    end_date=end_date.isoformat(),
+                stored_fx = (
+                    self.repository.get_fx_rates_1d_by_date(
+                        [quote_ccy], base_currency, provider, start_date, end_date
+                    ).get(quote_ccy.upper(), {})
+                    if incremental
+                    else {}
                 )
-                fx_rows = self._validate_fx_rows(rates, quote_ccy, base_currency, start_date, end_date)
-                self.repository.batch_upsert_fx_rates_1d(
+                fx_item, fx_rows = self._collect_fx_pair(
+                    client,
                     from_ccy=quote_ccy,
                     to_ccy=base_currency,
-                    provider=provider,
-                    rows=fx_rows,
+                    start_date=start_date,
+                    end_date=end_date,
+                    stored=stored_fx,
                 )
                 logger.info(
-                    'Single-asset FX backfill pair=%s/%s rates=%s',
-                    quote_ccy, base_currency, len(fx_rows),
+                    'Single-asset FX backfill pair=%s/%s rates=%s unchanged=%s',
+                    quote_ccy, base_currency, fx_item.rates_saved, fx_item.rates_unchanged,
                 )
+
+            self.repository.save_daily_history(provider=provider, bars=bar_rows, fx_rates=fx_rows)
+            logger.info(
+                'Single-asset backfill asset=%s bars=%s unchanged=%s',
+                pricing_asset.provider_symbol,
+                item.bars_saved,
+                item.bars_unchanged,
+            )
         except Exception as exc:
             logger.error('Single-asset backfill failed asset_id=%s error=%s', asset_id, exc)
 
-    def backfill_daily(self, *, portfolio_id: int, days: int = 365, asset_scope: str = 'target', user_id: str | None = None) -> DailyBackfillResponse:
+    def backfill_daily(
+        self,
+        *,
+        portfolio_id: int,
+        days: int = 365,
+        asset_scope: str = 'target',
+        user_id: str | None = None,
+        incremental: bool = True,
+    ) -> DailyBackfillResponse:
         provider = self.settings.finance_provider.strip().lower()
-        outputsize = max(30, min(days, 2000))
-        end_date = date.today()
-        start_date = end_date - timedelta(days=outputsize - 1)
+        start_date, end_date = self._backfill_window(days)
 
         client = make_finance_client(self.settings)
 
@@ -153,81 +287,97 @@ class HistoricalIngestionService:
         )
         base_currency = self.repository.get_portfolio_base_currency(portfolio_id, user_id=user_id)
 
+        asset_ids = [a.asset_id for a in pricing_assets]
+        quote_ccy_by_asset = self.repository.get_quote_currencies_for_assets(asset_ids)
+        needed_fx = sorted({
+            ccy for ccy in quote_ccy_by_asset.values() if ccy and ccy.upper() != base_currency.upper()
+        })
+
+        # Everything the workers compare against is read up front, in one query per table.
+        stored_bars: dict[int, dict[date, dict]] = {}
+        stored_fx: dict[str, dict[date, float]] = {}
+        if incremental:
+            stored_bars = self.repository.get_price_bars_1d_by_date(asset_ids, provider, start_date, end_date)
+            stored_fx = self.repository.get_fx_rates_1d_by_date(needed_fx, base_currency, provider, start_date, end_date)
+        latest_closes = self.repository.get_latest_close_prices(asset_ids)
+
+        bucket = _provider_token_bucket(
+            provider,
+            _provider_rate(self.settings, provider),
+            int(self.settings.finance_provider_rate_burst),
+        )
+
+        def fetch_asset(asset) -> tuple[DailyBackfillItem, list[dict]]:
+            return self._collect_asset(
+                client,
+                asset_id=asset.asset_id,
+                symbol=asset.symbol,
+                provider_symbol=asset.provider_symbol,
+                start_date=start_date,
+                end_date=end_date,
+                stored=stored_bars.get(asset.asset_id, {}),
+                latest_close=latest_closes.get(asset.asset_id),
+                bucket=bucket,
+            )
+
+        def fetch_fx(from_ccy: str) -> tuple[FxBackfillItem, list[dict]]:
+            return self._collect_fx_pair(
+                client,
+                from_ccy=from_ccy,
+                to_ccy=base_currency,
+                start_date=start_date,
+                end_date=end_date,
+                stored=stored_fx.get(from_ccy.upper(), {}),
+                bucket=bucket,
+            )
+
+        jobs = [(fetch_asset, asset) for asset in pricing_assets] + [(fetch_fx, ccy) for ccy in needed_fx]
+        max_workers = max(1, min(int(self.settings.backfill_max_workers), len(jobs) or 1))
+        logger.info(
+            'Start daily backfill portfolio=%s assets=%s fx_pairs=%s workers=%s',
+            portfolio_id,
+            len(pricing_assets),
+            len(needed_fx),
+            max_workers,
+        )
+
+        def run(job) -> tuple[object, list[dict]] | Exception:
+            func, arg = job
+            try:
+                return func(arg)
+            except ValueError as exc:
+                return exc
+
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='backfill') as pool:
+                results = list(pool.map(run, jobs))
+        else:
+            results = [run(job) for job in jobs]
+
         asset_items: list[DailyBackfillItem] = []
         fx_items: list[FxBackfillItem] = []
+        bar_rows: list[dict] = []
+        fx_rows: list[dict] = []
         errors: list[str] = []
 
-        quote_ccy_by_asset = self.repository.get_quote_currencies_for_assets([a.asset_id for a in pricing_assets])
+        for asset, result in zip(pricing_assets, results[:len(pricing_assets)]):
+            if isinstance(result, Exception):
+                errors.append(f"{asset.provider_symbol}: {result}")
+                logger.error('Daily backfill failure asset=%s error=%s', asset.provider_symbol, result)
+                continue
+            asset_items.append(result[0])
+            bar_rows.extend(result[1])
 
-        for asset in pricing_assets:
-            try:
-                bars = client.get_daily_bars(
-                    asset.provider_symbol,
-                    outputsize=outputsize,
-                    start_date=start_date.isoformat(),
-                    end_date=end_date.isoformat(),
-                )
-                reference_close = self.repository.get_latest_close_price(asset.asset_id)
-                rows = self._validate_bars(
-                    bars,
-                    asset.asset_id,
-                    asset.provider_symbol,
-                    start_date,
-                    end_date,
-                    reference_close=reference_close,
-                )
-                self.repository.batch_upsert_price_bars_1d(
-                    asset_id=asset.asset_id,
-                    provider=provider,
-                    rows=rows,
-                )
-                asset_items.append(
-                    DailyBackfillItem(
-                        asset_id=asset.asset_id,
-                        symbol=asset.symbol,
-                        provider_symbol=asset.provider_symbol,
-                        bars_saved=len(rows),
-                        bars_requested=len(bars),
-                        bars_rejected=max(0, len(bars) - len(rows)),
-                    )
-                )
-            except ValueError as exc:
-                msg = f"{asset.provider_symbol}: {exc}"
-                errors.append(msg)
-                logger.error('Daily backfill failure asset=%s error=%s', asset.provider_symbol, exc)
+        for from_ccy, result in zip(needed_fx, results[len(pricing_assets):]):
+            if isinstance(result, Exception):
+                errors.append(f"{from_ccy}/{base_currency}: {result}")
+                logger.error('Daily FX backfill failure pair=%s/%s error=%s', from_ccy, base_currency, result)
+                continue
+            fx_items.append(result[0])
+            fx_rows.extend(result[1])
 
-        needed_fx = sorted({
-            ccy for ccy in quote_ccy_by_asset.values() if ccy and ccy.upper() != base_currency.upper()
-        })
-        for from_ccy in needed_fx:
-            try:
-                rates = client.get_daily_fx_rates(
-                    from_ccy,
-                    base_currency,
-                    outputsize=outputsize,
-                    start_date=start_date.isoformat(),
-                    end_date=end_date.isoformat(),
-                )
-                rows = self._validate_fx_rows(rates, from_ccy, base_currency, start_date, end_date)
-                self.repository.batch_upsert_fx_rates_1d(
-                    from_ccy=from_ccy,
-                    to_ccy=base_currency,
-                    provider=provider,
-                    rows=rows,
-                )
-                fx_items.append(
-                    FxBackfillItem(
-                        from_currency=from_ccy,
-                        to_currency=base_currency,
-                        rates_saved=len(rows),
-                        rates_requested=len(rates),
-                        rates_rejected=max(0, len(rates) - len(rows)),
-                    )
-                )
-            except ValueError as exc:
-                msg = f"{from_ccy}/{base_currency}: {exc}"
-                errors.append(msg)
-                logger.error('Daily FX backfill failure pair=%s/%s error=%s', from_ccy, base_currency, exc)
+        # One write transaction for the whole portfolio.
+        self.repository.save_daily_history(provider=provider, bars=bar_rows, fx_rates=fx_rows)
 
         logger.info(
             'Daily backfill completed portfolio=%s asset_scope=%s assets=%s fx_pairs=%s errors=%s',
@@ -250,3 +400,76 @@ class HistoricalIngestionService:
             fx_items=fx_items,
             errors=errors,
         )
+
+
+def _weekdays_between(start_date: date, end_date: date) -> int:
+    """Number of Monday-Friday days in [start_date, end_date]."""
+    if end_date < start_date:
+        return 0
+    total_days = (end_date - start_date).days + 1
+    full_weeks, remainder = divmod(total_days, 7)
+    weekdays = full_weeks * 5
+    for offset in range(remainder):
+        if (start_date.weekday() + offset) % 7 < 5:
+            weekdays += 1
+    return weekdays
+
+
+def _missing_ranges(stored_dates, start_date: date, end_date: date) -> list[tuple[date, date]]:
+    """Date ranges of [start_date, end_date] that still need to be fetched.
+
+    The last stored day is always refetched, since its bar may have been
+    saved while the session was still open. Holes of fewer than
+    MIN_GAP_WEEKDAYS weekdays are taken as market holidays, and ranges
+    closer than MERGE_GAP_DAYS are merged into one request.
+    """
+    dates = sorted(d for d in stored_dates if start_date <= d <= end_date)
+    if not dates:
+        return [(start_date, end_date)]
+
+    ranges: list[tuple[date, date]] = []
+    if _weekdays_between(start_date, dates[0] - timedelta(days=1)) >= MIN_GAP_WEEKDAYS:
+        ranges.append((start_date, dates[0] - timedelta(days=1)))
+    for previous, current in zip(dates, dates[1:]):
+        gap_start = previous + timedelta(days=1)
+        gap_end = current - timedelta(days=1)
+        if _weekdays_between(gap_start, gap_end) >= MIN_GAP_WEEKDAYS:
+            ranges.append((gap_start, gap_end))
+    ranges.append((dates[-1], end_date))
+
+    merged: list[tuple[date, date]] = [ranges[0]]
+    for range_start, range_end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if (range_start - last_end).days <= MERGE_GAP_DAYS:
+            merged[-1] = (last_start, max(last_end, range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+def _close_before(stored: dict[date, dict], stored_dates: list[date], day: date) -> float | None:
+    idx = bisect_left(stored_dates, day)
+    return float(stored[stored_dates[idx - 1]]["close"]) if idx > 0 else None
+
+
+def _same_value(a: float | None, b: float | None) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=1e-10)
+
+
+def _changed_bar_rows(rows: list[dict], stored: dict[date, dict]) -> list[dict]:
+    """Rows that are new or differ from the stored bar of the same date."""
+    changed: list[dict] = []
+    for row in rows:
+        current = stored.get(row["price_date"])
+        if current is not None and all(
+            _same_value(row[key], current[key]) for key in ("open", "high", "low", "close", "volume")
+        ):
+            continue
+        changed.append(row)
+    return changed
+
+
+def _changed_fx_rows(rows: list[dict], stored: dict[date, float]) -> list[dict]:
+    return [row for row in rows if not _same_value(row["rate"], stored.get(row["price_date"]))]
@@ -0,0 +1,199 @@
+"""Vectorized NPV/IRR on dated cashflows (times in days, annual compounding)."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Realistic bounds: -99% to +1000% annualized.
+IRR_LOW = -0.99
+IRR_HIGH = 10.0
+# Rates scanned for sign changes of the NPV when no single root is guaranteed.
+IRR_PROBES = (-0.99, -0.9, -0.5, -0.2, 0.0, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+_NEWTON_MAX_ITER = 100
+_NEWTON_TOL = 1e-10
+# Horizons solved together; bounds the (horizons x flows) matrices.
+_BATCH_SIZE = 128
+
+
+def npv(rate: float, days: np.ndarray, amounts: np.ndarray) -> float:
+    """Net present value at ``rate`` of ``amounts`` paid ``days`` after the start."""
+    if rate <= -0.999999:
+        return float('inf')
+    return float(np.dot(amounts, np.exp(-(days / 365.0) * np.log1p(rate))))
+
+
+def npv_derivative(rate: float, days: np.ndarray, amounts: np.ndarray) -> float:
+    if rate <= -0.999999:
+        return float('inf')
+    years = days / 365.0
+    return float(np.dot(-years * amounts, np.exp(-(years + 1.0) * np.log1p(rate))))
+
+
+@dataclass(frozen=True)
+class CashflowSchedule:
+    """Investor cashflows sorted by day, for IRRs measured at several horizons.
+
+    The IRR at horizon ``h`` discounts every flow paid on or before ``h``
+    plus a terminal value paid at ``h``.
+    """
+
+    days: np.ndarray  # float64, non-decreasing
+    amounts: np.ndarray  # float64
+
+    @classmethod
+    def from_flows(cls, flows: list[tuple[float, float]]) -> CashflowSchedule:
+        ordered = sorted(flows, key=lambda flow: flow[0])
+        return cls(
+            days=np.array([day for day, _ in ordered], dtype=np.float64),
+            amounts=np.array([amount for _, amount in ordered], dtype=np.float64),
+        )
+
+    def flows_until(self, horizon: float, terminal_value: float) -> list[tuple[float, float]]:
+        count = int(np.searchsorted(self.days, horizon, side='right'))
+        return [*zip(self.days[:count].tolist(), self.amounts[:count].tolist()), (horizon, terminal_value)]
+
+    def irr_at_horizons(
+        self,
+        horizons: np.ndarray,
+        terminal_values: np.ndarray,
+        guess: float = 0.1,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Solve the IRR at every horizon with batched Newton iterations.
+
+        Returns ``(rates, unsolved)``. ``rates`` is NaN where there is no
+        IRR in [IRR_LOW, IRR_HIGH], e.g. because the flows never change sign.
+        ``unsolved`` flags the horizons left to a scalar bracketing solver.
+
+        With a single sign change in the flows (generalized Descartes rule)
+        there is at most one root. Newton then finds the same root as any
+        bracketing method, so each batch starts from the last root of the
+        previous one: IRRs of consecutive horizons are close. With several
+        sign changes, several roots are possible and the root picked must not
+        depend on the neighbours: horizons bracketed by [IRR_LOW, IRR_HIGH]
+        are flagged, the others get a cold Newton start from 0.1, and are
+        flagged only if that fails while two IRR_PROBES still bracket a root.
+        """
+        horizons = np.asarray(horizons, dtype=np.float64)
+        terminal_values = np.asarray(terminal_values, dtype=np.float64)
+        counts = np.searchsorted(self.days, horizons, side='right')
+        has_pos, has_neg, changes = self._sign_profile(horizons, terminal_values, counts)
+        solvable = has_pos & has_neg
+
+        rates = np.full(len(horizons), np.nan)
+        unsolved = np.zeros(len(horizons), dtype=bool)
+
+        single = np.flatnonzero(solvable & (changes == 1))
+        for batch in np.array_split(single, -(-len(single) // _BATCH_SIZE)) if len(single) else []:
+            roots, converged = self._newton(horizons[batch], terminal_values[batch], counts[batch], guess, damped=True)
+            in_bounds = converged & (roots >= IRR_LOW) & (roots <= IRR_HIGH)
+            rates[batch[in_bounds]] = roots[in_bounds]
+            if in_bounds.any():
+                guess = float(roots[in_bounds][-1])
+            # Newton may fail on a root inside the bounds; a root outside them means no IRR.
+            failed = batch[~converged]
+            f_low = self._npv(horizons[failed], terminal_values[failed], counts[failed], IRR_LOW)
+            f_high = self._npv(horizons[failed], terminal_values[failed], counts[failed], IRR_HIGH)
+            unsolved[failed[np.isfinite(f_low) & np.isfinite(f_high) & (f_low * f_high <= 0)]] = True
+
+        several = np.flatnonzero(solvable & (changes != 1))
+        for batch in np.array_split(several, -(-len(several) // _BATCH_SIZE)) if len(several) else []:
+            probes = np.stack([
+                self._npv(horizons[batch], terminal_values[batch], counts[batch], rate) for rate in IRR_PROBES
+            ])
+            f_low, f_high = probes[0], probes[-1]
+            bracketed = np.isfinite(f_low) & np.isfinite(f_high) & (f_low * f_high <= 0)
+            unsolved[batch[bracketed]] = True
+            cold = ~bracketed
+            roots, converged = self._newton(horizons[batch[cold]], terminal_values[batch[cold]], counts[batch[cold]], 0.1)
+            in_bounds = converged & (roots >= IRR_LOW) & (roots <= IRR_HIGH)
+            rates[batch[cold][in_bounds]] = roots[in_bounds]
+            # Without a root from Newton, only a sign change between two probes can still give one.
+            prev, cur = probes[:-1, cold], probes[1:, cold]
+            crossing = (np.isfinite(prev) & np.isfinite(cur) & ((prev == 0) | (cur == 0) | (prev * cur < 0))).any(axis=0)
+            unsolved[batch[cold][~in_bounds & crossing]] = True
+        return rates, unsolved
+
+    def _sign_profile(
+        self, horizons: np.ndarray, terminal_values: np.ndarray, counts: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per horizon: any positive flow, any negative flow, sign changes of the per-day totals."""
+        has_pos = (np.concatenate([[0], np.cumsum(self.amounts > 0)])[counts] > 0) | (terminal_values > 0)
+        has_neg = (np.concatenate([[0], np.cumsum(self.amounts < 0)])[counts] > 0) | (terminal_values < 0)
+
+        # Flows of the same day share the exponent: group them before counting.
+        group_days, group_start = np.unique(self.days, return_index=True)
+        group_totals = np.add.reduceat(self.amounts, group_start) if len(self.amounts) else np.empty(0)
+        nonzero = np.flatnonzero(group_totals)
+        signs = np.sign(group_totals[nonzero])
+        # Sign changes among, and last sign of, the first i nonzero groups.
+        changes_upto = np.concatenate([[0, 0], np.cumsum(signs[1:] != signs[:-1])])
+        last_sign_upto = np.concatenate([[0.0], signs])
+
+        groups = np.searchsorted(group_days, horizons, side='right')
+        # A group on the horizon day merges with the terminal value.
+        on_horizon = (groups > 0) & (np.concatenate([[np.nan], group_days])[groups] == horizons)
+        groups = groups - on_horizon
+        last_total = terminal_values + np.where(on_horizon, np.concatenate([group_totals, [0.0]])[groups], 0.0)
+        seen = np.searchsorted(nonzero, groups)
+        last_sign = last_sign_upto[seen]
+        terminal_sign = np.sign(last_total)
+        changes = changes_upto[seen] + ((last_sign != 0) & (terminal_sign != 0) & (terminal_sign != last_sign))
+        return has_pos, has_neg, changes
+
+    def _terms(self, horizons: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Flow years and per-horizon flow weights (zero past the horizon)."""
+        width = int(counts.max()) if len(counts) else 0
+        weights = np.where(np.arange(width)[None, :] < counts[:, None], self.amounts[:width][None, :], 0.0)
+        return self.days[:width] / 365.0, weights
+
+    def _npv(self, horizons: np.ndarray, terminal_values: np.ndarray, counts: np.ndarray, rate: float) -> np.ndarray:
+        years, weights = self._terms(horizons, counts)
+        log_growth = np.log1p(rate)
+        return weights @ np.exp(-years * log_growth) + terminal_values * np.exp(-(horizons / 365.0) * log_growth)
+
+    def _newton(
+        self,
+        horizons: np.ndarray,
+        terminal_values: np.ndarray,
+        counts: np.ndarray,
+        guess: float,
+        *,
+        damped: bool = False,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Newton iterations on every horizon at once.
+
+        An iterate stepping below -100% fails, like the scalar solver, unless
+        ``damped``: it then moves halfway towards -100% instead.
+        """
+        years, weights = self._terms(horizons, counts)
+        terminal_years = horizons / 365.0
+
+        rates = np.full(len(horizons), guess)
+        converged = np.zeros(len(horizons), dtype=bool)
+        failed = np.zeros(len(horizons), dtype=bool)
+        for _ in range(_NEWTON_MAX_ITER):
+            idx = np.flatnonzero(~converged & ~failed)
+            if not len(idx):
+                break
+            rate = rates[idx]
+            log_growth = np.log1p(rate)
+            discount = np.exp(-years[None, :] * log_growth[:, None])
+            terminal_discount = np.exp(-terminal_years[idx] * log_growth)
+            value = (weights[idx] * discount).sum(axis=1) + terminal_values[idx] * terminal_discount
+            slope = (
+                (weights[idx] * -years[None, :] * discount).sum(axis=1)
+                - terminal_values[idx] * terminal_years[idx] * terminal_discount
+            ) / (1.0 + rate)
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                updated = rate - value / slope
+            if damped:
+                updated = np.where(updated <= -0.999999, (rate - 1.0) / 2.0, updated)
+            ok = np.isfinite(updated) & (updated > -0.999999)
+            failed[idx[~ok]] = True
+            rates[idx[ok]] = updated[ok]
+            done = ok & (np.abs(updated - rate) <= _NEWTON_TOL * np.maximum(1.0, np.abs(updated)))
+            converged[idx[done]] = True
+        return rates, converged
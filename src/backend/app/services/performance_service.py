@@ -2,8 +2,12 @@ from __future__ import annotations
 
 import logging
 import statistics
+from collections.abc import Iterator
 from datetime import date, timedelta
 from math import isfinite, sqrt
+from typing import TypeVar
+
+import numpy as np
 
 from ..models import (
     DrawdownPoint,
@@ -23,6 +27,9 @@ from ..models import (
     YearlyReturnItem,
 )
 from ..repository import PortfolioRepository
+from .irr import IRR_HIGH, IRR_LOW, IRR_PROBES, CashflowSchedule
+from .irr import npv as irr_npv
+from .irr import npv_derivative as irr_npv_derivative
 
 try:
     from scipy.optimize import brentq as scipy_brentq  # type: ignore
@@ -42,6 +49,15 @@ _PERIOD_TO_DAYS: dict[str, int] = {
     '3y': 1095,
 }
 
+PointT = TypeVar('PointT')
+
+
+def _points(model: type[PointT], columns: dict[str, list]) -> Iterator[PointT]:
+    """One ``model`` per entry of the ``dates`` column, built as the iterator is consumed."""
+    names = [name for name in columns if name != "dates"]
+    for day, *row in zip(columns["dates"], *(columns[name] for name in names)):
+        yield model(date=day, **dict(zip(names, row)))
+
 
 class PerformanceService:
     def __init__(self, repo: PortfolioRepository) -> None:
@@ -95,7 +111,8 @@ class PerformanceService:
             else:
                 cashflow_by_day[day] = cashflow_by_day.get(day, 0.0) + float(cf.amount)
 
-        start_value = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, start)
+        values = self.repo.get_portfolio_values_in_range(portfolio_id, user_id, start, end)
+        start_value = values[start]
 
         if start_value <= 0:
             first_positive_cf_day = next(
@@ -105,7 +122,7 @@ class PerformanceService:
             if first_positive_cf_day is not None:
                 start = first_positive_cf_day
                 period_days = max((end - start).days, 1)
-                start_value = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, start)
+                start_value = values[start]
 
         if start_value <= 0:
             return TWRResult(
@@ -121,7 +138,7 @@ class PerformanceService:
         subperiod_start_value = start_value
 
         for day in event_days + [end]:
-            end_value = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, day)
+            end_value = values[day]
             cf_amount = cashflow_by_day.get(day, 0.0) if day in event_days else 0.0
             if subperiod_start_value > 0:
                 r_i = (end_value - subperiod_start_value - cf_amount) / subperiod_start_value
@@ -152,8 +169,9 @@ class PerformanceService:
         period_days = max((end - start).days, 1)
 
         cashflows, use_trade_flows = self._get_cashflows_with_fallback(portfolio_id, user_id, start, end)
-        start_value = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, start)
-        end_value = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, end)
+        values = self.repo.get_portfolio_values_in_range(portfolio_id, user_id, start, end)
+        start_value = values[start]
+        end_value = values[end]
 
         # When using buy/sell as cashflows, adjust portfolio values to
         # exclude the cash impact of trades (avoid double-counting).
@@ -273,6 +291,26 @@ class PerformanceService:
         start_date: date | None = None,
         end_date: date | None = None,
     ) -> list[TWRTimeseriesPoint]:
+        return list(self.iter_twr_timeseries(portfolio_id, user_id, start_date, end_date))
+
+    def iter_twr_timeseries(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> Iterator[TWRTimeseriesPoint]:
+        """Queries run (and errors raise) now; points are built as the iterator is consumed."""
+        return _points(TWRTimeseriesPoint, self.get_twr_timeseries_columns(portfolio_id, user_id, start_date, end_date))
+
+    def get_twr_timeseries_columns(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> dict[str, list]:
+        """The series as a ``dates`` list plus one list per other TWRTimeseriesPoint field."""
         start, end = self._resolve_date_range(portfolio_id, user_id, start_date, end_date)
         cashflows, use_trade_flows = self._get_cashflows_with_fallback(portfolio_id, user_id, start, end)
 
@@ -285,22 +323,12 @@ class PerformanceService:
             else:
                 cf_by_day[day] = cf_by_day.get(day, 0.0) + float(cf.amount)
 
-        values: dict[date, float] = {}
-        cursor = start
-        while cursor <= end:
-            values[cursor] = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, cursor)
-            cursor += timedelta(days=1)
+        values = self.repo.get_portfolio_values_in_range(portfolio_id, user_id, start, end)
+        dates = [start.isoformat()]
+        cumulative_twr_pct = [0.0]
+        portfolio_value = [round(values.get(start, 0.0), 2)]
 
-        points: list[TWRTimeseriesPoint] = []
         cumulative = 1.0
-        points.append(
-            TWRTimeseriesPoint(
-                date=start.isoformat(),
-                cumulative_twr_pct=0.0,
-                portfolio_value=round(values.get(start, 0.0), 2),
-            )
-        )
-
         cursor = start + timedelta(days=1)
         while cursor <= end:
             prev_day = cursor - timedelta(days=1)
@@ -311,16 +339,12 @@ class PerformanceService:
             daily_return = (curr_value - prev_value - cf_amount) / prev_value if prev_value > 0 else 0.0
             cumulative *= 1.0 + daily_return
 
-            points.append(
-                TWRTimeseriesPoint(
-                    date=cursor.isoformat(),
-                    cumulative_twr_pct=round((cumulative - 1.0) * 100.0, 4),
-                    portfolio_value=round(curr_value, 2),
-                )
-            )
+            dates.append(cursor.isoformat())
+            cumulative_twr_pct.append(round((cumulative - 1.0) * 100.0, 4))
+            portfolio_value.append(round(curr_value, 2))
             cursor += timedelta(days=1)
 
-        return points
+        return {"dates": dates, "cumulative_twr_pct": cumulative_twr_pct, "portfolio_value": portfolio_value}
 
     def get_gain_timeseries(
         self,
@@ -329,6 +353,26 @@ class PerformanceService:
         start_date: date | None = None,
         end_date: date | None = None,
     ) -> list[GainTimeseriesPoint]:
+        return list(self.iter_gain_timeseries(portfolio_id, user_id, start_date, end_date))
+
+    def iter_gain_timeseries(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> Iterator[GainTimeseriesPoint]:
+        """Queries run (and errors raise) now; points are built as the iterator is consumed."""
+        return _points(GainTimeseriesPoint, self.get_gain_timeseries_columns(portfolio_id, user_id, start_date, end_date))
+
+    def get_gain_timeseries_columns(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> dict[str, list]:
+        """The series as a ``dates`` list plus one list per other GainTimeseriesPoint field."""
         start, end = self._resolve_date_range(portfolio_id, user_id, start_date, end_date)
         cashflows, use_trade_flows = self._get_cashflows_with_fallback(portfolio_id, user_id, start, end)
 
@@ -340,24 +384,30 @@ class PerformanceService:
             if cf.side in invest_sides:
                 cf_by_day[day] = cf_by_day.get(day, 0.0) + float(cf.amount)
 
-        points: list[GainTimeseriesPoint] = []
+        values = self.repo.get_portfolio_values_in_range(portfolio_id, user_id, start, end)
+        dates: list[str] = []
+        portfolio_value: list[float] = []
+        net_invested: list[float] = []
+        absolute_gain: list[float] = []
+
         cumulative_invested = 0.0
         cursor = start
         while cursor <= end:
             cumulative_invested += cf_by_day.get(cursor, 0.0)
-            pv = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, cursor)
+            pv = values[cursor]
             gain = pv - cumulative_invested
-            points.append(
-                GainTimeseriesPoint(
-                    date=cursor.isoformat(),
-                    portfolio_value=round(pv, 2),
-                    net_invested=round(cumulative_invested, 2),
-                    absolute_gain=round(gain, 2),
-                )
-            )
+            dates.append(cursor.isoformat())
+            portfolio_value.append(round(pv, 2))
+            net_invested.append(round(cumulative_invested, 2))
+            absolute_gain.append(round(gain, 2))
             cursor += timedelta(days=1)
 
-        return points
+        return {
+            "dates": dates,
+            "portfolio_value": portfolio_value,
+            "net_invested": net_invested,
+            "absolute_gain": absolute_gain,
+        }
 
     def get_mwr_timeseries(
         self,
@@ -366,20 +416,36 @@ class PerformanceService:
         start_date: date | None = None,
         end_date: date | None = None,
     ) -> list[MWRTimeseriesPoint]:
+        return list(self.iter_mwr_timeseries(portfolio_id, user_id, start_date, end_date))
+
+    def iter_mwr_timeseries(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> Iterator[MWRTimeseriesPoint]:
+        """Queries run (and errors raise) now; points are built as the iterator is consumed."""
+        return _points(MWRTimeseriesPoint, self.get_mwr_timeseries_columns(portfolio_id, user_id, start_date, end_date))
+
+    def get_mwr_timeseries_columns(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> dict[str, list]:
+        """The series as a ``dates`` list plus one list per other MWRTimeseriesPoint field."""
         start, end = self._resolve_date_range(portfolio_id, user_id, start_date, end_date)
         period_days = (end - start).days
 
-        # Weekly sampling for periods > 365 days to limit IRR solves
-        if period_days > 365:
-            step = 7
-        else:
-            step = 1
-
         # Pre-fetch all cashflows once (with buy/sell fallback)
         cashflows, use_trade_flows = self._get_cashflows_with_fallback(portfolio_id, user_id, start, end)
-        start_value = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, start)
+        values = self.repo.get_portfolio_values_in_range(portfolio_id, user_id, start, end)
+        start_value = values[start]
 
         # When using buy/sell as cashflows, adjust start_value to asset-only
+        cash_before = 0.0
         if use_trade_flows:
             all_before = self.repo.get_external_cashflows(
                 portfolio_id, user_id, end_date=start, include_trades=True,
@@ -387,84 +453,42 @@ class PerformanceService:
             cash_before = sum(cf.amount for cf in all_before if cf.side in ("buy", "sell"))
             start_value = start_value - cash_before
 
-        # Pre-compute cashflow list with day offsets
-        cf_entries: list[tuple[date, float, float]] = []  # (day, days_from_start, amount_investor)
+        # Investor flows after the start day, plus the initial value as an outflow.
+        flows: list[tuple[float, float]] = []
+        if start_value != 0:
+            flows.append((0.0, -float(start_value)))
+        trade_cash = np.zeros(period_days + 1)
         for cf in cashflows:
-            day = date.fromisoformat(cf.date)
-            days_offset = float((day - start).days)
-            cf_entries.append((day, days_offset, -float(cf.amount)))
+            offset = (date.fromisoformat(cf.date) - start).days
+            if offset <= 0 or offset > period_days:
+                continue
+            flows.append((float(offset), -float(cf.amount)))
+            if use_trade_flows and cf.side in ("buy", "sell"):
+                trade_cash[offset] += float(cf.amount)
+        schedule = CashflowSchedule.from_flows(flows)
 
-        # Pre-compute buy/sell cash by day for value adjustments
-        trade_cash_by_day: dict[date, float] = {}
+        # Value at every cursor day; with trade flows, asset-only (minus trade cash to date).
+        horizons = np.arange(1, period_days + 1, dtype=np.float64)
+        terminal_values = np.array(
+            [float(values[start + timedelta(days=offset)]) for offset in range(1, period_days + 1)]
+        )
         if use_trade_flows:
-            for cf in cashflows:
-                if cf.side in ("buy", "sell"):
-                    day = date.fromisoformat(cf.date)
-                    trade_cash_by_day[day] = trade_cash_by_day.get(day, 0.0) + float(cf.amount)
-
-        points: list[MWRTimeseriesPoint] = []
-        points.append(MWRTimeseriesPoint(date=start.isoformat(), cumulative_mwr_pct=0.0))
-
-        cursor = start + timedelta(days=step)
-        while cursor <= end:
-            cursor_days = float((cursor - start).days)
-            cursor_value = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, cursor)
-
-            # When using trade flows, adjust cursor_value to asset-only
-            if use_trade_flows:
-                cash_up_to_cursor = sum(
-                    amt for day, amt in trade_cash_by_day.items() if start < day <= cursor
-                )
-                cursor_value = cursor_value - cash_before - cash_up_to_cursor
-
-            # Build flows for start..cursor
-            flows: list[tuple[float, float]] = []
-            if start_value != 0:
-                flows.append((0.0, -float(start_value)))
-            for day, days_offset, inv_amount in cf_entries:
-                if day <= cursor and day > start:
-                    flows.append((days_offset, inv_amount))
-            flows.append((cursor_days, float(cursor_value)))
-
-            mwr_pct: float | None = None
-            if flows:
-                has_pos = any(cf > 0 for _, cf in flows)
-                has_neg = any(cf < 0 for _, cf in flows)
-                if has_pos and has_neg:
-                    rate = self._solve_irr(flows)
-                    if rate is not None and isfinite(rate):
-                        mwr_pct = round(rate * 100.0, 4)
-
-            points.append(MWRTimeseriesPoint(date=cursor.isoformat(), cumulative_mwr_pct=mwr_pct))
-            cursor += timedelta(days=step)
-
-        # Ensure the last point is exactly 'end' if we didn't land on it
-        if points[-1].date != end.isoformat():
-            cursor_days = float((end - start).days)
-            end_value = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, end)
-            if use_trade_flows:
-                total_trade_cash = sum(trade_cash_by_day.values())
-                end_value = end_value - cash_before - total_trade_cash
-            flows = []
-            if start_value != 0:
-                flows.append((0.0, -float(start_value)))
-            for day, days_offset, inv_amount in cf_entries:
-                if day <= end and day > start:
-                    flows.append((days_offset, inv_amount))
-            flows.append((cursor_days, float(end_value)))
-
-            mwr_pct = None
-            if flows:
-                has_pos = any(cf > 0 for _, cf in flows)
-                has_neg = any(cf < 0 for _, cf in flows)
-                if has_pos and has_neg:
-                    rate = self._solve_irr(flows)
-                    if rate is not None and isfinite(rate):
-                        mwr_pct = round(rate * 100.0, 4)
-
-            points.append(MWRTimeseriesPoint(date=end.isoformat(), cumulative_mwr_pct=mwr_pct))
-
-        return points
+            terminal_values = terminal_values - cash_before - np.cumsum(trade_cash)[1:]
+
+        rates, unsolved = schedule.irr_at_horizons(horizons, terminal_values)
+        # Horizons with several sign changes (or no Newton convergence) go
+        # through the scalar solver from its default guess, so that the root
+        # picked among several does not depend on the neighbouring horizons.
+        for k in np.flatnonzero(unsolved).tolist():
+            rate = self._solve_irr(schedule.flows_until(horizons[k], terminal_values[k]))
+            rates[k] = rate if rate is not None and isfinite(rate) else np.nan
+
+        return {
+            "dates": [(start + timedelta(days=offset)).isoformat() for offset in range(period_days + 1)],
+            "cumulative_mwr_pct": [0.0] + [
+                round(rate * 100.0, 4) if isfinite(rate) else None for rate in rates.tolist()
+            ],
+        }
 
     # --- Advanced analytics ---
 
@@ -496,9 +520,11 @@ class PerformanceService:
             else:
                 cf_by_day[day] = cf_by_day.get(day, 0.0) + float(cf.amount)
 
+        values = self.repo.get_portfolio_values_in_range(portfolio_id, user_id, start, end)
+
         daily_series: list[dict] = []
         cumulative = 1.0
-        prev_value = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, start)
+        prev_value = values[start]
         daily_series.append({'date': start, 'cumulative_twr': cumulative, 'portfolio_value': prev_value})
 
         # Track month boundaries for monthly returns
@@ -508,7 +534,7 @@ class PerformanceService:
 
         cursor = start + timedelta(days=1)
         while cursor <= end:
-            curr_value = self.repo.get_portfolio_value_at_date(portfolio_id, user_id, cursor)
+            curr_value = values[cursor]
             cf_amount = float(cf_by_day.get(cursor, 0.0))
 
             if prev_value > 0:
@@ -586,6 +612,38 @@ class PerformanceService:
         start_date: date | None = None,
         end_date: date | None = None,
     ) -> DrawdownResponse:
+        header, points = self.stream_drawdown(portfolio_id, user_id, start_date, end_date)
+        return DrawdownResponse(points=list(points), **header)
+
+    def get_drawdown_columns(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> dict:
+        """DrawdownResponse fields with the points as ``dates``/``drawdown_pct`` columns."""
+        header, columns = self._drawdown(portfolio_id, user_id, start_date, end_date)
+        return {**header, **columns}
+
+    def stream_drawdown(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> tuple[dict, Iterator[DrawdownPoint]]:
+        """DrawdownResponse fields other than ``points``, and the points as a lazy iterator."""
+        header, columns = self._drawdown(portfolio_id, user_id, start_date, end_date)
+        return header, _points(DrawdownPoint, columns)
+
+    def _drawdown(
+        self,
+        portfolio_id: int,
+        user_id: str,
+        start_date: date | None,
+        end_date: date | None,
+    ) -> tuple[dict, dict[str, list]]:
         start, end = self._resolve_date_range(portfolio_id, user_id, start_date, end_date)
         daily, _ = self._build_monthly_returns(portfolio_id, user_id, start, end)
 
@@ -596,7 +654,7 @@ class PerformanceService:
         max_dd_start: date | None = None
         max_dd_end: date | None = None
         current_dd_start: date | None = None
-        points: list[DrawdownPoint] = []
+        drawdowns: list[float] = []
 
         for d in daily:
             cum = d['cumulative_twr']
@@ -613,16 +671,12 @@ class PerformanceService:
                 max_dd_start = current_dd_start
                 max_dd_end = d['date']
 
-            points.append(DrawdownPoint(
-                date=d['date'].isoformat(),
-                drawdown_pct=round(dd, 4),
-            ))
+            drawdowns.append(round(dd, 4))
 
-        current_dd = points[-1].drawdown_pct if points else 0.0
+        current_dd = drawdowns[-1] if drawdowns else 0.0
 
-        return DrawdownResponse(
+        header = dict(
             portfolio_id=portfolio_id,
-            points=points,
             max_drawdown_pct=round(max_dd, 4),
             max_drawdown_start=max_dd_start.isoformat() if max_dd_start else None,
             max_drawdown_end=max_dd_end.isoformat() if max_dd_end else None,
@@ -630,6 +684,7 @@ class PerformanceService:
             peak_date=peak_date.isoformat() if peak_date else None,
             peak_value=round(peak_value, 2) if peak_value is not None else None,
         )
+        return header, {"dates": [d['date'].isoformat() for d in daily], "drawdown_pct": drawdowns}
 
     def get_rolling_windows(
         self,
@@ -794,30 +849,21 @@ class PerformanceService:
         return labels.get(period, period)
 
     def _solve_irr(self, flows: list[tuple[float, float]]) -> float | None:
+        days = np.array([day for day, _ in flows], dtype=np.float64)
+        amounts = np.array([cf for _, cf in flows], dtype=np.float64)
+
         def npv(rate: float) -> float:
-            if rate <= -0.999999:
-                return float('inf')
-            total = 0.0
-            for days, cf in flows:
-                total += cf / ((1.0 + rate) ** (days / 365.0))
-            return total
+            return irr_npv(rate, days, amounts)
 
         def d_npv(rate: float) -> float:
-            if rate <= -0.999999:
-                return float('inf')
-            total = 0.0
-            for days, cf in flows:
-                t = days / 365.0
-                total += (-t * cf) / ((1.0 + rate) ** (t + 1.0))
-            return total
-
-        # Realistic bounds: -99% to +1000% annualized
-        low = -0.99
-        high = 10.0
+            return irr_npv_derivative(rate, days, amounts)
+
+        low = IRR_LOW
+        high = IRR_HIGH
 
         # Detect multiple zero crossings (sign changes) to warn about
         # ambiguous IRR when cashflows change sign multiple times.
-        probe_points = [-0.99, -0.9, -0.5, -0.2, 0.0, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0]
+        probe_points = IRR_PROBES
         sign_changes = 0
         prev_f = npv(probe_points[0])
         for x in probe_points[1:]:
@@ -875,8 +921,8 @@ class PerformanceService:
         return (low + high) / 2.0
 
     def _search_bisection(self, fn) -> float | None:
-        low = -0.99
-        probes = [-0.9, -0.5, -0.2, 0.0, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0]
+        low = IRR_PROBES[0]
+        probes = IRR_PROBES[1:]
         prev_x = low
         prev_f = fn(prev_x)
         for x in probes:
@@ -33,7 +33,7 @@ from ._monte_carlo import (
     _simulate_decumulation_paths,
     _solve_sustainable_withdrawal,
 )
-from ._xray import compute_portfolio_xray
+from ._xray import compute_portfolio_xray, compute_portfolio_xray_async
 
 __all__ = [
     "AnalyzedHolding",
@@ -60,4 +60,5 @@ __all__ = [
     "_simulate_decumulation_paths",
     "_solve_sustainable_withdrawal",
     "compute_portfolio_xray",
+    "compute_portfolio_xray_async",
 ]
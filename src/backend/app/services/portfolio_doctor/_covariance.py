@@ -0,0 +1,133 @@
+import math
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+from ...repository import AssetLogReturns, PortfolioRepository
+from ._prices import RETURN_LOOKBACK_DAYS
+
+TRADING_DAYS_PER_YEAR = 252
+MIN_RETURN_OBSERVATIONS = 20
+COVARIANCE_ESTIMATORS = ("sample", "shrinkage")
+
+
+@dataclass
+class CovarianceModel:
+    """Daily log-return covariance for a set of assets.
+
+    ``shrinkage`` is the Ledoit-Wolf intensity (0 for the sample estimator).
+    """
+
+    asset_ids: list[int]
+    mean_returns: np.ndarray
+    covariance: np.ndarray
+    estimator: str
+    shrinkage: float
+    observations: int
+
+    def weight_vector(self, weights: dict[int, float]) -> np.ndarray:
+        """Weights aligned on ``asset_ids`` and rescaled to sum to one."""
+        vector = np.array([max(0.0, weights.get(asset_id, 0.0)) for asset_id in self.asset_ids])
+        total = vector.sum()
+        return vector / total if total > 0 else vector
+
+    def portfolio_variance(self, weights: dict[int, float]) -> float:
+        """Daily variance w'Σw of the portfolio."""
+        w = self.weight_vector(weights)
+        return max(0.0, float(w @ self.covariance @ w))
+
+    def annualized_volatility(self, weights: dict[int, float]) -> float:
+        return math.sqrt(self.portfolio_variance(weights) * TRADING_DAYS_PER_YEAR)
+
+
+def _aligned_log_returns(
+    returns_by_asset: dict[int, AssetLogReturns],
+    min_observations: int = MIN_RETURN_OBSERVATIONS,
+) -> tuple[list[int], np.ndarray]:
+    """Align per-asset returns on a common (dates x assets) grid.
+
+    Assets with fewer than ``min_observations`` returns are left out. The grid
+    starts when every kept asset has started trading; a missing day counts as a
+    zero return, the move being booked on the next bar (as with forward-filled
+    closes).
+    """
+    kept = [item for item in returns_by_asset.values() if len(item.log_returns) >= min_observations]
+    if not kept:
+        return [], np.empty((0, 0))
+    kept.sort(key=lambda item: item.asset_id)
+
+    common_start = max(item.dates[0] for item in kept)
+    dates = sorted({day for item in kept for day in item.dates if day >= common_start})
+    row_by_date = {day: idx for idx, day in enumerate(dates)}
+    matrix = np.zeros((len(dates), len(kept)))
+    for col, item in enumerate(kept):
+        for day, value in zip(item.dates, item.log_returns):
+            row = row_by_date.get(day)
+            if row is not None:
+                matrix[row, col] = value
+    return [item.asset_id for item in kept], matrix
+
+
+def _sample_covariance(returns: np.ndarray) -> np.ndarray:
+    return np.atleast_2d(np.cov(returns, rowvar=False, ddof=1))
+
+
+def _shrinkage_covariance(returns: np.ndarray) -> tuple[np.ndarray, float]:
+    """Ledoit-Wolf shrinkage towards a scaled identity.
+
+    Returns (covariance, shrinkage intensity in [0, 1]).
+    """
+    n, p = returns.shape
+    centered = returns - returns.mean(axis=0)
+    sample = centered.T @ centered / n
+    mu = float(np.trace(sample)) / p
+    target_gap = sample - mu * np.eye(p)
+    delta = float((target_gap**2).sum()) / p
+    if delta <= 0:
+        return sample, 0.0
+
+    squared = centered**2
+    beta = float((squared.T @ squared / n - sample**2).sum()) / (p * n)
+    shrinkage = min(beta, delta) / delta
+    return shrinkage * mu * np.eye(p) + (1.0 - shrinkage) * sample, shrinkage
+
+
+def estimate_covariance(
+    returns_by_asset: dict[int, AssetLogReturns],
+    estimator: str = "shrinkage",
+) -> CovarianceModel | None:
+    if estimator not in COVARIANCE_ESTIMATORS:
+        raise ValueError(f"Stimatore di covarianza non supportato: {estimator}")
+
+    asset_ids, returns = _aligned_log_returns(returns_by_asset)
+    if not asset_ids or returns.shape[0] < MIN_RETURN_OBSERVATIONS:
+        return None
+
+    if estimator == "sample":
+        covariance, shrinkage = _sample_covariance(returns), 0.0
+    else:
+        covariance, shrinkage = _shrinkage_covariance(returns)
+    return CovarianceModel(
+        asset_ids=asset_ids,
+        mean_returns=returns.mean(axis=0),
+        covariance=covariance,
+        estimator=estimator,
+        shrinkage=shrinkage,
+        observations=int(returns.shape[0]),
+    )
+
+
+def _load_covariance_model(
+    repo: PortfolioRepository,
+    asset_ids: list[int],
+    estimator: str = "shrinkage",
+    lookback_days: int = RETURN_LOOKBACK_DAYS,
+) -> CovarianceModel | None:
+    """Covariance over the trailing lookback, built from the repository's
+    cached per-asset log returns."""
+    if not asset_ids:
+        return None
+    start_date = date.today() - timedelta(days=lookback_days)
+    returns_by_asset = repo.get_asset_log_returns(asset_ids, start_date)
+    return estimate_covariance(returns_by_asset, estimator=estimator)
@@ -1,10 +1,4 @@
 import logging
-import math
-import statistics
-from collections import defaultdict
-from datetime import date, timedelta
-
-from sqlalchemy import text
 
 from ...repository import PortfolioRepository
 from ...schemas.portfolio_doctor import (
@@ -24,6 +18,7 @@ from ...constants.geo_classification import (
 )
 from ...finance_client import normalize_expense_ratio_pct
 from ._holdings import AnalyzedHolding, _load_holdings, _is_equity_like
+from ._covariance import _load_covariance_model
 from .education_templates import enrich_alerts_with_education
 
 logger = logging.getLogger(__name__)
@@ -364,50 +359,25 @@ def dominant_region(holding: AnalyzedHolding) -> str:
     return max(profile.items(), key=lambda item: item[1])[0]
 
 
-def compute_portfolio_volatility(repo: PortfolioRepository, holdings: list[AnalyzedHolding]) -> float | None:
+def compute_portfolio_volatility(
+    repo: PortfolioRepository,
+    holdings: list[AnalyzedHolding],
+    estimator: str = "shrinkage",
+) -> float | None:
+    """Annualized portfolio volatility (%) from sqrt(w'Σw), so correlations
+    between holdings are taken into account.  Weights are rescaled over the
+    holdings with enough price history."""
     asset_ids = [holding.asset_id for holding in holdings if holding.asset_type != "cash"]
     if not asset_ids:
         return None
 
-    start_date = date.today() - timedelta(days=370)
-    with repo.engine.begin() as conn:
-        rows = conn.execute(
-            text(
-                """
-                select asset_id, price_date, close::float8 as close
-                from price_bars_1d
-                where asset_id = any(:asset_ids)
-                  and price_date >= :start_date
-                order by asset_id asc, price_date asc
-                """
-            ),
-            {"asset_ids": asset_ids, "start_date": start_date},
-        ).mappings().all()
-
-    prices_by_asset: dict[int, list[float]] = defaultdict(list)
-    for row in rows:
-        close = float(row["close"])
-        if close > 0 and math.isfinite(close):
-            prices_by_asset[int(row["asset_id"])].append(close)
-
-    weighted_volatility = 0.0
-    covered_weight = 0.0
-    for holding in holdings:
-        series = prices_by_asset.get(holding.asset_id, [])
-        if len(series) < 20:
-            continue
-        returns = [(curr / prev) - 1.0 for prev, curr in zip(series, series[1:]) if prev > 0 and curr > 0]
-        if len(returns) < 20:
-            continue
-        daily_volatility = statistics.pstdev(returns)
-        annualized = daily_volatility * math.sqrt(252) * 100.0
-        weight_fraction = holding.weight_pct / 100.0
-        weighted_volatility += annualized * weight_fraction
-        covered_weight += weight_fraction
-
-    if covered_weight == 0:
+    model = _load_covariance_model(repo, asset_ids, estimator=estimator)
+    if model is None:
+        return None
+    weights = {holding.asset_id: holding.weight_pct / 100.0 for holding in holdings}
+    if sum(weights.get(asset_id, 0.0) for asset_id in model.asset_ids) <= 0:
         return None
-    return round(weighted_volatility / covered_weight, 1)
+    return round(model.annualized_volatility(weights) * 100.0, 1)
 
 
 def compute_weighted_ter(
@@ -1,13 +1,14 @@
 import logging
 import math
-import statistics
-from collections import defaultdict
 from dataclasses import dataclass
 from datetime import date, timedelta
 
+import numpy as np
 from sqlalchemy import text
 
+from ...models import Position
 from ...repository import PortfolioRepository
+from ._prices import RETURN_LOOKBACK_DAYS, PriceMatrix, _load_price_matrix
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +25,10 @@ class AnalyzedHolding:
 
 
 def _load_holdings(repo: PortfolioRepository, portfolio_id: int, user_id: str) -> list[AnalyzedHolding]:
-    positions = repo.get_positions(portfolio_id, user_id)
+    return _analyze_positions(repo, repo.get_positions(portfolio_id, user_id))
+
+
+def _analyze_positions(repo: PortfolioRepository, positions: list[Position]) -> list[AnalyzedHolding]:
     if not positions:
         return []
 
@@ -79,14 +83,13 @@ def _normalize_portfolio_ids(portfolio_ids: list[int]) -> list[int]:
     return normalized
 
 
-def _load_aggregate_holdings(
+def _aggregate_holdings(
     repo: PortfolioRepository,
-    portfolio_ids: list[int],
-    user_id: str,
+    positions_by_portfolio: list[list[Position]],
 ) -> list[AnalyzedHolding]:
     holdings: list[AnalyzedHolding] = []
-    for portfolio_id in portfolio_ids:
-        holdings.extend(_load_holdings(repo, portfolio_id, user_id))
+    for positions in positions_by_portfolio:
+        holdings.extend(_analyze_positions(repo, positions))
     return _rebalance_holdings_by_market_value(holdings)
 
 
@@ -115,87 +118,38 @@ def _rebalance_holdings_by_market_value(holdings: list[AnalyzedHolding]) -> list
 def _compute_portfolio_return_params(
     repo: PortfolioRepository,
     holdings: list[AnalyzedHolding],
+    prices: PriceMatrix | None = None,
 ) -> tuple[float, float, float]:
     """Return (mu_annual, sigma_annual, df_t) where df_t is the estimated
     degrees-of-freedom for a Student-t model of returns (used by Monte Carlo
     to capture fat tails).  Falls back to a large df (normal-like) when
-    kurtosis estimation is not reliable."""
+    kurtosis estimation is not reliable.
+
+    ``prices`` lets the caller share a matrix already loaded for the request."""
     asset_ids = [h.asset_id for h in holdings if h.asset_type != "cash"]
     if not asset_ids:
         return 0.0, 0.0, 30.0
 
-    start_date = date.today() - timedelta(days=370)
-    with repo.engine.begin() as conn:
-        rows = conn.execute(
-            text(
-                """
-                select asset_id, price_date, close::float8 as close
-                from price_bars_1d
-                where asset_id = any(:asset_ids)
-                  and price_date >= :start_date
-                order by asset_id asc, price_date asc
-                """
-            ),
-            {"asset_ids": asset_ids, "start_date": start_date},
-        ).mappings().all()
-
-    prices_by_asset: dict[int, list[float]] = defaultdict(list)
-    dates_by_asset: dict[int, list[date]] = defaultdict(list)
-    for row in rows:
-        close = float(row["close"])
-        if close > 0 and math.isfinite(close):
-            aid = int(row["asset_id"])
-            prices_by_asset[aid].append(close)
-            dates_by_asset[aid].append(row["price_date"])
-
-    all_dates: set[date] = set()
-    for series_dates in dates_by_asset.values():
-        all_dates.update(series_dates)
-    if len(all_dates) < 20:
+    start_date = date.today() - timedelta(days=RETURN_LOOKBACK_DAYS)
+    if prices is None:
+        prices = _load_price_matrix(repo, asset_ids)
+    prices = prices.window(start_date)
+    if len(prices.dates) < 20:
         return 0.0, 0.0, 30.0
 
-    sorted_dates = sorted(all_dates)
-    price_lookup: dict[int, dict[date, float]] = {}
-    for asset_id, series_dates in dates_by_asset.items():
-        price_lookup[asset_id] = {
-            day: price
-            for day, price in zip(series_dates, prices_by_asset[asset_id])
-        }
-
     weight_map = {h.asset_id: h.weight_pct / 100.0 for h in holdings}
-    total_weight = sum(weight_map.values())
-    if total_weight <= 0:
-        return 0.0, 0.0
-
-    portfolio_values: list[float] = []
-    for current_date in sorted_dates:
-        value = 0.0
-        for asset_id, weight in weight_map.items():
-            series_prices = prices_by_asset.get(asset_id, [])
-            series_dates = dates_by_asset.get(asset_id, [])
-            if series_prices and series_dates:
-                latest_price = series_prices[0]
-                for series_date, series_price in zip(series_dates, series_prices):
-                    if series_date > current_date:
-                        break
-                    latest_price = series_price
-                base_price = series_prices[0]
-                normalized_value = latest_price / base_price if base_price > 0 else 1.0
-            else:
-                normalized_value = 1.0
-            value += normalized_value * (weight / total_weight)
-        portfolio_values.append(value)
-
-    log_returns = [
-        math.log(curr / prev)
-        for prev, curr in zip(portfolio_values, portfolio_values[1:])
-        if prev > 0 and curr > 0
-    ]
+    portfolio_values = prices.weighted_index(weight_map)
+    if portfolio_values.size == 0:
+        return 0.0, 0.0, 30.0
+
+    prev, curr = portfolio_values[:-1], portfolio_values[1:]
+    valid = (prev > 0) & (curr > 0)
+    log_returns = np.log(curr[valid] / prev[valid])
     if len(log_returns) < 20:
         return 0.0, 0.0, 30.0
 
-    mu_daily = statistics.mean(log_returns)
-    sigma_daily = statistics.pstdev(log_returns)
+    mu_daily = float(np.mean(log_returns))
+    sigma_daily = float(np.std(log_returns))
 
     # Estimate excess kurtosis to calibrate Student-t degrees of freedom.
     # For a t-distribution with df > 4, excess_kurtosis = 6 / (df - 4),
@@ -204,7 +158,7 @@ def _compute_portfolio_return_params(
     # heavy tails observed in real equity markets.
     n = len(log_returns)
     if n >= 30 and sigma_daily > 0:
-        m4 = sum((r - mu_daily) ** 4 for r in log_returns) / n
+        m4 = float(np.mean((log_returns - mu_daily) ** 4))
         excess_kurt = (m4 / sigma_daily**4) - 3.0
         if excess_kurt > 0.2:
             df_t = max(3.0, min(30.0, 6.0 / excess_kurt + 4.0))
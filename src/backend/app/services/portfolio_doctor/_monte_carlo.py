@@ -1,6 +1,8 @@
 import logging
 import math
-import random
+from dataclasses import dataclass
+
+import numpy as np
 
 from ...repository import PortfolioRepository
 from ...schemas.portfolio_doctor import (
@@ -11,18 +13,21 @@ from ...schemas.portfolio_doctor import (
     MonteCarloYearProjection,
 )
 from ._holdings import (
+    _aggregate_holdings,
+    _analyze_positions,
     _compute_portfolio_return_params,
-    _load_aggregate_holdings,
     _load_holdings,
     _normalize_portfolio_ids,
-    _percentile,
 )
 
 logger = logging.getLogger(__name__)
 
 NUM_SIMULATIONS = 5_000
+PROJECTION_NUM_SIMULATIONS = 50_000
 MAX_PROJECTION_YEARS = 20
 PROJECTION_HORIZONS = [5, 10, 20]
+PROJECTION_PERCENTILES = [10, 25, 50, 75, 90]
+TARGET_SUCCESS_RATE_PCT = 90.0
 
 
 def run_monte_carlo_projection(
@@ -45,7 +50,7 @@ def run_monte_carlo_projection(
 
     return MonteCarloProjectionResponse(
         portfolio_id=portfolio_id,
-        num_simulations=NUM_SIMULATIONS,
+        num_simulations=PROJECTION_NUM_SIMULATIONS,
         horizons=PROJECTION_HORIZONS,
         projections=projections,
         annualized_mean_return_pct=round(mu_annual * 100, 2),
@@ -62,16 +67,20 @@ def run_decumulation_plan(
     other_income_annual: float = 0.0,
     capital_gains_tax_rate_pct: float = 26.0,
     current_age: int | None = None,
+    target_success_rate_pct: float = TARGET_SUCCESS_RATE_PCT,
     user_id: str | None = None,
 ) -> DecumulationPlanResponse:
     if not user_id:
         raise ValueError("Utente non valido")
 
-    summary = repo.get_summary(portfolio_id, user_id)
+    # Summary and positions share one connection, released before the simulations.
+    with repo.unit_of_work():
+        summary = repo.get_summary(portfolio_id, user_id)
+        positions = repo.get_positions(portfolio_id, user_id)
     initial_capital = max(0.0, float(summary.market_value) + float(summary.cash_balance))
     initial_cost_basis = max(0.0, float(summary.cost_basis) + float(summary.cash_balance))
     estimated_embedded_gain_ratio_pct = _estimate_embedded_gain_ratio(initial_capital, initial_cost_basis) * 100
-    holdings = _load_holdings(repo, portfolio_id, user_id)
+    holdings = _analyze_positions(repo, positions)
 
     mu_annual, sigma_annual, df_t = _compute_portfolio_return_params(repo, holdings) if holdings else (0.0, 0.0, 30.0)
     sustainable_withdrawal = _solve_sustainable_withdrawal(
@@ -94,8 +103,11 @@ def run_decumulation_plan(
             capital_gains_tax_rate_pct=capital_gains_tax_rate_pct,
             estimated_embedded_gain_ratio_pct=estimated_embedded_gain_ratio_pct,
             current_age=current_age,
+            target_success_rate_pct=target_success_rate_pct,
         )
 
+    # One growth matrix feeds both the plan and the target-success solver.
+    growth = _decumulation_growth(years=years, mu_annual=mu_annual, sigma_annual=sigma_annual, df_t=df_t)
     paths = _simulate_decumulation_paths(
         initial_capital=initial_capital,
         initial_cost_basis=initial_cost_basis,
@@ -107,9 +119,20 @@ def run_decumulation_plan(
         mu_annual=mu_annual,
         sigma_annual=sigma_annual,
         df_t=df_t,
+        growth=growth,
     )
-    final_values = sorted(path["ending_capitals"][-1] for path in paths)
-    success_count = sum(1 for path in paths if path["ending_capitals"][-1] > 0)
+    target_success_withdrawal = _solve_success_rate_withdrawal(
+        growth=growth,
+        initial_capital=initial_capital,
+        initial_cost_basis=initial_cost_basis,
+        inflation_rate_pct=inflation_rate_pct,
+        other_income_annual=other_income_annual,
+        capital_gains_tax_rate_pct=capital_gains_tax_rate_pct,
+        target_success_rate_pct=target_success_rate_pct,
+    )
+    final_values = paths.ending_capitals[:, -1]
+    success_count = int(np.count_nonzero(final_values > 0))
+    p25_terminal, p50_terminal, p75_terminal = (float(value) for value in np.percentile(final_values, [25, 50, 75]))
     projections = _build_decumulation_projections(
         paths=paths,
         years=years,
@@ -131,11 +154,13 @@ def run_decumulation_plan(
         annualized_mean_return_pct=round(mu_annual * 100, 2),
         annualized_volatility_pct=round(sigma_annual * 100, 2),
         sustainable_withdrawal=round(max(0.0, sustainable_withdrawal), 2),
+        target_success_rate_pct=round(target_success_rate_pct, 1),
+        target_success_withdrawal=round(target_success_withdrawal, 2),
         success_rate_pct=round((success_count / NUM_SIMULATIONS) * 100, 1),
         depletion_probability_pct=round(((NUM_SIMULATIONS - success_count) / NUM_SIMULATIONS) * 100, 1),
-        p25_terminal_value=round(_percentile(final_values, 25), 2),
-        p50_terminal_value=round(_percentile(final_values, 50), 2),
-        p75_terminal_value=round(_percentile(final_values, 75), 2),
+        p25_terminal_value=round(p25_terminal, 2),
+        p50_terminal_value=round(p50_terminal, 2),
+        p75_terminal_value=round(p75_terminal, 2),
         depletion_year_p50=depletion_year_p50,
         projections=projections,
     )
@@ -150,6 +175,7 @@ def run_aggregate_decumulation_plan(
     other_income_annual: float = 0.0,
     capital_gains_tax_rate_pct: float = 26.0,
     current_age: int | None = None,
+    target_success_rate_pct: float = TARGET_SUCCESS_RATE_PCT,
     user_id: str | None = None,
 ) -> AggregateDecumulationPlanResponse:
     if not user_id:
@@ -159,21 +185,24 @@ def run_aggregate_decumulation_plan(
     if not normalized_ids:
         raise ValueError("Seleziona almeno un portafoglio")
 
-    portfolios = {portfolio.id: portfolio for portfolio in repo.list_portfolios(user_id)}
-    missing_ids = [portfolio_id for portfolio_id in normalized_ids if portfolio_id not in portfolios]
-    if missing_ids:
-        raise ValueError("Uno o pi\u00f9 portafogli non sono disponibili")
+    # Portfolio rows, summaries and positions share one connection, released before the simulations.
+    with repo.unit_of_work():
+        portfolios = {portfolio.id: portfolio for portfolio in repo.list_portfolios(user_id)}
+        missing_ids = [portfolio_id for portfolio_id in normalized_ids if portfolio_id not in portfolios]
+        if missing_ids:
+            raise ValueError("Uno o pi\u00f9 portafogli non sono disponibili")
 
-    base_currencies = {portfolios[portfolio_id].base_currency for portfolio_id in normalized_ids}
-    if len(base_currencies) != 1:
-        raise ValueError("I portafogli aggregati devono avere la stessa valuta base")
-    base_currency = next(iter(base_currencies))
+        base_currencies = {portfolios[portfolio_id].base_currency for portfolio_id in normalized_ids}
+        if len(base_currencies) != 1:
+            raise ValueError("I portafogli aggregati devono avere la stessa valuta base")
+        base_currency = next(iter(base_currencies))
 
-    summaries = [repo.get_summary(portfolio_id, user_id) for portfolio_id in normalized_ids]
+        summaries = [repo.get_summary(portfolio_id, user_id) for portfolio_id in normalized_ids]
+        positions_by_portfolio = [repo.get_positions(portfolio_id, user_id) for portfolio_id in normalized_ids]
     initial_capital = sum(max(0.0, float(summary.market_value) + float(summary.cash_balance)) for summary in summaries)
     initial_cost_basis = sum(max(0.0, float(summary.cost_basis) + float(summary.cash_balance)) for summary in summaries)
     estimated_embedded_gain_ratio_pct = _estimate_embedded_gain_ratio(initial_capital, initial_cost_basis) * 100
-    holdings = _load_aggregate_holdings(repo, normalized_ids, user_id)
+    holdings = _aggregate_holdings(repo, positions_by_portfolio)
     mu_annual, sigma_annual, df_t = _compute_portfolio_return_params(repo, holdings) if holdings else (0.0, 0.0, 30.0)
     sustainable_withdrawal = _solve_sustainable_withdrawal(
         initial_capital=initial_capital,
@@ -196,8 +225,11 @@ def run_aggregate_decumulation_plan(
             capital_gains_tax_rate_pct=capital_gains_tax_rate_pct,
             estimated_embedded_gain_ratio_pct=estimated_embedded_gain_ratio_pct,
             current_age=current_age,
+            target_success_rate_pct=target_success_rate_pct,
         )
 
+    # One growth matrix feeds both the plan and the target-success solver.
+    growth = _decumulation_growth(years=years, mu_annual=mu_annual, sigma_annual=sigma_annual, df_t=df_t)
     paths = _simulate_decumulation_paths(
         initial_capital=initial_capital,
         initial_cost_basis=initial_cost_basis,
@@ -209,9 +241,20 @@ def run_aggregate_decumulation_plan(
         mu_annual=mu_annual,
         sigma_annual=sigma_annual,
         df_t=df_t,
+        growth=growth,
     )
-    final_values = sorted(path["ending_capitals"][-1] for path in paths)
-    success_count = sum(1 for path in paths if path["ending_capitals"][-1] > 0)
+    target_success_withdrawal = _solve_success_rate_withdrawal(
+        growth=growth,
+        initial_capital=initial_capital,
+        initial_cost_basis=initial_cost_basis,
+        inflation_rate_pct=inflation_rate_pct,
+        other_income_annual=other_income_annual,
+        capital_gains_tax_rate_pct=capital_gains_tax_rate_pct,
+        target_success_rate_pct=target_success_rate_pct,
+    )
+    final_values = paths.ending_capitals[:, -1]
+    success_count = int(np.count_nonzero(final_values > 0))
+    p25_terminal, p50_terminal, p75_terminal = (float(value) for value in np.percentile(final_values, [25, 50, 75]))
     projections = _build_decumulation_projections(
         paths=paths,
         years=years,
@@ -234,71 +277,154 @@ def run_aggregate_decumulation_plan(
         annualized_mean_return_pct=round(mu_annual * 100, 2),
         annualized_volatility_pct=round(sigma_annual * 100, 2),
         sustainable_withdrawal=round(max(0.0, sustainable_withdrawal), 2),
+        target_success_rate_pct=round(target_success_rate_pct, 1),
+        target_success_withdrawal=round(target_success_withdrawal, 2),
         success_rate_pct=round((success_count / NUM_SIMULATIONS) * 100, 1),
         depletion_probability_pct=round(((NUM_SIMULATIONS - success_count) / NUM_SIMULATIONS) * 100, 1),
-        p25_terminal_value=round(_percentile(final_values, 25), 2),
-        p50_terminal_value=round(_percentile(final_values, 50), 2),
-        p75_terminal_value=round(_percentile(final_values, 75), 2),
+        p25_terminal_value=round(p25_terminal, 2),
+        p50_terminal_value=round(p50_terminal, 2),
+        p75_terminal_value=round(p75_terminal, 2),
         depletion_year_p50=depletion_year_p50,
         projections=projections,
     )
 
 
-def _t_random(rng: random.Random, df: float) -> float:
-    """Generate a Student-t distributed random variate.
+def _student_t_shocks(
+    rng: np.random.Generator,
+    df: float,
+    shape: tuple[int, int],
+) -> np.ndarray:
+    """Draw a matrix of Student-t shocks rescaled towards unit variance.
 
-    Uses the ratio of a standard normal to the sqrt of a chi-squared/df.
-    When df >= 30 the distribution is effectively Gaussian.
+    The Student-t with df degrees of freedom has variance df/(df-2) for df>2,
+    so shocks are scaled by sqrt((df-2)/df) to keep sigma_annual calibrated
+    while adding fat tails.  When df >= 30 the distribution is effectively
+    Gaussian and the shocks are drawn from a standard normal.
     """
     if df >= 30.0:
-        return rng.gauss(0, 1)
-    # chi-squared(df) = sum of df standard normals squared
-    # For efficiency use the gamma distribution: chi2 ~ Gamma(df/2, 2)
-    chi2 = rng.gammavariate(df / 2.0, 2.0)
-    if chi2 <= 0:
-        return rng.gauss(0, 1)
-    return rng.gauss(0, 1) / math.sqrt(chi2 / df)
+        shocks = rng.standard_normal(shape)
+    else:
+        shocks = rng.standard_t(df, shape)
+    if df > 2.0:
+        shocks *= math.sqrt((df - 2.0) / df)
+    return shocks
 
 
 def _simulate_paths(
     mu_annual: float,
     sigma_annual: float,
     df_t: float = 30.0,
+    *,
+    num_simulations: int = PROJECTION_NUM_SIMULATIONS,
+    seed: int = 42,
 ) -> list[MonteCarloYearProjection]:
     drift = mu_annual - 0.5 * sigma_annual**2
-    rng = random.Random(42)
-
-    # Scale factor: the Student-t with df degrees of freedom has variance
-    # df/(df-2) for df>2.  We scale the shock so that the overall variance
-    # still matches sigma_annual (preserves calibration while adding fat tails).
-    t_scale = math.sqrt((df_t - 2.0) / df_t) if df_t > 2.0 else 1.0
-
-    all_paths: list[list[float]] = []
-    for _ in range(NUM_SIMULATIONS):
-        cum = 0.0
-        path = [100.0]
-        for _ in range(MAX_PROJECTION_YEARS):
-            shock = _t_random(rng, df_t) * t_scale
-            cum += drift + sigma_annual * shock
-            path.append(100.0 * math.exp(cum))
-        all_paths.append(path)
+    rng = np.random.default_rng(seed)
+
+    # One (simulations x years) draw, then the whole path grid via cumsum.
+    shocks = _student_t_shocks(rng, df_t, (num_simulations, MAX_PROJECTION_YEARS))
+    log_paths = np.cumsum(drift + sigma_annual * shocks, axis=1)
+    paths = np.empty((num_simulations, MAX_PROJECTION_YEARS + 1))
+    paths[:, 0] = 100.0
+    np.exp(log_paths, out=paths[:, 1:])
+    paths[:, 1:] *= 100.0
+
+    # Linear interpolation matches _percentile on the sorted values.
+    bands = np.percentile(paths, PROJECTION_PERCENTILES, axis=0)
 
     projections: list[MonteCarloYearProjection] = []
     for year_idx in range(MAX_PROJECTION_YEARS + 1):
-        values = sorted(p[year_idx] for p in all_paths)
+        p10, p25, p50, p75, p90 = (round(float(value), 1) for value in bands[:, year_idx])
         projections.append(
             MonteCarloYearProjection(
                 year=year_idx,
-                p10=round(_percentile(values, 10), 1),
-                p25=round(_percentile(values, 25), 1),
-                p50=round(_percentile(values, 50), 1),
-                p75=round(_percentile(values, 75), 1),
-                p90=round(_percentile(values, 90), 1),
+                p10=p10,
+                p25=p25,
+                p50=p50,
+                p75=p75,
+                p90=p90,
             )
         )
     return projections
 
 
+@dataclass
+class DecumulationPaths:
+    """Column-oriented decumulation simulation.
+
+    Every 2-D array has shape (num_simulations, years); the spending target is
+    the same on every path, so it is kept as a per-year vector.
+    """
+
+    ending_capitals: np.ndarray
+    effective_rates: np.ndarray
+    depleted: np.ndarray
+    target_net_spendings: np.ndarray
+    gross_withdrawals: np.ndarray
+    estimated_taxes: np.ndarray
+    net_withdrawals: np.ndarray
+    net_spending_after_tax: np.ndarray
+
+    @property
+    def num_simulations(self) -> int:
+        return int(self.ending_capitals.shape[0])
+
+
+def _decumulation_growth(
+    *,
+    years: int,
+    mu_annual: float,
+    sigma_annual: float,
+    df_t: float = 30.0,
+    num_simulations: int = NUM_SIMULATIONS,
+    seed: int = 42,
+) -> np.ndarray:
+    """Gross annual growth factors, shape (num_simulations, years)."""
+    shape = (num_simulations, years)
+    if sigma_annual <= 0:
+        return np.full(shape, 1.0 + mu_annual)
+    drift = mu_annual - 0.5 * sigma_annual**2
+    shocks = _student_t_shocks(np.random.default_rng(seed), df_t, shape)
+    return np.exp(drift + sigma_annual * shocks)
+
+
+def _decumulation_year(
+    capital_before_sale: np.ndarray,
+    cost_basis: np.ndarray,
+    net_needed_from_portfolio: float,
+    tax_rate: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sell enough of every path to cover the net need after capital gains tax.
+
+    Vectorized _estimate_embedded_gain_ratio / _solve_gross_sale_for_net_need.
+    Returns (gross_sale, taxes, capital, cost_basis) after the sale.
+    """
+    has_capital = capital_before_sale > 0
+    embedded_gain_ratio = np.zeros_like(capital_before_sale)
+    np.divide(capital_before_sale - cost_basis, capital_before_sale, out=embedded_gain_ratio, where=has_capital)
+    np.clip(embedded_gain_ratio, 0.0, 1.0, out=embedded_gain_ratio)
+
+    if net_needed_from_portfolio > 0:
+        keep_rate = 1.0 - embedded_gain_ratio * tax_rate
+        gross_sale = np.where(
+            keep_rate <= 1e-9,
+            net_needed_from_portfolio,
+            net_needed_from_portfolio / np.maximum(keep_rate, 1e-9),
+        )
+        np.minimum(gross_sale, capital_before_sale, out=gross_sale)
+    else:
+        gross_sale = np.zeros_like(capital_before_sale)
+    taxes = gross_sale * embedded_gain_ratio * tax_rate
+
+    basis_ratio = np.zeros_like(capital_before_sale)
+    np.divide(cost_basis, capital_before_sale, out=basis_ratio, where=has_capital)
+    np.minimum(basis_ratio, 1.0, out=basis_ratio)
+    cost_basis = np.maximum(0.0, cost_basis - gross_sale * basis_ratio)
+    capital = np.maximum(0.0, capital_before_sale - gross_sale)
+    cost_basis[capital <= 0] = 0.0
+    return gross_sale, taxes, capital, cost_basis
+
+
 def _simulate_decumulation_paths(
     *,
     initial_capital: float,
@@ -311,108 +437,179 @@ def _simulate_decumulation_paths(
     mu_annual: float,
     sigma_annual: float,
     df_t: float = 30.0,
-) -> list[dict[str, list[float]]]:
-    drift = mu_annual - 0.5 * sigma_annual**2
+    num_simulations: int = NUM_SIMULATIONS,
+    growth: np.ndarray | None = None,
+) -> DecumulationPaths:
     inflation = max(0.0, inflation_rate_pct) / 100.0
     tax_rate = max(0.0, capital_gains_tax_rate_pct) / 100.0
-    t_scale = math.sqrt((df_t - 2.0) / df_t) if df_t > 2.0 else 1.0
-    rng = random.Random(42)
-    paths: list[dict[str, list[float]]] = []
-
-    for _ in range(NUM_SIMULATIONS):
-        capital = initial_capital
-        cost_basis = max(0.0, initial_cost_basis)
-        spending_target = max(0.0, annual_withdrawal)
-        ending_capitals: list[float] = []
-        effective_rates: list[float] = []
-        depleted_flags: list[float] = []
-        target_net_spendings: list[float] = []
-        gross_withdrawals: list[float] = []
-        estimated_taxes: list[float] = []
-        net_withdrawals: list[float] = []
-        net_spending_after_tax: list[float] = []
-
-        for _year in range(years):
-            starting_capital = capital
-            annual_return = math.exp(drift + sigma_annual * _t_random(rng, df_t) * t_scale) - 1 if sigma_annual > 0 else mu_annual
-            capital = max(0.0, capital * (1 + annual_return))
-            capital_before_sale = capital
-
-            net_needed_from_portfolio = max(0.0, spending_target - max(0.0, other_income_annual))
-            embedded_gain_ratio = _estimate_embedded_gain_ratio(capital_before_sale, cost_basis)
-            gross_sale = _solve_gross_sale_for_net_need(net_needed_from_portfolio, embedded_gain_ratio, tax_rate)
-            gross_sale = min(gross_sale, capital_before_sale)
-            taxes = gross_sale * embedded_gain_ratio * tax_rate
-            net_from_portfolio = max(0.0, gross_sale - taxes)
-            total_net_spending = net_from_portfolio + max(0.0, other_income_annual)
-
-            effective_rates.append((gross_sale / starting_capital) * 100 if starting_capital > 0 else 0.0)
-            basis_ratio = min(1.0, cost_basis / capital_before_sale) if capital_before_sale > 0 else 0.0
-            basis_sold = gross_sale * basis_ratio
-            cost_basis = max(0.0, cost_basis - basis_sold)
-            capital = max(0.0, capital_before_sale - gross_sale)
-            if capital <= 0:
-                cost_basis = 0.0
-
-            target_net_spendings.append(spending_target)
-            gross_withdrawals.append(gross_sale)
-            estimated_taxes.append(taxes)
-            net_withdrawals.append(net_from_portfolio)
-            net_spending_after_tax.append(total_net_spending)
-            ending_capitals.append(capital)
-            depleted_flags.append(1.0 if capital <= 0 else 0.0)
-            spending_target *= (1 + inflation)
-
-        paths.append(
-            {
-                "ending_capitals": ending_capitals,
-                "effective_rates": effective_rates,
-                "depleted_flags": depleted_flags,
-                "target_net_spendings": target_net_spendings,
-                "gross_withdrawals": gross_withdrawals,
-                "estimated_taxes": estimated_taxes,
-                "net_withdrawals": net_withdrawals,
-                "net_spending_after_tax": net_spending_after_tax,
-            }
+    other_income = max(0.0, other_income_annual)
+    if growth is None:
+        growth = _decumulation_growth(
+            years=years,
+            mu_annual=mu_annual,
+            sigma_annual=sigma_annual,
+            df_t=df_t,
+            num_simulations=num_simulations,
+        )
+    num_simulations = growth.shape[0]
+    shape = (num_simulations, years)
+
+    ending_capitals = np.empty(shape)
+    effective_rates = np.zeros(shape)
+    gross_withdrawals = np.empty(shape)
+    estimated_taxes = np.empty(shape)
+    target_net_spendings = max(0.0, annual_withdrawal) * (1 + inflation) ** np.arange(years)
+
+    capital = np.full(num_simulations, float(initial_capital))
+    cost_basis = np.full(num_simulations, max(0.0, initial_cost_basis))
+
+    for year_idx in range(years):
+        starting_capital = capital
+        capital_before_sale = np.maximum(0.0, capital * growth[:, year_idx])
+        net_needed_from_portfolio = max(0.0, float(target_net_spendings[year_idx]) - other_income)
+        gross_sale, taxes, capital, cost_basis = _decumulation_year(
+            capital_before_sale, cost_basis, net_needed_from_portfolio, tax_rate
         )
 
-    return paths
+        np.divide(gross_sale * 100, starting_capital, out=effective_rates[:, year_idx], where=starting_capital > 0)
+        gross_withdrawals[:, year_idx] = gross_sale
+        estimated_taxes[:, year_idx] = taxes
+        ending_capitals[:, year_idx] = capital
+
+    net_withdrawals = np.maximum(0.0, gross_withdrawals - estimated_taxes)
+    return DecumulationPaths(
+        ending_capitals=ending_capitals,
+        effective_rates=effective_rates,
+        depleted=ending_capitals <= 0,
+        target_net_spendings=target_net_spendings,
+        gross_withdrawals=gross_withdrawals,
+        estimated_taxes=estimated_taxes,
+        net_withdrawals=net_withdrawals,
+        net_spending_after_tax=net_withdrawals + other_income,
+    )
+
+
+def _decumulation_success_rate(
+    *,
+    growth: np.ndarray,
+    initial_capital: float,
+    initial_cost_basis: float,
+    annual_withdrawal: float,
+    inflation_rate_pct: float,
+    other_income_annual: float,
+    capital_gains_tax_rate_pct: float,
+) -> float:
+    """Share of paths ending the horizon with capital left (terminal values only)."""
+    inflation = max(0.0, inflation_rate_pct) / 100.0
+    tax_rate = max(0.0, capital_gains_tax_rate_pct) / 100.0
+    other_income = max(0.0, other_income_annual)
+    num_simulations, years = growth.shape
+
+    capital = np.full(num_simulations, float(initial_capital))
+    cost_basis = np.full(num_simulations, max(0.0, initial_cost_basis))
+    spending_target = max(0.0, annual_withdrawal)
+    for year_idx in range(years):
+        capital_before_sale = np.maximum(0.0, capital * growth[:, year_idx])
+        _, _, capital, cost_basis = _decumulation_year(
+            capital_before_sale, cost_basis, max(0.0, spending_target - other_income), tax_rate
+        )
+        spending_target *= (1 + inflation)
+    return float(np.count_nonzero(capital > 0)) / num_simulations
+
+
+def _solve_success_rate_withdrawal(
+    *,
+    growth: np.ndarray,
+    initial_capital: float,
+    initial_cost_basis: float,
+    inflation_rate_pct: float,
+    other_income_annual: float,
+    capital_gains_tax_rate_pct: float,
+    target_success_rate_pct: float = TARGET_SUCCESS_RATE_PCT,
+    tolerance: float = 1.0,
+) -> float:
+    """Highest first-year spending whose success rate still meets the target.
+
+    Bisects on the withdrawal against the same growth matrix, so every
+    candidate is scored on identical market paths and the success rate is
+    monotone in the withdrawal.
+    """
+    target = max(0.0, min(100.0, target_success_rate_pct)) / 100.0
+
+    def meets_target(annual_withdrawal: float) -> bool:
+        return _decumulation_success_rate(
+            growth=growth,
+            initial_capital=initial_capital,
+            initial_cost_basis=initial_cost_basis,
+            annual_withdrawal=annual_withdrawal,
+            inflation_rate_pct=inflation_rate_pct,
+            other_income_annual=other_income_annual,
+            capital_gains_tax_rate_pct=capital_gains_tax_rate_pct,
+        ) >= target
+
+    if initial_capital <= 0 or growth.size == 0 or not meets_target(0.0):
+        return 0.0
+
+    low = 0.0
+    high = max(1.0, initial_capital + max(0.0, other_income_annual))
+    for _ in range(32):
+        if not meets_target(high):
+            break
+        low, high = high, high * 2
+    else:
+        return low
+
+    while high - low > tolerance:
+        mid = (low + high) / 2
+        if meets_target(mid):
+            low = mid
+        else:
+            high = mid
+    return low
 
 
 def _build_decumulation_projections(
     *,
-    paths: list[dict[str, list[float]]],
+    paths: DecumulationPaths,
     years: int,
     other_income_annual: float,
     current_age: int | None,
 ) -> list[DecumulationYearProjection]:
-    projections: list[DecumulationYearProjection] = []
+    capital_bands = np.percentile(paths.ending_capitals, [25, 50, 75], axis=0)
+    medians = np.percentile(
+        np.stack(
+            [
+                paths.gross_withdrawals,
+                paths.estimated_taxes,
+                paths.net_withdrawals,
+                paths.net_spending_after_tax,
+                paths.effective_rates,
+            ]
+        ),
+        50,
+        axis=1,
+    )
+    depletion_pct = paths.depleted.sum(axis=0) / paths.num_simulations * 100
 
+    projections: list[DecumulationYearProjection] = []
     for year_index in range(years):
-        capitals = sorted(path["ending_capitals"][year_index] for path in paths)
-        rates = sorted(path["effective_rates"][year_index] for path in paths)
-        depleted_count = sum(path["depleted_flags"][year_index] for path in paths)
-        target_net_values = sorted(path["target_net_spendings"][year_index] for path in paths)
-        gross_values = sorted(path["gross_withdrawals"][year_index] for path in paths)
-        tax_values = sorted(path["estimated_taxes"][year_index] for path in paths)
-        net_values = sorted(path["net_withdrawals"][year_index] for path in paths)
-        total_net_values = sorted(path["net_spending_after_tax"][year_index] for path in paths)
-
+        gross, taxes, net, total_net, rate = (float(value) for value in medians[:, year_index])
+        p25, p50, p75 = (float(value) for value in capital_bands[:, year_index])
         projections.append(
             DecumulationYearProjection(
                 year=year_index + 1,
                 age=(current_age + year_index + 1) if current_age else None,
-                target_net_spending=round(_percentile(target_net_values, 50), 2),
-                gross_withdrawal=round(_percentile(gross_values, 50), 2),
-                estimated_taxes=round(_percentile(tax_values, 50), 2),
-                net_withdrawal=round(_percentile(net_values, 50), 2),
+                target_net_spending=round(float(paths.target_net_spendings[year_index]), 2),
+                gross_withdrawal=round(gross, 2),
+                estimated_taxes=round(taxes, 2),
+                net_withdrawal=round(net, 2),
                 other_income=round(max(0.0, other_income_annual), 2),
-                net_spending_after_tax=round(_percentile(total_net_values, 50), 2),
-                p25_ending_capital=round(_percentile(capitals, 25), 2),
-                p50_ending_capital=round(_percentile(capitals, 50), 2),
-                p75_ending_capital=round(_percentile(capitals, 75), 2),
-                p50_effective_withdrawal_rate_pct=round(_percentile(rates, 50), 2),
-                depletion_probability_pct=round((depleted_count / NUM_SIMULATIONS) * 100, 1),
+                net_spending_after_tax=round(total_net, 2),
+                p25_ending_capital=round(p25, 2),
+                p50_ending_capital=round(p50, 2),
+                p75_ending_capital=round(p75, 2),
+                p50_effective_withdrawal_rate_pct=round(rate, 2),
+                depletion_probability_pct=round(float(depletion_pct[year_index]), 1),
             )
         )
 
@@ -487,6 +684,7 @@ def _empty_decumulation_response(
     capital_gains_tax_rate_pct: float,
     estimated_embedded_gain_ratio_pct: float,
     current_age: int | None,
+    target_success_rate_pct: float = TARGET_SUCCESS_RATE_PCT,
 ) -> DecumulationPlanResponse:
     inflation = max(0.0, inflation_rate_pct) / 100.0
     projections = [
@@ -520,6 +718,8 @@ def _empty_decumulation_response(
         annualized_mean_return_pct=0.0,
         annualized_volatility_pct=0.0,
         sustainable_withdrawal=round(max(0.0, other_income_annual), 2),
+        target_success_rate_pct=round(target_success_rate_pct, 1),
+        target_success_withdrawal=0.0,
         success_rate_pct=0.0,
         depletion_probability_pct=100.0,
         p25_terminal_value=0.0,
@@ -541,6 +741,7 @@ def _empty_aggregate_decumulation_response(
     capital_gains_tax_rate_pct: float,
     estimated_embedded_gain_ratio_pct: float,
     current_age: int | None,
+    target_success_rate_pct: float = TARGET_SUCCESS_RATE_PCT,
 ) -> AggregateDecumulationPlanResponse:
     inflation = max(0.0, inflation_rate_pct) / 100.0
     projections = [
@@ -575,6 +776,8 @@ def _empty_aggregate_decumulation_response(
         annualized_mean_return_pct=0.0,
         annualized_volatility_pct=0.0,
         sustainable_withdrawal=round(max(0.0, other_income_annual), 2),
+        target_success_rate_pct=round(target_success_rate_pct, 1),
+        target_success_withdrawal=0.0,
         success_rate_pct=0.0,
         depletion_probability_pct=100.0,
         p25_terminal_value=0.0,
@@ -0,0 +1,150 @@
+import math
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+from ...repository import PortfolioRepository, PriceSeries
+
+# Trailing window used for return, volatility and Monte Carlo calibration.
+RETURN_LOOKBACK_DAYS = 370
+
+
+@dataclass
+class PriceMatrix:
+    """Daily closes aligned on a (dates x assets) grid.
+
+    Rows are the union of the dates on which at least one asset has a valid
+    close; ``closes`` holds NaN where an asset has no bar on that date.
+    """
+
+    dates: list[date]
+    asset_ids: list[int]
+    closes: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows) -> "PriceMatrix":
+        """Build the grid from ``(asset_id, price_date, close)`` mappings,
+        skipping non-positive and non-finite closes."""
+        valid = []
+        for row in rows:
+            close = float(row["close"])
+            if close > 0 and math.isfinite(close):
+                valid.append((int(row["asset_id"]), row["price_date"], close))
+
+        asset_ids = sorted({asset_id for asset_id, _, _ in valid})
+        dates = sorted({price_date for _, price_date, _ in valid})
+        col_by_asset = {asset_id: idx for idx, asset_id in enumerate(asset_ids)}
+        row_by_date = {price_date: idx for idx, price_date in enumerate(dates)}
+
+        closes = np.full((len(dates), len(asset_ids)), np.nan)
+        for asset_id, price_date, close in valid:
+            closes[row_by_date[price_date], col_by_asset[asset_id]] = close
+        return cls(dates=dates, asset_ids=asset_ids, closes=closes)
+
+    @classmethod
+    def from_series(cls, series: dict[int, PriceSeries]) -> "PriceMatrix":
+        """Build the grid from per-asset close series, skipping non-positive and non-finite closes."""
+        valid = {asset_id: item.valid() for asset_id, item in sorted(series.items())}
+        valid = {asset_id: item for asset_id, item in valid.items() if len(item.dates)}
+        if not valid:
+            return cls(dates=[], asset_ids=[], closes=np.empty((0, 0)))
+        days = np.unique(np.concatenate([item.dates for item in valid.values()]))
+        closes = np.full((len(days), len(valid)), np.nan)
+        for col, item in enumerate(valid.values()):
+            closes[np.searchsorted(days, item.dates), col] = item.closes
+        return cls(dates=days.astype(object).tolist(), asset_ids=list(valid), closes=closes)
+
+    def window(self, start_date: date, end_date: date | None = None) -> "PriceMatrix":
+        """Rows within [start_date, end_date], dropping dates left without bars."""
+        keep = np.array(
+            [day >= start_date and (end_date is None or day <= end_date) for day in self.dates],
+            dtype=bool,
+        )
+        if keep.size:
+            keep &= ~np.isnan(self.closes).all(axis=1)
+        return PriceMatrix(
+            dates=[day for day, kept in zip(self.dates, keep) if kept],
+            asset_ids=list(self.asset_ids),
+            closes=self.closes[keep] if keep.size else self.closes,
+        )
+
+    def observed(self, asset_id: int) -> np.ndarray:
+        """Valid closes of one asset in date order (no filling)."""
+        try:
+            col = self.asset_ids.index(asset_id)
+        except ValueError:
+            return np.empty(0)
+        series = self.closes[:, col]
+        return series[~np.isnan(series)]
+
+    def forward_filled(self) -> np.ndarray:
+        """Closes carried forward from the last bar; leading gaps stay NaN."""
+        filled = self.closes.copy()
+        if filled.size == 0:
+            return filled
+        rows = np.arange(filled.shape[0])[:, None]
+        last_seen = np.where(np.isnan(filled), 0, rows)
+        np.maximum.accumulate(last_seen, axis=0, out=last_seen)
+        return filled[last_seen, np.arange(filled.shape[1])]
+
+    def normalized(self) -> np.ndarray:
+        """Forward-filled closes divided by each asset's first close.
+
+        Dates before an asset's first bar (and assets without bars) are held
+        flat at 1.0.
+        """
+        filled = self.forward_filled()
+        if filled.size == 0:
+            return filled
+        first_idx = np.argmax(~np.isnan(self.closes), axis=0)
+        first = filled[first_idx, np.arange(filled.shape[1])]
+        with np.errstate(invalid="ignore"):
+            normalized = filled / first
+        return np.where(np.isnan(normalized), 1.0, normalized)
+
+    def weighted_index(self, weights: dict[int, float]) -> np.ndarray:
+        """Normalized portfolio value per date for the given asset weights.
+
+        Weights are rescaled to sum to one; assets without prices (cash or
+        uncovered holdings) are held flat instead of being dropped.
+        """
+        total_weight = sum(weights.values())
+        if total_weight <= 0 or not self.dates:
+            return np.empty(0)
+        col_weights = np.array([weights.get(asset_id, 0.0) for asset_id in self.asset_ids]) / total_weight
+        flat_weight = sum(w for asset_id, w in weights.items() if asset_id not in self.asset_ids) / total_weight
+        return self.normalized() @ col_weights + flat_weight
+
+
+def _load_price_matrix(
+    repo: PortfolioRepository,
+    asset_ids: list[int],
+    windows: list[tuple[date, date | None]] | None = None,
+) -> PriceMatrix:
+    """Daily bars for ``asset_ids`` from the shared price-series cache.
+
+    ``windows`` lists the [start, end] date ranges needed by the caller (an
+    open end means up to the latest bar); by default the trailing
+    RETURN_LOOKBACK_DAYS are loaded.
+    """
+    if not asset_ids:
+        return PriceMatrix(dates=[], asset_ids=[], closes=np.empty((0, 0)))
+    if windows is None:
+        windows = [(date.today() - timedelta(days=RETURN_LOOKBACK_DAYS), None)]
+
+    windowed: dict[int, PriceSeries] = {}
+    for asset_id, item in repo.get_price_series(asset_ids).items():
+        keep = _in_windows(item.dates, windows)
+        windowed[asset_id] = PriceSeries(dates=item.dates[keep], closes=item.closes[keep])
+    return PriceMatrix.from_series(windowed)
+
+
+def _in_windows(dates: np.ndarray, windows: list[tuple[date, date | None]]) -> np.ndarray:
+    """Mask of the ``dates`` (datetime64[D]) falling in any of ``windows``."""
+    keep = np.zeros(len(dates), dtype=bool)
+    for start, end in windows:
+        inside = dates >= np.datetime64(start, "D")
+        if end is not None:
+            inside &= dates <= np.datetime64(end, "D")
+        keep |= inside
+    return keep
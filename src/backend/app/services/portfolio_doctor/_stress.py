@@ -1,9 +1,7 @@
 import logging
-import math
-from collections import defaultdict
-from datetime import date
+from datetime import date, timedelta
 
-from sqlalchemy import text
+import numpy as np
 
 from ...repository import PortfolioRepository
 from ...schemas.portfolio_doctor import (
@@ -13,6 +11,7 @@ from ...schemas.portfolio_doctor import (
 )
 from ...constants.stress_scenarios import HISTORICAL_SCENARIOS, SHOCK_SCENARIOS
 from ._holdings import AnalyzedHolding, _load_holdings, _compute_portfolio_return_params
+from ._prices import RETURN_LOOKBACK_DAYS, PriceMatrix, _load_price_matrix
 
 logger = logging.getLogger(__name__)
 
@@ -32,34 +31,19 @@ def _compute_historical_scenario(
     repo: PortfolioRepository,
     holdings: list[AnalyzedHolding],
     scenario: dict,
+    prices: PriceMatrix | None = None,
 ) -> StressTestScenarioResult:
-    """Compute portfolio impact during a historical scenario using price_bars_1d."""
+    """Compute portfolio impact during a historical scenario using price_bars_1d.
+
+    ``prices`` may cover a wider range (e.g. every scenario of a stress run);
+    only the scenario window is used.
+    """
     start_date = date.fromisoformat(scenario["start"])
     end_date = date.fromisoformat(scenario["end"])
-    asset_ids = [h.asset_id for h in holdings if h.asset_type != "cash"]
-
-    prices_by_asset: dict[int, list[tuple[date, float]]] = defaultdict(list)
-    if asset_ids:
-        with repo.engine.begin() as conn:
-            rows = conn.execute(
-                text(
-                    """
-                    select asset_id, price_date, close::float8 as close
-                    from price_bars_1d
-                    where asset_id = any(:asset_ids)
-                      and price_date >= :start_date
-                      and price_date <= :end_date
-                    order by asset_id asc, price_date asc
-                    """
-                ),
-                {"asset_ids": asset_ids, "start_date": start_date, "end_date": end_date},
-            ).mappings().all()
-        for row in rows:
-            close = float(row["close"])
-            if close > 0 and math.isfinite(close):
-                prices_by_asset[int(row["asset_id"])].append(
-                    (row["price_date"], close)
-                )
+    if prices is None:
+        asset_ids = [h.asset_id for h in holdings if h.asset_type != "cash"]
+        prices = _load_price_matrix(repo, asset_ids, [(start_date, end_date)])
+    prices = prices.window(start_date, end_date)
 
     weighted_return = 0.0
     covered_weight = 0.0
@@ -68,11 +52,11 @@ def _compute_historical_scenario(
     for holding in holdings:
         if holding.asset_type == "cash":
             continue
-        series = prices_by_asset.get(holding.asset_id, [])
+        series = prices.observed(holding.asset_id)
         if len(series) < 2:
             continue
-        first_price = series[0][1]
-        last_price = series[-1][1]
+        first_price = float(series[0])
+        last_price = float(series[-1])
         asset_return = (last_price - first_price) / first_price
         weight_fraction = holding.weight_pct / 100.0
         weighted_return += asset_return * weight_fraction
@@ -95,7 +79,7 @@ def _compute_historical_scenario(
         portfolio_impact = scenario["benchmark_drawdown"] * 0.8
 
     # Compute max drawdown from portfolio-weighted daily series
-    max_dd = _compute_weighted_drawdown(prices_by_asset, holdings) if covered_weight > 0 else portfolio_impact
+    max_dd = _compute_weighted_drawdown(prices, holdings) if covered_weight > 0 else portfolio_impact
 
     # Estimate recovery months (rough heuristic based on drawdown depth)
     recovery_months = None
@@ -120,64 +104,21 @@ def _compute_historical_scenario(
 
 
 def _compute_weighted_drawdown(
-    prices_by_asset: dict[int, list[tuple[date, float]]],
+    prices: PriceMatrix,
     holdings: list[AnalyzedHolding],
 ) -> float:
     """Compute portfolio-level max drawdown from per-asset daily prices."""
-    # Collect all unique dates
-    all_dates: set[date] = set()
-    for series in prices_by_asset.values():
-        for d, _ in series:
-            all_dates.add(d)
-    if not all_dates:
-        return 0.0
-
-    sorted_dates = sorted(all_dates)
-    # Build price lookup per asset
-    price_lookup: dict[int, dict[date, float]] = {}
-    for asset_id, series in prices_by_asset.items():
-        price_lookup[asset_id] = {d: p for d, p in series}
-
+    # Cash and uncovered assets are held flat in the stress path
+    # instead of being dropped from the portfolio.
     weight_map = {h.asset_id: h.weight_pct / 100.0 for h in holdings}
-    total_weight = sum(weight_map.values())
-    if total_weight <= 0:
-        return 0.0
-
-    # Compute normalized portfolio value per date
-    portfolio_values: list[float] = []
-    for d in sorted_dates:
-        value = 0.0
-        for asset_id, w in weight_map.items():
-            lookup = price_lookup.get(asset_id, {})
-            series = prices_by_asset.get(asset_id, [])
-            if series:
-                first_price = series[0][1]
-                latest_price = first_price
-                for series_date, series_price in series:
-                    if series_date > d:
-                        break
-                    latest_price = series_price
-                normalized_value = latest_price / first_price if first_price > 0 else 1.0
-            else:
-                # Cash and uncovered assets are held flat in the stress path
-                # instead of being dropped from the portfolio.
-                normalized_value = 1.0
-            value += normalized_value * (w / total_weight)
-        if value > 0:
-            portfolio_values.append(value)
-
+    portfolio_values = prices.weighted_index(weight_map)
+    portfolio_values = portfolio_values[portfolio_values > 0]
     if len(portfolio_values) < 2:
         return 0.0
 
-    peak = portfolio_values[0]
-    max_dd = 0.0
-    for v in portfolio_values[1:]:
-        if v > peak:
-            peak = v
-        dd = (v - peak) / peak * 100.0
-        if dd < max_dd:
-            max_dd = dd
-    return max_dd
+    peaks = np.maximum.accumulate(portfolio_values)
+    drawdowns = (portfolio_values - peaks) / peaks * 100.0
+    return min(0.0, float(drawdowns.min()))
 
 
 def _compute_shock_scenario(
@@ -279,8 +220,16 @@ def run_stress_test(
             analysis_date=str(date.today()),
         )
 
+    # One price read covers the volatility lookback and every historical window.
+    asset_ids = [h.asset_id for h in holdings if h.asset_type != "cash"]
+    windows = [(date.today() - timedelta(days=RETURN_LOOKBACK_DAYS), None)] + [
+        (date.fromisoformat(scenario["start"]), date.fromisoformat(scenario["end"]))
+        for scenario in HISTORICAL_SCENARIOS
+    ]
+    prices = _load_price_matrix(repo, asset_ids, windows)
+
     # Compute portfolio volatility
-    mu_annual, sigma_annual, _df_t = _compute_portfolio_return_params(repo, holdings)
+    mu_annual, sigma_annual, _df_t = _compute_portfolio_return_params(repo, holdings, prices)
     volatility_pct = round(sigma_annual * 100, 2) if sigma_annual > 0 else None
 
     scenarios: list[StressTestScenarioResult] = []
@@ -288,7 +237,7 @@ def run_stress_test(
     # Historical scenarios
     for scenario in HISTORICAL_SCENARIOS:
         try:
-            result = _compute_historical_scenario(repo, holdings, scenario)
+            result = _compute_historical_scenario(repo, holdings, scenario, prices)
             scenarios.append(result)
         except Exception:
             logger.warning("Failed to compute historical scenario %s", scenario["id"], exc_info=True)
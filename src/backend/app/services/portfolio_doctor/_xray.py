@@ -1,7 +1,14 @@
+import asyncio
 import logging
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 
+from ...async_finance_client import (
+    DEFAULT_FANOUT_LIMIT,
+    AsyncFinanceClient,
+    gather_bounded,
+    map_in_finance_executor,
+)
 from ...repository import PortfolioRepository
 from ...schemas.portfolio_doctor import (
     XRayCoverageIssue,
@@ -36,13 +43,22 @@ def _resolve_isin_for_holding(repo: PortfolioRepository, holding: AnalyzedHoldin
     return None
 
 
-def compute_portfolio_xray(
+@dataclass
+class _XRayInputs:
+    holdings: list[AnalyzedHolding]
+    candidates: list[AnalyzedHolding]
+    enrichment_map: dict[int, dict]
+    provider_symbols: dict[int, str]
+    # Candidates without justETF top holdings, to be fetched from the finance provider.
+    needs_provider_holdings: list[AnalyzedHolding]
+
+
+def _prepare_xray(
     repo: PortfolioRepository,
     portfolio_id: int,
     user_id: str,
-    finance_client: object,
     justetf_client: object = None,
-) -> XRayResponse:
+) -> _XRayInputs:
     holdings = _load_holdings(repo, portfolio_id, user_id)
     if not holdings:
         raise ValueError("Portafoglio non trovato o vuoto")
@@ -87,30 +103,74 @@ def compute_portfolio_xray(
         except Exception:
             provider_symbols[h.asset_id] = h.symbol
 
-    # Fetch holdings for each candidate using ThreadPoolExecutor
     # Skip candidates that already have justETF enrichment holdings
-    etf_raw_holdings: dict[int, list] = {}
-    yfinance_failures: dict[int, str] = {}
-    needs_yfinance = [h for h in candidates if h.asset_id not in enrichment_map or not enrichment_map[h.asset_id].get("top_holdings")]
+    needs_provider_holdings = [
+        h for h in candidates
+        if h.asset_id not in enrichment_map or not enrichment_map[h.asset_id].get("top_holdings")
+    ]
+    return _XRayInputs(
+        holdings=holdings,
+        candidates=candidates,
+        enrichment_map=enrichment_map,
+        provider_symbols=provider_symbols,
+        needs_provider_holdings=needs_provider_holdings,
+    )
 
-    def fetch_one(asset_id: int, symbol: str):
-        return asset_id, finance_client.get_etf_top_holdings(symbol)
 
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = {
-            executor.submit(fetch_one, h.asset_id, provider_symbols[h.asset_id]): h
-            for h in needs_yfinance
-        }
-        for future in as_completed(futures):
-            try:
-                aid, result = future.result()
-                if result:  # only keep assets that actually have holdings (= ETFs/funds)
-                    etf_raw_holdings[aid] = result
-                else:
-                    yfinance_failures[aid] = "yfinance returned no top holdings"
-            except Exception as exc:
-                asset = futures[future]
-                yfinance_failures[asset.asset_id] = f"yfinance holdings fetch failed: {exc}"
+def compute_portfolio_xray(
+    repo: PortfolioRepository,
+    portfolio_id: int,
+    user_id: str,
+    finance_client: object,
+    justetf_client: object = None,
+) -> XRayResponse:
+    inputs = _prepare_xray(repo, portfolio_id, user_id, justetf_client)
+    results = map_in_finance_executor(
+        lambda h: finance_client.get_etf_top_holdings(inputs.provider_symbols[h.asset_id]),
+        inputs.needs_provider_holdings,
+    )
+    return _build_xray_response(portfolio_id, inputs, results)
+
+
+async def compute_portfolio_xray_async(
+    repo: PortfolioRepository,
+    portfolio_id: int,
+    user_id: str,
+    finance_client: AsyncFinanceClient,
+    justetf_client: object = None,
+    fanout_limit: int = DEFAULT_FANOUT_LIMIT,
+) -> XRayResponse:
+    """``compute_portfolio_xray`` with the provider fan-out on the event loop;
+    database and justETF work runs in a worker thread."""
+    inputs = await asyncio.to_thread(_prepare_xray, repo, portfolio_id, user_id, justetf_client)
+    results = await gather_bounded(
+        lambda h: finance_client.get_etf_top_holdings(inputs.provider_symbols[h.asset_id]),
+        inputs.needs_provider_holdings,
+        limit=fanout_limit,
+    )
+    return _build_xray_response(portfolio_id, inputs, results)
+
+
+def _build_xray_response(
+    portfolio_id: int,
+    inputs: _XRayInputs,
+    provider_results: list,
+) -> XRayResponse:
+    """Aggregate look-through holdings; ``provider_results`` holds, for each of
+    ``inputs.needs_provider_holdings``, the fetched top holdings or the error raised."""
+    holdings = inputs.holdings
+    candidates = inputs.candidates
+    enrichment_map = inputs.enrichment_map
+
+    etf_raw_holdings: dict[int, list] = {}
+    yfinance_failures: dict[int, str] = {}
+    for h, result in zip(inputs.needs_provider_holdings, provider_results):
+        if isinstance(result, BaseException):
+            yfinance_failures[h.asset_id] = f"yfinance holdings fetch failed: {result}"
+        elif result:  # only keep assets that actually have holdings (= ETFs/funds)
+            etf_raw_holdings[h.asset_id] = result
+        else:
+            yfinance_failures[h.asset_id] = "yfinance returned no top holdings"
 
     # Analyze all non-cash candidates and report which ones are not covered.
     etf_holdings = candidates
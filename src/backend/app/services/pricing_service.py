@@ -1,5 +1,8 @@
 import logging
+import threading
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 import httpx
 
@@ -7,11 +10,77 @@ from ..config import Settings
 from ..finance_client import make_finance_client
 from ..models import PriceRefreshItem, PriceRefreshResponse
 from ..price_validation import validate_quote_price
-from ..repository import PortfolioRepository
+from ..repository import PortfolioRepository, PricingAsset
 
 logger = logging.getLogger(__name__)
 
 
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` requests per second, bursts up to ``burst``.
+
+    ``clock`` and ``sleep`` default to ``time.monotonic`` and ``time.sleep``.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, float(burst))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1) -> None:
+        """Take ``tokens`` tokens, sleeping until they are available.
+
+        A request larger than the burst waits for a full bucket and leaves it
+        in debt, so the following callers wait for the excess to refill.
+        """
+        needed = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                wait_seconds = (needed - self._tokens) / self.rate
+            self._sleep(wait_seconds)
+
+
+# Shared per provider so that overlapping refreshes (scheduler + manual) honour one limit.
+_provider_buckets: dict[str, TokenBucket] = {}
+_provider_buckets_lock = threading.Lock()
+
+
+def _provider_token_bucket(provider: str, rate: float | None, burst: int) -> TokenBucket | None:
+    if rate is None or rate <= 0:
+        return None
+    with _provider_buckets_lock:
+        bucket = _provider_buckets.get(provider)
+        if bucket is None or bucket.rate != rate or bucket.capacity != max(1.0, float(burst)):
+            bucket = TokenBucket(rate=rate, burst=burst)
+            _provider_buckets[provider] = bucket
+        return bucket
+
+
+def _provider_rate(settings: Settings, provider: str) -> float | None:
+    """Requests/second allowed for ``provider``; None means unlimited."""
+    rate = settings.finance_provider_rate_limits_map.get(provider)
+    if rate is not None:
+        return rate
+    delay_seconds = max(0.0, float(settings.finance_symbol_request_delay_seconds))
+    return 1.0 / delay_seconds if delay_seconds > 0 else None
+
+
 class PriceIngestionService:
     def __init__(self, settings: Settings, repository: PortfolioRepository) -> None:
         self.settings = settings
@@ -44,61 +113,116 @@ class PriceIngestionService:
                 user_id=user_id,
             )
 
+        # Clients whose get_quotes sends one upstream request per chunk are
+        # asked for whole chunks at once; the others get one request per asset.
+        batched = getattr(client, 'batched_quotes', False) and callable(getattr(client, 'get_quotes', None))
+        batch_size = max(1, int(self.settings.finance_quote_batch_size)) if batched else 1
+        chunks = [pricing_assets[idx:idx + batch_size] for idx in range(0, len(pricing_assets), batch_size)]
+
+        max_workers = max(1, min(int(self.settings.price_refresh_max_workers), len(chunks) or 1))
+        bucket = _provider_token_bucket(
+            provider,
+            _provider_rate(self.settings, provider),
+            int(self.settings.finance_provider_rate_burst),
+        )
+
         logger.info(
-            'Start price refresh provider=%s portfolio_id=%s asset_scope=%s assets=%s',
+            'Start price refresh provider=%s portfolio_id=%s asset_scope=%s assets=%s requests=%s workers=%s',
             provider,
             portfolio_id,
             asset_scope,
             len(pricing_assets),
+            len(chunks),
+            max_workers,
         )
 
+        def fetch_quotes(chunk: list[PricingAsset]) -> dict[str, object]:
+            symbols = list(dict.fromkeys(asset.provider_symbol for asset in chunk))
+            if bucket is not None:
+                # Providers charge batched quotes per symbol.
+                bucket.acquire(len(symbols))
+            try:
+                if batched:
+                    return client.get_quotes(symbols)
+                return {symbols[0]: client.get_quote(symbols[0])}
+            except (ValueError, httpx.HTTPError) as exc:
+                return {symbol: exc for symbol in symbols}
+
+        def build(asset: PricingAsset, quote: object) -> tuple[PriceRefreshItem, dict] | str:
+            if quote is None:
+                quote = ValueError('quotazione assente nella risposta del provider')
+            if isinstance(quote, Exception):
+                logger.error('Price refresh failure provider=%s asset=%s error=%s', provider, asset.provider_symbol, quote)
+                return f"{asset.provider_symbol}: {quote}"
+
+            vr = validate_quote_price(
+                asset_id=asset.asset_id,
+                symbol=asset.provider_symbol,
+                price=quote.price,
+                min_price=self.settings.price_validation_min_price,
+            )
+            if not vr.valid:
+                return f"{asset.provider_symbol}: rejected - {vr.rejected_reason}"
+
+            tick = {
+                'asset_id': asset.asset_id,
+                'ts': quote.ts,
+                'last': quote.price,
+                'bid': quote.bid,
+                'ask': quote.ask,
+                'volume': quote.volume,
+                'previous_close': getattr(quote, 'previous_close', None),
+            }
+            item = PriceRefreshItem(
+                asset_id=asset.asset_id,
+                symbol=asset.symbol,
+                provider_symbol=asset.provider_symbol,
+                price=quote.price,
+                ts=quote.ts,
+                quote_source=getattr(quote, 'source', None),
+                is_realtime=getattr(quote, 'is_realtime', True),
+                is_fallback=getattr(quote, 'is_fallback', False),
+                stale=getattr(quote, 'stale', False),
+                warning=getattr(quote, 'warning', None),
+            )
+            return item, tick
+
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='price-refresh') as pool:
+                quotes_by_chunk = list(pool.map(fetch_quotes, chunks))
+        else:
+            quotes_by_chunk = [fetch_quotes(chunk) for chunk in chunks]
+
+        results = [
+            build(asset, quotes.get(asset.provider_symbol))
+            for chunk, quotes in zip(chunks, quotes_by_chunk)
+            for asset in chunk
+        ]
+
         items: list[PriceRefreshItem] = []
+        ticks: list[dict] = []
         errors: list[str] = []
-        delay_seconds = max(0.0, float(self.settings.finance_symbol_request_delay_seconds))
+        for result in results:
+            if isinstance(result, str):
+                errors.append(result)
+                continue
+            item, tick = result
+            items.append(item)
+            ticks.append(tick)
 
-        for index, asset in enumerate(pricing_assets):
-            try:
-                quote = client.get_quote(asset.provider_symbol)
-                vr = validate_quote_price(
-                    asset_id=asset.asset_id,
-                    symbol=asset.provider_symbol,
-                    price=quote.price,
-                    min_price=self.settings.price_validation_min_price,
-                )
-                if not vr.valid:
-                    errors.append(f"{asset.provider_symbol}: rejected - {vr.rejected_reason}")
-                    continue
-                self.repository.save_price_tick(
-                    asset_id=asset.asset_id,
-                    provider=provider,
-                    ts=quote.ts,
-                    last=quote.price,
-                    bid=quote.bid,
-                    ask=quote.ask,
-                    volume=quote.volume,
-                    previous_close=getattr(quote, 'previous_close', None),
-                )
-                items.append(
-                    PriceRefreshItem(
-                        asset_id=asset.asset_id,
-                        symbol=asset.symbol,
-                        provider_symbol=asset.provider_symbol,
-                        price=quote.price,
-                        ts=quote.ts,
-                        quote_source=getattr(quote, 'source', None),
-                        is_realtime=getattr(quote, 'is_realtime', True),
-                        is_fallback=getattr(quote, 'is_fallback', False),
-                        stale=getattr(quote, 'stale', False),
-                        warning=getattr(quote, 'warning', None),
+        # One transaction for the whole cycle instead of one per tick.
+        failed_ticks = self.repository.save_price_ticks(provider=provider, ticks=ticks) or {}
+        if failed_ticks:
+            for item in items:
+                if item.asset_id in failed_ticks:
+                    logger.error(
+                        'Price tick not saved provider=%s asset=%s error=%s',
+                        provider,
+                        item.provider_symbol,
+                        failed_ticks[item.asset_id],
                     )
-                )
-            except (ValueError, httpx.HTTPError) as exc:
-                error_message = f"{asset.provider_symbol}: {exc}"
-                errors.append(error_message)
-                logger.error('Price refresh failure provider=%s asset=%s error=%s', provider, asset.provider_symbol, exc)
-
-            if delay_seconds > 0 and index < len(pricing_assets) - 1:
-                time.sleep(delay_seconds)
+                    errors.append(f"{item.provider_symbol}: salvataggio tick fallito - {failed_ticks[item.asset_id]}")
+            items = [item for item in items if item.asset_id not in failed_ticks]
 
         logger.info(
             'End price refresh provider=%s requested=%s refreshed=%s failed=%s',
@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS portfolio_values_1d (
+    portfolio_id bigint NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+    value_date date NOT NULL,
+    asset_value numeric(28,10) NOT NULL,
+    cash_value numeric(28,10) NOT NULL,
+    net_external_flow numeric(28,10) NOT NULL DEFAULT 0,
+    computed_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (portfolio_id, value_date)
+)
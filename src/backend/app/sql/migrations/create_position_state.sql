@@ -0,0 +1,12 @@
+CREATE TABLE IF NOT EXISTS position_state (
+    portfolio_id bigint NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+    asset_id bigint NOT NULL REFERENCES assets(id) ON DELETE CASCADE,
+    quantity double precision NOT NULL DEFAULT 0,
+    cost_basis double precision NOT NULL DEFAULT 0,
+    running_quantity double precision NOT NULL DEFAULT 0,
+    first_trade_at timestamptz,
+    last_trade_at timestamptz,
+    last_transaction_id bigint,
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (portfolio_id, asset_id)
+)
@@ -0,0 +1,4 @@
+CREATE TABLE IF NOT EXISTS position_state_portfolios (
+    portfolio_id bigint PRIMARY KEY REFERENCES portfolios(id) ON DELETE CASCADE,
+    rebuilt_at timestamptz NOT NULL DEFAULT now()
+)
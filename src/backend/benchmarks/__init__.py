@@ -0,0 +1,5 @@
+"""Benchmarks of the repository and analytics hot paths on a synthetic dataset.
+
+Run them with ``scripts/benchmark.py`` against a dedicated database: the
+dataset is written there on the first run and reused afterwards.
+"""
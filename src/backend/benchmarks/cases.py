@@ -0,0 +1,93 @@
+"""Benchmarked operations: repository reads, analytics and CSV import."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from app.models import PortfolioCreate
+from app.repository import PortfolioRepository
+from app.services.csv_service import CsvImportService
+from app.services.performance_service import PerformanceService
+from app.services.portfolio_doctor import analyze_portfolio_health, run_monte_carlo_projection
+
+from .dataset import BASE_CURRENCY, LoadedDataset
+
+# Rows of the benchmarked CSV import.
+CSV_IMPORT_ROWS = 200
+
+
+@dataclass
+class BenchContext:
+    repo: PortfolioRepository
+    data: LoadedDataset
+    performance: PerformanceService = field(init=False)
+    csv_import: CsvImportService = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.performance = PerformanceService(self.repo)
+        self.csv_import = CsvImportService(self.repo)
+
+    @property
+    def portfolio_id(self) -> int:
+        return self.data.portfolio_ids[0]
+
+    @property
+    def user_id(self) -> str:
+        return self.data.user_id
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """``run`` is timed; ``setup``'s result is passed to it and to ``teardown``, both untimed."""
+
+    name: str
+    run: Callable[[BenchContext, Any], object]
+    setup: Callable[[BenchContext], Any] | None = None
+    teardown: Callable[[BenchContext, Any], None] | None = None
+
+
+def _scratch_portfolio(ctx: BenchContext) -> int:
+    return ctx.repo.create_portfolio(
+        PortfolioCreate(name="CSV import (benchmark)", base_currency=BASE_CURRENCY, timezone="Europe/Rome"),
+        ctx.user_id,
+    ).id
+
+
+def _import_csv(ctx: BenchContext, portfolio_id: int) -> object:
+    preview = ctx.csv_import.parse_and_validate(
+        portfolio_id,
+        ctx.user_id,
+        file_content=ctx.data.dataset.csv_import(CSV_IMPORT_ROWS),
+        filename="benchmark.csv",
+    )
+    result = ctx.csv_import.commit_batch(preview.batch_id, ctx.user_id)
+    if result.committed_transactions != CSV_IMPORT_ROWS:
+        raise RuntimeError(f"CSV import: {result.committed_transactions}/{CSV_IMPORT_ROWS} righe importate {result.errors[:3]}")
+    return result
+
+
+def _drop_portfolio(ctx: BenchContext, portfolio_id: int) -> None:
+    ctx.repo.delete_portfolio(portfolio_id, ctx.user_id)
+
+
+CASES: list[BenchmarkCase] = [
+    BenchmarkCase("positions", lambda ctx, _: ctx.repo.get_positions(ctx.portfolio_id, ctx.user_id)),
+    BenchmarkCase("summary", lambda ctx, _: ctx.repo.get_summary(ctx.portfolio_id, ctx.user_id)),
+    BenchmarkCase(
+        "timeseries_1y_daily",
+        lambda ctx, _: ctx.repo.get_timeseries(ctx.portfolio_id, "1y", "1d", ctx.user_id),
+    ),
+    BenchmarkCase(
+        "timeseries_max_weekly",
+        lambda ctx, _: ctx.repo.get_timeseries(ctx.portfolio_id, "max", "1w", ctx.user_id),
+    ),
+    BenchmarkCase("twr", lambda ctx, _: ctx.performance.calculate_twr(ctx.portfolio_id, ctx.user_id)),
+    BenchmarkCase("twr_timeseries", lambda ctx, _: ctx.performance.get_twr_timeseries(ctx.portfolio_id, ctx.user_id)),
+    BenchmarkCase("mwr", lambda ctx, _: ctx.performance.calculate_mwr(ctx.portfolio_id, ctx.user_id)),
+    BenchmarkCase("mwr_timeseries", lambda ctx, _: ctx.performance.get_mwr_timeseries(ctx.portfolio_id, ctx.user_id)),
+    BenchmarkCase("monthly_returns", lambda ctx, _: ctx.performance.get_monthly_returns(ctx.portfolio_id, ctx.user_id)),
+    BenchmarkCase("doctor", lambda ctx, _: analyze_portfolio_health(ctx.repo, ctx.portfolio_id, ctx.user_id)),
+    BenchmarkCase("monte_carlo", lambda ctx, _: run_monte_carlo_projection(ctx.repo, ctx.portfolio_id, ctx.user_id)),
+    BenchmarkCase("csv_import", _import_csv, setup=_scratch_portfolio, teardown=_drop_portfolio),
+]
@@ -0,0 +1,314 @@
+"""Deterministic synthetic dataset for the benchmarks, and its loader.
+
+``generate`` is pure: the same spec and end date always give the same
+assets, daily bars, FX rates and PAC-style transactions. ``load`` writes
+them through the repository (the same code paths the API uses) and
+reuses them on later runs when they are already in the database.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+from sqlalchemy import text
+
+from app.models import AssetCreate, PortfolioCreate, TransactionCreate
+from app.repository import PortfolioRepository
+
+DATABASE_DIR = Path(__file__).resolve().parents[3] / "database"
+BASE_CURRENCY = "EUR"
+PROVIDER = "yfinance"
+PORTFOLIO_NAME_PREFIX = "Benchmark"
+# Share of assets quoted in each currency; FX rates are generated towards EUR.
+CURRENCY_MIX = {"EUR": 0.6, "USD": 0.3, "GBP": 0.1}
+FX_START = {"USD": 0.92, "GBP": 1.17}
+# Monthly PAC instalment per asset, in EUR.
+MONTHLY_AMOUNT_PER_ASSET = 150.0
+TRADING_DAYS = 252
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    portfolios: int = 5
+    assets: int = 40
+    years: int = 5
+    assets_per_portfolio: int = 8
+    seed: int = 365
+
+    def __post_init__(self) -> None:
+        if min(self.portfolios, self.assets, self.years, self.assets_per_portfolio) < 1:
+            raise ValueError("Tutti i parametri del dataset devono essere >= 1")
+        if self.assets_per_portfolio > self.assets:
+            raise ValueError("assets_per_portfolio non puo superare assets")
+
+    @property
+    def key(self) -> str:
+        return f"p{self.portfolios}-a{self.assets}-y{self.years}-k{self.assets_per_portfolio}-s{self.seed}"
+
+    @property
+    def owner_user_id(self) -> str:
+        return f"bench-{self.key}"
+
+    @property
+    def tag(self) -> str:
+        """Six uppercase hex chars identifying the spec in asset symbols and ISINs."""
+        return hashlib.sha1(self.key.encode("utf-8")).hexdigest()[:6].upper()
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class SyntheticAsset:
+    symbol: str
+    name: str
+    isin: str
+    asset_type: str
+    quote_currency: str
+
+
+@dataclass(frozen=True)
+class SyntheticTransaction:
+    asset: int | None  # index into Dataset.assets; None for cash movements
+    side: str
+    trade_date: date
+    quantity: float
+    price: float
+    currency: str
+
+
+@dataclass(frozen=True)
+class Dataset:
+    spec: DatasetSpec
+    days: np.ndarray  # datetime64[D], business days
+    assets: list[SyntheticAsset]
+    closes: np.ndarray  # (assets, days)
+    fx: dict[str, np.ndarray]  # currency -> EUR per unit, one rate per day
+    transactions: list[list[SyntheticTransaction]]  # one list per portfolio
+
+    @property
+    def start(self) -> date:
+        return self.days[0].astype(date)
+
+    def bar_rows(self, asset_ids: list[int]) -> Iterator[dict]:
+        """price_bars_1d rows for ``asset_ids`` (the database ids of ``assets``, in order)."""
+        days = self.days.astype(date).tolist()
+        for asset_id, closes in zip(asset_ids, self.closes):
+            opens = np.concatenate([closes[:1], closes[:-1]])
+            spread = 1.0 + 0.004 * (1.0 + np.sin(np.arange(len(closes))))
+            highs = np.maximum(opens, closes) * spread
+            lows = np.minimum(opens, closes) / spread
+            for day, o, h, low, c in zip(days, opens.tolist(), highs.tolist(), lows.tolist(), closes.tolist()):
+                yield {
+                    "asset_id": asset_id,
+                    "price_date": day,
+                    "open": round(o, 6),
+                    "high": round(h, 6),
+                    "low": round(low, 6),
+                    "close": round(c, 6),
+                    "volume": 10_000.0,
+                }
+
+    def fx_rows(self) -> Iterator[dict]:
+        days = self.days.astype(date).tolist()
+        for currency, rates in self.fx.items():
+            for day, rate in zip(days, rates.tolist()):
+                yield {"from_ccy": currency, "to_ccy": BASE_CURRENCY, "price_date": day, "rate": round(rate, 8)}
+
+    def csv_import(self, rows: int) -> str:
+        """Generic-broker CSV with ``rows`` buys of the portfolio assets, Italian number format."""
+        lines = ["operazione;isin;segno;quantita;prezzo;divisa"]
+        buys = [tx for tx in self.transactions[0] if tx.side == "buy"][:rows]
+        for tx in buys:
+            asset = self.assets[tx.asset]
+            lines.append(
+                f"{tx.trade_date:%d/%m/%Y};{asset.isin};A;{_it_number(tx.quantity)};{_it_number(tx.price)};{tx.currency}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _it_number(value: float) -> str:
+    return f"{value:.4f}".replace(".", ",")
+
+
+def _business_days(start: date, end: date) -> np.ndarray:
+    days = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+    return days[np.is_busday(days)]
+
+
+def _random_walk(rng: np.random.Generator, start: float, drift: float, volatility: float, size: int) -> np.ndarray:
+    step = volatility / np.sqrt(TRADING_DAYS)
+    log_returns = rng.normal(drift / TRADING_DAYS - step * step / 2.0, step, size)
+    log_returns[0] = 0.0
+    return start * np.exp(np.cumsum(log_returns))
+
+
+def generate(spec: DatasetSpec, end: date | None = None) -> Dataset:
+    end = end or date.today()
+    rng = np.random.default_rng(spec.seed)
+    days = _business_days(end - timedelta(days=round(365.25 * spec.years)), end)
+
+    currencies = list(CURRENCY_MIX)
+    quote = rng.choice(currencies, size=spec.assets, p=list(CURRENCY_MIX.values()))
+    assets = [
+        SyntheticAsset(
+            symbol=f"BN{spec.tag}{idx:04d}",
+            name=f"Benchmark {'ETF' if idx % 4 else 'Stock'} {idx:04d}",
+            isin=f"XB{spec.tag}{idx:04d}",
+            asset_type="etf" if idx % 4 else "stock",
+            quote_currency=str(ccy),
+        )
+        for idx, ccy in enumerate(quote)
+    ]
+    closes = np.stack([
+        _random_walk(rng, rng.uniform(20.0, 200.0), rng.uniform(0.02, 0.10), rng.uniform(0.12, 0.35), len(days))
+        for _ in assets
+    ])
+    fx = {ccy: _random_walk(rng, rate, 0.0, 0.07, len(days)) for ccy, rate in FX_START.items()}
+    fx_for = {**fx, BASE_CURRENCY: np.ones(len(days))}
+
+    # PAC instalments on the first business day of each month.
+    months = days.astype("datetime64[M]")
+    instalments = np.flatnonzero(np.concatenate([[True], months[1:] != months[:-1]]))
+    transactions: list[list[SyntheticTransaction]] = []
+    for _ in range(spec.portfolios):
+        picks = sorted(rng.choice(spec.assets, size=spec.assets_per_portfolio, replace=False).tolist())
+        held = dict.fromkeys(picks, 0.0)
+        ledger: list[SyntheticTransaction] = []
+        for month, day_idx in enumerate(instalments.tolist()):
+            trade_date = days[day_idx].astype(date)
+            amount = MONTHLY_AMOUNT_PER_ASSET * len(picks)
+            ledger.append(SyntheticTransaction(None, "deposit", trade_date, amount, 1.0, BASE_CURRENCY))
+            for asset in picks:
+                ccy = assets[asset].quote_currency
+                price = round(float(closes[asset, day_idx]), 4)
+                quantity = round(MONTHLY_AMOUNT_PER_ASSET / float(fx_for[ccy][day_idx]) / price, 4)
+                held[asset] += quantity
+                ledger.append(SyntheticTransaction(asset, "buy", trade_date, quantity, price, ccy))
+            # Yearly partial sale of one position, so the flows change sign.
+            if month % 12 == 11:
+                asset = picks[int(rng.integers(len(picks)))]
+                quantity = round(held[asset] * 0.1, 4)
+                held[asset] -= quantity
+                price = round(float(closes[asset, day_idx]), 4)
+                ledger.append(SyntheticTransaction(asset, "sell", trade_date, quantity, price, assets[asset].quote_currency))
+        transactions.append(ledger)
+
+    return Dataset(spec=spec, days=days, assets=assets, closes=closes, fx=fx, transactions=transactions)
+
+
+@dataclass(frozen=True)
+class LoadedDataset:
+    spec: DatasetSpec
+    user_id: str
+    portfolio_ids: list[int]
+    dataset: Dataset
+
+
+def ensure_schema(repo: PortfolioRepository) -> bool:
+    """Bootstrap an empty database like scripts/bootstrap_db.ps1; returns True if it did.
+
+    Applies database/schema.sql and the migrations in name order. Migrations
+    driven by psql variables (one-off data fixes, no-ops without them) need
+    psql and are skipped.
+    """
+    with repo.engine.begin() as conn:
+        if conn.execute(text("select to_regclass('public.portfolios')")).scalar() is not None:
+            return False
+        conn.exec_driver_sql((DATABASE_DIR / "schema.sql").read_text(encoding="utf-8"))
+        for path in sorted((DATABASE_DIR / "migrations").glob("*.sql")):
+            sql = path.read_text(encoding="utf-8")
+            if any(line.startswith("\\") for line in sql.splitlines()):
+                continue
+            conn.exec_driver_sql(sql)
+    return True
+
+
+def load(
+    repo: PortfolioRepository,
+    spec: DatasetSpec,
+    *,
+    rebuild: bool = False,
+    end: date | None = None,
+) -> LoadedDataset:
+    """Load ``spec`` into the database, or reuse it when a previous run already did."""
+    dataset = generate(spec, end)
+    user_id = spec.owner_user_id
+    ensure_schema(repo)
+
+    portfolio_ids = _benchmark_portfolio_ids(repo, user_id)
+    if len(portfolio_ids) == spec.portfolios and not rebuild:
+        return LoadedDataset(spec=spec, user_id=user_id, portfolio_ids=portfolio_ids, dataset=dataset)
+
+    purge(repo, spec)
+    asset_ids = [
+        repo.create_asset(
+            AssetCreate(
+                symbol=asset.symbol,
+                name=asset.name,
+                asset_type=asset.asset_type,
+                quote_currency=asset.quote_currency,
+                isin=asset.isin,
+            )
+        ).id
+        for asset in dataset.assets
+    ]
+    repo.bulk_load_price_bars_1d(provider=PROVIDER, rows=dataset.bar_rows(asset_ids))
+    repo.bulk_load_fx_rates_1d(provider=PROVIDER, rows=dataset.fx_rows())
+
+    portfolio_ids = []
+    for number, ledger in enumerate(dataset.transactions, start=1):
+        portfolio = repo.create_portfolio(
+            PortfolioCreate(name=f"{PORTFOLIO_NAME_PREFIX} {number}", base_currency=BASE_CURRENCY, timezone="Europe/Rome"),
+            user_id,
+        )
+        # Analytics clamp their start to the creation date: date it back to the first trade.
+        with repo.engine.begin() as conn:
+            conn.execute(
+                text("update portfolios set created_at = :created_at where id = :id"),
+                {"created_at": datetime.combine(dataset.start, time(), tzinfo=timezone.utc), "id": portfolio.id},
+            )
+        for tx in ledger:
+            repo.create_transaction(
+                TransactionCreate(
+                    portfolio_id=portfolio.id,
+                    asset_id=asset_ids[tx.asset] if tx.asset is not None else None,
+                    side=tx.side,
+                    trade_at=datetime.combine(tx.trade_date, time(12), tzinfo=timezone.utc),
+                    quantity=tx.quantity,
+                    price=tx.price,
+                    trade_currency=tx.currency,
+                ),
+                user_id,
+            )
+        portfolio_ids.append(portfolio.id)
+    repo.clear_caches()
+    return LoadedDataset(spec=spec, user_id=user_id, portfolio_ids=portfolio_ids, dataset=dataset)
+
+
+def purge(repo: PortfolioRepository, spec: DatasetSpec) -> None:
+    """Delete the portfolios and assets of ``spec`` (prices and FX of other data are left alone)."""
+    with repo.engine.begin() as conn:
+        conn.execute(text("delete from portfolios where owner_user_id = :user_id"), {"user_id": spec.owner_user_id})
+        conn.execute(text("delete from assets where symbol like :prefix"), {"prefix": f"BN{spec.tag}%"})
+    repo.clear_caches()
+
+
+def _benchmark_portfolio_ids(repo: PortfolioRepository, user_id: str) -> list[int]:
+    with repo.engine.begin() as conn:
+        rows = conn.execute(
+            text(
+                """
+                select id from portfolios
+                where owner_user_id = :user_id and name like :prefix
+                order by id asc
+                """
+            ),
+            {"user_id": user_id, "prefix": f"{PORTFOLIO_NAME_PREFIX} %"},
+        ).all()
+    return [int(row.id) for row in rows]
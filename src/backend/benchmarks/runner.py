@@ -0,0 +1,144 @@
+"""Timing loop, baseline file and regression check."""
+
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .cases import BenchContext, BenchmarkCase
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_TOLERANCE = 0.5
+# Slowdowns smaller than this are noise, whatever their ratio.
+DEFAULT_NOISE_FLOOR_MS = 5.0
+
+
+@dataclass(frozen=True)
+class Regression:
+    case: str
+    baseline_ms: float
+    current_ms: float
+    tolerance: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ms / self.baseline_ms if self.baseline_ms else float("inf")
+
+
+def summarize(samples_ms: list[float]) -> dict[str, float | int]:
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "median_ms": round(float(np.median(samples)), 3),
+        "min_ms": round(float(samples.min()), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "runs": int(len(samples)),
+    }
+
+
+def run_case(ctx: BenchContext, case: BenchmarkCase, *, warmup: int, repeat: int, cold: bool) -> dict[str, float | int]:
+    """Time ``repeat`` runs of ``case`` after ``warmup`` untimed ones.
+
+    With ``cold`` the repository caches are dropped before every run, so
+    each one reads prices, FX and positions from the database. As in
+    ``timeit``, the garbage collector is off while timing: its pauses would
+    otherwise land on random runs.
+    """
+    samples: list[float] = []
+    for iteration in range(warmup + repeat):
+        state = case.setup(ctx) if case.setup else None
+        if cold:
+            ctx.repo.clear_caches()
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            case.run(ctx, state)
+            elapsed = (time.perf_counter() - started) * 1000.0
+        finally:
+            gc.enable()
+            if case.teardown:
+                case.teardown(ctx, state)
+        if iteration >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict[str, Any] | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def build_baseline(
+    results: dict[str, dict[str, float | int]],
+    *,
+    spec: dict[str, int],
+    mode: str,
+    previous: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Baseline document for ``results``, keeping thresholds and untouched cases of ``previous``."""
+    previous = previous if previous and previous.get("spec") == spec and previous.get("mode") == mode else {}
+    cases = dict(previous.get("cases", {}))
+    for name, summary in results.items():
+        tolerance = cases.get(name, {}).get("tolerance")
+        cases[name] = {**summary, **({"tolerance": tolerance} if tolerance is not None else {})}
+    return {
+        "spec": spec,
+        "mode": mode,
+        "tolerance": previous.get("tolerance", DEFAULT_TOLERANCE),
+        "noise_floor_ms": previous.get("noise_floor_ms", DEFAULT_NOISE_FLOOR_MS),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.machine()},
+        "cases": dict(sorted(cases.items())),
+    }
+
+
+def save_baseline(baseline: dict[str, Any], path: Path = BASELINE_PATH) -> None:
+    path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(
+    results: dict[str, dict[str, float | int]],
+    baseline: dict[str, Any],
+    *,
+    tolerance: float | None = None,
+) -> list[Regression]:
+    """Cases slower than the baseline by more than the tolerance and the noise floor.
+
+    The fastest current run is held against the baseline median: a slowdown
+    in the code moves every run, while a busy machine mostly moves the
+    slower ones. ``tolerance`` overrides the baseline's default, not the
+    per-case values.
+    """
+    default_tolerance = tolerance if tolerance is not None else float(baseline.get("tolerance", DEFAULT_TOLERANCE))
+    noise_floor = float(baseline.get("noise_floor_ms", DEFAULT_NOISE_FLOOR_MS))
+    regressions: list[Regression] = []
+    for name, summary in results.items():
+        reference = baseline.get("cases", {}).get(name)
+        if reference is None:
+            continue
+        case_tolerance = float(reference.get("tolerance", default_tolerance))
+        baseline_ms = float(reference["median_ms"])
+        current_ms = float(summary["min_ms"])
+        if current_ms > baseline_ms * (1.0 + case_tolerance) and current_ms - baseline_ms > noise_floor:
+            regressions.append(Regression(name, baseline_ms, current_ms, case_tolerance))
+    return regressions
+
+
+def format_report(results: dict[str, dict[str, float | int]], baseline: dict[str, Any] | None) -> str:
+    reference = (baseline or {}).get("cases", {})
+    lines = [f"{'case':<24}{'median ms':>12}{'min ms':>10}{'p95 ms':>10}{'baseline':>12}{'min delta':>11}"]
+    for name, summary in results.items():
+        base = reference.get(name, {}).get("median_ms")
+        delta = f"{(summary['min_ms'] / base - 1.0) * 100:+.1f}%" if base else "-"
+        lines.append(
+            f"{name:<24}{summary['median_ms']:>12.2f}{summary['min_ms']:>10.2f}{summary['p95_ms']:>10.2f}"
+            f"{(f'{base:.2f}' if base else '-'):>12}{delta:>11}"
+        )
+    return "\n".join(lines)
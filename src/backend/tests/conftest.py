@@ -0,0 +1,63 @@
+import json
+import math
+from typing import Any
+
+import pytest
+
+
+# The response encoder before orjson, verbatim: the reference for app.responses.
+class _SafeEncoder(json.JSONEncoder):
+    """JSON encoder that converts NaN/Inf to None instead of raising."""
+    def default(self, o: Any) -> Any:
+        return super().default(o)
+
+    def iterencode(self, o: Any, _one_shot: bool = False) -> Any:
+        return super().iterencode(self._sanitize(o), _one_shot=_one_shot)
+
+    @staticmethod
+    def _sanitize(obj: Any) -> Any:
+        if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
+            return None
+        if isinstance(obj, dict):
+            return {k: _SafeEncoder._sanitize(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [_SafeEncoder._sanitize(v) for v in obj]
+        return obj
+
+
+def _compact_separators(text: str) -> str:
+    """Drop the space json.dumps writes after ',' and ':' outside string literals."""
+    out: list[str] = []
+    in_string = escaped = skip_space = False
+    for char in text:
+        if skip_space:
+            skip_space = False
+            if char == " ":
+                continue
+        out.append(char)
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in ",:":
+            skip_space = True
+    return "".join(out)
+
+
+@pytest.fixture
+def baseline_json():
+    """Bytes of the baseline encoder with compact separators.
+
+    The baseline wrote ', ' and ': '; the orjson encoder cannot, so the
+    whitespace is the one difference this reference leaves out.
+    """
+    def dumps(content: Any) -> bytes:
+        text = json.dumps(content, ensure_ascii=False, allow_nan=False, cls=_SafeEncoder)
+        return _compact_separators(text).encode("utf-8")
+
+    return dumps
@@ -1,3 +1,5 @@
+import json
+
 from fastapi import APIRouter, FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
@@ -5,6 +7,7 @@ from fastapi.testclient import TestClient
 import app.api.portfolio_health as portfolio_health_api
 import app.api.instant_portfolio_analyzer as instant_portfolio_api
 import app.main as api_main
+import app.responses as api_responses
 from app.errors import AppError
 from app.schemas.portfolio_doctor import (
     PortfolioHealthAlert,
@@ -29,7 +32,7 @@ from app.schemas.instant_portfolio_analyzer import (
     PortfolioTopInsight,
     ResolvedPosition,
 )
-from app.models import AdminUsageSummary
+from app.models import AdminUsageSummary, DrawdownPoint, MWRTimeseriesPoint
 
 
 class _FakeRepo:
@@ -177,6 +180,31 @@ class _FakePerformanceService:
         }
 
 
+class _FakeStreamingPerformanceService:
+    def _mwr_points(self):
+        return [
+            MWRTimeseriesPoint(date='2026-01-01', cumulative_mwr_pct=0.0),
+            MWRTimeseriesPoint(date='2026-01-02', cumulative_mwr_pct=float('nan')),
+            MWRTimeseriesPoint(date='2026-01-03', cumulative_mwr_pct=1.5),
+        ]
+
+    def get_mwr_timeseries(self, portfolio_id: int, user_id: str, start_date=None, end_date=None):
+        return self._mwr_points()
+
+    def iter_mwr_timeseries(self, portfolio_id: int, user_id: str, start_date=None, end_date=None):
+        if portfolio_id != 1:
+            raise ValueError('Portfolio non trovato')
+        return iter(self._mwr_points())
+
+    def get_mwr_timeseries_columns(self, portfolio_id: int, user_id: str, start_date=None, end_date=None):
+        return {'dates': ['2026-01-01', '2026-01-02'], 'cumulative_mwr_pct': [0.0, float('inf')]}
+
+    def stream_drawdown(self, portfolio_id: int, user_id: str, start_date=None, end_date=None):
+        header = {'portfolio_id': portfolio_id, 'max_drawdown_pct': -2.0, 'current_drawdown_pct': -1.0}
+        points = (DrawdownPoint(date=f'2026-01-0{day}', drawdown_pct=-float(day - 1)) for day in (1, 2, 3))
+        return header, points
+
+
 def test_error_model_uniform(monkeypatch):
     monkeypatch.setattr(api_main, 'repo', _FakeRepo())
     client = TestClient(api_main.app)
@@ -813,3 +841,88 @@ def test_csv_import_template_route(monkeypatch):
         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
     assert 'valore365-generic-import-template.xlsx' in response.headers['content-disposition']
+
+
+def test_performance_timeseries_ndjson_streams_the_json_points(monkeypatch):
+    monkeypatch.setattr(api_main, 'performance_service', _FakeStreamingPerformanceService())
+    client = TestClient(api_main.app)
+
+    as_json = client.get('/api/portfolios/1/performance/mwr/timeseries').json()
+    response = client.get('/api/portfolios/1/performance/mwr/timeseries?format=ndjson')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == as_json
+    assert lines[1]['cumulative_mwr_pct'] is None
+
+    missing = client.get('/api/portfolios/2/performance/mwr/timeseries?format=ndjson')
+    assert missing.status_code == 404
+    assert client.get('/api/portfolios/1/performance/mwr/timeseries?format=xml').status_code == 422
+
+
+def test_drawdown_ndjson_sends_the_summary_before_the_points(monkeypatch):
+    monkeypatch.setattr(api_main, 'performance_service', _FakeStreamingPerformanceService())
+    client = TestClient(api_main.app)
+
+    response = client.get('/api/portfolios/1/performance/drawdown?format=ndjson')
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {'portfolio_id': 1, 'max_drawdown_pct': -2.0, 'current_drawdown_pct': -1.0}
+    assert lines[1:] == [
+        {'date': '2026-01-01', 'drawdown_pct': 0.0},
+        {'date': '2026-01-02', 'drawdown_pct': -1.0},
+        {'date': '2026-01-03', 'drawdown_pct': -2.0},
+    ]
+
+
+def test_performance_timeseries_columnar_format(monkeypatch):
+    monkeypatch.setattr(api_main, 'performance_service', _FakeStreamingPerformanceService())
+    client = TestClient(api_main.app)
+
+    response = client.get('/api/portfolios/1/performance/mwr/timeseries?format=columnar')
+
+    assert response.status_code == 200
+    assert response.json() == {'dates': ['2026-01-01', '2026-01-02'], 'cumulative_mwr_pct': [0.0, None]}
+
+
+def test_series_routes_document_only_the_formats_they_accept():
+    paths = api_main.app.openapi()['paths']
+
+    def ok(path: str) -> dict:
+        return paths[path]['get']['responses']['200']
+
+    mwr = ok('/api/portfolios/{portfolio_id}/performance/mwr/timeseries')
+    assert 'application/x-ndjson' in mwr['content'] and 'format=columnar' in mwr['description']
+    for path in ('/api/portfolios/{portfolio_id}/timeseries', '/api/assets/{asset_id}/price-timeseries'):
+        assert 'application/x-ndjson' not in ok(path)['content']
+        assert 'format=ndjson' not in ok(path)['description'] and 'format=columnar' in ok(path)['description']
+    target = ok('/api/portfolios/{portfolio_id}/target-performance')
+    assert 'application/x-ndjson' in target['content'] and 'format=columnar' not in target['description']
+
+
+def test_fast_json_encoder_matches_the_baseline_encoder_on_route_payloads(monkeypatch, baseline_json):
+    rendered: list = []
+    render = api_responses.SafeJSONResponse.render
+
+    def _recording_render(self, content):
+        rendered.append(content)
+        return render(self, content)
+
+    monkeypatch.setattr(api_responses.SafeJSONResponse, 'render', _recording_render)
+    monkeypatch.setattr(api_main, 'repo', _FakeRepo())
+    monkeypatch.setattr(api_main.settings, 'admin_user_ids', 'dev-user')
+    client = TestClient(api_main.app)
+
+    responses = [client.get('/api/portfolios'), client.get('/api/admin/usage-summary')]
+    responses.append(client.post('/api/portfolios', json={'name': 'Più € 😀', 'base_currency': 'EUR', 'timezone': 'Europe/Rome'}))
+    monkeypatch.setattr(api_main, 'performance_service', _FakePerformanceService())
+    responses.append(client.get('/api/portfolios/1/performance/summary?period=1y'))
+    monkeypatch.setattr(api_main, 'performance_service', _FakeStreamingPerformanceService())
+    responses.append(client.get('/api/portfolios/1/performance/mwr/timeseries'))
+    responses.append(client.get('/api/portfolios/1/performance/mwr/timeseries?format=columnar'))
+
+    assert len(rendered) == len(responses)
+    for response, content in zip(responses, rendered):
+        assert response.status_code == 200
+        assert response.content == baseline_json(content)
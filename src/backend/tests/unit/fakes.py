@@ -0,0 +1,46 @@
+from collections.abc import Callable
+from contextlib import contextmanager
+from typing import Any
+
+
+# In-memory stand-ins for the SQLAlchemy engine and results the repository
+# mixins use. Each test module keeps its own connection fake: that is where
+# the statements under test are answered.
+class FakeResult:
+    """Rows of a ``conn.execute`` result; ``mappings()`` returns the same rows."""
+
+    def __init__(self, rows: list[Any] | None = None) -> None:
+        self.rows = rows or []
+
+    def mappings(self):
+        return self
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def all(self):
+        return self.rows
+
+    fetchall = all
+
+
+class FakeEngine:
+    """``begin()`` yields ``conn``, or a fresh ``conn_factory()`` per transaction.
+
+    ``begins`` counts the transactions and ``conns`` keeps the connection of
+    each, in order.
+    """
+
+    def __init__(self, conn: Any = None, *, conn_factory: Callable[[], Any] | None = None) -> None:
+        self.conn = conn
+        self.conn_factory = conn_factory
+        self.begins = 0
+        self.conns: list[Any] = []
+
+    @contextmanager
+    def begin(self):
+        self.begins += 1
+        conn = self.conn_factory() if self.conn_factory is not None else self.conn
+        self.conns.append(conn)
+        yield conn
+
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from datetime import UTC, datetime
+
+import httpx
+
+from app.async_finance_client import (
+    AsyncTwelveDataClient,
+    ExecutorAsyncFinanceClient,
+    as_async_finance_client,
+    gather_bounded,
+    map_in_finance_executor,
+)
+from app.errors import ProviderError
+from app.finance_client import ProviderIntradayBar, TwelveDataClient
+from app.repository import AssetMeta, IntradayHoldings, PortfolioRepository
+
+
+def test_gather_bounded_caps_concurrency_and_keeps_order():
+    in_flight = 0
+    peak = 0
+
+    async def work(value: int) -> int:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if value == 3:
+            raise ValueError("boom")
+        return value * 2
+
+    results = asyncio.run(gather_bounded(work, range(6), limit=2))
+
+    assert peak == 2
+    assert results[:3] == [0, 2, 4]
+    assert isinstance(results[3], ValueError)
+    assert results[4:] == [8, 10]
+
+
+def test_executor_client_runs_sync_calls_off_the_event_loop():
+    class _SyncClient:
+        def __init__(self) -> None:
+            self.threads = set()
+
+        def get_intraday_bars(self, symbol: str, period: str = "5d", interval: str = "1h"):
+            self.threads.add(threading.current_thread().name)
+            return [ProviderIntradayBar(ts=datetime(2026, 3, 10, 10, tzinfo=UTC), close=1.0)]
+
+    sync_client = _SyncClient()
+    client = as_async_finance_client(sync_client)
+
+    async def run():
+        return await gather_bounded(lambda s: client.get_intraday_bars(s, period="1d"), ["A", "B", "C"])
+
+    results = asyncio.run(run())
+
+    assert isinstance(client, ExecutorAsyncFinanceClient)
+    assert all(len(bars) == 1 for bars in results)
+    assert all(name.startswith("finance") for name in sync_client.threads)
+    assert map_in_finance_executor(lambda x: 1 / x, [1, 0])[0] == 1.0
+
+
+def test_async_twelvedata_batches_quotes_and_trims_intraday_sessions(monkeypatch):
+    requests = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(dict(request.url.params))
+        if request.url.path.endswith("/quote"):
+            return httpx.Response(200, json={
+                "AAPL": {"symbol": "AAPL", "close": "101.5"},
+                "BAD": {"code": 404, "message": "symbol not found"},
+            })
+        return httpx.Response(200, json={"values": [
+            {"datetime": "2026-03-11 15:00:00", "close": "12.0"},
+            {"datetime": "2026-03-11 14:00:00", "close": "11.0"},
+            {"datetime": "2026-03-10 15:00:00", "close": "10.0"},
+        ]})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as pooled:
+            monkeypatch.setattr("app.async_finance_client.get_async_http_client", lambda provider: pooled)
+            client = as_async_finance_client(TwelveDataClient(base_url="https://example.test", api_key="key"))
+            assert isinstance(client, AsyncTwelveDataClient)
+            quotes = await client.get_quotes(["AAPL", "BAD"])
+            bars = await client.get_intraday_bars("AAPL", period="1d", interval="1h")
+            return quotes, bars
+
+    quotes, bars = asyncio.run(run())
+
+    assert requests[0]["symbol"] == "AAPL,BAD"
+    assert quotes["AAPL"].price == 101.5
+    assert isinstance(quotes["BAD"], ProviderError)
+    assert requests[1]["interval"] == "1h"
+    assert [bar.close for bar in bars] == [11.0, 12.0]
+
+
+def test_build_intraday_timeseries_carries_prices_forward():
+    holdings = IntradayHoldings(
+        base_currency="EUR",
+        quantities={1: 2.0, 2: 10.0},
+        asset_meta={1: AssetMeta(symbol="A", quote_currency="USD"), 2: AssetMeta(symbol="B", quote_currency="EUR")},
+        provider_symbols={1: "A", 2: "B"},
+        fx_rates={"USD": 0.5},
+        cash=100.0,
+    )
+    t1 = datetime(2026, 3, 10, 10, tzinfo=UTC)
+    t2 = datetime(2026, 3, 10, 11, tzinfo=UTC)
+    bars = {
+        1: [ProviderIntradayBar(ts=t1, close=10.0), ProviderIntradayBar(ts=t2, close=20.0)],
+        2: [ProviderIntradayBar(ts=t1, close=3.0)],
+    }
+
+    points = PortfolioRepository.build_intraday_timeseries(holdings, bars)
+
+    assert [p.market_value for p in points] == [140.0, 150.0]
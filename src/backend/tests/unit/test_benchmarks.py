@@ -0,0 +1,101 @@
+import csv
+import io
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.services.csv_service import REQUIRED_COLUMNS, _parse_italian_number
+from benchmarks.dataset import DatasetSpec, generate
+from benchmarks.runner import build_baseline, compare, summarize
+
+SPEC = DatasetSpec(portfolios=2, assets=6, years=2, assets_per_portfolio=3, seed=7)
+END = date(2026, 10, 16)
+
+
+def test_dataset_is_deterministic_and_sized_by_the_spec():
+    dataset = generate(SPEC, END)
+    again = generate(SPEC, END)
+
+    assert np.array_equal(dataset.closes, again.closes)
+    assert dataset.transactions == again.transactions
+    assert dataset.closes.shape == (6, len(dataset.days))
+    assert np.is_busday(dataset.days).all() and dataset.days[-1].astype(date) == END
+    assert {len(asset.isin) for asset in dataset.assets} == {12}
+    assert set(dataset.fx) == {"USD", "GBP"}
+
+    months = len(np.unique(dataset.days.astype("datetime64[M]")))
+    for ledger in dataset.transactions:
+        sides = [tx.side for tx in ledger]
+        assert sides.count("deposit") == months
+        assert sides.count("buy") == months * 3
+        assert sides.count("sell") == months // 12
+        assert len({tx.asset for tx in ledger if tx.asset is not None}) == 3
+
+
+def test_dataset_sells_never_exceed_the_holdings():
+    for ledger in generate(DatasetSpec(years=3, seed=11), END).transactions:
+        held: dict[int, float] = {}
+        for tx in ledger:
+            if tx.side == "buy":
+                held[tx.asset] = held.get(tx.asset, 0.0) + tx.quantity
+            elif tx.side == "sell":
+                held[tx.asset] -= tx.quantity
+                assert held[tx.asset] > 0
+
+
+def test_dataset_csv_import_uses_the_generic_broker_columns():
+    dataset = generate(SPEC, END)
+    rows = list(csv.DictReader(io.StringIO(dataset.csv_import(5)), delimiter=";"))
+    first_buy = next(tx for tx in dataset.transactions[0] if tx.side == "buy")
+
+    assert set(REQUIRED_COLUMNS) <= set(rows[0])
+    assert len(rows) == 5
+    assert rows[0]["isin"] == dataset.assets[first_buy.asset].isin
+    assert _parse_italian_number(rows[0]["quantita"]) == pytest.approx(first_buy.quantity)
+
+
+def test_dataset_spec_validation():
+    with pytest.raises(ValueError):
+        DatasetSpec(assets=3, assets_per_portfolio=4)
+    assert DatasetSpec().owner_user_id == "bench-p5-a40-y5-k8-s365"
+
+
+def test_compare_flags_cases_whose_fastest_run_exceeds_the_threshold():
+    baseline = {
+        "tolerance": 0.5,
+        "noise_floor_ms": 5.0,
+        "cases": {
+            "twr": {"median_ms": 100.0},
+            "mwr": {"median_ms": 100.0, "tolerance": 1.0},
+            "positions": {"median_ms": 4.0},
+        },
+    }
+    results = {
+        "twr": summarize([160.0, 170.0, 400.0]),
+        "mwr": summarize([160.0, 170.0]),  # within its own tolerance
+        "positions": summarize([8.0, 9.0]),  # x2 but under the noise floor
+        "doctor": summarize([1000.0]),  # not in the baseline
+    }
+
+    assert [r.case for r in compare(results, baseline)] == ["twr"]
+    assert compare(results, baseline, tolerance=0.7) == []
+    assert compare({"twr": summarize([140.0, 900.0])}, baseline) == []
+
+
+def test_build_baseline_keeps_thresholds_of_the_same_dataset():
+    spec = SPEC.to_dict()
+    previous = {
+        "spec": spec,
+        "mode": "cold",
+        "tolerance": 0.3,
+        "cases": {"twr": {"median_ms": 1.0, "tolerance": 0.8}, "mwr": {"median_ms": 2.0}},
+    }
+
+    baseline = build_baseline({"twr": summarize([5.0])}, spec=spec, mode="cold", previous=previous)
+    assert baseline["tolerance"] == 0.3
+    assert baseline["cases"]["twr"] == {"median_ms": 5.0, "min_ms": 5.0, "p95_ms": 5.0, "runs": 1, "tolerance": 0.8}
+    assert baseline["cases"]["mwr"] == {"median_ms": 2.0}
+
+    fresh = build_baseline({"twr": summarize([5.0])}, spec=spec, mode="warm", previous=previous)
+    assert list(fresh["cases"]) == ["twr"] and "tolerance" not in fresh["cases"]["twr"]
@@ -0,0 +1,95 @@
+from datetime import date
+
+from app.repository._bulk_load import BulkLoadMixin
+from app.repository._price_series import PriceSeriesCache, PriceSeriesMixin
+from tests.unit.fakes import FakeEngine
+
+
+class _FakeCopy:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def write_row(self, row) -> None:
+        self.rows.append(row)
+
+
+class _FakeCursor:
+    def __init__(self, merge_rows: list[tuple], distinct_rows: int) -> None:
+        self.merge_rows = merge_rows
+        self.distinct_rows = distinct_rows
+        self.copied: list = []
+        self.statements: list[str] = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def copy(self, sql):
+        self.statements.append(sql)
+        return _FakeCopy(self.copied)
+
+    def fetchone(self):
+        return (self.distinct_rows,)
+
+    def fetchall(self):
+        return self.merge_rows
+
+    def close(self) -> None:
+        pass
+
+
+class _FakeConn:
+    def __init__(self, cursor: _FakeCursor) -> None:
+        self.connection = type("_Pooled", (), {"driver_connection": type("_Driver", (), {"cursor": lambda _: cursor})()})()
+
+
+class _Repo(BulkLoadMixin, PriceSeriesMixin):
+    def __init__(self, cursor: _FakeCursor) -> None:
+        self.engine = FakeEngine(_FakeConn(cursor))
+        self.invalidated_assets: list[tuple[int, date]] = []
+        self.invalidated_returns: list[int] = []
+        self.bumped_assets: list[int] = []
+        self._price_series_cache = PriceSeriesCache()
+
+    def _invalidate_portfolio_values_for_asset(self, conn, asset_id: int, from_date: date) -> None:
+        self.invalidated_assets.append((asset_id, from_date))
+
+    def _invalidate_log_returns(self, asset_ids: list[int]) -> None:
+        self.invalidated_returns.extend(asset_ids)
+
+    def _bump_snapshot_assets(self, asset_ids: list[int]) -> None:
+        self.bumped_assets.extend(asset_ids)
+
+
+def test_bulk_load_price_bars_streams_rows_and_counts_changes():
+    cursor = _FakeCursor(merge_rows=[(7, date(2026, 3, 2), 1, 1)], distinct_rows=3)
+    repo = _Repo(cursor)
+    rows = (
+        {"asset_id": 7, "price_date": date(2026, 3, day), "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": None}
+        for day in (2, 3, 4)
+    )
+
+    result = repo.bulk_load_price_bars_1d(provider=" YFinance ", rows=rows)
+
+    assert len(cursor.copied) == 3
+    assert cursor.copied[0] == (7, date(2026, 3, 2), 1.0, 1.0, 1.0, 1.0, None)
+    assert (result.inserted, result.updated, result.unchanged) == (1, 1, 1)
+    assert repo.invalidated_assets == [(7, date(2026, 3, 2))]
+    assert repo.invalidated_returns == [7]
+    assert repo.bumped_assets == [7]
+
+
+def test_bulk_load_price_bars_skips_merge_when_nothing_is_staged():
+    cursor = _FakeCursor(merge_rows=[], distinct_rows=0)
+    repo = _Repo(cursor)
+
+    result = repo.bulk_load_price_bars_1d(provider="yfinance", rows=[])
+
+    assert result.staged == 0
+    assert not any("insert into price_bars_1d" in sql for sql in cursor.statements)
+    assert repo.invalidated_returns == []
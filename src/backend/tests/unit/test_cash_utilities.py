@@ -1,5 +1,6 @@
 from datetime import date
 
+from app.repository._fx_rates import FxRates
 from app.repository._utilities import _build_cash_breakdown, _compute_cash_balance_base
 
 
@@ -73,13 +74,17 @@ def test_compute_cash_balance_base_only_cash_movements():
                 "trade_currency": "EUR",
             },
         ],
-        fx_rows=[
-            {
-                "from_ccy": "USD",
-                "price_date": date(2026, 1, 4),
-                "rate": 0.9,
-            }
-        ],
+        fx=FxRates.from_rows(
+            [
+                {
+                    "from_ccy": "USD",
+                    "price_date": date(2026, 1, 4),
+                    "rate": 0.9,
+                }
+            ],
+            "EUR",
+            default=1.0,
+        ),
     )
 
     # Only deposit (500) - withdrawal (100) = 400. Buy/sell ignored.
@@ -1,11 +1,13 @@
 import sys
 import types
+from datetime import UTC, datetime
+from zoneinfo import ZoneInfo
 
 import pandas as pd
 import pytest
 
 from app.errors import ProviderError
-from app.finance_client import YahooFinanceClient, normalize_expense_ratio_pct
+from app.finance_client import TwelveDataClient, YahooFinanceClient, normalize_expense_ratio_pct
 
 
 def test_normalize_expense_ratio_pct_handles_percent_and_fraction_inputs():
@@ -85,3 +87,77 @@ def test_yfinance_daily_bars_empty_raises_provider_error(monkeypatch):
         client.get_daily_bars("AAPL")
 
     assert exc.value.reason == "no_data"
+
+
+def test_yfinance_get_quotes_prefers_fast_info_and_downloads_only_the_rest(monkeypatch):
+    downloads = []
+    tokyo_today = datetime.now(ZoneInfo("Asia/Tokyo")).date()
+
+    def _download(tickers, **kwargs):
+        downloads.append(list(tickers))
+        columns = pd.MultiIndex.from_product([["MSFT", "7203.T"], ["Open", "Close"]])
+        return pd.DataFrame(
+            [[1.0, 300.0, 1.0, 2500.0], [1.0, float("nan"), 1.0, 2510.0]],
+            index=pd.to_datetime(["2026-03-10", tokyo_today.isoformat()]),
+            columns=columns,
+        )
+
+    realtime = {"AAPL": (101.0, 100.0)}
+    timezones = {"MSFT": "America/New_York", "7203.T": "Asia/Tokyo"}
+
+    class _Ticker:
+        def __init__(self, symbol: str):
+            price, previous_close = realtime.get(symbol, (None, None))
+            self.fast_info = types.SimpleNamespace(
+                last_price=price, previous_close=previous_close, timezone=timezones.get(symbol)
+            )
+
+    fake_module = types.SimpleNamespace(download=_download, Ticker=lambda symbol: _Ticker(symbol))
+    monkeypatch.setitem(sys.modules, "yfinance", fake_module)
+
+    quotes = YahooFinanceClient(max_retries=1).get_quotes(["AAPL", "MSFT", "AAPL", "7203.T", "NOPE"])
+
+    assert list(quotes) == ["AAPL", "MSFT", "7203.T", "NOPE"]
+    assert downloads == [["MSFT", "7203.T", "NOPE"]]
+    assert quotes["AAPL"].source == "fast_info"
+    assert quotes["AAPL"].is_realtime is True
+    assert quotes["AAPL"].previous_close == 100.0
+
+    msft = quotes["MSFT"]
+    assert (msft.price, msft.previous_close) == (300.0, None)
+    assert (msft.source, msft.is_realtime, msft.is_fallback, msft.stale) == ("download_close", False, True, True)
+    assert msft.ts == datetime(2026, 3, 10, 4, tzinfo=UTC)
+
+    # Today's bar in Tokyo is current even when it is still yesterday in UTC.
+    toyota = quotes["7203.T"]
+    assert (toyota.price, toyota.previous_close) == (2510.0, 2500.0)
+    assert toyota.is_fallback is True and toyota.stale is False
+    assert toyota.ts == datetime(tokyo_today.year, tokyo_today.month, tokyo_today.day, tzinfo=ZoneInfo("Asia/Tokyo"))
+
+    assert isinstance(quotes["NOPE"], ProviderError)
+    assert quotes["NOPE"].reason == "no_data"
+
+
+def test_twelvedata_get_quotes_reports_errors_per_symbol(monkeypatch):
+    calls = []
+
+    def _request_json(self, path, params, *, symbol):
+        calls.append(params["symbol"])
+        return {
+            "AAPL": {"symbol": "AAPL", "close": "101.5", "previous_close": "100.0", "volume": "1200"},
+            "BAD": {"code": 404, "message": "symbol not found"},
+        }
+
+    monkeypatch.setattr(TwelveDataClient, "_request_json", _request_json)
+
+    client = TwelveDataClient(base_url="https://example.test", api_key="key")
+    quotes = client.get_quotes(["AAPL", "BAD", "MISSING"])
+
+    assert calls == ["AAPL,BAD,MISSING"]
+    assert quotes["AAPL"].price == 101.5
+    assert quotes["AAPL"].previous_close == 100.0
+    assert quotes["AAPL"].volume == 1200.0
+    assert isinstance(quotes["BAD"], ProviderError)
+    assert "symbol not found" in quotes["BAD"].message
+    assert isinstance(quotes["MISSING"], ProviderError)
+    assert quotes["MISSING"].reason == "no_data"
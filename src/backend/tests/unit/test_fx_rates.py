@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.repository._fx_rates import FxRateIndex, FxRates
+from tests.unit.fakes import FakeResult
+
+
+class _FakeConn:
+    """Serves fx_rates_1d rows from memory and counts full-pair loads."""
+
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.loads = 0
+
+    def execute(self, statement, params):
+        if "first_date" in params:
+            return FakeResult([
+                {"price_date": r["price_date"], "rate": r["rate"]}
+                for r in self.rows
+                if r["from_ccy"] == params["from_ccy"] and r["price_date"] >= params["first_date"]
+            ])
+        self.loads += 1
+        return FakeResult([r for r in self.rows if r["from_ccy"] in params["from_ccy"]])
+
+
+def _rows() -> list[dict]:
+    return [
+        {"from_ccy": "USD", "price_date": date(2026, 1, 2), "rate": 0.9},
+        {"from_ccy": "USD", "price_date": date(2026, 1, 5), "rate": 0.8},
+    ]
+
+
+def test_fx_rates_keep_each_call_site_fallback():
+    strict = FxRates.from_rows(_rows(), "EUR")
+    lenient = FxRates.from_rows(_rows(), "EUR", default=1.0)
+
+    assert strict.rate("EUR", None) == 1.0
+    assert strict.rate("USD", date(2026, 1, 1)) is None
+    assert lenient.rate("USD", date(2026, 1, 1)) == 1.0
+    assert strict.rate("USD", date(2026, 1, 4)) == 0.9
+    assert strict.rate("USD", None) is None
+    assert strict.rate("GBP", date(2026, 1, 4)) is None
+    assert lenient.latest("GBP") == 1.0
+    assert strict.latest("USD") == 0.8
+
+
+def test_vectorized_lookup_matches_scalar_lookup():
+    fx = FxRates.from_rows(_rows(), "EUR")
+    start = date(2025, 12, 30)
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(date(2026, 1, 8), "D") + 1)
+
+    vectorized = fx.rates("USD", days)
+    scalar = [fx.rate("USD", start + timedelta(days=i)) for i in range(len(days))]
+
+    assert [None if np.isnan(v) else float(v) for v in vectorized] == scalar
+    assert FxRates.from_rows(_rows(), "EUR", default=1.0).rates("GBP", days).tolist() == [1.0] * len(days)
+
+
+def test_index_merges_committed_writes_without_reloading():
+    conn = _FakeConn(_rows())
+    index = FxRateIndex()
+    index.lookup(conn, ["USD"], "EUR")
+
+    conn.rows.append({"from_ccy": "USD", "price_date": date(2026, 1, 6), "rate": 0.7})
+    index.apply_refresh(index.begin_refresh(conn, {("USD", "EUR"): date(2026, 1, 6)}))
+    fx = index.lookup(conn, ["USD"], "EUR")
+
+    assert fx.rate("USD", date(2026, 1, 7)) == 0.7
+    assert conn.loads == 1
+
+
+def test_index_drops_pairs_written_concurrently():
+    conn = _FakeConn(_rows())
+    index = FxRateIndex()
+    index.lookup(conn, ["USD"], "EUR")
+
+    first = index.begin_refresh(conn, {("USD", "EUR"): date(2026, 1, 6)})
+    second = index.begin_refresh(conn, {("USD", "EUR"): date(2026, 1, 6)})
+    index.apply_refresh(first)
+    index.apply_refresh(second)
+
+    assert index.stats()["pairs"] == 0
+    index.lookup(conn, ["USD"], "EUR")
+    assert conn.loads == 2
@@ -1,6 +1,6 @@
-from datetime import date
+from datetime import date, timedelta
 
-from app.services.historical_service import HistoricalIngestionService
+from app.services.historical_service import HistoricalIngestionService, _missing_ranges
 from app.models import DailyBackfillResponse
 
 
@@ -12,9 +12,17 @@ class _FakeAsset:
 
 
 class _FakeRepo:
-    def __init__(self) -> None:
+    def __init__(self, stored_bars=None, stored_fx=None) -> None:
         self.bars_rows = []
         self.fx_rows = []
+        self.stored_bars = stored_bars or {}
+        self.stored_fx = stored_fx or {}
+
+    def get_price_bars_1d_by_date(self, asset_ids, provider, start_date, end_date):
+        return {1: self.stored_bars} if self.stored_bars else {}
+
+    def get_fx_rates_1d_by_date(self, from_ccys, to_ccy, provider, start_date, end_date):
+        return {'USD': self.stored_fx} if self.stored_fx else {}
 
     def get_assets_for_price_refresh(self, provider: str, portfolio_id: int | None = None, asset_scope: str = 'target', user_id: str | None = None):
         return [_FakeAsset(1, 'AAPL', 'AAPL')]
@@ -25,14 +33,12 @@ class _FakeRepo:
     def get_quote_currencies_for_assets(self, asset_ids: list[int]):
         return {1: 'USD'}
 
-    def batch_upsert_price_bars_1d(self, **kwargs):
-        self.bars_rows.extend(kwargs['rows'])
-
-    def batch_upsert_fx_rates_1d(self, **kwargs):
-        self.fx_rows.extend(kwargs['rows'])
+    def get_latest_close_prices(self, asset_ids: list[int]):
+        return {}
 
-    def get_latest_close_price(self, asset_id: int):
-        return None
+    def save_daily_history(self, *, provider: str, bars: list[dict], fx_rates: list[dict]):
+        self.bars_rows.extend(bars)
+        self.fx_rows.extend(fx_rates)
 
 
 class _FakeSettings:
@@ -41,14 +47,20 @@ class _FakeSettings:
     price_validation_max_ohlc_spread_pct = 100.0
     price_validation_fx_min_rate = 0.0001
     price_validation_fx_max_rate = 10000.0
+    backfill_max_workers = 1
+    finance_provider_rate_limits_map: dict[str, float] = {}
+    finance_provider_rate_burst = 1
+    finance_symbol_request_delay_seconds = 0.0
 
 
 class _FakeClient:
     def __init__(self, bars=None, fx_rates=None):
         self._bars = bars
         self._fx_rates = fx_rates
+        self.bar_ranges = []
 
     def get_daily_bars(self, symbol: str, outputsize: int = 365, *, start_date=None, end_date=None, **kwargs):
+        self.bar_ranges.append((start_date, end_date))
         if self._bars is not None:
             return self._bars
 
@@ -159,3 +171,101 @@ def test_backfill_daily_rejects_invalid_fx_rate(monkeypatch):
     assert len(repo.bars_rows) == 1
     # Invalid FX rate should be filtered
     assert len(repo.fx_rows) == 0
+
+
+def test_missing_ranges_skips_holidays_and_refetches_last_day():
+    start = date(2026, 1, 5)   # Monday
+    end = date(2026, 3, 31)
+    stored = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    stored = [d for d in stored if d != date(2026, 1, 6) and not (date(2026, 2, 2) <= d <= date(2026, 2, 13))]
+    stored = [d for d in stored if d <= date(2026, 3, 27)]
+
+    assert _missing_ranges([], start, end) == [(start, end)]
+    assert _missing_ranges(stored, start, end) == [
+        (date(2026, 2, 2), date(2026, 2, 13)),
+        (date(2026, 3, 27), end),
+    ]
+
+
+def test_backfill_daily_fetches_only_gaps_and_skips_unchanged_bars(monkeypatch):
+    import app.services.historical_service as mod
+
+    class Bar:
+        def __init__(self, day, close):
+            self.day = day
+            self.open = close
+            self.high = close
+            self.low = close
+            self.close = close
+            self.volume = 10.0
+
+    today = date.today()
+    start = today - timedelta(days=29)
+    stored = {
+        start + timedelta(days=offset): {'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 10.0}
+        for offset in range(29)
+    }
+    yesterday = today - timedelta(days=1)
+    client = _FakeClient(bars=[Bar(yesterday, 1.0), Bar(today, 1.02)], fx_rates=[])
+    monkeypatch.setattr(mod, 'make_finance_client', lambda _: client)
+
+    repo = _FakeRepo(stored_bars=stored, stored_fx={d: 0.92 for d in stored})
+    result = HistoricalIngestionService(_FakeSettings(), repo).backfill_daily(portfolio_id=1, days=30)
+
+    assert client.bar_ranges == [(yesterday.isoformat(), today.isoformat())]
+    item = result.asset_items[0]
+    assert (item.bars_requested, item.bars_saved, item.bars_unchanged) == (2, 1, 1)
+    assert [row['price_date'] for row in repo.bars_rows] == [today]
+
+    full = HistoricalIngestionService(_FakeSettings(), _FakeRepo(stored_bars=stored)).backfill_daily(
+        portfolio_id=1, days=30, incremental=False
+    )
+    assert client.bar_ranges[-1] == (start.isoformat(), today.isoformat())
+    assert full.asset_items[0].bars_unchanged == 0
+
+
+def test_backfill_daily_fetches_in_parallel_and_saves_once(monkeypatch):
+    import threading
+
+    import app.services.historical_service as mod
+    from app.errors import ProviderError
+
+    class _ParallelClient(_FakeClient):
+        def __init__(self):
+            super().__init__()
+            self.threads = set()
+
+        def get_daily_bars(self, symbol: str, outputsize: int = 365, **kwargs):
+            self.threads.add(threading.current_thread().name)
+            if symbol == 'BAD':
+                raise ProviderError(provider='yfinance', operation='daily_bars', symbol=symbol, reason='no_data', message='nessun dato')
+            return super().get_daily_bars(symbol, outputsize, **kwargs)
+
+    class _ManyAssetsRepo(_FakeRepo):
+        saves = 0
+
+        def get_assets_for_price_refresh(self, provider: str, portfolio_id: int | None = None, asset_scope: str = 'target', user_id: str | None = None):
+            return [_FakeAsset(i, f'S{i}', 'BAD' if i == 3 else f'S{i}') for i in range(1, 7)]
+
+        def get_quote_currencies_for_assets(self, asset_ids: list[int]):
+            return {asset_id: 'USD' for asset_id in asset_ids}
+
+        def save_daily_history(self, **kwargs):
+            self.saves += 1
+            super().save_daily_history(**kwargs)
+
+    class _ParallelSettings(_FakeSettings):
+        backfill_max_workers = 4
+
+    client = _ParallelClient()
+    monkeypatch.setattr(mod, 'make_finance_client', lambda _: client)
+    repo = _ManyAssetsRepo()
+
+    result = HistoricalIngestionService(_ParallelSettings(), repo).backfill_daily(portfolio_id=1, days=30)
+
+    assert [item.asset_id for item in result.asset_items] == [1, 2, 4, 5, 6]
+    assert result.errors == ['BAD: nessun dato']
+    assert result.fx_pairs_refreshed == 1
+    assert repo.saves == 1
+    assert sorted(row['asset_id'] for row in repo.bars_rows) == [1, 2, 4, 5, 6]
+    assert all(name.startswith('backfill') for name in client.threads)
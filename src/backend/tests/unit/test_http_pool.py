@@ -0,0 +1,82 @@
+import asyncio
+import logging
+
+import httpx
+
+from app import http_pool
+from app.finance_client import TwelveDataClient
+
+
+def test_get_http_client_is_shared_until_closed():
+    http_pool.close_http_clients()
+    http_pool.configure_http_pool(max_connections=5, max_keepalive_connections=2, http2=False)
+    try:
+        first = http_pool.get_http_client("twelvedata")
+        assert http_pool.get_http_client("twelvedata") is first
+        assert http_pool.get_http_client("fmp") is not first
+
+        http_pool.close_http_clients()
+
+        assert first.is_closed
+        assert http_pool.get_http_client("twelvedata") is not first
+    finally:
+        http_pool.close_http_clients()
+        http_pool.configure_http_pool()
+
+
+def test_configure_http_pool_warns_when_http2_is_unavailable(monkeypatch, caplog):
+    monkeypatch.setattr(http_pool, "_HTTP2_AVAILABLE", False)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.http_pool"):
+            http_pool.configure_http_pool(http2=False)
+            assert caplog.records == []
+            http_pool.configure_http_pool(http2=True)
+        assert "h2" in caplog.records[0].getMessage()
+    finally:
+        http_pool.close_http_clients()
+        http_pool.configure_http_pool()
+
+
+def test_twelvedata_retries_on_the_pooled_client(monkeypatch):
+    statuses = iter([503, 200])
+    seen_clients = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        status = next(statuses)
+        if status != 200:
+            return httpx.Response(status, request=request)
+        return httpx.Response(200, json={"symbol": "AAPL", "close": "101.5"}, request=request)
+
+    pooled = httpx.Client(transport=httpx.MockTransport(_handler))
+
+    def _get_http_client(provider: str) -> httpx.Client:
+        seen_clients.append(provider)
+        return pooled
+
+    monkeypatch.setattr("app.finance_client.get_http_client", _get_http_client)
+
+    client = TwelveDataClient(base_url="https://example.test", api_key="key", retry_backoff_seconds=0.0)
+    quote = client.get_quote("AAPL")
+
+    assert quote.price == 101.5
+    assert seen_clients == ["twelvedata", "twelvedata"]
+    assert not pooled.is_closed
+    pooled.close()
+
+
+def test_async_http_clients_are_kept_per_event_loop():
+    async def get_twice():
+        client = http_pool.get_async_http_client("twelvedata")
+        assert http_pool.get_async_http_client("twelvedata") is client
+        return client
+
+    async def get_and_close():
+        client = await get_twice()
+        await http_pool.aclose_async_http_clients()
+        return client
+
+    first = asyncio.run(get_twice())
+    second = asyncio.run(get_and_close())
+
+    assert second is not first
+    assert second.is_closed
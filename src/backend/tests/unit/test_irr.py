@@ -0,0 +1,46 @@
+import numpy as np
+
+from app.services.irr import CashflowSchedule
+from app.services.performance_service import PerformanceService
+
+
+def test_batched_irr_matches_scalar_solver_at_every_horizon():
+    flows = [(0.0, -1000.0), (30.0, -200.0), (95.0, 150.0), (95.0, -400.0), (200.0, -100.0)]
+    schedule = CashflowSchedule.from_flows(flows)
+    horizons = np.arange(1.0, 366.0)
+    terminal_values = 1000.0 + 2.0 * horizons + np.where(horizons >= 95, 250.0, 0.0)
+
+    rates, unsolved = schedule.irr_at_horizons(horizons, terminal_values)
+    solver = PerformanceService(repo=None)
+
+    assert not unsolved.any()
+    for horizon, terminal, rate in zip(horizons, terminal_values, rates):
+        expected = solver._solve_irr(schedule.flows_until(horizon, terminal))
+        if expected is None:
+            assert np.isnan(rate)
+        else:
+            assert abs(rate - expected) < 1e-7
+
+
+def test_irr_without_sign_change_or_root_in_bounds_is_nan():
+    schedule = CashflowSchedule.from_flows([(0.0, -100.0)])
+
+    rates, unsolved = schedule.irr_at_horizons(np.array([10.0, 365.0, 365.0]), np.array([-5.0, 100.0, 1e9]))
+
+    assert np.isnan(rates[0]) and np.isnan(rates[2])
+    assert abs(rates[1]) < 1e-12
+    assert not unsolved.any()
+
+
+def test_several_sign_changes_pick_the_root_of_the_scalar_solver():
+    # -100, +230, -132 at 0/1/2 years: roots at +10% and +20%, not bracketed by the bounds.
+    two_roots = CashflowSchedule.from_flows([(0.0, -100.0), (365.0, 230.0)])
+    # -1, +3, -3, +1 at 0/1/2/3 years: triple root at 0%, bracketed by the bounds.
+    bracketed = CashflowSchedule.from_flows([(0.0, -1.0), (365.0, 3.0), (730.0, -3.0)])
+
+    rates, unsolved = two_roots.irr_at_horizons(np.array([730.0]), np.array([-132.0]))
+    _, flagged = bracketed.irr_at_horizons(np.array([1095.0]), np.array([1.0]))
+
+    assert not unsolved[0]
+    assert abs(rates[0] - PerformanceService(repo=None)._solve_irr(two_roots.flows_until(730.0, -132.0))) < 1e-9
+    assert flagged.tolist() == [True]
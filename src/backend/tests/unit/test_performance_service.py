@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, timedelta
 
 from app.models import CashFlowEntry
 from app.services.performance_service import PerformanceService
@@ -27,6 +27,14 @@ class _FakeRepo:
     def get_portfolio_value_at_date(self, portfolio_id: int, user_id: str, target_date: date) -> float:
         return float(self.values.get(target_date, 0.0))
 
+    def get_portfolio_values_in_range(self, portfolio_id: int, user_id: str, start_date: date, end_date: date) -> dict[date, float]:
+        out: dict[date, float] = {}
+        cursor = start_date
+        while cursor <= end_date:
+            out[cursor] = self.get_portfolio_value_at_date(portfolio_id, user_id, cursor)
+            cursor += timedelta(days=1)
+        return out
+
 
 def test_twr_and_mwr_zero_on_empty_portfolio():
     day = date(2026, 1, 1)
@@ -75,6 +83,10 @@ def test_twr_timeseries_accounts_for_external_cashflow():
     assert points[0].cumulative_twr_pct == 0.0
     # Day 2 return = (170 - 100 - 50) / 100 = 20%
     assert abs(points[1].cumulative_twr_pct - 20.0) < 0.01
+    columns = service.get_twr_timeseries_columns(1, 'u', start, end)
+    assert columns['dates'] == [point.date for point in points]
+    assert columns['cumulative_twr_pct'] == [point.cumulative_twr_pct for point in points]
+    assert columns['portfolio_value'] == [100.0, 170.0, 180.0]
 
 
 def test_monthly_returns_and_hall_of_fame_rank_periods_correctly():
@@ -129,6 +141,12 @@ def test_drawdown_tracks_peak_trough_and_current_drawdown():
     assert drawdown.peak_date == '2026-01-02'
     assert drawdown.peak_value == 120.0
     assert round(drawdown.current_drawdown_pct, 2) == -20.83
+    columns = service.get_drawdown_columns(1, 'u', start, end)
+    assert columns == {
+        **drawdown.model_dump(exclude={'points'}),
+        'dates': [point.date for point in drawdown.points],
+        'drawdown_pct': [point.drawdown_pct for point in drawdown.points],
+    }
 
 
 def test_rolling_windows_exposes_cagr_volatility_and_sharpe():
@@ -154,3 +172,25 @@ def test_rolling_windows_exposes_cagr_volatility_and_sharpe():
     assert point.cagr_pct is not None and point.cagr_pct > 0
     assert point.volatility_pct is not None and point.volatility_pct > 0
     assert point.sharpe_ratio is not None and point.sharpe_ratio > 0
+
+
+def test_mwr_timeseries_is_daily_over_multiple_years_and_matches_calculate_mwr():
+    start = date(2023, 1, 1)
+    end = start + timedelta(days=3 * 365)
+    values = {start + timedelta(days=offset): 1000.0 * 1.08 ** (offset / 365.0) for offset in range(3 * 365 + 1)}
+    deposit_day = start + timedelta(days=400)
+    for offset in range(400, 3 * 365 + 1):
+        values[start + timedelta(days=offset)] += 500.0 * 1.08 ** ((offset - 400) / 365.0)
+    repo = _FakeRepo(
+        created=start,
+        values=values,
+        cashflows=[CashFlowEntry(date=deposit_day.isoformat(), side='deposit', amount=500.0)],
+    )
+    service = PerformanceService(repo)
+
+    points = service.get_mwr_timeseries(1, 'u', start, end)
+
+    assert len(points) == 3 * 365 + 1
+    assert points[0].cumulative_mwr_pct == 0.0
+    assert all(abs(point.cumulative_mwr_pct - 8.0) < 0.01 for point in points[1:])
+    assert points[-1].cumulative_mwr_pct == service.calculate_mwr(1, 'u', start, end).mwr_pct
@@ -1,7 +1,18 @@
-from datetime import date
+from datetime import date, timedelta
+
+import numpy as np
 
 from app.schemas.portfolio_doctor import PortfolioHealthMetrics
 from app.services.portfolio_doctor._holdings import _compute_portfolio_return_params
+from app.repository import AssetLogReturns, PriceSeries
+from app.services.portfolio_doctor._covariance import estimate_covariance
+from app.services.portfolio_doctor._prices import PriceMatrix
+from app.services.portfolio_doctor._monte_carlo import (
+    _decumulation_growth,
+    _decumulation_success_rate,
+    _simulate_paths,
+    _solve_success_rate_withdrawal,
+)
 from app.services.portfolio_doctor.education_templates import enrich_alerts_with_education
 from app.services.portfolio_doctor._stress import (
     _compute_historical_scenario,
@@ -138,6 +149,21 @@ def test_weighted_ter_normalizes_metadata_expense_ratio_units():
     assert weighted_ter == 0.13
 
 
+class _PriceRepo:
+    """Serves the price-series reads of the doctor from ``(asset_id, price_date, close)`` rows."""
+
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+
+    def get_price_series(self, asset_ids):
+        return {
+            asset_id: PriceSeries.from_points(
+                (row["price_date"], row["close"]) for row in self.rows if row["asset_id"] == asset_id
+            )
+            for asset_id in asset_ids
+        }
+
+
 def test_historical_stress_does_not_renormalize_away_cash_weight():
     holdings = [
         _holding(1, "EQ", "Equity ETF", "etf", 50, "USD"),
@@ -149,32 +175,6 @@ def test_historical_stress_does_not_renormalize_away_cash_weight():
         {"asset_id": 1, "price_date": date(2020, 3, 23), "close": 80.0},
     ]
 
-    class _Result:
-        def mappings(self):
-            return self
-
-        def all(self):
-            return rows
-
-    class _Conn:
-        def execute(self, *args, **kwargs):
-            return _Result()
-
-    class _Begin:
-        def __enter__(self):
-            return _Conn()
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
-
-    class _Engine:
-        @staticmethod
-        def begin():
-            return _Begin()
-
-    class _Repo:
-        engine = _Engine()
-
     scenario = {
         "id": "covid_crash",
         "name": "Covid Crash",
@@ -184,7 +184,7 @@ def test_historical_stress_does_not_renormalize_away_cash_weight():
         "benchmark_drawdown": -33.9,
     }
 
-    result = _compute_historical_scenario(_Repo(), holdings, scenario)
+    result = _compute_historical_scenario(_PriceRepo(rows), holdings, scenario)
 
     assert result.estimated_portfolio_impact_pct == -10.0
     assert result.max_drawdown_pct == -10.0
@@ -196,18 +196,68 @@ def test_weighted_drawdown_keeps_uncovered_assets_flat_instead_of_dropping_them(
         _holding(2, "BOND", "Bond ETF", "bond", 50, "EUR"),
     ]
 
-    prices_by_asset = {
-        1: [
-            (date(2020, 2, 19), 100.0),
-            (date(2020, 3, 23), 80.0),
+    prices = PriceMatrix.from_rows(
+        [
+            {"asset_id": 1, "price_date": date(2020, 2, 19), "close": 100.0},
+            {"asset_id": 1, "price_date": date(2020, 3, 23), "close": 80.0},
         ]
-    }
+    )
 
-    drawdown = _compute_weighted_drawdown(prices_by_asset, holdings)
+    drawdown = _compute_weighted_drawdown(prices, holdings)
 
     assert round(drawdown, 2) == -10.0
 
 
+def test_price_matrix_forward_fills_and_holds_missing_assets_flat():
+    prices = PriceMatrix.from_rows(
+        [
+            {"asset_id": 1, "price_date": date(2024, 1, 1), "close": 100.0},
+            {"asset_id": 1, "price_date": date(2024, 1, 3), "close": 110.0},
+            {"asset_id": 2, "price_date": date(2024, 1, 2), "close": 50.0},
+            {"asset_id": 2, "price_date": date(2024, 1, 3), "close": 0.0},
+            {"asset_id": 2, "price_date": date(2024, 1, 4), "close": 40.0},
+        ]
+    )
+
+    assert prices.dates == [date(2024, 1, day) for day in range(1, 5)]
+    assert prices.observed(2).tolist() == [50.0, 40.0]
+    assert prices.normalized().tolist() == [[1.0, 1.0], [1.0, 1.0], [1.1, 1.0], [1.1, 0.8]]
+    index = prices.weighted_index({1: 0.5, 2: 0.25, 99: 0.25})
+    assert [round(value, 4) for value in index] == [1.0, 1.0, 1.05, 1.0]
+    window = prices.window(date(2024, 1, 3), date(2024, 1, 4))
+    assert window.dates == [date(2024, 1, 3), date(2024, 1, 4)]
+    assert window.normalized()[:, 1].tolist() == [1.0, 1.0]
+
+
+def _log_returns(asset_id: int, values: list[float]) -> AssetLogReturns:
+    return AssetLogReturns(
+        asset_id=asset_id,
+        dates=[date(2025, 1, 1) + timedelta(days=idx) for idx in range(len(values))],
+        log_returns=np.array(values),
+    )
+
+
+def test_covariance_volatility_accounts_for_correlation():
+    wave = [0.01 if idx % 2 == 0 else -0.01 for idx in range(40)]
+    returns = {
+        1: _log_returns(1, wave),
+        2: _log_returns(2, [-value for value in wave]),
+        3: _log_returns(3, wave),
+        4: _log_returns(4, wave[:10]),
+    }
+
+    sample = estimate_covariance(returns, estimator="sample")
+    shrunk = estimate_covariance(returns, estimator="shrinkage")
+
+    assert sample is not None and shrunk is not None
+    assert sample.asset_ids == [1, 2, 3]
+    assert sample.annualized_volatility({1: 0.5, 2: 0.5}) < 1e-9
+    single = sample.annualized_volatility({1: 1.0})
+    assert abs(sample.annualized_volatility({1: 0.5, 3: 0.5}) - single) < 1e-9
+    assert 0.0 < shrunk.shrinkage <= 1.0
+    assert 0.0 < shrunk.annualized_volatility({1: 0.5, 2: 0.5}) < single
+
+
 def test_portfolio_return_params_use_portfolio_series_not_weighted_asset_sigmas():
     holdings = [
         _holding(1, "UP", "Up Asset", "etf", 50, "USD"),
@@ -218,33 +268,7 @@ def test_portfolio_return_params_use_portfolio_series_not_weighted_asset_sigmas(
     down_series = [{"asset_id": 2, "price_date": date(2026, 1, day + 1), "close": 100.0 - day} for day in range(21)]
     rows = sorted(up_series + down_series, key=lambda row: (row["asset_id"], row["price_date"]))
 
-    class _Result:
-        def mappings(self):
-            return self
-
-        def all(self):
-            return rows
-
-    class _Conn:
-        def execute(self, *args, **kwargs):
-            return _Result()
-
-    class _Begin:
-        def __enter__(self):
-            return _Conn()
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
-
-    class _Engine:
-        @staticmethod
-        def begin():
-            return _Begin()
-
-    class _Repo:
-        engine = _Engine()
-
-    mu_annual, sigma_annual, df_t = _compute_portfolio_return_params(_Repo(), holdings)
+    mu_annual, sigma_annual, df_t = _compute_portfolio_return_params(_PriceRepo(rows), holdings)
 
     assert abs(mu_annual) < 1e-6
     assert sigma_annual < 0.001
@@ -396,6 +420,78 @@ def test_decumulation_paths_deplete_with_zero_return_and_high_withdrawals():
     assert projections[3].depletion_probability_pct == 100
 
 
+def test_decumulation_paths_apply_taxes_on_embedded_gains_for_every_path():
+    paths = _simulate_decumulation_paths(
+        initial_capital=200_000,
+        initial_cost_basis=100_000,
+        annual_withdrawal=20_000,
+        years=3,
+        inflation_rate_pct=0.0,
+        other_income_annual=5_000.0,
+        capital_gains_tax_rate_pct=25.0,
+        mu_annual=0.0,
+        sigma_annual=0.0,
+        num_simulations=10,
+    )
+
+    assert paths.ending_capitals.shape == (10, 3)
+    # 50% embedded gain taxed at 25%: 15k net needs a 15k / 0.875 gross sale.
+    assert round(float(paths.gross_withdrawals[0, 0]), 2) == 17142.86
+    assert round(float(paths.estimated_taxes[0, 0]), 2) == 2142.86
+    assert round(float(paths.net_spending_after_tax[9, 0]), 2) == 20000.0
+    assert round(float(paths.ending_capitals[9, 0]), 2) == 182857.14
+    assert not paths.depleted.any()
+
+
+def test_success_rate_withdrawal_hits_target_on_shared_growth_matrix():
+    growth = _decumulation_growth(years=25, mu_annual=0.05, sigma_annual=0.15, df_t=6.0, num_simulations=2_000)
+    plan = {
+        "growth": growth,
+        "initial_capital": 500_000,
+        "initial_cost_basis": 400_000,
+        "inflation_rate_pct": 2.0,
+        "other_income_annual": 5_000.0,
+        "capital_gains_tax_rate_pct": 26.0,
+    }
+
+    withdrawal = _solve_success_rate_withdrawal(**plan, target_success_rate_pct=90.0)
+
+    assert withdrawal > 5_000
+    assert _decumulation_success_rate(**plan, annual_withdrawal=withdrawal) >= 0.9
+    assert _decumulation_success_rate(**plan, annual_withdrawal=withdrawal + 5) < 0.9
+    paths = _simulate_decumulation_paths(
+        initial_capital=500_000,
+        initial_cost_basis=400_000,
+        annual_withdrawal=withdrawal,
+        years=25,
+        inflation_rate_pct=2.0,
+        other_income_annual=5_000.0,
+        capital_gains_tax_rate_pct=26.0,
+        mu_annual=0.05,
+        sigma_annual=0.15,
+        growth=growth,
+    )
+    assert (paths.ending_capitals[:, -1] > 0).mean() >= 0.9
+
+
+def test_simulate_paths_is_deterministic_with_ordered_bands():
+    first = _simulate_paths(0.06, 0.18, 5.0, num_simulations=2_000)
+    second = _simulate_paths(0.06, 0.18, 5.0, num_simulations=2_000)
+
+    assert first == second
+    assert len(first) == 21
+    assert (first[0].p10, first[0].p50, first[0].p90) == (100.0, 100.0, 100.0)
+    for projection in first[1:]:
+        assert projection.p10 <= projection.p25 <= projection.p50 <= projection.p75 <= projection.p90
+    assert first[20].p10 < 100.0 < first[20].p90
+
+
+def test_simulate_paths_without_volatility_follows_drift():
+    projections = _simulate_paths(0.05, 0.0, num_simulations=100)
+
+    assert projections[10].p10 == projections[10].p90 == round(100.0 * 2.718281828459045 ** 0.5, 1)
+
+
 def test_normalize_portfolio_ids_deduplicates_and_discards_invalid_values():
     normalized = _normalize_portfolio_ids([3, 0, 3, -4, 5, 7, 5])
 
@@ -0,0 +1,224 @@
+from datetime import date, datetime, timedelta, timezone
+
+from app.repository._base import AssetMeta, PortfolioData
+from app.repository._fx_rates import FxRates
+from app.repository._price_series import PriceSeries
+from app.repository._valuation import ValuationMixin, _sweep_daily_valuations, _valuation_affected_from
+from tests.unit.fakes import FakeEngine, FakeResult
+
+
+def _tx(day: date, side: str, qty: float, price: float, asset_id: int | None = None, ccy: str = "EUR") -> dict:
+    return {
+        "asset_id": asset_id,
+        "side": side,
+        "trade_date": day,
+        "quantity": qty,
+        "price": price,
+        "trade_currency": ccy,
+    }
+
+
+def test_sweep_forward_fills_prices_fx_and_applies_trades_in_order():
+    tx_rows = [
+        _tx(date(2026, 1, 1), "deposit", 1000.0, 1.0),
+        _tx(date(2026, 1, 2), "buy", 10.0, 50.0, asset_id=1, ccy="USD"),
+        _tx(date(2026, 1, 4), "sell", 4.0, 55.0, asset_id=1, ccy="USD"),
+    ]
+    price_rows = [
+        {"asset_id": 1, "price_date": date(2026, 1, 2), "close": 50.0},
+        {"asset_id": 1, "price_date": date(2026, 1, 3), "close": 0.0},  # ignored, non-positive
+        {"asset_id": 1, "price_date": date(2026, 1, 4), "close": 60.0},
+    ]
+    fx_rows = [
+        {"from_ccy": "USD", "price_date": date(2026, 1, 1), "rate": 0.5},
+        {"from_ccy": "USD", "price_date": date(2026, 1, 3), "rate": 0.8},
+    ]
+
+    out = _sweep_daily_valuations(
+        opening_cash_balance=0.0,
+        start_date=date(2025, 12, 31),
+        end_date=date(2026, 1, 5),
+        today=date(2026, 6, 1),
+        tx_rows=tx_rows,
+        price_rows=price_rows,
+        fx=FxRates.from_rows(fx_rows, "EUR", default=1.0),
+        asset_meta={1: AssetMeta(symbol="AAA", quote_currency="USD")},
+    )
+
+    assert [v.total for v in out] == [
+        0.0,     # before any transaction
+        1000.0,  # deposit only
+        1250.0,  # 10 * 50 USD @ 0.5
+        1250.0,  # 0.0 close skipped, still priced at the 2026-01-02 bar/fx
+        1288.0,  # 6 * 60 USD @ 0.8
+        1288.0,  # forward-filled
+    ]
+    assert [v.net_external_flow for v in out] == [0.0, 1000.0, 0.0, 0.0, 0.0, 0.0]
+
+
+def test_sweep_uses_opening_cash_only_for_today_when_no_transactions():
+    out = _sweep_daily_valuations(
+        opening_cash_balance=321.456,
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 1, 2),
+        today=date(2026, 1, 2),
+        tx_rows=[],
+        price_rows=[],
+        fx=FxRates("EUR", {}, default=1.0),
+        asset_meta={},
+    )
+
+    assert [v.total for v in out] == [0.0, 321.46]
+
+
+class _StoreConn:
+    """Serves the portfolio_values_1d and transactions statements of ValuationMixin from memory."""
+
+    def __init__(self, transactions: list[dict]) -> None:
+        self.transactions = transactions
+        self.store: dict[tuple[int, date], dict] = {}
+        self.tx_reads = 0
+        self.locks = 0
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        params = params or {}
+        if "pg_advisory_xact_lock" in sql:
+            self.locks += 1
+            return FakeResult([])
+        if sql.startswith("insert into portfolio_values_1d"):
+            for row in params:
+                self.store[(row["portfolio_id"], row["value_date"])] = dict(row)
+            return FakeResult([])
+        if sql.startswith("delete from portfolio_values_1d"):
+            if "asset_id" in params:
+                portfolios = {tx["portfolio_id"] for tx in self.transactions if tx["asset_id"] == params["asset_id"]}
+            else:
+                portfolios = {params["portfolio_id"]}
+            for key in [k for k in self.store if k[0] in portfolios and k[1] >= params["from_date"]]:
+                del self.store[key]
+            return FakeResult([])
+        if "from portfolio_values_1d" in sql:
+            return FakeResult([
+                {**row, "value_date": day}
+                for (pid, day), row in sorted(self.store.items())
+                if pid == params["portfolio_id"] and params["start_date"] <= day <= params["end_date"]
+            ])
+        if "from transactions" in sql:
+            self.tx_reads += 1
+            return FakeResult(sorted(
+                (tx for tx in self.transactions if tx["trade_date"] <= params["end_date"]),
+                key=lambda tx: tx["trade_date"],
+            ))
+        raise AssertionError(f"unexpected statement: {sql}")
+
+
+class _StoreRepo(ValuationMixin):
+    def __init__(self, conn: _StoreConn, closes: dict[int, list[tuple[date, float]]]) -> None:
+        self.engine = FakeEngine(conn)
+        self.closes = closes
+
+    def _get_portfolio_for_user(self, conn, portfolio_id: int, user_id: str) -> PortfolioData:
+        return PortfolioData(id=portfolio_id, base_currency="EUR", cash_balance=0.0)
+
+    def _get_asset_meta(self, conn, asset_ids: list[int]) -> dict[int, AssetMeta]:
+        return {asset_id: AssetMeta(symbol=f"A{asset_id}", quote_currency="EUR") for asset_id in asset_ids}
+
+    def _price_series(self, conn, asset_ids: list[int]) -> dict[int, PriceSeries]:
+        return {asset_id: PriceSeries.from_points(self.closes.get(asset_id, [])) for asset_id in asset_ids}
+
+    def _fx_rates(self, conn, currencies, base_currency: str, *, default=None) -> FxRates:
+        return FxRates(base_currency, {}, default=default)
+
+
+def _days_ago(days: int) -> date:
+    return date.today() - timedelta(days=days)
+
+
+def _stored_tx(days_ago: int, side: str, qty: float, price: float, asset_id: int | None = None) -> dict:
+    return {"portfolio_id": 1, **_tx(_days_ago(days_ago), side, qty, price, asset_id)}
+
+
+def _store_fixture() -> tuple[_StoreRepo, _StoreConn]:
+    conn = _StoreConn([
+        _stored_tx(30, "deposit", 1000.0, 1.0),
+        _stored_tx(20, "buy", 10.0, 10.0, asset_id=7),
+    ])
+    repo = _StoreRepo(conn, {7: [(_days_ago(25), 10.0), (_days_ago(10), 20.0)]})
+    return repo, conn
+
+
+def _totals(repo: _StoreRepo, start: int, end: int = 1) -> dict[date, float]:
+    return {v.day: v.total for v in repo.get_daily_valuations(1, "u", _days_ago(start), _days_ago(end))}
+
+
+def test_valuation_affected_from_steps_back_from_the_earliest_trade():
+    utc = timezone.utc
+    assert _valuation_affected_from(
+        datetime(2026, 3, 10, 23, 30, tzinfo=utc), datetime(2026, 3, 8, 1, 0, tzinfo=utc)
+    ) == date(2026, 3, 7)
+
+
+def test_first_missing_day_finds_the_first_gap():
+    stored = {day: None for day in (date(2026, 1, 1), date(2026, 1, 2), date(2026, 1, 4))}
+
+    assert ValuationMixin._first_missing_day(stored, date(2026, 1, 1), date(2026, 1, 5)) == date(2026, 1, 3)
+    assert ValuationMixin._first_missing_day(stored, date(2026, 1, 1), date(2026, 1, 2)) is None
+    assert ValuationMixin._first_missing_day({}, date(2026, 1, 1), date(2026, 1, 1)) == date(2026, 1, 1)
+
+
+def test_past_days_are_stored_once_and_then_served_from_the_store():
+    repo, conn = _store_fixture()
+
+    first = _totals(repo, 30)
+    assert len(conn.store) == 30
+    assert first[_days_ago(21)] == 1000.0 and first[_days_ago(20)] == 1100.0 and first[_days_ago(10)] == 1200.0
+
+    conn.store[(1, _days_ago(15))]["asset_value"] = 123.0  # only visible if read back from the store
+    again = _totals(repo, 30)
+    assert again[_days_ago(15)] == 1123.0
+    assert conn.tx_reads == 1
+
+
+def test_today_is_computed_live_and_never_stored():
+    repo, conn = _store_fixture()
+
+    values = repo.get_daily_valuations(1, "u", _days_ago(3), date.today())
+
+    assert [v.day for v in values][-1] == date.today()
+    assert (1, date.today()) not in conn.store
+    assert len(conn.store) == 3
+
+
+def test_editing_a_past_transaction_recomputes_the_stored_days_from_that_day_on():
+    repo, conn = _store_fixture()
+    _totals(repo, 30)
+    for day in (25, 22):
+        conn.store[(1, _days_ago(day))]["cash_value"] = 5000.0  # marks days that must not be recomputed
+
+    # The buy moves from 20 to 18 days ago and doubles: the writer invalidates from the earlier date.
+    old_trade_at = datetime.combine(_days_ago(20), datetime.min.time(), tzinfo=timezone.utc)
+    conn.transactions[1] = _stored_tx(18, "buy", 20.0, 10.0, asset_id=7)
+    repo._invalidate_portfolio_values(conn, 1, _valuation_affected_from(old_trade_at))
+
+    assert min(day for _, day in conn.store) == _days_ago(30) and (1, _days_ago(21)) not in conn.store
+    values = _totals(repo, 30)
+    assert values[_days_ago(25)] == values[_days_ago(22)] == 5000.0
+    assert values[_days_ago(20)] == 1000.0  # recomputed: no buy yet
+    assert values[_days_ago(18)] == 1200.0  # 20 units at the 10.0 close
+    assert values[_days_ago(10)] == 1400.0
+    assert len(conn.store) == 30 and conn.locks >= 2
+
+
+def test_editing_a_price_bar_recomputes_every_portfolio_holding_the_asset_from_that_day_on():
+    repo, conn = _store_fixture()
+    _totals(repo, 30)
+    conn.store[(1, _days_ago(12))]["cash_value"] = 5000.0
+
+    repo.closes[7] = [(_days_ago(25), 10.0), (_days_ago(10), 30.0)]
+    repo._invalidate_portfolio_values_for_asset(conn, 7, _days_ago(10))
+
+    values = _totals(repo, 30)
+    assert values[_days_ago(12)] == 5100.0  # stored row kept
+    assert values[_days_ago(11)] == 1100.0
+    assert values[_days_ago(10)] == values[_days_ago(1)] == 1300.0
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.repository._fx_rates import FxRates
+from app.repository._position_state import PositionState, PositionStateMixin
+
+
+def _at(day: int) -> datetime:
+    return datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(days=day)
+
+
+def test_position_state_applies_average_cost_in_base_currency():
+    state = PositionState(asset_id=7)
+    state.apply(1, _at(1), "buy", 10.0, 100.0, 2.0, 0.0, fx=0.5)
+    state.apply(2, _at(2), "buy", 10.0, 200.0, 0.0, 0.0, fx=0.5)
+    state.apply(3, _at(3), "sell", 5.0, 300.0, 1.0, 0.0, fx=0.5)
+
+    assert state.quantity == pytest.approx(15.0)
+    # (10*100 + 2 + 10*200) * 0.5 = 1501, less 5 units at the 75.05 average
+    assert state.cost_basis == pytest.approx(1501.0 - 75.05 * 5)
+    assert state.running_quantity == pytest.approx(15.0)
+    assert (state.first_trade_at, state.last_trade_at, state.last_transaction_id) == (_at(1), _at(3), 3)
+
+
+def test_position_state_caps_sells_but_tracks_running_quantity():
+    state = PositionState(asset_id=7)
+    state.apply(1, _at(1), "buy", 2.0, 10.0, 0.0, 0.0, fx=1.0)
+    state.apply(2, _at(2), "sell", 3.0, 10.0, 0.0, 0.0, fx=1.0)
+
+    assert (state.quantity, state.cost_basis) == (0.0, 0.0)
+    assert state.running_quantity == pytest.approx(-1.0)
+
+
+class _Ledger(PositionStateMixin):
+    """Ledger with storage replaced by an in-memory checkpoint."""
+
+    def __init__(self, state: PositionState | None) -> None:
+        self.state = state
+        self.saved: list[PositionState] = []
+        self.timeline_checks = 0
+        self.rebuilt: list[list[int] | None] = []
+
+    def _lock_position_state(self, conn, portfolio_ids_sql, params):
+        pass
+
+    def _position_state_is_current(self, conn, portfolio_id):
+        return self.state is not None
+
+    def _fx_rates(self, conn, currencies, base_currency, *, default=None):
+        return FxRates(base_currency, {}, default)
+
+    def _save_position_state(self, conn, portfolio_id, states):
+        self.saved.extend(states)
+
+    def _rebuild_position_state(self, conn, portfolio_id, asset_ids=None):
+        self.rebuilt.append(asset_ids)
+        return True
+
+    def _assert_non_negative_inventory_timeline(self, conn, portfolio_id, asset_id, **kwargs):
+        self.timeline_checks += 1
+
+
+class _Conn:
+    def __init__(self, ledger: _Ledger) -> None:
+        self.ledger = ledger
+
+    def execute(self, statement, params):
+        return self
+
+    def mappings(self):
+        return self
+
+    def fetchone(self):
+        state = self.ledger.state
+        return None if state is None else {**state.__dict__}
+
+
+def _trade(side: str, day: int, quantity: float) -> dict:
+    return {
+        "id": 100 + day,
+        "asset_id": 7,
+        "side": side,
+        "trade_at": _at(day),
+        "trade_date": _at(day).date(),
+        "quantity": quantity,
+        "price": 10.0,
+        "fees": 0.0,
+        "taxes": 0.0,
+        "trade_currency": "EUR",
+    }
+
+
+def _checkpoint(quantity: float, last_day: int) -> PositionState:
+    return PositionState(
+        asset_id=7,
+        quantity=quantity,
+        cost_basis=quantity * 10.0,
+        running_quantity=quantity,
+        first_trade_at=_at(0),
+        last_trade_at=_at(last_day),
+        last_transaction_id=1,
+    )
+
+
+def test_appended_sell_is_checked_against_the_running_quantity():
+    ledger = _Ledger(_checkpoint(4.0, last_day=5))
+
+    ledger._apply_trade_to_position_state(_Conn(ledger), 1, "EUR", _trade("sell", 6, 3.0))
+    assert ledger.saved[-1].quantity == pytest.approx(1.0)
+    assert ledger.timeline_checks == 0
+
+    with pytest.raises(ValueError, match="Quantita insufficiente"):
+        ledger._apply_trade_to_position_state(_Conn(ledger), 1, "EUR", _trade("sell", 6, 5.0))
+
+
+def test_backdated_trade_replays_the_asset():
+    ledger = _Ledger(_checkpoint(4.0, last_day=5))
+
+    ledger._apply_trade_to_position_state(_Conn(ledger), 1, "EUR", _trade("sell", 2, 1.0))
+
+    assert ledger.timeline_checks == 1
+    assert ledger.rebuilt == [[7]]
+    assert ledger.saved == []
+
+
+def test_trade_without_ledger_falls_back_to_the_timeline_check():
+    ledger = _Ledger(None)
+
+    ledger._apply_trade_to_position_state(_Conn(ledger), 1, "EUR", _trade("sell", 6, 1.0))
+
+    assert ledger.timeline_checks == 1
+    assert ledger.rebuilt == [] and ledger.saved == []
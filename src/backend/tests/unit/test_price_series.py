@@ -0,0 +1,88 @@
+from datetime import date
+
+from app.repository._price_series import PriceSeries, PriceSeriesCache
+from tests.unit.fakes import FakeResult
+
+
+class _FakeConn:
+    """Serves price_bars_1d closes from memory and counts full-history loads."""
+
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.loads = 0
+
+    def execute(self, statement, params):
+        if "first_dates" in params:
+            first_dates = dict(zip(params["asset_ids"], params["first_dates"]))
+            return FakeResult([
+                r for r in self.rows
+                if r["asset_id"] in first_dates and r["price_date"] >= first_dates[r["asset_id"]]
+            ])
+        self.loads += 1
+        return FakeResult([r for r in self.rows if r["asset_id"] in params["asset_ids"]])
+
+
+def _bars(asset_id: int, closes: list[float], first_day: int = 1) -> list[dict]:
+    return [
+        {"asset_id": asset_id, "price_date": date(2026, 1, first_day + idx), "close": close}
+        for idx, close in enumerate(closes)
+    ]
+
+
+def test_price_series_windows_and_valid_closes():
+    series = PriceSeries.from_points([(date(2026, 1, 3), 0.0), (date(2026, 1, 1), 10.0), (date(2026, 1, 5), 12.0)])
+
+    assert series.window(date(2026, 1, 2), date(2026, 1, 5)).points() == [(date(2026, 1, 3), 0.0), (date(2026, 1, 5), 12.0)]
+    assert series.window(None, date(2026, 1, 4)).valid().points() == [(date(2026, 1, 1), 10.0)]
+    assert series.window(date(2026, 2, 1)).points() == []
+    assert series.nbytes == 48
+
+
+def test_cache_splices_committed_writes_without_reloading():
+    conn = _FakeConn(_bars(1, [10.0, 11.0, 12.0]))
+    cache = PriceSeriesCache()
+    cache.get_many(conn, [1, 2])
+
+    conn.rows = _bars(1, [10.0, 11.5, 12.5, 13.0])
+    cache.apply_refresh(cache.begin_refresh(conn, {1: date(2026, 1, 2)}))
+    series = cache.get_many(conn, [1, 2])
+
+    assert series[1].points()[1:] == [(date(2026, 1, 2), 11.5), (date(2026, 1, 3), 12.5), (date(2026, 1, 4), 13.0)]
+    assert series[2].points() == []
+    assert conn.loads == 1
+    assert cache.stats()["hits"] == 2
+
+
+def test_cache_drops_assets_written_concurrently():
+    conn = _FakeConn(_bars(1, [10.0, 11.0]))
+    cache = PriceSeriesCache()
+    cache.get_many(conn, [1])
+
+    first = cache.begin_refresh(conn, {1: date(2026, 1, 2)})
+    second = cache.begin_refresh(conn, {1: date(2026, 1, 2)})
+    cache.apply_refresh(first)
+    cache.apply_refresh(second)
+
+    assert cache.stats()["assets"] == 0
+    cache.get_many(conn, [1])
+    assert conn.loads == 2
+
+
+def test_cache_evicts_least_recently_used_by_memory_budget():
+    conn = _FakeConn(_bars(1, [1.0] * 4) + _bars(2, [2.0] * 4) + _bars(3, [3.0] * 4))
+    cache = PriceSeriesCache(max_bytes=2 * 4 * 16)
+    cache.get_many(conn, [1, 2])
+    cache.get_many(conn, [1])
+    cache.get_many(conn, [3])
+
+    stats = cache.stats()
+    assert (stats["assets"], stats["bytes"], stats["evictions"]) == (2, 128, 1)
+    cache.get_many(conn, [1, 3])
+    assert conn.loads == 2
+    cache.get_many(conn, [2])
+    assert conn.loads == 3
+
+    disabled = PriceSeriesCache(max_bytes=0)
+    assert not disabled.enabled
+    assert disabled.get_many(conn, [1])[1].closes.tolist() == [1.0] * 4
+    assert disabled.stats()["assets"] == 0
@@ -1,7 +1,9 @@
+import threading
 from datetime import UTC, datetime
 
 from app.models import PriceRefreshResponse
-from app.services.pricing_service import PriceIngestionService
+from app.services.pricing_service import PriceIngestionService, TokenBucket
+from tests.unit.fakes import FakeEngine
 
 
 class _FakeAsset:
@@ -19,8 +21,8 @@ class _FakeRepo:
     def get_assets_for_price_refresh(self, provider: str, portfolio_id: int | None = None, asset_scope: str = 'target', user_id: str | None = None):
         return [_FakeAsset(1, 'AAPL', 'AAPL')]
 
-    def save_price_tick(self, **kwargs):
-        self.saved.append(kwargs)
+    def save_price_ticks(self, *, provider: str, ticks: list[dict]):
+        self.saved.extend({**tick, 'provider': provider} for tick in ticks)
 
     def batch_upsert_price_bars_1d(self, **kwargs):
         self.bars_rows.extend(kwargs.get('rows', []))
@@ -30,6 +32,10 @@ class _FakeSettings:
     finance_provider = 'yfinance'
     finance_symbol_request_delay_seconds = 0.0
     price_validation_min_price = 0.0001
+    price_refresh_max_workers = 1
+    finance_quote_batch_size = 50
+    finance_provider_rate_limits_map: dict[str, float] = {}
+    finance_provider_rate_burst = 1
 
 
 class _FakeClient:
@@ -80,3 +86,229 @@ def test_refresh_prices_zero_price_rejected(monkeypatch):
     assert result.failed_assets == 1
     assert len(repo.saved) == 0
     assert any("rejected" in e for e in result.errors)
+
+
+def test_refresh_prices_concurrent_mode_keeps_order_and_batches_ticks(monkeypatch):
+    import app.services.pricing_service as mod
+
+    # Every good symbol waits until all eight are in flight: only returns if they run concurrently.
+    in_flight = threading.Barrier(8, timeout=10)
+
+    class _SlowClient(_FakeClient):
+        def get_quote(self, symbol: str):
+            if symbol == 'BAD':
+                raise ValueError('not found')
+            in_flight.wait()
+            return super().get_quote(symbol)
+
+    class _ManyAssetsRepo(_FakeRepo):
+        def __init__(self) -> None:
+            super().__init__()
+            self.batches = 0
+
+        def get_assets_for_price_refresh(self, provider: str, portfolio_id: int | None = None, asset_scope: str = 'target', user_id: str | None = None):
+            symbols = [f'S{idx}' for idx in range(8)] + ['BAD']
+            return [_FakeAsset(idx + 1, symbol, symbol) for idx, symbol in enumerate(symbols)]
+
+        def save_price_ticks(self, *, provider: str, ticks: list[dict]):
+            self.batches += 1
+            super().save_price_ticks(provider=provider, ticks=ticks)
+
+    class _Settings(_FakeSettings):
+        price_refresh_max_workers = 8
+
+    monkeypatch.setattr(mod, 'make_finance_client', lambda _: _SlowClient())
+
+    repo = _ManyAssetsRepo()
+    result = PriceIngestionService(_Settings(), repo).refresh_prices(asset_scope='all')
+
+    assert result.refreshed_assets == 8
+    assert result.errors == ['BAD: not found']
+    assert [item.symbol for item in result.items] == [f'S{idx}' for idx in range(8)]
+    assert repo.batches == 1
+    assert [tick['asset_id'] for tick in repo.saved] == list(range(1, 9))
+
+
+def test_refresh_prices_uses_batched_quotes_when_available(monkeypatch):
+    import app.services.pricing_service as mod
+    from app.errors import ProviderError
+
+    class _BatchClient(_FakeClient):
+        batched_quotes = True
+
+        def __init__(self) -> None:
+            super().__init__()
+            self.batches = []
+
+        def get_quotes(self, symbols: list[str]):
+            self.batches.append(list(symbols))
+            return {
+                symbol: (
+                    ProviderError(provider='fake', operation='quote', symbol=symbol, reason='no_data', message='no data')
+                    if symbol == 'BAD'
+                    else self.get_quote(symbol)
+                )
+                for symbol in symbols
+            }
+
+    class _ManyAssetsRepo(_FakeRepo):
+        def get_assets_for_price_refresh(self, provider: str, portfolio_id: int | None = None, asset_scope: str = 'target', user_id: str | None = None):
+            symbols = ['A', 'B', 'BAD', 'C', 'A']
+            return [_FakeAsset(idx + 1, symbol, symbol) for idx, symbol in enumerate(symbols)]
+
+    class _Settings(_FakeSettings):
+        finance_quote_batch_size = 3
+
+    client = _BatchClient()
+    monkeypatch.setattr(mod, 'make_finance_client', lambda _: client)
+
+    repo = _ManyAssetsRepo()
+    result = PriceIngestionService(_Settings(), repo).refresh_prices(asset_scope='all')
+
+    assert client.batches == [['A', 'B', 'BAD'], ['C', 'A']]
+    assert result.refreshed_assets == 4
+    assert result.errors == ['BAD: no data']
+    assert [tick['asset_id'] for tick in repo.saved] == [1, 2, 4, 5]
+
+
+def test_refresh_prices_quotes_per_asset_when_get_quotes_is_not_one_request(monkeypatch):
+    import app.services.pricing_service as mod
+
+    class _PerSymbolClient(_FakeClient):
+        def __init__(self) -> None:
+            super().__init__()
+            self.quoted: list[str] = []
+
+        def get_quote(self, symbol: str):
+            self.quoted.append(symbol)
+            return super().get_quote(symbol)
+
+        def get_quotes(self, symbols: list[str]):
+            raise AssertionError('get_quotes would still call upstream once per symbol')
+
+    class _ManyAssetsRepo(_FakeRepo):
+        def get_assets_for_price_refresh(self, provider: str, portfolio_id: int | None = None, asset_scope: str = 'target', user_id: str | None = None):
+            return [_FakeAsset(idx + 1, symbol, symbol) for idx, symbol in enumerate(['A', 'B', 'C'])]
+
+    client = _PerSymbolClient()
+    monkeypatch.setattr(mod, 'make_finance_client', lambda _: client)
+
+    result = PriceIngestionService(_FakeSettings(), _ManyAssetsRepo()).refresh_prices(asset_scope='all')
+
+    assert client.quoted == ['A', 'B', 'C']
+    assert result.refreshed_assets == 3
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    now = [0.0]
+    sleeps: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=4.0, burst=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        bucket.acquire()
+    assert sleeps == [0.25, 0.25]
+
+    now[0] += 10.0  # idle: refills up to the burst, not beyond
+    sleeps.clear()
+    for _ in range(3):
+        bucket.acquire()
+    assert sleeps == [0.25]
+
+
+def test_token_bucket_charges_batched_requests_per_symbol():
+    now = [0.0]
+    sleeps: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=4.0, burst=2, clock=lambda: now[0], sleep=sleep)
+    bucket.acquire(2)
+    bucket.acquire(3)  # larger than the burst: waits for a full bucket, then owes one token
+    bucket.acquire()
+    assert sleeps == [0.5, 0.5]
+
+
+def test_refresh_prices_reports_ticks_the_repository_could_not_save(monkeypatch):
+    import app.services.pricing_service as mod
+
+    class _RejectingRepo(_FakeRepo):
+        def get_assets_for_price_refresh(self, provider: str, portfolio_id: int | None = None, asset_scope: str = 'target', user_id: str | None = None):
+            return [_FakeAsset(1, 'AAPL', 'AAPL'), _FakeAsset(2, 'MSFT', 'MSFT')]
+
+        def save_price_ticks(self, *, provider: str, ticks: list[dict]):
+            super().save_price_ticks(provider=provider, ticks=ticks)
+            return {2: 'numeric field overflow'}
+
+    monkeypatch.setattr(mod, 'make_finance_client', lambda _: _FakeClient())
+
+    result = PriceIngestionService(_FakeSettings(), _RejectingRepo()).refresh_prices(asset_scope='all')
+
+    assert result.refreshed_assets == 1 and result.failed_assets == 1
+    assert [item.symbol for item in result.items] == ['AAPL']
+    assert result.errors == ['MSFT: salvataggio tick fallito - numeric field overflow']
+
+
+class _TickConn:
+    """Fails any insert touching ``bad_asset``; savepoints roll back their own rows only."""
+
+    def __init__(self, bad_asset: int) -> None:
+        self.bad_asset = bad_asset
+        self.rows: list[dict] = []
+        self.statements = 0
+        self._pending: list[dict] = []
+
+    def begin_nested(self):
+        conn = self
+
+        class _Savepoint:
+            def __enter__(self):
+                conn._pending = []
+
+            def __exit__(self, exc_type, exc, tb):
+                if exc_type is None:
+                    conn.rows.extend(conn._pending)
+                conn._pending = []
+                return False
+
+        return _Savepoint()
+
+    def execute(self, statement, params):
+        from sqlalchemy.exc import IntegrityError
+
+        self.statements += 1
+        rows = params if isinstance(params, list) else [params]
+        if any(row['asset_id'] == self.bad_asset for row in rows):
+            raise IntegrityError('insert', params, Exception('violates foreign key constraint\nDETAIL: ...'))
+        self._pending.extend(rows)
+
+
+def test_save_price_ticks_keeps_the_good_ticks_when_one_fails():
+    from app.repository._search_pricing import SearchPricingMixin
+
+    class _Repo(SearchPricingMixin):
+        def __init__(self, conn: _TickConn) -> None:
+            self.engine = FakeEngine(conn)
+            self.bumped: set[int] = set()
+
+        def _bump_snapshot_assets(self, asset_ids) -> None:
+            self.bumped |= set(asset_ids)
+
+    ts = datetime.now(UTC)
+    ticks = [{'asset_id': asset_id, 'ts': ts, 'last': 1.0} for asset_id in (1, 2, 3)]
+
+    conn = _TickConn(bad_asset=2)
+    repo = _Repo(conn)
+    assert repo.save_price_ticks(provider='YFinance', ticks=ticks) == {2: 'violates foreign key constraint'}
+    assert [row['asset_id'] for row in conn.rows] == [1, 3]
+    assert {row['provider'] for row in conn.rows} == {'yfinance'}
+    assert repo.bumped == {1, 3}
+
+    clean = _TickConn(bad_asset=99)
+    assert _Repo(clean).save_price_ticks(provider='yfinance', ticks=ticks) == {}
+    assert clean.statements == 1 and len(clean.rows) == 3
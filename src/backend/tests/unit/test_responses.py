@@ -0,0 +1,78 @@
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from app.models import MWRTimeseriesPoint
+from app.responses import NDJSONResponse, SafeJSONResponse, _dumps, _ndjson_chunks, _stdlib_dumps
+
+
+class _Ratio(float):
+    pass
+
+
+def _payload() -> dict:
+    return {
+        "name": "Più € 😀 \"quoted, a: b\"\n\ttab  ",
+        "values": [0.0, -0.0, 1.0, 0.1, 123.456, 2.5e-4, 1e15, -7, 2**63 - 1, True, False, None],
+        "exponents": [1e-5, 1e16, 1.5e-7, -2.5e20],
+        "missing": [float("nan"), float("inf"), float("-inf"), np.float64("nan")],
+        "numpy": np.float64(1.25),
+        "nested": {"tuple": (1, 2), "empty": {}, "list": []},
+        "by_year": {2024: 1.5, 2025: None},
+    }
+
+
+@dataclass
+class _Point:
+    day: str
+
+
+def test_fast_path_matches_the_baseline_encoder_but_for_exponent_floats(baseline_json):
+    payload = _payload()
+    baseline = baseline_json(payload)
+
+    assert _stdlib_dumps(payload) == baseline
+    assert b'"exponents":[1e-05,1e+16,1.5e-07,-2.5e+20]' in baseline
+    assert _dumps(payload) == baseline.replace(b"[1e-05,1e+16,1.5e-07,-2.5e+20]", b"[0.00001,1e16,1.5e-7,-2.5e20]")
+    decoded = json.loads(_dumps(payload))
+    assert decoded == json.loads(baseline)
+    assert decoded["missing"] == [None, None, None, None]
+    assert decoded["by_year"] == {"2024": 1.5, "2025": None}
+
+
+def test_integers_beyond_64_bits_fall_back_to_the_stdlib_encoder(baseline_json):
+    payload = {"big": 2**70, "ratio": _Ratio(0.5), "nan_ratio": _Ratio("nan")}
+
+    assert _dumps(payload) == baseline_json(payload) == b'{"big":1180591620717411303424,"ratio":0.5,"nan_ratio":null}'
+    assert _dumps({"ratio": _Ratio(0.5)}) == b'{"ratio":0.5}'
+
+
+@pytest.mark.parametrize(
+    "value",
+    [object(), np.int64(3), np.array([1.0]), date(2026, 1, 2), datetime(2026, 1, 2, 9, 30), _Point("2026-01-02")],
+)
+def test_both_encoders_reject_the_types_the_baseline_rejects(value, baseline_json):
+    for dumps in (baseline_json, _dumps, _stdlib_dumps):
+        with pytest.raises(TypeError):
+            dumps({"value": value})
+    with pytest.raises(TypeError):
+        _dumps({"value": value, "big": 2**70})
+
+
+def test_models_are_serialized_directly():
+    point = MWRTimeseriesPoint(date="2026-01-02", cumulative_mwr_pct=float("nan"))
+
+    assert SafeJSONResponse([point]).body == b'[{"date":"2026-01-02","cumulative_mwr_pct":null}]'
+    assert _stdlib_dumps([point]) == b'[{"date":"2026-01-02","cumulative_mwr_pct":null}]'
+
+
+def test_ndjson_lines_are_chunked_after_the_header():
+    points = (MWRTimeseriesPoint(date=f"2026-01-{day:02d}", cumulative_mwr_pct=float(day)) for day in range(1, 4))
+    chunks = list(_ndjson_chunks(points, {"portfolio_id": 1}))
+
+    assert chunks[0] == b'{"portfolio_id":1}\n'
+    assert b"".join(chunks[1:]).splitlines()[-1] == b'{"date":"2026-01-03","cumulative_mwr_pct":3.0}'
+    assert NDJSONResponse(iter(())).media_type == "application/x-ndjson"
@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+from app.repository._price_series import PriceSeriesCache, PriceSeriesMixin
+from app.repository._returns import LogReturnsCache, ReturnsMixin
+from app.repository._session import UnitOfWorkMixin
+from tests.unit.fakes import FakeEngine, FakeResult
+
+
+class _FakeConn:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.calls = 0
+
+    def execute(self, statement, params):
+        self.calls += 1
+        return FakeResult([row for row in self.rows if row["asset_id"] in params["asset_ids"]])
+
+
+class _Repo(ReturnsMixin, PriceSeriesMixin, UnitOfWorkMixin):
+    def __init__(self, conn: _FakeConn) -> None:
+        self.engine = FakeEngine(conn)
+        self._log_returns_cache = LogReturnsCache()
+        self._price_series_cache = PriceSeriesCache()
+
+    def _bump_snapshot_assets(self, asset_ids: list[int]) -> None:
+        pass
+
+
+def _bars(asset_id: int, closes: list[float]) -> list[dict]:
+    return [
+        {"asset_id": asset_id, "price_date": date(2026, 1, 1) + timedelta(days=idx), "close": close}
+        for idx, close in enumerate(closes)
+    ]
+
+
+def test_log_returns_are_cached_until_bars_are_upserted():
+    conn = _FakeConn(_bars(1, [100.0, 110.0, 99.0]) + _bars(2, [50.0, 50.0]))
+    repo = _Repo(conn)
+
+    first = repo.get_asset_log_returns([1, 2, 3], date(2026, 1, 1))
+    again = repo.get_asset_log_returns([1], date(2026, 1, 2))
+
+    assert conn.calls == 1
+    assert first[1].dates == [date(2026, 1, 2), date(2026, 1, 3)]
+    assert [round(value, 6) for value in first[1].log_returns] == [0.09531, -0.105361]
+    assert first[2].log_returns.tolist() == [0.0]
+    assert first[3].dates == []
+    assert again[1].dates == [date(2026, 1, 2), date(2026, 1, 3)]
+
+    conn.rows = _bars(1, [100.0, 120.0, 99.0]) + _bars(2, [50.0, 50.0])
+    repo._after_price_bars_changed(repo._begin_price_series_refresh(conn, {1: date(2026, 1, 1)}))
+    refreshed = repo.get_asset_log_returns([1, 2], date(2026, 1, 1))
+
+    assert conn.calls == 2
+    assert round(float(refreshed[1].log_returns[0]), 6) == 0.182322
+    assert refreshed[2].log_returns.tolist() == [0.0]
+
+
+def test_log_returns_loaded_during_an_upsert_are_not_cached():
+    cache = LogReturnsCache()
+    generation = cache.generation()
+    cache.invalidate([1])
+
+    cache.put([], date(2026, 1, 1), generation)
+
+    assert cache.get(1, date(2026, 1, 1)) is None
+
+
+def test_price_reads_join_the_unit_of_work():
+    repo = _Repo(_FakeConn(_bars(1, [100.0, 110.0])))
+
+    with repo.unit_of_work():
+        repo.get_asset_log_returns([1], date(2026, 1, 1))
+        repo.get_price_series([1])
+
+    assert repo.engine.begins == 1
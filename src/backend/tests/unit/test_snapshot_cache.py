@@ -0,0 +1,88 @@
+from app.repository._asset_crud import AssetCrudMixin
+from app.repository._snapshot_cache import PortfolioSnapshotCache, SnapshotCacheMixin
+from tests.unit.fakes import FakeEngine
+
+
+def _deps(portfolio_id: int, asset_ids: list[int]):
+    return lambda _value: [("portfolio", portfolio_id), *(("asset", asset_id) for asset_id in asset_ids)]
+
+
+def test_snapshot_cache_hits_until_a_dependency_is_bumped():
+    cache = PortfolioSnapshotCache(ttl_seconds=60, max_entries=10)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return len(loads)
+
+    assert cache.get_or_load(("positions", 1), load, _deps(1, [7])) == 1
+    assert cache.get_or_load(("positions", 1), load, _deps(1, [7])) == 1
+
+    cache.bump_assets([8])
+    assert cache.get_or_load(("positions", 1), load, _deps(1, [7])) == 1
+
+    cache.bump_assets([7])
+    assert cache.get_or_load(("positions", 1), load, _deps(1, [7])) == 2
+
+    cache.bump_portfolios([1])
+    assert cache.get_or_load(("positions", 1), load, _deps(1, [7])) == 3
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (2, 3, 2)
+
+
+def test_snapshot_cache_does_not_store_values_raced_by_a_write():
+    cache = PortfolioSnapshotCache(ttl_seconds=60, max_entries=10)
+
+    def load_while_writing():
+        cache.bump_portfolios([1])
+        return "stale"
+
+    cache.get_or_load(("summary", 1), load_while_writing, _deps(1, []))
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_snapshot_cache_evicts_least_recently_used_and_expires():
+    cache = PortfolioSnapshotCache(ttl_seconds=60, max_entries=2)
+    cache.get_or_load("a", lambda: "a", _deps(1, []))
+    cache.get_or_load("b", lambda: "b", _deps(2, []))
+    cache.get_or_load("a", lambda: "a2", _deps(1, []))
+    cache.get_or_load("c", lambda: "c", _deps(3, []))
+
+    assert cache.get_or_load("a", lambda: "a3", _deps(1, [])) == "a"
+    assert cache.get_or_load("b", lambda: "b2", _deps(2, [])) == "b2"
+    assert cache.stats()["evictions"] == 2
+
+    expired = PortfolioSnapshotCache(ttl_seconds=0, max_entries=2)
+    assert not expired.enabled
+    assert expired.get_or_load("a", lambda: "fresh", _deps(1, [])) == "fresh"
+
+
+class _RecordingConn:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+
+
+class _AssetRepo(AssetCrudMixin, SnapshotCacheMixin):
+    def __init__(self) -> None:
+        self.engine = FakeEngine(_RecordingConn())
+        self._snapshot_cache = PortfolioSnapshotCache(ttl_seconds=60, max_entries=10)
+
+
+def test_update_asset_type_invalidates_cached_snapshots_of_the_asset():
+    repo = _AssetRepo()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return len(loads)
+
+    repo._snapshot_cache.get_or_load(("summary", 1), load, _deps(1, [7]))
+    repo.update_asset_type(7, "etf")
+
+    assert "update assets set asset_type" in repo.engine.conn.statements[0]
+    assert repo._snapshot_cache.get_or_load(("summary", 1), load, _deps(1, [7])) == 2
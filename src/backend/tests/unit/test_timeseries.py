@@ -0,0 +1,105 @@
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.repository import AssetMeta, FxRates, PortfolioData, PriceSeries
+from app.repository._summary import SummaryMixin, _sample_indices, _timeseries_start
+from tests.unit.fakes import FakeResult
+
+
+class _FakeConn:
+    def __init__(self, tx_rows: list[dict]) -> None:
+        self.tx_rows = tx_rows
+
+    def execute(self, statement, params):
+        return FakeResult(self.tx_rows)
+
+
+class _Repo(SummaryMixin):
+    def __init__(self, tx_rows: list[dict], closes: dict[int, PriceSeries], fx_rows: list[dict]) -> None:
+        self.conn = _FakeConn(tx_rows)
+        self.closes = closes
+        self.fx_rows = fx_rows
+
+    @contextmanager
+    def _begin(self):
+        yield self.conn
+
+    def _get_portfolio_for_user(self, conn, portfolio_id: int, user_id: str) -> PortfolioData:
+        return PortfolioData(id=portfolio_id, base_currency="EUR", cash_balance=0.0)
+
+    def _get_asset_meta(self, conn, asset_ids: list[int]) -> dict[int, AssetMeta]:
+        return {1: AssetMeta(symbol="AAA", quote_currency="USD"), 2: AssetMeta(symbol="BBB", quote_currency="EUR")}
+
+    def _price_series(self, conn, asset_ids: list[int]) -> dict[int, PriceSeries]:
+        return {asset_id: self.closes[asset_id] for asset_id in asset_ids}
+
+    def _fx_rates(self, conn, currencies, base_currency: str, *, default=None) -> FxRates:
+        return FxRates.from_rows(self.fx_rows, base_currency, default)
+
+
+def _days_ago(days: int) -> date:
+    return date.today() - timedelta(days=days)
+
+
+def test_sample_indices_keep_the_last_day_of_each_period():
+    days = np.arange(np.datetime64("2026-01-29"), np.datetime64("2026-02-10") + 1)
+
+    assert _sample_indices(days, "1d").tolist() == list(range(len(days)))
+    # 2026-02-01 and 2026-02-08 are Sundays.
+    assert days[_sample_indices(days, "1w")].astype(str).tolist() == ["2026-02-01", "2026-02-08", "2026-02-10"]
+    assert days[_sample_indices(days, "1mo")].astype(str).tolist() == ["2026-01-31", "2026-02-10"]
+
+
+def test_timeseries_start_per_range():
+    end = date(2026, 10, 17)
+
+    assert _timeseries_start("1y", end, None) == date(2025, 10, 18)
+    assert _timeseries_start("1m", end, None) == date(2026, 9, 18)
+    assert _timeseries_start("ytd", end, None) == date(2026, 1, 1)
+    assert _timeseries_start("max", end, date(2019, 5, 2)) == date(2019, 5, 2)
+    assert _timeseries_start("max", end, None) == end
+
+
+def test_timeseries_values_holdings_with_as_of_prices_and_fx():
+    tx_rows = [
+        {"trade_date": _days_ago(40), "asset_id": 1, "side": "buy", "quantity": 10.0},
+        {"trade_date": _days_ago(10), "asset_id": 2, "side": "buy", "quantity": 4.0},
+        {"trade_date": _days_ago(5), "asset_id": 1, "side": "sell", "quantity": 10.0},
+    ]
+    closes = {
+        1: PriceSeries.from_points([(_days_ago(50), 10.0), (_days_ago(20), 12.0)]),
+        2: PriceSeries.from_points([(_days_ago(8), 5.0)]),
+    }
+    fx_rows = [{"from_ccy": "USD", "price_date": _days_ago(25), "rate": 0.5}]
+    repo = _Repo(tx_rows, closes, fx_rows)
+
+    daily = repo.get_timeseries(1, "1m", "1d", "user")
+    values = {point.date: point.market_value for point in daily}
+
+    assert len(daily) == 30
+    assert values[_days_ago(26).isoformat()] == 0.0  # no USD rate yet
+    assert values[_days_ago(25).isoformat()] == 50.0
+    assert values[_days_ago(20).isoformat()] == 60.0
+    assert values[_days_ago(9).isoformat()] == 60.0  # asset 2 held but not priced yet
+    assert values[_days_ago(8).isoformat()] == 80.0
+    assert values[_days_ago(5).isoformat()] == 20.0
+
+    monthly = repo.get_timeseries(1, "max", "1mo", "user")
+    assert monthly[0].date >= _days_ago(40).isoformat()
+    assert monthly[-1] == daily[-1]
+
+
+def test_timeseries_columns_match_the_points():
+    tx_rows = [{"trade_date": _days_ago(40), "asset_id": 1, "side": "buy", "quantity": 3.0}]
+    closes = {1: PriceSeries.from_points([(_days_ago(50), 10.0), (_days_ago(20), 12.345)])}
+    repo = _Repo(tx_rows, closes, [{"from_ccy": "USD", "price_date": _days_ago(60), "rate": 0.9}])
+
+    columns = repo.get_timeseries_columns(1, "3m", "1w", "user")
+    points = repo.get_timeseries(1, "3m", "1w", "user")
+
+    assert list(columns) == ["dates", "market_value"]
+    assert [{"date": d, "market_value": v} for d, v in zip(columns["dates"], columns["market_value"])] == [
+        point.model_dump() for point in points
+    ]
@@ -0,0 +1,94 @@
+import contextvars
+import threading
+
+from app.repository._base import BaseRepositoryMixin
+from app.repository._session import UnitOfWorkMixin
+from app.repository._utilities import UtilitiesMixin
+from tests.unit.fakes import FakeEngine, FakeResult
+
+
+class _FakeConn:
+    def __init__(self) -> None:
+        self.queries = 0
+
+    def execute(self, statement, params):
+        self.queries += 1
+        sql = str(statement)
+        if "from portfolios" in sql:
+            return FakeResult([{"id": params["id"], "base_currency": "EUR", "cash_balance": 100.0}])
+        if "from assets" in sql:
+            return FakeResult([{"id": asset_id, "symbol": f"S{asset_id}", "quote_currency": "USD"} for asset_id in params["asset_ids"]])
+        return FakeResult([])
+
+
+class _Repo(UnitOfWorkMixin, BaseRepositoryMixin):
+    def __init__(self) -> None:
+        self.engine = FakeEngine(conn_factory=_FakeConn)
+
+    def load(self, asset_ids: list[int]):
+        with self._begin() as conn:
+            return self._get_portfolio_for_user(conn, 1, "u"), self._get_asset_meta(conn, asset_ids)
+
+
+def test_unit_of_work_shares_connection_and_memoizes_lookups():
+    repo = _Repo()
+
+    with repo.unit_of_work():
+        first = repo.load([1, 2])
+        second = repo.load([2, 3])
+
+    assert repo.engine.begins == 1
+    assert first[0] == second[0]
+    assert sorted(second[1]) == [2, 3]
+    # portfolio once, assets 1-2, then only asset 3
+    assert repo.engine.conns[0].queries == 3
+
+
+def test_without_unit_of_work_each_call_opens_its_own_connection():
+    repo = _Repo()
+
+    repo.load([1])
+    repo.load([1])
+
+    assert repo.engine.begins == 2
+
+
+def test_unit_of_work_is_not_shared_with_other_threads():
+    repo = _Repo()
+
+    with repo.unit_of_work():
+        # asyncio.to_thread / run_in_threadpool copy the context into the worker
+        context = contextvars.copy_context()
+        worker = threading.Thread(target=context.run, args=(repo.load, [1]))
+        worker.start()
+        worker.join()
+        repo.load([1])
+
+    assert repo.engine.begins == 2
+
+
+def test_unit_of_work_checks_out_a_connection_only_when_used():
+    repo = _Repo()
+
+    with repo.unit_of_work():
+        pass
+    assert repo.engine.begins == 0
+
+    with repo.unit_of_work():
+        with repo.unit_of_work():
+            repo.load([1])
+        repo.load([1])
+    assert repo.engine.begins == 1
+
+
+def test_writes_do_not_join_the_unit_of_work():
+    class _WritingRepo(UtilitiesMixin, _Repo):
+        pass
+
+    repo = _WritingRepo()
+    with repo.unit_of_work():
+        repo.load([1])
+        repo.save_idempotency_response(idempotency_key="k", endpoint="/x", response_payload={}, user_id="u")
+
+    assert repo.engine.begins == 2
+    assert repo.engine.conns[1].queries == 1
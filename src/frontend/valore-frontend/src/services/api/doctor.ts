@@ -33,6 +33,7 @@ export const getDecumulationPlan = async (
     otherIncomeAnnual?: number;
     capitalGainsTaxRatePct?: number;
     currentAge?: number | null;
+    targetSuccessRatePct?: number;
   },
 ): Promise<DecumulationPlanResponse> => {
   const query = new URLSearchParams({
@@ -45,6 +46,9 @@ export const getDecumulationPlan = async (
   if (params.currentAge != null && Number.isFinite(params.currentAge)) {
     query.set('current_age', String(params.currentAge));
   }
+  if (params.targetSuccessRatePct != null) {
+    query.set('target_success_rate_pct', String(params.targetSuccessRatePct));
+  }
   return apiFetch<DecumulationPlanResponse>(`/portfolios/${portfolioId}/decumulation?${query.toString()}`);
 };
 
@@ -57,6 +61,7 @@ export const getAggregateDecumulationPlan = async (
     otherIncomeAnnual?: number;
     capitalGainsTaxRatePct?: number;
     currentAge?: number | null;
+    targetSuccessRatePct?: number;
   },
 ): Promise<AggregateDecumulationPlanResponse> => {
   const query = new URLSearchParams({
@@ -70,5 +75,8 @@ export const getAggregateDecumulationPlan = async (
   if (params.currentAge != null && Number.isFinite(params.currentAge)) {
     query.set('current_age', String(params.currentAge));
   }
+  if (params.targetSuccessRatePct != null) {
+    query.set('target_success_rate_pct', String(params.targetSuccessRatePct));
+  }
   return apiFetch<AggregateDecumulationPlanResponse>(`/portfolios/aggregate/decumulation?${query.toString()}`);
 };
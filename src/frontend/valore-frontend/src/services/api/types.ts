@@ -277,6 +277,8 @@ export interface DecumulationPlanResponse {
   annualized_mean_return_pct: number;
   annualized_volatility_pct: number;
   sustainable_withdrawal: number;
+  target_success_rate_pct: number;
+  target_success_withdrawal: number;
   success_rate_pct: number;
   depletion_probability_pct: number;
   p25_terminal_value: number;
@@ -300,6 +302,8 @@ export interface AggregateDecumulationPlanResponse {
   annualized_mean_return_pct: number;
   annualized_volatility_pct: number;
   sustainable_withdrawal: number;
+  target_success_rate_pct: number;
+  target_success_withdrawal: number;
   success_rate_pct: number;
   depletion_probability_pct: number;
   p25_terminal_value: number;